@@ -86,8 +86,9 @@ load_dotenv(os.path.join(app_dir, '.env'), override=True)
 # =============================================================================
 
 # MODEL_PRICING + TokenTracker moved to backend/services/grading_models.py (Wave 7 Phase B).
-# MODEL_PRICING uses the explicit `as` form — external importers (planner_routes,
-# assistant_routes, assignment_post_processing) do `from assignment_grader import MODEL_PRICING`.
+# MODEL_PRICING keeps the explicit `as` form for external `from assignment_grader
+# import MODEL_PRICING` callers; in-repo importers use grading_models directly
+# so they don't load the grading pipeline just for the pricing table.
 from backend.services.grading_models import (  # noqa: F401
     MODEL_PRICING as MODEL_PRICING,
     TokenTracker as TokenTracker,
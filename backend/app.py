@@ -250,6 +250,16 @@ except Exception as e:  # noqa: BLE001 — broad catch: error is logged + captur
     _logger.warning("metrics endpoint not loaded: %s", e)
     sentry_sdk.capture_exception(e)
 
+# Request-scoped storage unit of work: per-key load cache + buffered saves
+# flushed at teardown. No-op unless FLAG_STORAGE_UNIT_OF_WORK is on. See
+# backend/storage_uow.py.
+try:
+    from backend.storage_uow import register as _register_storage_uow
+    _register_storage_uow(app)
+except Exception as e:  # noqa: BLE001  # broad catch: error is logged
+    _logger.warning("storage unit-of-work hooks not loaded: %s", e)
+    sentry_sdk.capture_exception(e)
+
 @app.errorhandler(500)
 def handle_500(e):
     return jsonify({"error": "Internal server error"}), 500
@@ -7,7 +7,14 @@ import logging
 import os
 
 from celery import Celery
-from celery.signals import worker_process_init
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_init,
+    worker_process_init,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -50,6 +57,14 @@ celery_app.conf.task_acks_late = True
 celery_app.conf.task_reject_on_worker_lost = True
 
 celery_app.autodiscover_tasks(['backend.tasks'])
+# autodiscover_tasks only looks for a `backend.tasks.tasks` module; list the
+# task modules explicitly so the worker registers them at startup.
+celery_app.conf.include = ['backend.tasks.grading_tasks', 'backend.tasks.job_tasks']
+
+# Background jobs (backend/services/background_jobs.py) get their own queue,
+# consumed by the Procfile's jobs_worker, so minutes-long exports and bulk
+# sends never sit in front of portal grading on the default queue.
+celery_app.conf.task_routes = {'jobs.run': {'queue': 'jobs'}}
 
 
 @worker_process_init.connect
@@ -71,4 +86,77 @@ def _init_worker_process(**kwargs):
     _sb._supabase_raw = None
     _sb._supabase_resilient = None
 
+    # LLM adapter events -> metrics shards (served by the CELERY_METRICS_PORT exporter).
+    from backend.observability import llm_metrics
+    llm_metrics.install()
+
     _logger.info("Celery worker process init: Sentry + Supabase client globals reset")
+
+
+# Storage unit of work per task (backend/storage_uow.py; no-op unless
+# FLAG_STORAGE_UNIT_OF_WORK is on). Tokens are keyed by task id because
+# prerun/postrun are separate signal calls; postrun fires on failure too,
+# so buffered saves are flushed either way.
+_storage_uow_tokens = {}
+
+
+@task_prerun.connect
+def _begin_task_storage_uow(task_id=None, **kwargs):
+    from backend.storage_uow import begin
+    token = begin('task')
+    if token is not None:
+        _storage_uow_tokens[task_id] = token
+
+
+@task_postrun.connect
+def _end_task_storage_uow(task_id=None, **kwargs):
+    token = _storage_uow_tokens.pop(task_id, None)
+    if token is None:
+        return
+    from backend.storage_uow import end
+    try:
+        end(token)
+    except Exception as e:  # noqa: BLE001  # broad catch: a flush failure must not fail the task result; error is logged
+        _logger.error("Storage unit-of-work flush failed for task %s: %s", task_id, e)
+
+
+# Task metrics (backend/celery_metrics.py): publish time rides in the
+# message headers; the worker records queue wait, run time, retries and
+# outcomes into per-process shards. CELERY_METRICS_PORT serves the summed
+# shards from the main worker process.
+@before_task_publish.connect
+def _stamp_task_enqueued_at(headers=None, **kwargs):
+    from backend.celery_metrics import stamp_enqueued_at
+    stamp_enqueued_at(headers)
+
+
+@worker_init.connect
+def _start_task_metrics_exporter(**kwargs):
+    port = os.environ.get('CELERY_METRICS_PORT')
+    if not port:
+        return
+    from backend.celery_metrics import start_exporter
+    try:
+        start_exporter(int(port))
+    except Exception as e:  # noqa: BLE001  # broad catch: metrics must not stop the worker; error is logged
+        _logger.error("Celery metrics exporter failed to start on port %s: %s", port, e)
+
+
+@task_prerun.connect
+def _record_task_started(task_id=None, task=None, **kwargs):
+    from backend.celery_metrics import task_started
+    if task_id and task is not None:
+        task_started(task_id, task)
+
+
+@task_postrun.connect
+def _record_task_finished(task_id=None, task=None, state=None, **kwargs):
+    from backend.celery_metrics import task_finished
+    if task_id and task is not None:
+        task_finished(task_id, task.name, state)
+
+
+@task_retry.connect
+def _record_task_retry(sender=None, **kwargs):
+    from backend.celery_metrics import task_retried
+    task_retried(getattr(sender, 'name', None) or 'unknown')
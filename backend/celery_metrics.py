@@ -0,0 +1,160 @@
+"""Prometheus metrics for Celery tasks (task latency, queue wait, retries, outcomes).
+
+Families (all labelled by Celery task name, a bounded set):
+
+* ``graider_celery_task_duration_seconds{task,state}`` — histogram of run
+  time, state being SUCCESS / FAILURE / RETRY.
+* ``graider_celery_task_queue_wait_seconds{task}`` — publish-to-start
+  delay. The publisher stamps ``graider_enqueued_at`` into the message
+  headers (before_task_publish), and the worker reads it at task_prerun.
+* ``graider_celery_task_retries_total{task}`` — counter.
+* ``graider_celery_task_outcomes_total{task,outcome}`` — counter. The
+  outcome is the final state lowercased, unless the task recorded a more
+  specific one with `note_outcome` (grading.portal_submission records
+  ``not_found`` / ``assessment_unavailable`` for its early exits).
+
+The signal handlers in backend/celery_app.py feed these. Prefork children
+record into a `MetricsRegistry` (role ``celery``) whose shards live in
+METRICS_MULTIPROC_DIR. With CELERY_METRICS_PORT set, the main worker
+process serves the summed shards (plus the LLM families of
+backend/observability/llm_metrics.py) at ``http://0.0.0.0:<port>/metrics``
+(and creates a private shard dir for its children when
+METRICS_MULTIPROC_DIR is unset). With METRICS_TOKEN set, scrapes need
+``Authorization: Bearer <token>``, the same gate as the web /metrics.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from backend.metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry, scrape_authorized
+
+_logger = logging.getLogger(__name__)
+
+ENQUEUED_AT_HEADER = "graider_enqueued_at"
+
+# Portal grading runs for seconds to minutes (soft limit 840s).
+_DURATION_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 900.0)
+_WAIT_BUCKETS = (0.05, 0.25, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+
+CELERY_FAMILIES: dict[str, tuple[str, str, tuple[float, ...] | None]] = {
+    "graider_celery_task_duration_seconds": (
+        "histogram", "Celery task run time by final state", _DURATION_BUCKETS),
+    "graider_celery_task_queue_wait_seconds": (
+        "histogram", "Delay between publishing a Celery task and a worker starting it", _WAIT_BUCKETS),
+    "graider_celery_task_retries_total": ("counter", "Celery task retries scheduled", None),
+    "graider_celery_task_outcomes_total": ("counter", "Finished Celery task runs by outcome", None),
+}
+
+_registry: MetricsRegistry | None = None
+_registry_pid = 0
+_registry_lock = threading.Lock()
+_started: dict[str, float] = {}   # task_id -> monotonic start
+_outcomes: dict[str, str] = {}    # task_id -> outcome recorded by the task
+
+
+def get_registry() -> MetricsRegistry:
+    """This process's Celery registry (created after fork, so per child)."""
+    global _registry
+    if _registry is None or _registry_pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry_pid != os.getpid():
+                _set_registry(MetricsRegistry(CELERY_FAMILIES, role="celery", live_gauges=False))
+    return _registry  # type: ignore[return-value]
+
+
+def _set_registry(registry: MetricsRegistry | None) -> None:
+    global _registry, _registry_pid
+    _registry = registry
+    _registry_pid = os.getpid()
+
+
+def stamp_enqueued_at(headers: dict[str, Any] | None) -> None:
+    """before_task_publish: record the publish time in the message headers."""
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+
+def _enqueued_at(task: Any) -> float | None:
+    request = getattr(task, "request", None)
+    if request is None:
+        return None
+    value = getattr(request, ENQUEUED_AT_HEADER, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(ENQUEUED_AT_HEADER)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def task_started(task_id: str, task: Any) -> None:
+    _started[task_id] = time.monotonic()
+    enqueued_at = _enqueued_at(task)
+    if enqueued_at is not None:
+        get_registry().observe("graider_celery_task_queue_wait_seconds",
+                               (("task", task.name),), max(0.0, time.time() - enqueued_at))
+
+
+def note_outcome(task_id: str | None, outcome: str) -> None:
+    """Record a task-specific outcome label for the current run of ``task_id``."""
+    if task_id:
+        _outcomes[task_id] = outcome
+
+
+def task_finished(task_id: str, task_name: str, state: str | None) -> None:
+    state = state or "UNKNOWN"
+    registry = get_registry()
+    started = _started.pop(task_id, None)
+    if started is not None:
+        registry.observe("graider_celery_task_duration_seconds",
+                         (("task", task_name), ("state", state)), time.monotonic() - started)
+    outcome = _outcomes.pop(task_id, None)
+    if outcome is None or state != "SUCCESS":
+        outcome = state.lower()
+    registry.inc("graider_celery_task_outcomes_total", (("task", task_name), ("outcome", outcome)))
+    registry.flush()
+
+
+def task_retried(task_name: str) -> None:
+    get_registry().inc("graider_celery_task_retries_total", (("task", task_name),))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 — http.server naming
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        if not scrape_authorized(self.headers.get("Authorization", "")):
+            self.send_error(401)
+            return
+        from backend.observability import llm_metrics
+        body = (get_registry().render() + llm_metrics.render()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 — scrape noise
+        return
+
+
+def start_exporter(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve the summed Celery shards on ``host:port`` from a daemon thread.
+
+    Call in the main worker process before the pool forks, so children
+    inherit METRICS_MULTIPROC_DIR.
+    """
+    if not os.getenv("METRICS_MULTIPROC_DIR"):
+        os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="graider-celery-metrics-")
+    _set_registry(None)
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="celery-metrics").start()
+    _logger.info("Celery metrics exporter listening on %s:%s", host, port)
+    return server
@@ -806,17 +806,32 @@ def delete_clever_data(teacher_id="local-dev"):
     # (and can carry Clever-sourced IEP/504 context). We UPDATE rather than
     # delete the rows: the assessment itself is the teacher's authored content,
     # but the embedded roster snapshot must not survive a FERPA delete.
+    # The stored student_projection (migration 0003) copies both fields and is
+    # what /api/student/join serves, so it is rebuilt from the scrubbed row in
+    # the same update — otherwise the join endpoint keeps serving the PII.
     scrubbed = 0
     if sb is not None:
+        from backend.services.student_assessment_projection import projection_columns_for
         try:
-            rows = (sb.table("published_assessments").select("id,settings")
+            rows = (sb.table("published_assessments")
+                    .select("id,join_code,title,assessment,settings,teacher_name,"
+                            "student_projection_etag")
                     .eq("teacher_id", teacher_id).execute())
             for row in (rows.data or []):
                 settings = row.get("settings") or {}
+                update = {}
                 if settings.get("student_accommodations") or settings.get("restricted_students"):
                     settings.pop("student_accommodations", None)
                     settings.pop("restricted_students", None)
-                    (sb.table("published_assessments").update({"settings": settings})
+                    update["settings"] = settings
+                if row.get("student_projection_etag"):
+                    # Also catches rows whose settings an earlier delete
+                    # scrubbed but whose projection still carries the PII.
+                    projection = projection_columns_for({**row, "settings": settings})
+                    if projection["student_projection_etag"] != row["student_projection_etag"]:
+                        update.update(projection)
+                if update:
+                    (sb.table("published_assessments").update(update)
                      .eq("id", row["id"]).execute())
                     scrubbed += 1
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
@@ -17,6 +17,7 @@ import json
 import csv
 import math
 import threading
+import functools
 import concurrent.futures
 from pathlib import Path
 from datetime import datetime
@@ -51,6 +52,8 @@ except ImportError:
 # State helpers from canonical grading.state module
 from backend.grading.state import _get_state, _get_lock, save_results
 from backend.services.rubric_formatting import format_rubric_for_prompt
+from backend.services.roster_index import RosterIndex
+from backend.observability import stage_timing
 
 _logger = logging.getLogger(__name__)
 
@@ -735,6 +738,7 @@ def _resolve_student(
     filepath: Any,
     grading_state: dict[str, Any],
     roster: dict[Any, Any],
+    roster_index: RosterIndex | None = None,
 ) -> tuple[Any, Any]:
     from assignment_grader import (  # function-local: preserves test patchability
         parse_filename,
@@ -747,44 +751,17 @@ def _resolve_student(
     if lookup_key in roster:
         student_info = roster[lookup_key].copy()
     else:
-        # Try fuzzy matching for partial/hyphenated last names
+        # Try fuzzy matching for partial/hyphenated last names (apostrophes
+        # ignored, "k" matches "kolas", "fox" matches "maloney fox",
+        # "salvador guzman" matches "salvador-guzman")
+        if roster_index is None:
+            roster_index = RosterIndex(roster)
         student_info = None
-        first_name_lower = parsed['first_name'].lower()
-        last_name_lower = parsed['last_name'].lower()
-        # Strip apostrophes/special chars for comparison (Da'Jaun → dajaun)
-        first_name_norm = first_name_lower.replace("'", "").replace("\u2019", "")
-        last_name_norm = last_name_lower.replace("'", "").replace("\u2019", "")
-        # Normalize spaces/hyphens (Salvador Guzman → salvadorguzman)
-        last_name_collapsed = last_name_norm.replace(" ", "").replace("-", "")
-
-        for roster_key, roster_data in roster.items():
-            if isinstance(roster_data, dict):
-                roster_first = roster_data.get('first_name', '').lower()
-                roster_last = roster_data.get('last_name', '').lower()
-                roster_first_norm = roster_first.replace("'", "").replace("\u2019", "")
-                roster_last_norm = roster_last.replace("'", "").replace("\u2019", "")
-                roster_last_collapsed = roster_last_norm.replace(" ", "").replace("-", "")
-
-                # Match first name (strip apostrophes for comparison)
-                if (roster_first_norm != first_name_norm
-                        and not roster_first_norm.startswith(first_name_norm)):
-                    continue
-
-                # Check various last name matching patterns
-                roster_last_parts_hyphen = roster_last_norm.split('-')
-                roster_last_parts_space = roster_last_norm.split(' ')
-                if (
-                    roster_last_norm.startswith(last_name_norm) or  # "k" matches "kolas"
-                    roster_last_parts_hyphen[0] == last_name_norm or  # "kolas" matches "kolas-nowicki"
-                    last_name_norm in roster_last_parts_hyphen or  # "nowicki" matches "kolas-nowicki"
-                    roster_last_parts_space[0] == last_name_norm or  # "maloney" matches "maloney fox"
-                    last_name_norm in roster_last_parts_space or  # "fox" matches "maloney fox"
-                    roster_last_collapsed == last_name_collapsed  # "salvador guzman" matches "salvador-guzman"
-                ):
-                    student_info = roster_data.copy()
-                    student_name = f"{roster_data.get('first_name', parsed['first_name'])} {roster_data.get('last_name', parsed['last_name'])}"
-                    grading_state["log"].append(f"  📎 Matched '{parsed['first_name']} {parsed['last_name']}' to '{student_name}'")
-                    break
+        roster_data = roster_index.match_filename_name(parsed['first_name'], parsed['last_name'])
+        if roster_data is not None:
+            student_info = roster_data.copy()
+            student_name = f"{roster_data.get('first_name', parsed['first_name'])} {roster_data.get('last_name', parsed['last_name'])}"
+            grading_state["log"].append(f"  📎 Matched '{parsed['first_name']} {parsed['last_name']}' to '{student_name}'")
 
         if not student_info:
             student_info = {"student_id": "UNKNOWN", "student_name": student_name,
@@ -919,7 +896,8 @@ def _assemble_post_grade(
     baseline_deviation = {"flag": "normal", "reasons": [], "details": {}}
     if student_info.get('student_id') and student_info['student_id'] != "UNKNOWN":
         try:
-            baseline_deviation = detect_baseline_deviation(student_info['student_id'], grade_result, teacher_id)
+            with stage_timing.span(stage_timing.POSTPROCESS):
+                baseline_deviation = detect_baseline_deviation(student_info['student_id'], grade_result, teacher_id)
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
             # Behavior-critical: baseline deviation detection flags
             # anomalous grades (potential cheating signal). Silent
@@ -940,7 +918,8 @@ def _assemble_post_grade(
         try:
             grade_record_hist = {**student_info, **grade_result, "filename": filepath.name,
                            "assignment": matched_title, "period": student_period}
-            add_assignment_to_history(student_info['student_id'], grade_record_hist, teacher_id)
+            with stage_timing.span(stage_timing.HISTORY_UPDATE):
+                add_assignment_to_history(student_info['student_id'], grade_record_hist, teacher_id)
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
             sentry_sdk.capture_exception(e)
 
@@ -1014,6 +993,16 @@ def _resolve_student_period(
     return student_period
 
 
+def _file_traced(fn: Callable[..., dict[str, Any]]) -> Callable[..., dict[str, Any]]:
+    """Attribute the file's stage spans to ``filepath.name`` (stage_timing)."""
+    @functools.wraps(fn)
+    def wrapper(filepath: Any, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        with stage_timing.file_trace(getattr(filepath, 'name', str(filepath))):
+            return fn(filepath, *args, **kwargs)
+    return wrapper
+
+
+@_file_traced
 def grade_single_file(
     filepath: Any, file_index: int, total_files: int, *,
     ai_model: str,
@@ -1046,6 +1035,7 @@ def grade_single_file(
     subject: str,
     teacher_id: str,
     trusted_students: list[str] | None,
+    roster_index: RosterIndex | None = None,
 ) -> dict[str, Any]:
     """Grade a single file - designed for parallel execution."""
     # The grade fns + ASSIGNMENT_NAME stay a FUNCTION-LOCAL import: a module-level
@@ -1061,24 +1051,29 @@ def grade_single_file(
         read_assignment_file,
     )
     try:
-        student_info, parsed = _resolve_student(
-            filepath=filepath,
-            grading_state=grading_state,
-            roster=roster,
-        )
+        with stage_timing.span(stage_timing.RESOLVE_STUDENT):
+            student_info, parsed = _resolve_student(
+                filepath=filepath,
+                grading_state=grading_state,
+                roster=roster,
+                roster_index=roster_index,
+            )
 
         # Match assignment config
         _logger.debug("  Matching config for: %s", filepath.name)
         _logger.debug("  Available configs: %s", list(all_configs.keys()))
-        matched_config = find_matching_config(filepath.name, all_configs, grading_state)
+        with stage_timing.span(stage_timing.CONFIG_MATCH):
+            matched_config = find_matching_config(filepath.name, all_configs, grading_state)
         _logger.debug("  Match result: %s", ('FOUND - ' + matched_config.get('title', '?')) if matched_config else 'NONE')
         if not matched_config:
             try:
-                temp_file_data = read_assignment_file(filepath)
+                with stage_timing.span(stage_timing.PARSE):
+                    temp_file_data = read_assignment_file(filepath)
                 if temp_file_data and temp_file_data.get("type") == "text":
                     file_text = temp_file_data.get("content", "")
                     if file_text:
-                        matched_config = find_matching_config(filepath.name, all_configs, grading_state, file_text)
+                        with stage_timing.span(stage_timing.CONFIG_MATCH):
+                            matched_config = find_matching_config(filepath.name, all_configs, grading_state, file_text)
             except Exception as e:  # noqa: BLE001  # broad catch: error is logged
                 # Best-effort: content-based matching failed. The
                 # surrounding flow will then use whatever fallback
@@ -1195,25 +1190,27 @@ def grade_single_file(
             }
 
         # Build AI notes
-        file_ai_notes, history_context = _build_file_ai_notes(
-            custom_rubric=custom_rubric,
-            file_notes=file_notes,
-            filepath=filepath,
-            global_ai_notes=global_ai_notes,
-            grading_state=grading_state,
-            matched_config=matched_config,
-            matched_title=matched_title,
-            output_folder=output_folder,
-            period_class_level_map=period_class_level_map,
-            resubmissions=resubmissions,
-            rubric_type=rubric_type,
-            student_info=student_info,
-            student_period=student_period,
-            teacher_id=teacher_id,
-        )
+        with stage_timing.span(stage_timing.CONTEXT):
+            file_ai_notes, history_context = _build_file_ai_notes(
+                custom_rubric=custom_rubric,
+                file_notes=file_notes,
+                filepath=filepath,
+                global_ai_notes=global_ai_notes,
+                grading_state=grading_state,
+                matched_config=matched_config,
+                matched_title=matched_title,
+                output_folder=output_folder,
+                period_class_level_map=period_class_level_map,
+                resubmissions=resubmissions,
+                rubric_type=rubric_type,
+                student_info=student_info,
+                student_period=student_period,
+                teacher_id=teacher_id,
+            )
 
         # Read file
-        file_data = read_assignment_file(filepath)
+        with stage_timing.span(stage_timing.PARSE):
+            file_data = read_assignment_file(filepath)
         if not file_data:
             return {"success": False, "error": "Could not read file", "filepath": filepath}
 
@@ -1385,7 +1382,7 @@ def _grade_all_files(
             future_to_file = {}
             for i in range(file_index, batch_end):
                 filepath = new_files[i]
-                future = executor.submit(grade_single_file, filepath, i + 1, len(new_files), **gsf_kwargs)
+                future = executor.submit(stage_timing.propagate(grade_single_file), filepath, i + 1, len(new_files), **gsf_kwargs)
                 future_to_file[future] = (filepath, i + 1)
 
             # Wait for batch to complete, check stop between results
@@ -1584,8 +1581,11 @@ def _grade_all_files(
                     grading_state["log"].append("")
                     grading_state["log"].append(f"Cost limit reached (${grading_state['session_cost']['total_cost']:.4f} >= ${cost_limit:.2f}). Auto-stopping...")
 
-            # Advance to next batch
+            # Advance to next batch; refresh the run's timing summary for /api/status
             file_index = batch_end
+            trace = stage_timing.current_trace()
+            if trace is not None:
+                _update_state(timing=trace.summary())
     return api_error_occurred
 
 
@@ -1746,6 +1746,7 @@ def _run_grading_thread_inner(
     def _update_state(**kwargs: Any) -> None:
         with grading_lock:
             grading_state.update(kwargs)
+    _update_state(timing=None)
 
     # Log global AI notes status
     if global_ai_notes:
@@ -1846,12 +1847,14 @@ def _run_grading_thread_inner(
         )
 
         grading_state["log"].append("Loading student roster...")
-        roster = load_roster(roster_file)
+        with stage_timing.span(stage_timing.ROSTER_LOAD):
+            roster = load_roster(roster_file)
         grading_state["log"].append(f"Loaded {len(roster)//2} students")
 
         # Stage files: canonicalize names and deduplicate (keeps newest per student+assignment)
         from backend.staging import stage_files
-        stage_result = stage_files(assignments_folder, log_fn=grading_state["log"].append)  # type: ignore[no-untyped-call]
+        with stage_timing.span(stage_timing.STAGING):
+            stage_result = stage_files(assignments_folder, log_fn=grading_state["log"].append)  # type: ignore[no-untyped-call]
         staging_folder = stage_result["staging_folder"]
         resubmissions = stage_result.get("resubmissions", set())
 
@@ -1936,6 +1939,7 @@ def _run_grading_thread_inner(
             period_class_level_map=period_class_level_map,
             resubmissions=resubmissions,
             roster=roster,
+            roster_index=RosterIndex(roster),
             rubric_prompt=rubric_prompt,
             rubric_weights=rubric_weights,
             student_period_map=student_period_map,
@@ -1963,18 +1967,20 @@ def _run_grading_thread_inner(
             with grading_lock:
                 results_copy = list(grading_state["results"])
             if results_copy:
-                save_results(results_copy, teacher_id)
+                with stage_timing.span(stage_timing.SAVE):
+                    save_results(results_copy, teacher_id)
             return
 
         # Export CSVs and emails
-        _export_results(
-            all_grades=all_grades,
-            grading_state=grading_state,
-            output_folder=output_folder,
-            school_name=school_name,
-            subject=subject,
-            teacher_name=teacher_name,
-        )
+        with stage_timing.span(stage_timing.EXPORT):
+            _export_results(
+                all_grades=all_grades,
+                grading_state=grading_state,
+                output_folder=output_folder,
+                school_name=school_name,
+                subject=subject,
+                teacher_name=teacher_name,
+            )
 
         grading_state["log"].append("")
         grading_state["log"].append("=" * 50)
@@ -1998,13 +2004,17 @@ def _run_grading_thread_inner(
             _update_state(calibration=calibration)
 
         # Save results to storage for persistence across restarts
-        save_results(results_snapshot, teacher_id)
+        with stage_timing.span(stage_timing.SAVE):
+            save_results(results_snapshot, teacher_id)
 
     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
         _update_state(error=str(e))
         sentry_sdk.capture_exception(e)
         grading_state["log"].append(f"Error: {str(e)}")
     finally:
+        trace = stage_timing.current_trace()
+        if trace is not None:
+            _update_state(timing=trace.summary())
         _update_state(is_running=False, stop_requested=False)
         # Also save on stop/error to preserve partial results
         with grading_lock:
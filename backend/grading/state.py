@@ -2,17 +2,31 @@
 
 Extracted from backend/app.py in Phase 3a PR2. Keeps module-level dicts
 and the thread-safe accessors exactly as they were at app.py head.
+
+Memory bounds: a state's ``log`` is a `BoundedLog` capped at
+GRADING_LOG_MAX_LINES (oldest lines dropped). With
+FLAG_GRADING_STATE_EVICTION on, `_get_state` periodically sweeps out idle
+states: those not running and untouched for GRADING_STATE_IDLE_TTL
+seconds, then least-recently-used ones while more than GRADING_STATE_MAX
+remain. Results this process changed but never saved are persisted
+first. An evicted teacher's next `_get_state` rebuilds the state and
+reloads results from storage.
 """
 
+import hashlib
 import json
 import logging
 import os
 import re
+import sys
 import threading
+import time
 from typing import Any, Callable, Optional, cast
 
 import sentry_sdk
 
+from backend.feature_flags import flag_enabled
+
 _logger = logging.getLogger(__name__)
 
 # Import storage abstraction (mirrors the fallback pattern in backend/app.py).
@@ -89,6 +103,7 @@ def load_saved_results(teacher_id: str = 'local-dev') -> list[dict[str, Any]]:
                 cleaned = _sanitize_student_name(sn)
                 if cleaned != sn:
                     r['student_name'] = cleaned
+            _mark_persisted(teacher_id, data)
             return cast(list[dict[str, Any]], data)
     # Fallback to direct file read
     if os.path.exists(RESULTS_FILE):
@@ -102,6 +117,7 @@ def load_saved_results(teacher_id: str = 'local-dev') -> list[dict[str, Any]]:
                     cleaned = _sanitize_student_name(sn)
                     if cleaned != sn:
                         r['student_name'] = cleaned
+                _mark_persisted(teacher_id, results)
                 return results
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
             sentry_sdk.capture_exception(e)
@@ -114,10 +130,12 @@ def save_results(results: list[dict[str, Any]], teacher_id: str = 'local-dev') -
     when configured."""
     if storage_save is not None:
         storage_save('results', results, teacher_id)
+        _mark_persisted(teacher_id, results)
     else:
         try:
             with open(RESULTS_FILE, 'w') as f:
                 json.dump(results, f, indent=2)
+            _mark_persisted(teacher_id, results)
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
             _logger.error("Error saving results: %s", e)
             sentry_sdk.capture_exception(e)
@@ -127,6 +145,52 @@ _grading_states: dict[str, dict[str, Any]] = {}   # teacher_id -> state dict
 _grading_locks: dict[str, threading.Lock] = {}    # teacher_id -> Lock
 _states_meta_lock = threading.Lock()
 
+_last_access: dict[str, float] = {}       # teacher_id -> monotonic time of last _get_state
+_persisted_digests: dict[str, str] = {}   # teacher_id -> digest of results last loaded/saved
+_last_sweep = 0.0
+_SWEEP_INTERVAL = 60.0
+evictions_total = 0
+
+
+class BoundedLog(list[Any]):
+    """The state's ``log`` list, keeping only the newest ``maxlen`` lines.
+
+    Still a list, so /api/status snapshots and jsonify are unchanged.
+    """
+
+    def __init__(self, lines: Any = (), maxlen: Optional[int] = None):
+        super().__init__(lines)
+        self.maxlen = maxlen if maxlen is not None else int(os.getenv('GRADING_LOG_MAX_LINES') or '2000')
+        self._trim()
+
+    def _trim(self) -> None:
+        if len(self) > self.maxlen:
+            del self[:len(self) - self.maxlen]
+
+    def append(self, line: Any) -> None:
+        super().append(line)
+        if len(self) > self.maxlen:
+            del self[0]
+
+    def extend(self, lines: Any) -> None:
+        super().extend(lines)
+        self._trim()
+
+
+def _results_digest(results: Any) -> str:
+    payload = json.dumps(results, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _mark_persisted(teacher_id: str, results: Any) -> None:
+    """Remember what storage holds for ``teacher_id`` (eviction saves only on change)."""
+    if not flag_enabled('grading_state_eviction', default=False):
+        return
+    try:
+        _persisted_digests[teacher_id] = _results_digest(results)
+    except Exception:  # noqa: BLE001  # broad catch: unknown digest just means eviction re-saves
+        _persisted_digests.pop(teacher_id, None)
+
 
 def _create_default_state(teacher_id: str = 'local-dev') -> dict[str, Any]:
     """Create a fresh grading state dict for a teacher."""
@@ -136,7 +200,7 @@ def _create_default_state(teacher_id: str = 'local-dev') -> dict[str, Any]:
         "progress": 0,
         "total": 0,
         "current_file": "",
-        "log": [],
+        "log": BoundedLog(),
         "results": load_saved_results(teacher_id),
         "complete": False,
         "error": None,
@@ -145,23 +209,127 @@ def _create_default_state(teacher_id: str = 'local-dev') -> dict[str, Any]:
         "cost_warning_pct": 80,
         "cost_limit_hit": False,
         "cost_warning_sent": False,
+        "timing": None,
     }
 
 
 def _get_state(teacher_id: str = 'local-dev') -> dict[str, Any]:
     """Get (or lazily create) the grading state dict for a teacher."""
-    if teacher_id not in _grading_states:
+    now = time.monotonic()
+    _last_access[teacher_id] = now
+    state = _grading_states.get(teacher_id)
+    if state is None:
         with _states_meta_lock:
-            if teacher_id not in _grading_states:
-                _grading_states[teacher_id] = _create_default_state(teacher_id)
+            state = _grading_states.get(teacher_id)
+            if state is None:
+                state = _grading_states[teacher_id] = _create_default_state(teacher_id)
                 _grading_locks[teacher_id] = threading.Lock()
-    return _grading_states[teacher_id]
+    # Routes clear the log with a plain ``[]``; re-wrap so the cap holds.
+    if type(state.get("log")) is list:
+        state["log"] = BoundedLog(state["log"])
+    if now - _last_sweep >= _SWEEP_INTERVAL and flag_enabled('grading_state_eviction', default=False):
+        evict_idle_states(now, keep=teacher_id)
+    return state
 
 
 def _get_lock(teacher_id: str = 'local-dev') -> threading.Lock:
     """Get (or lazily create) the grading lock for a teacher."""
-    _get_state(teacher_id)  # ensure state+lock exist
-    return _grading_locks[teacher_id]
+    while True:
+        _get_state(teacher_id)  # ensure state+lock exist
+        lock = _grading_locks.get(teacher_id)
+        if lock is not None:
+            return lock
+
+
+def evict_idle_states(now: Optional[float] = None, keep: Optional[str] = None) -> list[str]:
+    """Drop idle teacher states from memory; returns the evicted teacher ids.
+
+    Running states, ``keep``, and states whose lock is currently held are
+    never evicted. LRU eviction (over GRADING_STATE_MAX) only takes states
+    idle for at least one sweep interval, so a burst of new teachers
+    cannot evict someone mid-request.
+    """
+    global _last_sweep, evictions_total
+    now = time.monotonic() if now is None else now
+    ttl = float(os.getenv('GRADING_STATE_IDLE_TTL') or '1800')
+    max_states = int(os.getenv('GRADING_STATE_MAX') or '200')
+
+    with _states_meta_lock:
+        _last_sweep = now
+        by_age = sorted(_grading_states, key=lambda t: _last_access.get(t, 0.0))
+        overflow = len(by_age) - max_states
+        candidates = []
+        last_seen = {}
+        for teacher_id in by_age:
+            idle = now - _last_access.get(teacher_id, 0.0)
+            if teacher_id == keep or _grading_states[teacher_id].get("is_running"):
+                continue
+            if idle >= ttl or (overflow > 0 and idle >= _SWEEP_INTERVAL):
+                candidates.append(teacher_id)
+                last_seen[teacher_id] = _last_access.get(teacher_id, 0.0)
+                overflow -= 1
+
+        evicted = []
+        for teacher_id in candidates:
+            lock = _grading_locks.get(teacher_id)
+            if lock is None or not lock.acquire(blocking=False):
+                continue
+            try:
+                state = _grading_states[teacher_id]
+                # Re-check under the teacher lock: a request may have touched it since.
+                if state.get("is_running") or _last_access.get(teacher_id, 0.0) != last_seen[teacher_id]:
+                    continue
+                if not _persist_before_evict(teacher_id, state):
+                    continue
+                del _grading_states[teacher_id]
+                del _grading_locks[teacher_id]
+                _last_access.pop(teacher_id, None)
+                _persisted_digests.pop(teacher_id, None)
+                evicted.append(teacher_id)
+            finally:
+                lock.release()
+        evictions_total += len(evicted)
+
+    if evicted:
+        from backend.observability.events import emit
+        emit("grading.state.evicted", count=len(evicted), remaining=len(_grading_states))
+    return evicted
+
+
+def _persist_before_evict(teacher_id: str, state: dict[str, Any]) -> bool:
+    """Save results this process changed since its last load/save; False keeps the state."""
+    results = state.get("results", [])
+    try:
+        if _persisted_digests.get(teacher_id) == _results_digest(results):
+            return True
+        save_results(list(results), teacher_id)
+        return True
+    except Exception as e:  # noqa: BLE001  # broad catch: keep the state rather than lose results
+        _logger.warning("Not evicting grading state for %s: save failed: %s", teacher_id, e)
+        sentry_sdk.capture_exception(e)
+        return False
+
+
+def _approx_size(obj: Any, depth: int = 0) -> int:
+    size = sys.getsizeof(obj)
+    if depth > 6:
+        return size
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k, depth + 1) + _approx_size(v, depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(v, depth + 1) for v in obj)
+    return size
+
+
+def state_bytes(state: dict[str, Any], sample: int = 20) -> int:
+    """Approximate bytes held by one state; ``results`` is estimated from a sample."""
+    size = sum(_approx_size(v) for k, v in state.items() if k != "results")
+    results = state.get("results") or []
+    if results:
+        step = max(1, len(results) // sample)
+        picked = results[::step][:sample]
+        size += sys.getsizeof(results) + len(results) * sum(_approx_size(r) for r in picked) // len(picked)
+    return size
 
 
 def _update_state(teacher_id: str = 'local-dev', **kwargs: Any) -> None:
@@ -180,7 +348,7 @@ def reset_state(teacher_id: str = 'local-dev', clear_results: bool = False) -> N
             "progress": 0,
             "total": 0,
             "current_file": "",
-            "log": [],
+            "log": BoundedLog(),
             "results": [] if clear_results else state.get("results", []),
             "complete": False,
             "error": None,
@@ -189,4 +357,5 @@ def reset_state(teacher_id: str = 'local-dev', clear_results: bool = False) -> N
             "cost_warning_pct": 80,
             "cost_limit_hit": False,
             "cost_warning_sent": False,
+            "timing": None,
         })
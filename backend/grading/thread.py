@@ -2,13 +2,14 @@
 
 Extracted from backend/app.py in Phase 3a PR3. Handles BYOK (bring your
 own key) context management then delegates to the pipeline module for
-the actual grading logic. Thin wrapper (~27 LOC) — lifecycle concerns
+the actual grading logic. Thin wrapper — lifecycle concerns
 ONLY; business logic lives in backend.grading.pipeline.
 """
 from typing import Any, Optional
 
 from backend.grading.pipeline import _run_grading_thread_inner
 from backend.grading.state import _get_state
+from backend.observability.stage_timing import export_otel, run_trace
 
 
 def run_grading_thread(
@@ -60,12 +61,16 @@ def run_grading_thread(
     try:
         if user_api_keys:
             set_thread_keys(user_api_keys)
-        _run_grading_thread_inner(
-            assignments_folder, output_folder, roster_file, assignment_config,
-            global_ai_notes, grading_period, grade_level, subject, teacher_name,
-            school_name, selected_files, ai_model, skip_verified, class_period,
-            rubric, ensemble_models, extraction_mode, trusted_students,
-            grading_style, teacher_id,
-        )
+        # Stage timing (backend/observability/stage_timing.py): the inner run
+        # stores trace.summary() as grading_state["timing"].
+        with run_trace() as trace:
+            _run_grading_thread_inner(
+                assignments_folder, output_folder, roster_file, assignment_config,
+                global_ai_notes, grading_period, grade_level, subject, teacher_name,
+                school_name, selected_files, ai_model, skip_verified, class_period,
+                rubric, ensemble_models, extraction_mode, trusted_students,
+                grading_style, teacher_id,
+            )
+        export_otel(trace, {"graider.ai_model": ai_model})
     finally:
         clear_thread_keys()  # type: ignore[no-untyped-call]
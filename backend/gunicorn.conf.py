@@ -0,0 +1,38 @@
+"""gunicorn settings for the web service (Procfile / railway.json / nixpacks.toml).
+
+Worker model: ``gthread``. The former sync workers served one request per
+process, so each /api/assistant/chat SSE stream (a multi-round tool loop,
+often a minute or more) pinned a whole worker; two concurrent assistant
+users could block a 2-worker pod, status polls included. gthread workers
+serve GUNICORN_THREADS requests concurrently per process, and their
+--timeout watchdog tracks the worker's main loop rather than each request,
+so a long stream is no longer killed at 120s either.
+
+Not gevent: grading runs as plain threads with ThreadPoolExecutors, the
+Supabase/LLM SDKs and Playwright (slide PDFs) would all run under
+monkey-patching, and a single blocking C call would stall every greenlet in
+the worker. Threads give streams their own stack with no patching.
+
+Streams cannot take every thread: backend/stream_slots.py caps concurrent
+streams per worker (SSE_STREAM_SLOTS, default GUNICORN_THREADS - 4) and
+answers 503 + Retry-After beyond it, so sync routes always keep threads.
+Capacity per pod is WEB_CONCURRENCY x SSE_STREAM_SLOTS streams;
+loadtest/scenarios/assistant-streams.js measures it.
+
+Worker settings are env-tunable; GUNICORN_WORKER_CLASS=sync restores the old
+one-request-per-worker model. gunicorn quietly swaps a sync worker for
+gthread whenever threads > 1, so with sync the thread default drops to 1
+(an explicit GUNICORN_THREADS still wins).
+"""
+import os
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS') or 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY') or '2')
+threads = int(os.getenv('GUNICORN_THREADS') or ('1' if worker_class == 'sync' else '16'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT') or '120')
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT') or '30')
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE') or '5')
+
+max_requests = 1000
+max_requests_jitter = 50
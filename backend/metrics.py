@@ -5,12 +5,20 @@ Hand-rolled stdlib registry — deliberately NOT prometheus_client:
 * No new dependency → no lockfile churn, no pip-audit surface.
 * gunicorn runs multiple workers; prometheus_client's answer to that is
   multiprocess mode (PROMETHEUS_MULTIPROC_DIR + lifecycle hooks), which
-  is operationally heavier than this anchor needs. This registry is
+  is operationally heavier than this anchor needs. By default the registry is
   **per-worker**: each gunicorn worker keeps its own counters, and a
   scrape is served by whichever worker accepts the connection. That
   limitation is documented in every HELP line so scraper operators see
   it (sum/rate across scrapes still trends correctly; absolute totals
-  are per-process). Revisit if we ever need exact cross-worker totals.
+  are per-process).
+* Exact cross-worker totals: set ``METRICS_MULTIPROC_DIR`` to a directory
+  shared by the workers (same idea as prometheus_client's multiprocess
+  mode, without the dependency). Each worker then writes its counters and
+  histograms to ``web_<pid>.json`` there, at most every
+  METRICS_FLUSH_SECONDS (5) and at exit. A scrape sums every shard, and
+  the shards of exited workers are folded into an archive so totals stay
+  monotonic. Live gauges stay per-worker. Celery workers use the same
+  store via backend/celery_metrics.py.
 
 Exposed families (Prometheus text exposition format v0.0.4):
 
@@ -20,6 +28,16 @@ Exposed families (Prometheus text exposition format v0.0.4):
   ``graider_grading_states_tracked`` — gauges computed at scrape time
   from the real per-teacher grading state registry in
   ``backend.grading.state`` (the same dicts the SIGTERM handler walks).
+* ``graider_grading_state_bytes`` / ``graider_grading_state_bytes_max`` —
+  approximate memory held by those states (sum and largest single state;
+  aggregated, not labelled by teacher, to keep ids out of label values),
+  plus ``graider_grading_state_evictions_total`` for idle-state eviction.
+* ``graider_llm_*`` — LLM latency, time-to-first-token, tokens, cost,
+  retries, rate-limit waits and breaker state per provider/model/feature
+  (backend/observability/llm_metrics.py).
+* ``graider_sse_streams_active`` / ``graider_sse_stream_slots`` /
+  ``graider_sse_streams_rejected_total`` — assistant SSE streams held
+  against the per-worker cap in backend/stream_slots.py.
 * ``graider_process_threads`` — ``threading.active_count()`` (grading +
   portal-grading threads run as plain threads in this process).
 
@@ -41,11 +59,16 @@ compare). Unset (the default) keeps the endpoint open.
 """
 from __future__ import annotations
 
+import atexit
+import contextlib
+import fcntl
 import hmac
+import json
 import logging
 import os
 import threading
 import time
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from flask import Response, g, request
@@ -67,9 +90,12 @@ _KNOWN_METHODS = frozenset(
 _BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
 
 _PER_WORKER_NOTE = (
-    "(per-worker: each gunicorn worker exposes its own values; a scrape "
+    "(per-worker: each worker process exposes its own values; a scrape "
     "reports the worker that served it)"
 )
+_FLEET_NOTE = (
+    "(fleet-wide: summed over every process sharing METRICS_MULTIPROC_DIR)"
+)
 
 
 def _escape_label_value(value: str) -> str:
@@ -86,97 +112,271 @@ def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
     return "{" + inner + "}"
 
 
+# family -> (type, help text, histogram buckets)
+HTTP_FAMILIES: dict[str, tuple[str, str, tuple[float, ...] | None]] = {
+    "graider_http_requests_total": ("counter", "Total HTTP requests handled", None),
+    "graider_http_request_duration_seconds": ("histogram", "HTTP request latency", _BUCKETS),
+}
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
 class MetricsRegistry:
-    """Thread-safe per-process registry for request counters/histograms.
+    """Thread-safe registry of counters/histograms for one process.
 
     State is per-app-instance (stored in ``app.extensions``) so test
-    apps get isolated registries, and per-worker in production (see
-    module docstring for the multi-worker limitation).
+    apps get isolated registries. With ``METRICS_MULTIPROC_DIR`` set,
+    every process also writes its samples to a shard file there and a
+    scrape sums all shards (`ShardStore`); otherwise values are
+    per-worker (see module docstring).
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        families: dict[str, tuple[str, str, tuple[float, ...] | None]] | None = None,
+        role: str = "web",
+        shard_dir: str | None = None,
+        live_gauges: bool = True,
+    ) -> None:
+        self.families = families if families is not None else HTTP_FAMILIES
+        self.live_gauges = live_gauges
         self._lock = threading.Lock()
-        # (method, endpoint, status_class) -> count
-        self._requests: dict[tuple[str, str, str], int] = {}
-        # (method, endpoint) -> {"buckets": [...], "sum": float, "count": int}
-        self._durations: dict[tuple[str, str], dict[str, Any]] = {}
+        # (family, labels) -> value
+        self._counters: dict[tuple[str, _Labels], float] = {}
+        # (family, labels) -> {"buckets": [...], "sum": float, "count": int}
+        self._histograms: dict[tuple[str, _Labels], dict[str, Any]] = {}
+        directory = shard_dir if shard_dir is not None else os.getenv("METRICS_MULTIPROC_DIR")
+        self._shards = ShardStore(directory, role) if directory else None
+        self._flush_interval = float(os.getenv("METRICS_FLUSH_SECONDS") or "5")
+        self._last_flush = 0.0
+
+    @property
+    def multiprocess(self) -> bool:
+        return self._shards is not None
+
+    def inc(self, family: str, labels: _Labels = (), amount: float = 1) -> None:
+        key = (family, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, family: str, labels: _Labels, value: float) -> None:
+        self._observe(family, labels, value)
+        self._maybe_flush()
+
+    def _observe(self, family: str, labels: _Labels, value: float) -> None:
+        edges = self.families[family][2] or ()
+        key = (family, labels)
+        with self._lock:
+            histo = self._histograms.get(key)
+            if histo is None:
+                histo = {"buckets": [0] * len(edges), "sum": 0.0, "count": 0}
+                self._histograms[key] = histo
+            for i, edge in enumerate(edges):
+                if value <= edge:
+                    histo["buckets"][i] += 1
+            histo["sum"] += value
+            histo["count"] += 1
 
     def observe_request(
         self, method: str, endpoint: str, status_code: int, duration_s: float
     ) -> None:
         method = method.upper() if method.upper() in _KNOWN_METHODS else "OTHER"
         status_class = f"{status_code // 100}xx"
-        counter_key = (method, endpoint, status_class)
-        histo_key = (method, endpoint)
         with self._lock:
-            self._requests[counter_key] = self._requests.get(counter_key, 0) + 1
-            histo = self._durations.get(histo_key)
-            if histo is None:
-                histo = {"buckets": [0] * len(_BUCKETS), "sum": 0.0, "count": 0}
-                self._durations[histo_key] = histo
-            for i, edge in enumerate(_BUCKETS):
-                if duration_s <= edge:
-                    histo["buckets"][i] += 1
-            histo["sum"] += duration_s
-            histo["count"] += 1
+            counter_key = ("graider_http_requests_total", (
+                ("method", method), ("endpoint", endpoint), ("status", status_class)))
+            self._counters[counter_key] = self._counters.get(counter_key, 0) + 1
+        self._observe("graider_http_request_duration_seconds",
+                      (("method", method), ("endpoint", endpoint)), duration_s)
+        self._maybe_flush()
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable copy of this process's samples."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: dict(h, buckets=list(h["buckets"])) for key, h in self._histograms.items()}
+        return _snapshot_from_merged(counters, histograms)
+
+    def flush(self) -> None:
+        """Write this process's shard now (no-op without a shard dir)."""
+        if self._shards is None:
+            return
+        self._last_flush = time.monotonic()
+        try:
+            self._shards.write(self.snapshot())
+        except OSError as e:
+            logging.getLogger(__name__).warning("metrics shard write failed: %s", e)
+
+    def _maybe_flush(self) -> None:
+        if self._shards is not None and time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
 
     def render(self) -> str:
         """Render the full exposition (request metrics + live gauges)."""
+        own = self.snapshot()
+        if self._shards is not None:
+            self.flush()
+            snapshots = [own] + self._shards.collect()
+            scope = _FLEET_NOTE
+        else:
+            snapshots = [own]
+            scope = _PER_WORKER_NOTE
+        counters, histograms = merge_snapshots(snapshots)
+
         lines: list[str] = []
-        with self._lock:
-            requests_snapshot = dict(self._requests)
-            durations_snapshot = {
-                key: {
-                    "buckets": list(histo["buckets"]),
-                    "sum": histo["sum"],
-                    "count": histo["count"],
-                }
-                for key, histo in self._durations.items()
-            }
-
-        lines.append(
-            "# HELP graider_http_requests_total Total HTTP requests "
-            f"handled {_PER_WORKER_NOTE}."
-        )
-        lines.append("# TYPE graider_http_requests_total counter")
-        for (method, endpoint, status_class), count in sorted(
-            requests_snapshot.items()
-        ):
-            labels = _format_labels(
-                (("method", method), ("endpoint", endpoint), ("status", status_class))
-            )
-            lines.append(f"graider_http_requests_total{labels} {count}")
+        for family, (mtype, help_text, edges) in self.families.items():
+            lines.append(f"# HELP {family} {help_text} {scope}.")
+            lines.append(f"# TYPE {family} {mtype}")
+            if mtype == "counter":
+                for (f, labels), value in sorted(counters.items()):
+                    if f == family:
+                        lines.append(f"{family}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (f, labels), histo in sorted(histograms.items()):
+                if f != family:
+                    continue
+                for i, edge in enumerate(edges or ()):
+                    lines.append(
+                        f"{family}_bucket{_format_labels(labels + (('le', repr(edge)),))} "
+                        f"{histo['buckets'][i]}"
+                    )
+                lines.append(f"{family}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histo['count']}")
+                lines.append(f"{family}_sum{_format_labels(labels)} {histo['sum']:.6f}")
+                lines.append(f"{family}_count{_format_labels(labels)} {histo['count']}")
+
+        if self.live_gauges:
+            lines.extend(_render_grading_gauges())
+        return "\n".join(lines) + "\n"
 
-        lines.append(
-            "# HELP graider_http_request_duration_seconds HTTP request "
-            f"latency {_PER_WORKER_NOTE}."
-        )
-        lines.append("# TYPE graider_http_request_duration_seconds histogram")
-        for (method, endpoint), histo in sorted(durations_snapshot.items()):
-            base = (("method", method), ("endpoint", endpoint))
-            for i, edge in enumerate(_BUCKETS):
-                labels = _format_labels(base + (("le", repr(edge)),))
-                lines.append(
-                    "graider_http_request_duration_seconds_bucket"
-                    f"{labels} {histo['buckets'][i]}"
-                )
-            labels = _format_labels(base + (("le", "+Inf"),))
-            lines.append(
-                "graider_http_request_duration_seconds_bucket"
-                f"{labels} {histo['count']}"
-            )
-            base_labels = _format_labels(base)
-            lines.append(
-                "graider_http_request_duration_seconds_sum"
-                f"{base_labels} {histo['sum']:.6f}"
-            )
-            lines.append(
-                "graider_http_request_duration_seconds_count"
-                f"{base_labels} {histo['count']}"
-            )
 
-        lines.extend(_render_grading_gauges())
-        return "\n".join(lines) + "\n"
+def merge_snapshots(
+    snapshots: list[dict[str, Any]],
+) -> tuple[dict[tuple[str, _Labels], float], dict[tuple[str, _Labels], dict[str, Any]]]:
+    """Sum counters and histograms across snapshots (see `MetricsRegistry.snapshot`)."""
+    counters: dict[tuple[str, _Labels], float] = {}
+    histograms: dict[tuple[str, _Labels], dict[str, Any]] = {}
+    for snap in snapshots:
+        for family, labels, value in snap.get("counters", ()):
+            key = (family, tuple(tuple(p) for p in labels))
+            counters[key] = counters.get(key, 0) + value
+        for family, labels, buckets, total, count in snap.get("histograms", ()):
+            key = (family, tuple(tuple(p) for p in labels))
+            histo = histograms.get(key)
+            if histo is None or len(histo["buckets"]) != len(buckets):
+                histograms[key] = {"buckets": list(buckets), "sum": total, "count": count}
+                continue
+            histo["buckets"] = [a + b for a, b in zip(histo["buckets"], buckets)]
+            histo["sum"] += total
+            histo["count"] += count
+    return counters, histograms
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ShardStore:
+    """Per-process sample files for one role (``web`` / ``celery``) in a shared dir.
+
+    Each process atomically replaces ``<role>_<pid>.json`` with its
+    cumulative samples. `collect` returns every other process's shard plus
+    ``<role>_archive.json``; shards of exited processes (gunicorn
+    ``--max-requests`` recycling, Celery child replacement) are folded
+    into the archive under an flock, so counters stay monotonic
+    fleet-wide.
+    """
+
+    def __init__(self, directory: str, role: str) -> None:
+        self.directory = Path(directory)
+        self.role = role
+
+    def _shard_path(self, pid: int) -> Path:
+        return self.directory / f"{self.role}_{pid}.json"
+
+    def write(self, snapshot: dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._shard_path(os.getpid())
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, path)
+
+    def collect(self) -> list[dict[str, Any]]:
+        """Snapshots of every other live process plus the archive of exited ones."""
+        if not self.directory.is_dir():
+            return []
+        own_pid = os.getpid()
+        archive_path = self.directory / f"{self.role}_archive.json"
+        snapshots: list[dict[str, Any]] = []
+        with open(self.directory / f".{self.role}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                archive = _read_json(archive_path) or {}
+                dead: list[Path] = []
+                for path in self.directory.glob(f"{self.role}_*.json"):
+                    pid_part = path.stem[len(self.role) + 1:]
+                    if not pid_part.isdigit() or int(pid_part) == own_pid:
+                        continue
+                    data = _read_json(path)
+                    if data is None:
+                        continue
+                    if _pid_alive(int(pid_part)):
+                        snapshots.append(data)
+                    else:
+                        archive = _snapshot_from_merged(*merge_snapshots([archive, data]))
+                        dead.append(path)
+                if dead:
+                    tmp = archive_path.with_name(f".{archive_path.name}.tmp")
+                    tmp.write_text(json.dumps(archive))
+                    os.replace(tmp, archive_path)
+                    for path in dead:
+                        path.unlink(missing_ok=True)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        if archive:
+            snapshots.append(archive)
+        return snapshots
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.getLogger(__name__).warning("unreadable metrics shard %s: %s", path, e)
+        return None
+
+
+def _snapshot_from_merged(
+    counters: dict[tuple[str, _Labels], float], histograms: dict[tuple[str, _Labels], dict[str, Any]],
+) -> dict[str, Any]:
+    return {
+        "counters": [[f, [list(p) for p in labels], v] for (f, labels), v in counters.items()],
+        "histograms": [[f, [list(p) for p in labels], h["buckets"], h["sum"], h["count"]]
+                       for (f, labels), h in histograms.items()],
+    }
+
+
+def scrape_authorized(authorization: str) -> bool:
+    """True if a scrape may proceed: METRICS_TOKEN unset, or ``authorization``
+    is ``Bearer <METRICS_TOKEN>`` (constant-time compare). Shared by the web
+    /metrics route and the Celery exporter (backend/celery_metrics.py)."""
+    expected = os.getenv("METRICS_TOKEN")
+    if not expected:
+        return True
+    return authorization.startswith("Bearer ") and hmac.compare_digest(
+        authorization[7:], expected)
 
 
 def _render_grading_gauges() -> list[str]:
@@ -184,24 +384,38 @@ def _render_grading_gauges() -> list[str]:
 
     Reads ``backend.grading.state._grading_states`` (the per-teacher
     grading state dicts) under ``_states_meta_lock`` — the same
-    snapshot pattern ``_handle_sigterm`` in backend/app.py uses.
-    Imported lazily so a minimal test app doesn't pull the grading
-    stack at registration time.
+    snapshot pattern ``_handle_sigterm`` in backend/app.py uses — then
+    copies each state's items under that teacher's lock, since a grading
+    thread may add keys mid-scrape. Imported lazily so a minimal test app
+    doesn't pull the grading stack at registration time.
     """
     from backend.grading import state as grading_state
 
     with grading_state._states_meta_lock:
-        snapshot = list(grading_state._grading_states.values())
+        entries = [(state, grading_state._grading_locks.get(teacher_id))
+                   for teacher_id, state in grading_state._grading_states.items()]
+    snapshot = []
+    for state, lock in entries:
+        with lock or contextlib.nullcontext():
+            snapshot.append(dict(list(state.items())))
 
     runs_active = 0
     files_pending = 0
+    state_bytes_total = 0
+    state_bytes_max = 0
     for state in snapshot:
+        size = grading_state.state_bytes(state)
+        state_bytes_total += size
+        state_bytes_max = max(state_bytes_max, size)
         if state.get("is_running"):
             runs_active += 1
             total = state.get("total", 0) or 0
             progress = state.get("progress", 0) or 0
             files_pending += max(total - progress, 0)
 
+    from backend import stream_slots
+    slots = stream_slots.get_slots()
+
     return [
         "# HELP graider_grading_runs_active Teacher grading runs currently "
         f"executing in this process {_PER_WORKER_NOTE}.",
@@ -215,6 +429,30 @@ def _render_grading_gauges() -> list[str]:
         f"held in memory {_PER_WORKER_NOTE}.",
         "# TYPE graider_grading_states_tracked gauge",
         f"graider_grading_states_tracked {len(snapshot)}",
+        "# HELP graider_grading_state_bytes Approximate bytes held by all "
+        f"teacher grading states (results, log) {_PER_WORKER_NOTE}.",
+        "# TYPE graider_grading_state_bytes gauge",
+        f"graider_grading_state_bytes {state_bytes_total}",
+        "# HELP graider_grading_state_bytes_max Approximate bytes held by the "
+        f"largest single teacher grading state {_PER_WORKER_NOTE}.",
+        "# TYPE graider_grading_state_bytes_max gauge",
+        f"graider_grading_state_bytes_max {state_bytes_max}",
+        "# HELP graider_grading_state_evictions_total Idle teacher grading "
+        f"states evicted from memory {_PER_WORKER_NOTE}.",
+        "# TYPE graider_grading_state_evictions_total counter",
+        f"graider_grading_state_evictions_total {grading_state.evictions_total}",
+        "# HELP graider_sse_streams_active Assistant SSE streams currently "
+        f"holding a worker thread {_PER_WORKER_NOTE}.",
+        "# TYPE graider_sse_streams_active gauge",
+        f"graider_sse_streams_active {slots.active}",
+        "# HELP graider_sse_stream_slots Concurrent SSE stream cap "
+        f"(SSE_STREAM_SLOTS) {_PER_WORKER_NOTE}.",
+        "# TYPE graider_sse_stream_slots gauge",
+        f"graider_sse_stream_slots {slots.capacity}",
+        "# HELP graider_sse_streams_rejected_total SSE streams refused with "
+        f"503 because every slot was taken {_PER_WORKER_NOTE}.",
+        "# TYPE graider_sse_streams_rejected_total counter",
+        f"graider_sse_streams_rejected_total {slots.rejected_total}",
         "# HELP graider_process_threads Live threads in this process, "
         f"including grading threads {_PER_WORKER_NOTE}.",
         "# TYPE graider_process_threads gauge",
@@ -244,6 +482,10 @@ def register_metrics(app: "Flask") -> None:
         return
     registry = MetricsRegistry()
     app.extensions["graider_metrics"] = registry
+    from backend.observability import llm_metrics
+    llm_metrics.install()
+    if registry.multiprocess:
+        atexit.register(registry.flush)  # keep samples from a recycled worker
 
     @app.before_request
     def _metrics_start_timer() -> None:
@@ -261,17 +503,13 @@ def register_metrics(app: "Flask") -> None:
     def graider_metrics() -> Response:
         # Optional bearer gate: METRICS_TOKEN set → require it (constant-
         # time compare); unset → open, matching /healthz's public posture.
-        expected = os.getenv("METRICS_TOKEN")
-        if expected:
-            supplied = request.headers.get("Authorization", "")
-            if not (
-                supplied.startswith("Bearer ")
-                and hmac.compare_digest(supplied[7:], expected)
-            ):
-                return Response(
-                    "unauthorized\n", status=401, content_type="text/plain"
-                )
-        return Response(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+        if not scrape_authorized(request.headers.get("Authorization", "")):
+            return Response(
+                "unauthorized\n", status=401, content_type="text/plain"
+            )
+        from backend.observability import llm_metrics
+        return Response(registry.render() + llm_metrics.render(),
+                        content_type=PROMETHEUS_CONTENT_TYPE)
 
     # limiter.exempt: a Redis blip in flask-limiter's storage must not
     # 500 the scrape — same rationale as /healthz. Imported lazily so a
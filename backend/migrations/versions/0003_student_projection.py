@@ -0,0 +1,48 @@
+"""Stored student-safe projection on published_assessments.
+
+Revision ID: 0003_student_projection
+Revises: 0002_subm_dedup
+Create Date: 2026-10-18
+
+Classification: additive, forward-only, reversible.
+
+Adds two nullable TEXT columns written by publish_assessment:
+`student_projection` (the pre-serialized, answer-free JSON body served by
+/api/student/join/<code>) and `student_projection_etag` (its content hash,
+used for conditional GETs). Existing rows stay NULL; the join route falls
+back to projecting the full row per request for them, so no backfill is
+required for correctness.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003_student_projection"
+down_revision: Union[str, None] = "0002_subm_dedup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_STATEMENTS_UP = [
+    "ALTER TABLE published_assessments ADD COLUMN IF NOT EXISTS student_projection TEXT",
+    "ALTER TABLE published_assessments ADD COLUMN IF NOT EXISTS student_projection_etag TEXT",
+]
+
+_STATEMENTS_DOWN = [
+    "ALTER TABLE published_assessments DROP COLUMN IF EXISTS student_projection_etag",
+    "ALTER TABLE published_assessments DROP COLUMN IF EXISTS student_projection",
+]
+
+
+def upgrade() -> None:
+    for stmt in _STATEMENTS_UP:
+        op.execute(stmt)
+
+
+# destructive: downgrade() only — drops the two derived projection columns.
+# Their contents are recomputable from `assessment` + `settings`, and the
+# join route already handles rows where they are NULL.
+def downgrade() -> None:
+    for stmt in _STATEMENTS_DOWN:
+        op.execute(stmt)
@@ -0,0 +1,98 @@
+"""student_standards_mastery rollup table.
+
+Revision ID: 0004_mastery_rollup
+Revises: 0003_student_projection
+Create Date: 2026-10-18
+
+Classification: additive, forward-only, reversible.
+
+Materialized per-(student, class, standard) mastery rollup described in
+docs/perf-progress-rank.md. Rows are written by
+backend/services/student_mastery_rollup.py when class-based grading
+finalizes and when a remediation is recalled, and are backfilled by
+backend/scripts/backfill_mastery_rollup.py. The table starts empty; reads
+only switch to it once FLAG_MASTERY_ROLLUP_READS is on, so no backfill is
+required for correctness at migration time.
+
+Each attempt_mode_* column holds the `{overall, by_dok}` aggregate that
+_aggregate_mastery_for_student(include_dok=True) produces for that mode, or
+NULL when the standard contributes no points under that mode (the row still
+exists so the class's standard-column union stays exact).
+
+RLS mirrors class_students_own: a teacher reads rows for classes they own.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004_mastery_rollup"
+down_revision: Union[str, None] = "0003_student_projection"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_STATEMENTS_UP = [
+    """
+    CREATE TABLE IF NOT EXISTS public.student_standards_mastery (
+        student_id           uuid NOT NULL,
+        class_id             uuid NOT NULL,
+        standard_code        text NOT NULL,
+        percentage           numeric,
+        points_earned        numeric,
+        points_possible      numeric,
+        question_count       integer,
+        attempt_mode_latest  jsonb,
+        attempt_mode_best    jsonb,
+        attempt_mode_average jsonb,
+        last_submission_at   timestamptz,
+        updated_at           timestamptz NOT NULL DEFAULT now(),
+        CONSTRAINT student_standards_mastery_pkey
+            PRIMARY KEY (student_id, class_id, standard_code),
+        CONSTRAINT student_standards_mastery_student_id_fkey FOREIGN KEY (student_id)
+            REFERENCES public.students(id) ON DELETE CASCADE,
+        CONSTRAINT student_standards_mastery_class_id_fkey FOREIGN KEY (class_id)
+            REFERENCES public.classes(id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_ssm_class_standard "
+    "ON public.student_standards_mastery (class_id, standard_code)",
+    "CREATE INDEX IF NOT EXISTS idx_ssm_class_updated "
+    "ON public.student_standards_mastery (class_id, updated_at DESC)",
+    "ALTER TABLE public.student_standards_mastery ENABLE ROW LEVEL SECURITY",
+    """
+    DO $pol$
+    BEGIN
+        IF to_regproc('auth.uid') IS NULL THEN
+            RETURN;  -- bare Postgres: no Supabase auth; skip policy
+        END IF;
+        CREATE POLICY student_standards_mastery_own ON public.student_standards_mastery
+            FOR ALL
+            USING (EXISTS (SELECT 1 FROM classes WHERE classes.id =
+                   student_standards_mastery.class_id AND
+                   (classes.teacher_id)::text = (auth.uid())::text))
+            WITH CHECK (EXISTS (SELECT 1 FROM classes WHERE classes.id =
+                   student_standards_mastery.class_id AND
+                   (classes.teacher_id)::text = (auth.uid())::text));
+    EXCEPTION WHEN duplicate_object THEN
+        NULL;
+    END
+    $pol$
+    """,
+]
+
+_STATEMENTS_DOWN = [
+    "DROP TABLE IF EXISTS public.student_standards_mastery",
+]
+
+
+def upgrade() -> None:
+    for stmt in _STATEMENTS_UP:
+        op.execute(stmt)
+
+
+# destructive: downgrade() only — drops the derived rollup table. Every row
+# is recomputable from student_submissions via the backfill script.
+def downgrade() -> None:
+    for stmt in _STATEMENTS_DOWN:
+        op.execute(stmt)
@@ -0,0 +1,143 @@
+"""class_gradebook_grid() RPC: roster × content × canonical-grade grid.
+
+Revision ID: 0005_gradebook_grid
+Revises: 0004_mastery_rollup
+Create Date: 2026-10-18
+
+Classification: additive, forward-only, reversible.
+
+`student_gradebook.build_class_gradebook` makes 4+ PostgREST round trips
+(enrollments, students, published_content, remediation content, then
+paginated submissions) and picks the canonical attempt per (student,
+content) in Python. This function returns the same inputs in ONE call as a
+jsonb document, with attempt_mode selection done in SQL:
+
+    {"roster":  [{id, first_name, last_name}, ...],
+     "content": [{id, title, content_type, created_at, due_date, is_active,
+                  target_student_ids, remediation_content}, ...],
+     "grades":  [{student_id, content_id, submission_id, percentage,
+                  attempt_number, submitted_at, total_attempts,
+                  percentage_sum}, ...]}
+
+Ordering mirrors _select_submissions_by_mode exactly:
+- latest:  attempt_number DESC (NULL as 0), submitted_at DESC (NULL last)
+- best:    percentage DESC (NULL as 0), submitted_at DESC, attempt_number DESC
+- average: anchor row = latest; percentage_sum / total_attempts is averaged
+           (and rounded) in Python so rounding matches the fallback.
+
+`remediation_content` carries the full `content` JSONB only for rows with
+non-empty target_student_ids (the DOK pill), same as the Python path's
+focused second fetch.
+
+SECURITY INVOKER: the caller's RLS applies, so a teacher-JWT client sees
+exactly the rows its table reads would. The Python path stays as the
+fallback (FLAG_GRADEBOOK_RPC off, fake Supabase, or RPC error).
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0005_gradebook_grid"
+down_revision: Union[str, None] = "0004_mastery_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_STATEMENTS_UP = [
+    # The SQL function body is validated at CREATE time. Trees stamped at
+    # 0001 over the frozen SQL files (Migrations Smoke) may predate this
+    # column; the baseline's drift convergence adds it the same way.
+    "ALTER TABLE public.published_content "
+    "ADD COLUMN IF NOT EXISTS target_student_ids jsonb",
+    """
+    CREATE OR REPLACE FUNCTION public.class_gradebook_grid(
+        p_class_id uuid,
+        p_attempt_mode text DEFAULT 'latest'
+    )
+    RETURNS jsonb
+    LANGUAGE sql
+    STABLE
+    SECURITY INVOKER
+    SET search_path = public
+    AS $fn$
+    WITH roster AS (
+        SELECT s.id, s.first_name, s.last_name
+        FROM class_students cs
+        JOIN students s ON s.id = cs.student_id
+        WHERE cs.class_id = p_class_id
+    ),
+    content AS (
+        SELECT pc.id, pc.title, pc.content_type, pc.created_at, pc.due_date,
+               pc.is_active, pc.target_student_ids,
+               CASE WHEN pc.target_student_ids IS NOT NULL
+                         AND pc.target_student_ids NOT IN ('null'::jsonb, '[]'::jsonb)
+                    THEN pc.content END AS remediation_content
+        FROM published_content pc
+        WHERE pc.class_id = p_class_id
+          AND pc.content_type IN ('assessment', 'assignment')
+    ),
+    ranked AS (
+        SELECT ss.id, ss.student_id, ss.content_id, ss.attempt_number,
+               ss.submitted_at, ss.percentage,
+               count(*) OVER w AS total_attempts,
+               sum(coalesce(ss.percentage, 0)) OVER w AS percentage_sum,
+               row_number() OVER (
+                   PARTITION BY ss.student_id, ss.content_id
+                   ORDER BY
+                       CASE WHEN p_attempt_mode = 'best'
+                            THEN coalesce(ss.percentage, 0) END DESC NULLS LAST,
+                       CASE WHEN p_attempt_mode = 'best'
+                            THEN NULL ELSE coalesce(ss.attempt_number, 0) END DESC NULLS LAST,
+                       ss.submitted_at DESC NULLS LAST,
+                       coalesce(ss.attempt_number, 0) DESC,
+                       ss.id
+               ) AS rn
+        FROM student_submissions ss
+        WHERE ss.student_id IN (SELECT id FROM roster)
+          AND ss.content_id IN (SELECT id FROM content)
+          AND ss.status <> 'draft'
+        WINDOW w AS (PARTITION BY ss.student_id, ss.content_id)
+    )
+    SELECT jsonb_build_object(
+        'roster', coalesce((SELECT jsonb_agg(to_jsonb(r)) FROM roster r), '[]'::jsonb),
+        'content', coalesce((SELECT jsonb_agg(to_jsonb(c)) FROM content c), '[]'::jsonb),
+        'grades', coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'student_id', g.student_id,
+                'content_id', g.content_id,
+                'submission_id', g.id,
+                'percentage', g.percentage,
+                'attempt_number', g.attempt_number,
+                'submitted_at', g.submitted_at,
+                'total_attempts', g.total_attempts,
+                'percentage_sum', g.percentage_sum
+            ))
+            FROM ranked g
+            WHERE g.rn = 1
+        ), '[]'::jsonb)
+    )
+    $fn$
+    """,
+    # Covering index for the per-class submissions scan. student_submissions
+    # is filtered by (student_id, content_id) in both paths.
+    "CREATE INDEX IF NOT EXISTS idx_student_submissions_student_content "
+    "ON public.student_submissions (student_id, content_id)",
+]
+
+_STATEMENTS_DOWN = [
+    "DROP FUNCTION IF EXISTS public.class_gradebook_grid(uuid, text)",
+    "DROP INDEX IF EXISTS public.idx_student_submissions_student_content",
+]
+
+
+def upgrade() -> None:
+    for stmt in _STATEMENTS_UP:
+        op.execute(stmt)
+
+
+# destructive: downgrade() only — drops the RPC and its index. The Python
+# gradebook path does not depend on either.
+def downgrade() -> None:
+    for stmt in _STATEMENTS_DOWN:
+        op.execute(stmt)
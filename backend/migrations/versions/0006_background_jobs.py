@@ -0,0 +1,106 @@
+"""background_jobs table + private job-results bucket.
+
+Revision ID: 0006_background_jobs
+Revises: 0005_gradebook_grid
+Create Date: 2026-10-18
+
+Classification: additive, forward-only, reversible.
+
+Persisted rows for backend/services/background_jobs.py: one row per
+teacher-initiated long operation (bulk grade emails, district report,
+cloud sync, login roster syncs, slide exports). The row is the source of
+truth for status, progress, cancellation and the result summary; Celery's
+result backend stays off. Result files (and large job inputs such as slide
+decks) live in the private `job-results` Storage bucket under
+`<job_id>/...`, read and written only by the service-role client.
+
+The jobs service writes with the service role; the RLS policy lets a
+teacher-JWT client read its own jobs.
+
+`dedupe_key` + the partial index let enqueue return an already queued or
+running job of the same kind (double-clicks, stalled-outbox restarts)
+instead of starting a second one.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0006_background_jobs"
+down_revision: Union[str, None] = "0005_gradebook_grid"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_STATEMENTS_UP = [
+    """
+    CREATE TABLE IF NOT EXISTS public.background_jobs (
+        id               uuid PRIMARY KEY,
+        teacher_id       text NOT NULL,
+        kind             text NOT NULL,
+        status           text NOT NULL DEFAULT 'queued',
+        params           jsonb NOT NULL DEFAULT '{}'::jsonb,
+        progress         jsonb NOT NULL DEFAULT '{}'::jsonb,
+        result           jsonb,
+        error            text,
+        cancel_requested boolean NOT NULL DEFAULT false,
+        dedupe_key       text,
+        task_id          text,
+        attempts         integer NOT NULL DEFAULT 0,
+        created_at       timestamptz NOT NULL DEFAULT now(),
+        updated_at       timestamptz NOT NULL DEFAULT now(),
+        started_at       timestamptz,
+        finished_at      timestamptz,
+        CONSTRAINT background_jobs_status_check CHECK (status IN
+            ('queued', 'running', 'succeeded', 'failed', 'cancelled'))
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_background_jobs_teacher_created "
+    "ON public.background_jobs (teacher_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_background_jobs_active_dedupe "
+    "ON public.background_jobs (teacher_id, kind, dedupe_key) "
+    "WHERE status IN ('queued', 'running')",
+    "ALTER TABLE public.background_jobs ENABLE ROW LEVEL SECURITY",
+    """
+    DO $pol$
+    BEGIN
+        IF to_regproc('auth.uid') IS NULL THEN
+            RETURN;  -- bare Postgres: no Supabase auth; skip policy
+        END IF;
+        CREATE POLICY background_jobs_own_read ON public.background_jobs
+            FOR SELECT
+            USING (teacher_id = (auth.uid())::text);
+    EXCEPTION WHEN duplicate_object THEN
+        NULL;
+    END
+    $pol$
+    """,
+    """
+    DO $bucket$
+    BEGIN
+        IF to_regclass('storage.buckets') IS NULL THEN
+            RETURN;  -- bare Postgres: no Supabase Storage; files stay local
+        END IF;
+        INSERT INTO storage.buckets (id, name, public)
+        VALUES ('job-results', 'job-results', false)
+        ON CONFLICT (id) DO NOTHING;
+    END
+    $bucket$
+    """,
+]
+
+_STATEMENTS_DOWN = [
+    "DROP TABLE IF EXISTS public.background_jobs",
+]
+
+
+def upgrade() -> None:
+    for stmt in _STATEMENTS_UP:
+        op.execute(stmt)
+
+
+# destructive: downgrade() only — drops job history. The job-results bucket
+# is left in place (Storage objects are not removable from SQL).
+def downgrade() -> None:
+    for stmt in _STATEMENTS_DOWN:
+        op.execute(stmt)
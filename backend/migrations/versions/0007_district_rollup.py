@@ -0,0 +1,630 @@
+"""District analytics rollup, maintained by triggers.
+
+Revision ID: 0007_district_rollup
+Revises: 0006_background_jobs
+Create Date: 2026-10-18
+
+Classification: additive, forward-only, reversible.
+
+GET /api/district/analytics used to rebuild the district rollup on every
+cache miss. It paged teacher_id out of three whole tables, listed every
+auth user, then ran admin_routes.compute_overview + _enrich_teachers over
+all teachers. Results were capped at _HARD_CAP rows per chunk
+("approximate"). These tables hold the same numbers, exact, maintained as
+the source rows change:
+
+- district_rollup_units: one row per attribution unit, kept by row
+  triggers as a delta (old row out, new row in). Units are:
+    ('class', classes.id)                    -> enrollments (class_students rows)
+    ('content', published_content.id)        -> student_submissions.score stats
+    ('assessment', published_assessments.join_code) -> submissions.score stats
+  Score stats are scored_count, score_sum and grade_a..grade_f, using the
+  same bands as compute_overview (>=90 A, >=80 B, >=70 C, >=60 D, else F).
+- district_teacher_rollup: one row per district teacher (anyone owning a
+  class, published_content or published_assessments row). It holds
+  _enrich_teachers' counts, compute_overview's totals, and the auth email
+  and first name.
+    * A leaf change (grade, enrollment) applies the same delta to the
+      owning teacher's row.
+    * An ownership change (class, content or assessment inserted, deleted
+      or re-parented) recomputes the affected teachers' rows from their
+      units: district_rollup_refresh_teacher, one index probe per owned
+      unit.
+
+The district overview is the column sum of district_teacher_rollup,
+one paged select (backend/services/district_rollup.py).
+
+The tables start empty. backend/scripts/backfill_district_rollup.py
+--apply calls district_rollup_rebuild(teacher_id) for every teacher. The
+rebuild recomputes that teacher's units from source under a table lock,
+so concurrent writers apply their deltas after it. --verify compares
+against the live computation. Reads switch over only with
+FLAG_DISTRICT_ROLLUP_READS.
+
+Both tables have RLS on and no policy: only the service role (district
+admin routes, the backfill) reads them. The functions are SECURITY DEFINER
+so the triggers can maintain the rollup whichever role writes the source
+row; EXECUTE is revoked from API roles.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0007_district_rollup"
+down_revision: Union[str, None] = "0006_background_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Canonical (lower-case) uuid text: classes / published_content teacher_id
+# are uuid, published_assessments.teacher_id is text (may be clever:{id}).
+_UUID_RE = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+
+_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_add(
+        p_kind text,
+        p_key text,
+        p_teacher_id text,
+        p_enrollments bigint,
+        p_score numeric,
+        p_sign integer
+    )
+    RETURNS void
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    DECLARE
+        v_scored integer := CASE WHEN p_score IS NULL THEN 0 ELSE p_sign END;
+        v_a integer := CASE WHEN p_score >= 90 THEN p_sign ELSE 0 END;
+        v_b integer := CASE WHEN p_score >= 80 AND p_score < 90 THEN p_sign ELSE 0 END;
+        v_c integer := CASE WHEN p_score >= 70 AND p_score < 80 THEN p_sign ELSE 0 END;
+        v_d integer := CASE WHEN p_score >= 60 AND p_score < 70 THEN p_sign ELSE 0 END;
+        v_f integer := CASE WHEN p_score < 60 THEN p_sign ELSE 0 END;
+        v_sum numeric := p_sign * coalesce(p_score, 0);
+        v_enrollments bigint := p_sign * p_enrollments;
+    BEGIN
+        IF p_key IS NULL OR p_key = '' THEN
+            RETURN;
+        END IF;
+        INSERT INTO district_rollup_units AS u
+            (unit_kind, unit_key, enrollments, scored_count, score_sum,
+             grade_a, grade_b, grade_c, grade_d, grade_f)
+        VALUES (p_kind, p_key, v_enrollments, v_scored, v_sum,
+                v_a, v_b, v_c, v_d, v_f)
+        ON CONFLICT (unit_kind, unit_key) DO UPDATE SET
+            enrollments  = u.enrollments + EXCLUDED.enrollments,
+            scored_count = u.scored_count + EXCLUDED.scored_count,
+            score_sum    = u.score_sum + EXCLUDED.score_sum,
+            grade_a      = u.grade_a + EXCLUDED.grade_a,
+            grade_b      = u.grade_b + EXCLUDED.grade_b,
+            grade_c      = u.grade_c + EXCLUDED.grade_c,
+            grade_d      = u.grade_d + EXCLUDED.grade_d,
+            grade_f      = u.grade_f + EXCLUDED.grade_f,
+            updated_at   = now();
+
+        IF p_teacher_id IS NULL OR p_teacher_id = '' THEN
+            RETURN;
+        END IF;
+        -- Serializes with district_rollup_refresh_teacher for this teacher.
+        -- No row yet (pre-backfill) → nothing to adjust; the rebuild
+        -- computes it from source.
+        PERFORM pg_advisory_xact_lock(hashtext('district_rollup:' || p_teacher_id));
+        UPDATE district_teacher_rollup AS t SET
+            students_count = t.students_count + v_enrollments,
+            scored_count   = t.scored_count + v_scored,
+            score_sum      = t.score_sum + v_sum,
+            grade_a        = t.grade_a + v_a,
+            grade_b        = t.grade_b + v_b,
+            grade_c        = t.grade_c + v_c,
+            grade_d        = t.grade_d + v_d,
+            grade_f        = t.grade_f + v_f,
+            updated_at     = now()
+        WHERE t.teacher_id = p_teacher_id;
+    END;
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_class_teacher(p_class_id uuid)
+    RETURNS text
+    LANGUAGE sql
+    STABLE
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+        SELECT teacher_id::text FROM classes WHERE id = p_class_id
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_content_teacher(p_content_id uuid)
+    RETURNS text
+    LANGUAGE sql
+    STABLE
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+        SELECT c.teacher_id::text
+        FROM published_content pc
+        JOIN classes c ON c.id = pc.class_id
+        WHERE pc.id = p_content_id
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_assessment_teacher(p_join_code text)
+    RETURNS text
+    LANGUAGE sql
+    STABLE
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+        SELECT nullif(teacher_id, '') FROM published_assessments
+        WHERE join_code = p_join_code AND p_join_code <> ''
+    $fn$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION public.district_rollup_refresh_teacher(p_teacher_id text)
+    RETURNS void
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    DECLARE
+        v_uuid uuid;
+        v_owned bigint;
+        v_email text;
+        v_name text;
+    BEGIN
+        IF p_teacher_id IS NULL OR p_teacher_id = '' THEN
+            RETURN;
+        END IF;
+        PERFORM pg_advisory_xact_lock(hashtext('district_rollup:' || p_teacher_id));
+        IF p_teacher_id ~ '{_UUID_RE}' THEN
+            v_uuid := p_teacher_id::uuid;
+        END IF;
+
+        SELECT (SELECT count(*) FROM classes WHERE teacher_id = v_uuid)
+             + (SELECT count(*) FROM published_content WHERE teacher_id = v_uuid)
+             + (SELECT count(*) FROM published_assessments WHERE teacher_id = p_teacher_id)
+          INTO v_owned;
+        IF v_owned = 0 THEN
+            DELETE FROM district_teacher_rollup WHERE teacher_id = p_teacher_id;
+            RETURN;
+        END IF;
+
+        -- Same source as the list_all_users lookup the live path does
+        -- (email + user_metadata.first_name); absent on bare Postgres.
+        IF v_uuid IS NOT NULL AND to_regclass('auth.users') IS NOT NULL THEN
+            EXECUTE 'SELECT email, raw_user_meta_data ->> ''first_name'' '
+                    'FROM auth.users WHERE id = $1'
+               INTO v_email, v_name
+              USING v_uuid;
+        END IF;
+
+        WITH cls AS (
+            SELECT id FROM classes WHERE teacher_id = v_uuid
+        ),
+        pc AS (
+            SELECT pc.id FROM published_content pc JOIN cls ON pc.class_id = cls.id
+        ),
+        pa AS (
+            SELECT join_code FROM published_assessments WHERE teacher_id = p_teacher_id
+        ),
+        units AS (
+            SELECT u.* FROM cls JOIN district_rollup_units u
+                ON u.unit_kind = 'class' AND u.unit_key = cls.id::text
+            UNION ALL
+            SELECT u.* FROM pc JOIN district_rollup_units u
+                ON u.unit_kind = 'content' AND u.unit_key = pc.id::text
+            UNION ALL
+            SELECT u.* FROM pa JOIN district_rollup_units u
+                ON u.unit_kind = 'assessment' AND u.unit_key = pa.join_code
+            WHERE pa.join_code <> ''
+        )
+        INSERT INTO district_teacher_rollup AS t
+            (teacher_id, email, name, classes_count, students_count,
+             assessments_count, total_assessments, scored_count, score_sum,
+             grade_a, grade_b, grade_c, grade_d, grade_f, updated_at)
+        SELECT p_teacher_id, v_email, v_name,
+               (SELECT count(*) FROM cls),
+               coalesce(sum(units.enrollments), 0),
+               (SELECT count(*) FROM pa),
+               (SELECT count(*) FROM pc) + (SELECT count(*) FROM pa WHERE join_code <> ''),
+               coalesce(sum(units.scored_count), 0),
+               coalesce(sum(units.score_sum), 0),
+               coalesce(sum(units.grade_a), 0),
+               coalesce(sum(units.grade_b), 0),
+               coalesce(sum(units.grade_c), 0),
+               coalesce(sum(units.grade_d), 0),
+               coalesce(sum(units.grade_f), 0),
+               now()
+        FROM units
+        ON CONFLICT (teacher_id) DO UPDATE SET
+            email             = EXCLUDED.email,
+            name              = EXCLUDED.name,
+            classes_count     = EXCLUDED.classes_count,
+            students_count    = EXCLUDED.students_count,
+            assessments_count = EXCLUDED.assessments_count,
+            total_assessments = EXCLUDED.total_assessments,
+            scored_count      = EXCLUDED.scored_count,
+            score_sum         = EXCLUDED.score_sum,
+            grade_a           = EXCLUDED.grade_a,
+            grade_b           = EXCLUDED.grade_b,
+            grade_c           = EXCLUDED.grade_c,
+            grade_d           = EXCLUDED.grade_d,
+            grade_f           = EXCLUDED.grade_f,
+            updated_at        = EXCLUDED.updated_at;
+    END;
+    $fn$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION public.district_rollup_rebuild(p_teacher_id text)
+    RETURNS jsonb
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    DECLARE
+        v_uuid uuid;
+    BEGIN
+        IF p_teacher_id IS NULL OR p_teacher_id = '' THEN
+            RETURN NULL;
+        END IF;
+        IF p_teacher_id ~ '{_UUID_RE}' THEN
+            v_uuid := p_teacher_id::uuid;
+        END IF;
+        -- Writers that already adjusted a unit hold ROW EXCLUSIVE until they
+        -- commit, so this waits for them and then reads their rows; writers
+        -- arriving later wait here and apply their delta on top.
+        LOCK TABLE district_rollup_units IN SHARE ROW EXCLUSIVE MODE;
+
+        INSERT INTO district_rollup_units AS u (unit_kind, unit_key, enrollments)
+        SELECT 'class', c.id::text,
+               (SELECT count(*) FROM class_students cs WHERE cs.class_id = c.id)
+        FROM classes c
+        WHERE c.teacher_id = v_uuid
+        ON CONFLICT (unit_kind, unit_key) DO UPDATE SET
+            enrollments = EXCLUDED.enrollments,
+            updated_at  = now();
+
+        INSERT INTO district_rollup_units AS u
+            (unit_kind, unit_key, scored_count, score_sum,
+             grade_a, grade_b, grade_c, grade_d, grade_f)
+        SELECT 'content', pc.id::text,
+               count(ss.score),
+               coalesce(sum(ss.score), 0),
+               count(*) FILTER (WHERE ss.score >= 90),
+               count(*) FILTER (WHERE ss.score >= 80 AND ss.score < 90),
+               count(*) FILTER (WHERE ss.score >= 70 AND ss.score < 80),
+               count(*) FILTER (WHERE ss.score >= 60 AND ss.score < 70),
+               count(*) FILTER (WHERE ss.score < 60)
+        FROM published_content pc
+        JOIN classes c ON c.id = pc.class_id
+        LEFT JOIN student_submissions ss ON ss.content_id = pc.id
+        WHERE c.teacher_id = v_uuid
+        GROUP BY pc.id
+        ON CONFLICT (unit_kind, unit_key) DO UPDATE SET
+            scored_count = EXCLUDED.scored_count,
+            score_sum    = EXCLUDED.score_sum,
+            grade_a      = EXCLUDED.grade_a,
+            grade_b      = EXCLUDED.grade_b,
+            grade_c      = EXCLUDED.grade_c,
+            grade_d      = EXCLUDED.grade_d,
+            grade_f      = EXCLUDED.grade_f,
+            updated_at   = now();
+
+        INSERT INTO district_rollup_units AS u
+            (unit_kind, unit_key, scored_count, score_sum,
+             grade_a, grade_b, grade_c, grade_d, grade_f)
+        SELECT 'assessment', pa.join_code,
+               count(s.score),
+               coalesce(sum(s.score), 0),
+               count(*) FILTER (WHERE s.score >= 90),
+               count(*) FILTER (WHERE s.score >= 80 AND s.score < 90),
+               count(*) FILTER (WHERE s.score >= 70 AND s.score < 80),
+               count(*) FILTER (WHERE s.score >= 60 AND s.score < 70),
+               count(*) FILTER (WHERE s.score < 60)
+        FROM published_assessments pa
+        LEFT JOIN submissions s ON s.join_code = pa.join_code
+        WHERE pa.teacher_id = p_teacher_id AND pa.join_code <> ''
+        GROUP BY pa.join_code
+        ON CONFLICT (unit_kind, unit_key) DO UPDATE SET
+            scored_count = EXCLUDED.scored_count,
+            score_sum    = EXCLUDED.score_sum,
+            grade_a      = EXCLUDED.grade_a,
+            grade_b      = EXCLUDED.grade_b,
+            grade_c      = EXCLUDED.grade_c,
+            grade_d      = EXCLUDED.grade_d,
+            grade_f      = EXCLUDED.grade_f,
+            updated_at   = now();
+
+        PERFORM district_rollup_refresh_teacher(p_teacher_id);
+        RETURN (SELECT to_jsonb(t) FROM district_teacher_rollup t
+                WHERE t.teacher_id = p_teacher_id);
+    END;
+    $fn$
+    """,
+    # ── Trigger functions ────────────────────────────────────────────────
+    # OLD is NULL in INSERT row triggers and NEW in DELETE ones (PG11+), so
+    # each function handles all three operations.
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_on_student_submission()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.score IS NOT NULL THEN
+            PERFORM district_rollup_add('content', OLD.content_id::text,
+                district_rollup_content_teacher(OLD.content_id), 0, OLD.score, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.score IS NOT NULL THEN
+            PERFORM district_rollup_add('content', NEW.content_id::text,
+                district_rollup_content_teacher(NEW.content_id), 0, NEW.score, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_on_submission()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.score IS NOT NULL THEN
+            PERFORM district_rollup_add('assessment', OLD.join_code,
+                district_rollup_assessment_teacher(OLD.join_code), 0, OLD.score, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.score IS NOT NULL THEN
+            PERFORM district_rollup_add('assessment', NEW.join_code,
+                district_rollup_assessment_teacher(NEW.join_code), 0, NEW.score, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_on_enrollment()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM district_rollup_add('class', OLD.class_id::text,
+                district_rollup_class_teacher(OLD.class_id), 1, NULL, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM district_rollup_add('class', NEW.class_id::text,
+                district_rollup_class_teacher(NEW.class_id), 1, NULL, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $fn$
+    """,
+    # Ownership changes: recompute every teacher on either side. Cascaded
+    # deletes (class_students under a deleted class) find no teacher and
+    # only adjust their unit; the class's own refresh drops it.
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_on_class()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM district_rollup_refresh_teacher(OLD.teacher_id::text);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM district_rollup_refresh_teacher(NEW.teacher_id::text);
+        END IF;
+        RETURN NULL;
+    END;
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_on_content()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM district_rollup_refresh_teacher(OLD.teacher_id::text);
+            PERFORM district_rollup_refresh_teacher(district_rollup_class_teacher(OLD.class_id));
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM district_rollup_refresh_teacher(NEW.teacher_id::text);
+            PERFORM district_rollup_refresh_teacher(district_rollup_class_teacher(NEW.class_id));
+        END IF;
+        RETURN NULL;
+    END;
+    $fn$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.district_rollup_on_assessment()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    SECURITY DEFINER
+    SET search_path = public
+    AS $fn$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM district_rollup_refresh_teacher(OLD.teacher_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM district_rollup_refresh_teacher(NEW.teacher_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $fn$
+    """,
+]
+
+_FUNCTION_SIGNATURES = [
+    "public.district_rollup_add(text, text, text, bigint, numeric, integer)",
+    "public.district_rollup_class_teacher(uuid)",
+    "public.district_rollup_content_teacher(uuid)",
+    "public.district_rollup_assessment_teacher(text)",
+    "public.district_rollup_refresh_teacher(text)",
+    "public.district_rollup_rebuild(text)",
+    "public.district_rollup_on_student_submission()",
+    "public.district_rollup_on_submission()",
+    "public.district_rollup_on_enrollment()",
+    "public.district_rollup_on_class()",
+    "public.district_rollup_on_content()",
+    "public.district_rollup_on_assessment()",
+]
+
+# (trigger, table, events, WHEN). UPDATE triggers fire only when a column
+# the rollup reads actually changed — grading status churn is free.
+_TRIGGER_SPECS = [
+    ("district_rollup_student_submissions", "student_submissions",
+     "INSERT OR DELETE", None, "district_rollup_on_student_submission"),
+    ("district_rollup_student_submissions_update", "student_submissions",
+     "UPDATE OF score, content_id",
+     "OLD.score IS DISTINCT FROM NEW.score OR OLD.content_id IS DISTINCT FROM NEW.content_id",
+     "district_rollup_on_student_submission"),
+    ("district_rollup_submissions", "submissions",
+     "INSERT OR DELETE", None, "district_rollup_on_submission"),
+    ("district_rollup_submissions_update", "submissions",
+     "UPDATE OF score, join_code",
+     "OLD.score IS DISTINCT FROM NEW.score OR OLD.join_code IS DISTINCT FROM NEW.join_code",
+     "district_rollup_on_submission"),
+    ("district_rollup_class_students", "class_students",
+     "INSERT OR DELETE", None, "district_rollup_on_enrollment"),
+    ("district_rollup_class_students_update", "class_students",
+     "UPDATE OF class_id", "OLD.class_id IS DISTINCT FROM NEW.class_id",
+     "district_rollup_on_enrollment"),
+    ("district_rollup_classes", "classes",
+     "INSERT OR DELETE", None, "district_rollup_on_class"),
+    ("district_rollup_classes_update", "classes",
+     "UPDATE OF teacher_id", "OLD.teacher_id IS DISTINCT FROM NEW.teacher_id",
+     "district_rollup_on_class"),
+    ("district_rollup_published_content", "published_content",
+     "INSERT OR DELETE", None, "district_rollup_on_content"),
+    ("district_rollup_published_content_update", "published_content",
+     "UPDATE OF teacher_id, class_id",
+     "OLD.teacher_id IS DISTINCT FROM NEW.teacher_id OR OLD.class_id IS DISTINCT FROM NEW.class_id",
+     "district_rollup_on_content"),
+    ("district_rollup_published_assessments", "published_assessments",
+     "INSERT OR DELETE", None, "district_rollup_on_assessment"),
+    ("district_rollup_published_assessments_update", "published_assessments",
+     "UPDATE OF teacher_id, join_code",
+     "OLD.teacher_id IS DISTINCT FROM NEW.teacher_id OR OLD.join_code IS DISTINCT FROM NEW.join_code",
+     "district_rollup_on_assessment"),
+]
+
+
+# Supabase grants EXECUTE on new public functions to the API roles; only the
+# service role may call the rebuild RPC (the backfill), and nothing else is
+# callable through PostgREST. Bare Postgres has no such roles.
+_GRANTS = """
+    DO $grants$
+    DECLARE
+        fn text;
+    BEGIN
+        FOREACH fn IN ARRAY ARRAY[%s] LOOP
+            EXECUTE format('REVOKE ALL ON FUNCTION %%s FROM PUBLIC', fn);
+            IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+                EXECUTE format('REVOKE ALL ON FUNCTION %%s FROM anon, authenticated', fn);
+            END IF;
+        END LOOP;
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+            GRANT EXECUTE ON FUNCTION public.district_rollup_rebuild(text) TO service_role;
+        END IF;
+    END
+    $grants$
+    """ % ", ".join(f"'{sig}'" for sig in _FUNCTION_SIGNATURES)
+
+
+def _trigger_sql(name, table, events, when, function):
+    return (
+        f"CREATE OR REPLACE TRIGGER {name} AFTER {events} ON public.{table} "
+        "FOR EACH ROW "
+        + (f"WHEN ({when}) " if when else "")
+        + f"EXECUTE FUNCTION public.{function}()"
+    )
+
+
+_STATEMENTS_UP = [
+    """
+    CREATE TABLE IF NOT EXISTS public.district_rollup_units (
+        unit_kind    text NOT NULL,
+        unit_key     text NOT NULL,
+        enrollments  bigint NOT NULL DEFAULT 0,
+        scored_count bigint NOT NULL DEFAULT 0,
+        score_sum    numeric NOT NULL DEFAULT 0,
+        grade_a      bigint NOT NULL DEFAULT 0,
+        grade_b      bigint NOT NULL DEFAULT 0,
+        grade_c      bigint NOT NULL DEFAULT 0,
+        grade_d      bigint NOT NULL DEFAULT 0,
+        grade_f      bigint NOT NULL DEFAULT 0,
+        updated_at   timestamptz NOT NULL DEFAULT now(),
+        CONSTRAINT district_rollup_units_pkey PRIMARY KEY (unit_kind, unit_key),
+        CONSTRAINT district_rollup_units_kind_check CHECK (unit_kind IN
+            ('class', 'content', 'assessment'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.district_teacher_rollup (
+        teacher_id        text PRIMARY KEY,
+        email             text,
+        name              text,
+        classes_count     bigint NOT NULL DEFAULT 0,
+        students_count    bigint NOT NULL DEFAULT 0,
+        assessments_count bigint NOT NULL DEFAULT 0,
+        total_assessments bigint NOT NULL DEFAULT 0,
+        scored_count      bigint NOT NULL DEFAULT 0,
+        score_sum         numeric NOT NULL DEFAULT 0,
+        grade_a           bigint NOT NULL DEFAULT 0,
+        grade_b           bigint NOT NULL DEFAULT 0,
+        grade_c           bigint NOT NULL DEFAULT 0,
+        grade_d           bigint NOT NULL DEFAULT 0,
+        grade_f           bigint NOT NULL DEFAULT 0,
+        updated_at        timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    "ALTER TABLE public.district_rollup_units ENABLE ROW LEVEL SECURITY",
+    "ALTER TABLE public.district_teacher_rollup ENABLE ROW LEVEL SECURITY",
+    # district_rollup_refresh_teacher's ownership probe; the other lookups
+    # ride existing indexes (classes (teacher_id, name), idx_published_class,
+    # idx_submissions_content, idx_submissions_join_code, class_students
+    # (class_id, student_id), idx_published_assessments_teacher).
+    "CREATE INDEX IF NOT EXISTS idx_published_content_teacher "
+    "ON public.published_content (teacher_id)",
+    *_FUNCTIONS,
+    _GRANTS,
+    *(_trigger_sql(*spec) for spec in _TRIGGER_SPECS),
+]
+
+_STATEMENTS_DOWN = [
+    *(f"DROP TRIGGER IF EXISTS {name} ON public.{table}"
+      for name, table, *_ in _TRIGGER_SPECS),
+    *(f"DROP FUNCTION IF EXISTS {sig}" for sig in reversed(_FUNCTION_SIGNATURES)),
+    "DROP TABLE IF EXISTS public.district_teacher_rollup",
+    "DROP TABLE IF EXISTS public.district_rollup_units",
+    "DROP INDEX IF EXISTS public.idx_published_content_teacher",
+]
+
+
+def upgrade() -> None:
+    for stmt in _STATEMENTS_UP:
+        op.execute(stmt)
+
+
+# destructive: district_rollup_refresh_teacher deletes the rollup row of a
+# teacher who no longer owns anything (derived data only). downgrade() drops
+# the triggers, functions and both rollup tables — every row is recomputable
+# from source via backend/scripts/backfill_district_rollup.py.
+def downgrade() -> None:
+    for stmt in _STATEMENTS_DOWN:
+        op.execute(stmt)
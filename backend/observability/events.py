@@ -14,12 +14,16 @@ Example output after the JsonFormatter runs:
      "logger": "backend.observability.events",
      "request_id": "abc-123",
      "message": "{\\"event\\": \\"llm.call.start\\", \\"model\\": \\"gpt-4\\"}"}
+
+In-process consumers (backend/observability/llm_metrics.py) subscribe with
+`add_listener`; each listener gets ``(event, fields)`` after the log line is
+written, and its exceptions are logged, never raised into the emitter.
 """
 from __future__ import annotations
 
 import json
 import logging
-from typing import Any
+from typing import Any, Callable
 
 _logger = logging.getLogger(__name__)
 
@@ -31,6 +35,19 @@ _LEVEL_MAP = {
     "critical": logging.CRITICAL,
 }
 
+_listeners: list[Callable[[str, dict[str, Any]], None]] = []
+
+
+def add_listener(listener: Callable[[str, dict[str, Any]], None]) -> None:
+    """Call ``listener(event, fields)`` for every emitted event (idempotent)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[str, dict[str, Any]], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
 
 def emit(event: str, level: str = "info", **fields: Any) -> None:
     """Emit a structured event as a JSON payload inside the log record's message.
@@ -55,3 +72,8 @@ def emit(event: str, level: str = "info", **fields: Any) -> None:
 
     payload = {"event": event, **fields}
     _logger.log(level_int, json.dumps(payload, default=str))
+    for listener in tuple(_listeners):
+        try:
+            listener(event, fields)
+        except Exception:  # noqa: BLE001  # broad catch: a consumer bug must not break the emitting call; error is logged
+            _logger.debug("event listener failed for %s", event, exc_info=True)
@@ -0,0 +1,156 @@
+"""Prometheus families for LLM calls, built from the adapter seam's events.
+
+The adapters in backend/services/llm_adapter emit ``llm.call.*`` /
+``llm.stream.first_token`` / ``llm.breaker.state_change`` through
+`backend.observability.events.emit`. `install()` subscribes a listener
+that turns them into metrics labelled by provider, model and feature (the
+``feature_label`` from ``LLMRequest.metadata``; ``unlabeled`` when unset):
+
+* ``graider_llm_request_duration_seconds{provider,model,feature,status}``
+  — histogram of total call latency (status ok / error).
+* ``graider_llm_time_to_first_token_seconds{provider,model,feature}`` —
+  histogram, streaming calls only.
+* ``graider_llm_tokens_total{provider,model,feature,kind}`` — counter;
+  kind is prompt / completion / cached (prompt tokens served from the
+  provider's prompt cache). Each kind is the provider's own count, so the
+  overlap differs: OpenAI and Gemini prompt counts include the cached
+  tokens, while Anthropic's ``input_tokens`` excludes cache reads (its
+  full prompt is prompt + cached).
+* ``graider_llm_cost_usd_total{provider,model,feature}`` — counter.
+* ``graider_llm_retries_total{provider,model,feature,reason}`` — counter;
+  reason is rate_limit (429) or transient.
+* ``graider_llm_rate_limit_wait_seconds_total{provider,model,feature}`` —
+  counter of backoff sleep spent on 429s.
+* ``graider_llm_breaker_transitions_total{provider,model,to_state}`` —
+  counter, plus the live ``graider_llm_breaker_state{provider,model}``
+  gauge (0 closed, 1 half-open, 2 open) read from this process's breakers.
+
+All labels come from code (provider/model names and feature labels in
+source), never from user input. Counters and histograms share the web
+registry's METRICS_MULTIPROC_DIR shard store (role ``llm``). /metrics
+(backend/metrics.py) and the Celery exporter append `render()`.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from backend.metrics import _PER_WORKER_NOTE, MetricsRegistry, _format_labels
+from backend.observability.events import add_listener
+
+_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+_TTFT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+
+LLM_FAMILIES: dict[str, tuple[str, str, tuple[float, ...] | None]] = {
+    "graider_llm_request_duration_seconds": (
+        "histogram", "LLM call latency by provider, model, feature and status", _LATENCY_BUCKETS),
+    "graider_llm_time_to_first_token_seconds": (
+        "histogram", "Streaming LLM time to first token", _TTFT_BUCKETS),
+    "graider_llm_tokens_total": (
+        "counter", "LLM tokens by kind (prompt, completion, cached prompt)", None),
+    "graider_llm_cost_usd_total": ("counter", "Estimated LLM spend in USD", None),
+    "graider_llm_retries_total": ("counter", "LLM call retries by reason", None),
+    "graider_llm_rate_limit_wait_seconds_total": (
+        "counter", "Backoff seconds spent waiting out LLM rate limits", None),
+    "graider_llm_breaker_transitions_total": (
+        "counter", "LLM circuit breaker state transitions", None),
+}
+
+_BREAKER_STATE_VALUES = {"closed": 0, "half-open": 1, "half_open": 1, "open": 2}
+
+_registry: MetricsRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry(LLM_FAMILIES, role="llm", live_gauges=False)
+    return _registry
+
+
+def reset() -> None:
+    """Drop accumulated samples (tests)."""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def _call_labels(fields: dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    return (
+        ("provider", str(fields.get("provider") or "unknown")),
+        ("model", str(fields.get("model") or "unknown")),
+        ("feature", str(fields.get("feature_label") or "unlabeled")),
+    )
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+
+def on_event(event: str, fields: dict[str, Any]) -> None:
+    """events.emit listener; ignores everything but LLM adapter events."""
+    if not event.startswith("llm."):
+        return
+    registry = get_registry()
+    if event in ("llm.call.complete", "llm.call.error"):
+        labels = _call_labels(fields)
+        status = "ok" if event == "llm.call.complete" else "error"
+        registry.observe("graider_llm_request_duration_seconds", labels + (("status", status),),
+                         _number(fields.get("duration_ms")) / 1000)
+        if status == "ok":
+            for kind, key in (("prompt", "prompt_tokens"), ("completion", "completion_tokens"),
+                              ("cached", "cached_tokens")):
+                count = _number(fields.get(key))
+                if count:
+                    registry.inc("graider_llm_tokens_total", labels + (("kind", kind),), int(count))
+            cost = _number(fields.get("cost_usd"))
+            if cost:
+                registry.inc("graider_llm_cost_usd_total", labels, cost)
+    elif event == "llm.stream.first_token":
+        registry.observe("graider_llm_time_to_first_token_seconds", _call_labels(fields),
+                         _number(fields.get("ttft_ms")) / 1000)
+    elif event == "llm.call.retry":
+        labels = _call_labels(fields)
+        rate_limited = bool(fields.get("rate_limited"))
+        registry.inc("graider_llm_retries_total",
+                     labels + (("reason", "rate_limit" if rate_limited else "transient"),))
+        if rate_limited:
+            registry.inc("graider_llm_rate_limit_wait_seconds_total", labels, _number(fields.get("delay_s")))
+    elif event == "llm.breaker.state_change":
+        registry.inc("graider_llm_breaker_transitions_total", (
+            ("provider", str(fields.get("provider") or "unknown")),
+            ("model", str(fields.get("model") or "unknown")),
+            ("to_state", str(fields.get("to_state") or "unknown")),
+        ))
+
+
+def install() -> None:
+    """Subscribe `on_event` to events.emit (idempotent)."""
+    add_listener(on_event)
+
+
+def _render_breaker_gauge() -> list[str]:
+    from backend.services.llm_adapter.breakers import _BREAKERS
+
+    lines = [
+        "# HELP graider_llm_breaker_state LLM circuit breaker state, 0 closed / "
+        f"1 half-open / 2 open {_PER_WORKER_NOTE}.",
+        "# TYPE graider_llm_breaker_state gauge",
+    ]
+    for (provider, model), breaker in sorted(_BREAKERS.items()):
+        state = _BREAKER_STATE_VALUES.get(str(getattr(breaker, "current_state", "closed")), 0)
+        lines.append(f"graider_llm_breaker_state{_format_labels((('provider', provider), ('model', model)))} {state}")
+    return lines
+
+
+def render() -> str:
+    """Exposition text for the LLM families (appended to /metrics)."""
+    lines = get_registry().render().splitlines()
+    try:
+        lines.extend(_render_breaker_gauge())
+    except ImportError:  # adapter SDKs not installed in this process
+        pass
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,314 @@
+"""Stage-level timing spans for grading runs.
+
+A slow run used to be opaque: staging, parsing, config matching,
+extraction, PII sanitization, LLM calls, post-processing, history updates
+and saves all happen inside one progress bar. This module is a small span
+API that the grading code threads through those stages:
+
+    with run_trace() as trace:           # grading.thread.run_grading_thread
+        with span(STAGING): ...
+        with file_trace(path.name): ...  # grade_single_file
+            with span(LLM): ...          # grading_pipeline / grading_leaves
+
+`run_trace` and `file_trace` bind the active trace and file in context
+variables, so code deep in the pipeline only calls `span(stage)`. Outside
+a run (route handlers, the Celery portal task, tests) `span` is a no-op.
+Context variables do not cross ThreadPoolExecutor boundaries by
+themselves: submit through `propagate(fn)` so a worker thread records into
+the caller's trace and file.
+
+`RunTrace.summary()` is what the run stores in ``grading_state["timing"]``
+(and so what /api/status returns): per-stage count / total / p50 / p95 /
+max milliseconds, plus the slowest files with their per-stage time
+("critical path": the stage that dominated each file). Spans may nest (a
+feedback translation LLM call inside post-processing); the summary uses
+each span's self time, so a nested stage is not counted twice. Durations
+use `time.monotonic`.
+
+With OTEL_EXPORTER_OTLP_ENDPOINT set and the OpenTelemetry SDK + OTLP
+exporter installed, `export_otel` replays a finished trace as spans
+(run -> file -> stage). File spans carry their index, not the filename
+(filenames hold student names). Without either, export is skipped.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, TypeVar
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Run-level stages
+STAGING = "staging"
+ROSTER_LOAD = "roster_load"
+EXPORT = "export"
+SAVE = "save"
+# Per-file stages
+RESOLVE_STUDENT = "resolve_student"
+CONFIG_MATCH = "config_match"
+PARSE = "parse"
+CONTEXT = "context"
+EXTRACTION = "extraction"
+PII_SANITIZE = "pii_sanitize"
+LLM = "llm"
+POSTPROCESS = "postprocess"
+HISTORY_UPDATE = "history_update"
+
+_SLOWEST_FILES = 10
+
+
+@dataclass(frozen=True)
+class Span:
+    stage: str
+    file: str | None
+    start: float   # seconds since the run started
+    duration: float
+    self_time: float  # duration minus nested spans
+
+
+class RunTrace:
+    """Spans recorded during one grading run (thread-safe append)."""
+
+    def __init__(self) -> None:
+        self.started_wall = time.time()
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+        self.files: dict[str, tuple[int, float, float]] = {}  # name -> (index, start, duration)
+        self.finished: float | None = None
+
+    def _offset(self, monotonic: float) -> float:
+        return monotonic - self._t0
+
+    def record(self, stage: str, file: str | None, start: float, end: float,
+               nested: float = 0.0) -> None:
+        duration = end - start
+        with self._lock:
+            self.spans.append(Span(stage, file, self._offset(start), duration,
+                                   max(0.0, duration - nested)))
+
+    def record_file(self, file: str, start: float, end: float) -> None:
+        with self._lock:
+            index = self.files[file][0] if file in self.files else len(self.files)
+            self.files[file] = (index, self._offset(start), end - start)
+
+    def finish(self) -> None:
+        self.finished = self._offset(time.monotonic())
+
+    def summary(self, slowest_files: int = _SLOWEST_FILES) -> dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+            files = dict(self.files)
+        elapsed = self.finished if self.finished is not None else self._offset(time.monotonic())
+
+        by_stage: dict[str, list[float]] = {}
+        per_file: dict[str, dict[str, float]] = {}
+        for s in spans:
+            by_stage.setdefault(s.stage, []).append(s.self_time)
+            if s.file is not None:
+                stages = per_file.setdefault(s.file, {})
+                stages[s.stage] = stages.get(s.stage, 0.0) + s.self_time
+
+        stage_stats = {}
+        for stage, durations in by_stage.items():
+            durations.sort()
+            stage_stats[stage] = {
+                "count": len(durations),
+                "total_ms": _ms(sum(durations)),
+                "p50_ms": _ms(_percentile(durations, 50)),
+                "p95_ms": _ms(_percentile(durations, 95)),
+                "max_ms": _ms(durations[-1]),
+            }
+
+        ranked = sorted(files.items(), key=lambda item: item[1][2], reverse=True)[:slowest_files]
+        slowest = []
+        for name, (_, _, duration) in ranked:
+            stages = per_file.get(name, {})
+            slowest.append({
+                "file": name,
+                "total_ms": _ms(duration),
+                "critical_stage": max(stages, key=stages.__getitem__) if stages else None,
+                "stages": {stage: _ms(v) for stage, v in stages.items()},
+            })
+
+        file_durations = sorted(d for _, _, d in files.values())
+        return {
+            "started_at": self.started_wall,
+            "elapsed_ms": _ms(elapsed),
+            "running": self.finished is None,
+            "files": len(files),
+            "file_p50_ms": _ms(_percentile(file_durations, 50)),
+            "file_p95_ms": _ms(_percentile(file_durations, 95)),
+            "stages": stage_stats,
+            "slowest_files": slowest,
+        }
+
+
+def _ms(seconds: float | None) -> int | None:
+    return None if seconds is None else int(round(seconds * 1000))
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an ascending list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+_current_trace: contextvars.ContextVar[RunTrace | None] = contextvars.ContextVar(
+    "graider_run_trace", default=None)
+_current_file: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "graider_trace_file", default=None)
+# Nested-time accumulator of the enclosing span ([seconds]); children add to it.
+_enclosing: contextvars.ContextVar[list[float] | None] = contextvars.ContextVar(
+    "graider_trace_enclosing", default=None)
+
+
+def current_trace() -> RunTrace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def run_trace() -> Iterator[RunTrace]:
+    """Bind a new `RunTrace` for the duration of a grading run."""
+    trace = RunTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _current_trace.reset(token)
+
+
+@contextmanager
+def file_trace(file: str) -> Iterator[None]:
+    """Attribute spans inside the block to ``file`` and time the file itself."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    token = _current_file.set(file)
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        trace.record_file(file, start, time.monotonic())
+        _current_file.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the block as ``stage`` of the current file (or run); no-op outside a run."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    nested = [0.0]
+    token = _enclosing.set(nested)
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        end = time.monotonic()
+        _enclosing.reset(token)
+        trace.record(stage, _current_file.get(), start, end, nested[0])
+        parent = _enclosing.get()
+        if parent is not None:
+            with trace._lock:
+                parent[0] += end - start
+
+
+def timed(stage: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator form of `span`."""
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap ``fn`` to run in a copy of the caller's context (for executor.submit)."""
+    if _current_trace.get() is None:
+        return fn
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        return ctx.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+_tracer: Any = None
+_tracer_lock = threading.Lock()
+
+
+def _get_tracer() -> Any:
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                from opentelemetry import trace
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                provider = TracerProvider()
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+                _tracer = provider.get_tracer("graider.grading")
+    return _tracer
+
+
+def export_otel(trace: RunTrace, attributes: dict[str, Any] | None = None) -> bool:
+    """Replay ``trace`` to the OTLP collector; True when spans were sent.
+
+    Only when OTEL_EXPORTER_OTLP_ENDPOINT is set. Missing SDK packages or
+    exporter errors are logged and swallowed: tracing never fails a run.
+    """
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        tracer = _get_tracer()
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        _logger.info("OTEL_EXPORTER_OTLP_ENDPOINT set but opentelemetry-sdk / OTLP exporter not installed")
+        return False
+
+    base_ns = int(trace.started_wall * 1e9)
+
+    def ns(offset: float) -> int:
+        return base_ns + int(offset * 1e9)
+
+    try:
+        end = trace.finished if trace.finished is not None else trace._offset(time.monotonic())
+        root = tracer.start_span("grading.run", start_time=base_ns, attributes={
+            "graider.files": len(trace.files), **(attributes or {})})
+        root_ctx = otel_trace.set_span_in_context(root)
+        file_ctx = {}
+        for name, (index, start, duration) in trace.files.items():
+            file_span = tracer.start_span("grading.file", context=root_ctx, start_time=ns(start),
+                                          attributes={"graider.file_index": index})
+            file_span.end(end_time=ns(start + duration))
+            file_ctx[name] = otel_trace.set_span_in_context(file_span)
+        for s in trace.spans:
+            parent = file_ctx.get(s.file, root_ctx) if s.file is not None else root_ctx
+            stage_span = tracer.start_span(f"grading.{s.stage}", context=parent, start_time=ns(s.start))
+            stage_span.end(end_time=ns(s.start + s.duration))
+        root.end(end_time=ns(end))
+        return True
+    except Exception as e:  # noqa: BLE001  # broad catch: tracing must not fail a run; error is logged
+        _logger.warning("OpenTelemetry export of grading trace failed: %s", e)
+        return False
@@ -7,7 +7,7 @@ for all external service calls (OpenAI, Anthropic, Supabase, Clever, etc.).
 import logging
 import random
 import time
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +198,7 @@ def with_retry(
     label: str = "",
     max_delay_s: float = MAX_DELAY_S,
     non_retryable: tuple[type[BaseException], ...] = (),
+    on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
 ) -> Any:
     """Call *fn()* with automatic retry on transient failures.
 
@@ -210,6 +211,9 @@ def with_retry(
             immediately without retry, even if they'd match
             is_retryable_error(). Used for pybreaker.CircuitBreakerError
             so open-circuit raises fail-fast rather than backing off.
+        on_retry: Optional ``(attempt, exc, delay_s)`` callback invoked
+            before each backoff sleep (metrics hook; its errors are logged
+            and ignored).
 
     Returns:
         The return value of *fn()* on success.
@@ -247,6 +251,11 @@ def with_retry(
                 "%sAttempt %d/%d failed (%s). Retrying in %.2fs...",
                 tag, attempt, max_retries + 1, exc, delay,
             )
+            if on_retry is not None:
+                try:
+                    on_retry(attempt, exc, delay)
+                except Exception as hook_err:  # noqa: BLE001  # broad catch: a metrics hook must not break retry; error is logged
+                    logger.debug("%son_retry hook failed: %s", tag, hook_err)
             time.sleep(delay)
 
     # Should never reach here, but just in case.
@@ -259,6 +259,7 @@ def delete_roster_data(teacher_id):
     Returns dict with counts of deleted items.
     """
     from backend.supabase_client import get_supabase as _get_supabase
+    from backend.services.student_mastery_rollup import refresh_rollup_for_classes
 
     deleted = {"classes": 0, "students": 0, "enrollments": 0, "roster_files": 0}
 
@@ -277,6 +278,7 @@ def delete_roster_data(teacher_id):
                 if content_ids:
                     sb.table("student_submissions").delete().in_("content_id", content_ids).execute()
                     sb.table("published_content").delete().in_("id", content_ids).execute()
+                    refresh_rollup_for_classes(sb, class_ids)
                 for cid in class_ids:
                     sb.table("class_students").delete().eq("class_id", cid).execute()
 
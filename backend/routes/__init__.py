@@ -37,6 +37,7 @@ from .assessment_results_routes import assessment_results_bp
 from .district_routes import district_bp
 from .admin_routes import admin_bp
 from .sync_routes import sync_bp
+from .job_routes import jobs_bp
 
 
 def register_routes(app, get_state_fn=None, run_grading_fn=None, reset_fn=None, get_lock_fn=None):
@@ -76,6 +77,7 @@ def register_routes(app, get_state_fn=None, run_grading_fn=None, reset_fn=None,
     app.register_blueprint(district_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(sync_bp)
+    app.register_blueprint(jobs_bp)
 
 
 __all__ = [
@@ -107,4 +109,5 @@ __all__ = [
     'assessment_results_bp',
     'district_bp',
     'admin_bp',
+    'jobs_bp',
 ]
@@ -452,6 +452,35 @@ def _chunked_in_rows_capped(sb, table, column, values, select_cols,
     return out, capped
 
 
+def _last_activity_by_teacher(sb, teacher_ids):
+    """Most recent audit_log timestamp per teacher id.
+
+    Chunked .in_(), sorted desc PER CHUNK then merged. Bounded by a global
+    cap. For each teacher we take the FIRST occurrence in descending
+    timestamp order AFTER sorting the merged result. A teacher with no
+    activity in the window is absent from the result.
+    """
+    out: dict = {}
+    AUDIT_TOP_N = max(500, len(teacher_ids) * 5)
+    # Per-chunk limit ensures we don't pull a hot teacher's
+    # entire history when a chunk happens to align with their ids.
+    per_chunk_limit = AUDIT_TOP_N
+    audit_rows = _chunked_in_rows(
+        sb, "audit_log", "teacher_id", teacher_ids,
+        "teacher_id, timestamp",
+        order=("timestamp", True),
+        limit=per_chunk_limit,
+    )
+    # Merge sort by timestamp desc, then take first per teacher.
+    audit_rows.sort(key=lambda r: r.get("timestamp") or "", reverse=True)
+    for row in audit_rows[:AUDIT_TOP_N]:
+        tid = row.get("teacher_id")
+        ts = row.get("timestamp")
+        if tid and ts and tid not in out:
+            out[tid] = ts
+    return out
+
+
 def _enrich_teachers(teachers):
     """Add classes_count, students_count, assessments_count, last_activity.
 
@@ -530,28 +559,8 @@ def _enrich_teachers(teachers):
             if tid:
                 assessments_count[tid] = assessments_count.get(tid, 0) + 1
 
-        # 4. Last activity per teacher — chunked .in_(), sorted desc PER
-        # CHUNK then merged. Bounded by a global cap. For each teacher
-        # we take the FIRST occurrence in descending timestamp order
-        # AFTER sorting the merged result. A teacher with no activity
-        # in the window reports None.
-        AUDIT_TOP_N = max(500, len(teacher_ids) * 5)
-        # Per-chunk limit ensures we don't pull a hot teacher's
-        # entire history when a chunk happens to align with their ids.
-        per_chunk_limit = AUDIT_TOP_N
-        audit_rows = _chunked_in_rows(
-            sb, "audit_log", "teacher_id", teacher_ids,
-            "teacher_id, timestamp",
-            order=("timestamp", True),
-            limit=per_chunk_limit,
-        )
-        # Merge sort by timestamp desc, then take first per teacher.
-        audit_rows.sort(key=lambda r: r.get("timestamp") or "", reverse=True)
-        for row in audit_rows[:AUDIT_TOP_N]:
-            tid = row.get("teacher_id")
-            ts = row.get("timestamp")
-            if tid and ts and tid not in last_activity:
-                last_activity[tid] = ts
+        # 4. Last activity per teacher (bounded audit_log window)
+        last_activity.update(_last_activity_by_teacher(sb, teacher_ids))
     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
         logger.warning("Failed to enrich teachers (batched): %s", e)
         sentry_sdk.capture_exception(e)
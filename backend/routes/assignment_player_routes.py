@@ -10,6 +10,7 @@ Grading approach:
 - Image uploads: Mathpix OCR for STEM subjects (handwritten math → LaTeX),
   GPT-4o Vision for ELA/Social Studies (handwritten text → text).
 """
+import importlib.util
 import logging
 import os
 import re
@@ -25,13 +26,17 @@ _logger = logging.getLogger(__name__)
 from pathlib import Path
 import sentry_sdk
 
-# Import multipass grading for text-based question types
+# Import multipass grading for text-based question types. assignment_grader
+# loads the whole grading pipeline and the provider SDKs, so it is imported
+# on the first AI-graded question, not with the blueprint.
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-try:
-    from assignment_grader import grade_per_question as ai_grade_per_question
-    AI_GRADING_AVAILABLE = True
-except ImportError:
-    AI_GRADING_AVAILABLE = False
+AI_GRADING_AVAILABLE = importlib.util.find_spec('assignment_grader') is not None
+
+
+def ai_grade_per_question(**kwargs):
+    from assignment_grader import grade_per_question
+    return grade_per_question(**kwargs)
+
 
 # Import Mathpix OCR for handwritten math recognition
 try:
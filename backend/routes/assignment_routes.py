@@ -21,14 +21,17 @@ _logger = logging.getLogger(__name__)
 # Import storage abstraction
 try:
     from backend.storage import load as storage_load, save as storage_save, delete as storage_delete, list_keys as storage_list_keys
+    from backend.storage import load_prefix as storage_load_prefix
 except ImportError:
     try:
         from storage import load as storage_load, save as storage_save, delete as storage_delete, list_keys as storage_list_keys
+        from storage import load_prefix as storage_load_prefix
     except ImportError:
         storage_load = None
         storage_save = None
         storage_delete = None
         storage_list_keys = None
+        storage_load_prefix = None
 
 assignment_bp = Blueprint('assignment', __name__)
 
@@ -173,11 +176,9 @@ def list_assignments():
     teacher_id = getattr(g, 'user_id', 'local-dev')
     assignment_data = {}
 
-    if storage_list_keys and storage_load:
-        keys = storage_list_keys('assignment:', teacher_id)
-        for key in keys:
+    if storage_load_prefix:
+        for key, data in storage_load_prefix('assignment:', teacher_id).items():
             name = key[len('assignment:'):]
-            data = storage_load(key, teacher_id) or {}
             imported_doc = data.get("importedDoc") or {}
             assignment_data[name] = {
                 "aliases": data.get("aliases", []),
@@ -7,7 +7,9 @@ Handles conversation management and VPortal credential storage.
 
 import os
 import io
+import importlib.util
 import json
+import sys
 import time
 import base64
 import uuid
@@ -21,37 +23,46 @@ from flask import Blueprint, request, jsonify, Response, stream_with_context, g
 from backend.utils.auth_decorators import require_teacher
 from backend.utils.errors import handle_route_errors
 from backend.extensions import limiter
+from backend import stream_slots
 from backend.paths import graider_export_dir
 
-try:
-    import anthropic
-except ImportError:
-    anthropic = None
 
-try:
-    import openai as openai_pkg
-except ImportError:
-    openai_pkg = None
+def _find_sdk(name):
+    """Module spec of an installed provider SDK (None if missing), without importing it."""
+    try:
+        return importlib.util.find_spec(name)
+    except ImportError:
+        return None
 
-try:
-    from google import genai as genai_pkg
-except ImportError:
-    genai_pkg = None
+
+# Provider SDKs are checked, not imported: the adapters import them on the
+# first stream (see backend/services/llm_adapter/__init__.py).
+anthropic = _find_sdk("anthropic")
+openai_pkg = _find_sdk("openai")
+genai_pkg = _find_sdk("google.genai")
 
 from backend.services.assistant_tools import (
     TOOL_DEFINITIONS, execute_tool, _merge_submodules,
-    _load_standards,
+    _load_standards, is_read_only_tool,
     DOCUMENTS_DIR,
 )
+from backend.services.assistant_tool_runner import (
+    parallel_tool_calls_enabled, run_concurrently, timed_execute,
+)
+from backend.services.assistant_tool_data import ToolDataContext
 from backend.services.assistant_tools_reports import _extract_pdf_text, _extract_docx_text
+from backend.services.assistant_conversation_store import ConversationStore, ExpiryIndex
+from backend.services.assistant_prompt_context import (
+    PromptSection,
+    StorageRecord,
+    TeacherContextBuilder,
+    directory_deps,
+)
 import sentry_sdk
 import pybreaker
 
 from backend.services.llm_adapter.breakers import get_breaker
 from backend.services.llm_adapter import (
-    AnthropicAdapter,
-    GeminiAdapter,
-    OpenAIAdapter,
     LLMRequest,
     Message,
     TextPart,
@@ -66,6 +77,20 @@ from backend.services.llm_adapter import (
     FinishEvent,
 )
 
+_STREAM_ADAPTERS = {
+    "anthropic": "AnthropicAdapter",
+    "openai": "OpenAIAdapter",
+    "gemini": "GeminiAdapter",
+}
+
+
+def __getattr__(name):
+    """Resolve the adapter classes lazily (PEP 562) from backend.services.llm_adapter."""
+    if name in _STREAM_ADAPTERS.values():
+        from backend.services import llm_adapter
+        return getattr(llm_adapter, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Import storage abstraction for per-teacher credential isolation
 try:
     from backend.storage import load as storage_load, save as storage_save
@@ -240,19 +265,30 @@ def _build_llm_request(
 # In-memory conversation store {session_id: {"messages": [...], "last_active": timestamp}}
 conversations = {}
 CONVERSATION_TTL = 7200  # 2 hours
+# Legacy single-file store; imported once into CONVERSATIONS_DIR, then renamed.
 CONVERSATIONS_FILE = os.path.join(GRAIDER_DATA_DIR, "assistant_conversations.json")
+CONVERSATIONS_DIR = os.path.join(GRAIDER_DATA_DIR, "assistant_conversations")
+PERSISTED_CONVERSATION_TTL = 86400  # on-disk records outlive the in-memory 2h window
+PERSISTED_MESSAGES_MAX = 40
+
+_conversation_store = ConversationStore(
+    CONVERSATIONS_DIR,
+    ttl_seconds=PERSISTED_CONVERSATION_TTL,
+    legacy_file=CONVERSATIONS_FILE,
+)
+# Expiry index over `conversations` so the per-request cleanup pops only the
+# sessions that are actually stale instead of scanning every live one.
+_conversation_expiry = ExpiryIndex(CONVERSATION_TTL)
+
+
+def _touch_conversation(session_id, conv):
+    conv["last_active"] = time.time()
+    _conversation_expiry.touch(session_id, conv["last_active"])
 
 
 def _persist_conversation(session_id):
     """Save a single conversation to disk so it survives server restarts."""
     try:
-        os.makedirs(GRAIDER_DATA_DIR, exist_ok=True)
-        # Load existing file
-        all_convs = {}
-        if os.path.exists(CONVERSATIONS_FILE):
-            with open(CONVERSATIONS_FILE, 'r', encoding='utf-8') as f:
-                all_convs = json.load(f)
-
         conv = conversations.get(session_id)
         if conv:
             # Only persist text messages (skip binary/image content blocks)
@@ -265,19 +301,11 @@ def _persist_conversation(session_id):
                     text_parts = [b for b in m["content"] if isinstance(b, dict) and b.get("type") == "text"]
                     if text_parts:
                         safe_messages.append({"role": m["role"], "content": text_parts[0]["text"]})
-            all_convs[session_id] = {
-                "messages": safe_messages[-40:],  # Keep last 40 messages max
-                "last_active": conv["last_active"],
-            }
+            _conversation_store.put(
+                session_id, safe_messages[-PERSISTED_MESSAGES_MAX:], conv["last_active"],
+            )
         else:
-            all_convs.pop(session_id, None)
-
-        # Prune old sessions (>24h)
-        cutoff = time.time() - 86400
-        all_convs = {k: v for k, v in all_convs.items() if v.get("last_active", 0) > cutoff}
-
-        with open(CONVERSATIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(all_convs, f, indent=2)
+            _conversation_store.delete(session_id)
     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
         logger.warning("Failed to persist conversation %s: %s", session_id, e)
 
@@ -285,11 +313,7 @@ def _persist_conversation(session_id):
 def _load_conversation(session_id):
     """Load a conversation from disk if it exists."""
     try:
-        if os.path.exists(CONVERSATIONS_FILE):
-            with open(CONVERSATIONS_FILE, 'r', encoding='utf-8') as f:
-                all_convs = json.load(f)
-            if session_id in all_convs:
-                return all_convs[session_id]
+        return _conversation_store.get(session_id)
     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
         logger.warning("Failed to load conversation %s: %s", session_id, e)
     return None
@@ -659,30 +683,35 @@ def _load_assessment_templates():
     return templates
 
 
-def _load_analytics_snapshot():
-    """Build a compact analytics summary from master_grades.csv for the system prompt.
+GLOBAL_SETTINGS_FILE = os.path.expanduser("~/.graider_global_settings.json")
 
-    Returns a short text block with class averages, rubric category performance,
-    student trends, and attention flags — enough for proactive recommendations
-    without needing a tool call.
-    """
-    import csv
-    from collections import defaultdict
 
-    # Locate master_grades.csv
+def _analytics_master_file():
+    """Locate master_grades.csv (output_folder from the global settings file)."""
     output_folder = graider_export_dir("Results")
-    settings_file = os.path.expanduser("~/.graider_global_settings.json")
-    if os.path.exists(settings_file):
+    if os.path.exists(GLOBAL_SETTINGS_FILE):
         try:
-            with open(settings_file, 'r') as f:
+            with open(GLOBAL_SETTINGS_FILE, 'r') as f:
                 gs = json.load(f)
             output_folder = gs.get('output_folder', output_folder)
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
             # Best-effort: malformed settings file uses the existing
             # output_folder value (caller-supplied or default).
             logger.debug("Failed to load output_folder from settings file: %s", e)
+    return os.path.join(output_folder, "master_grades.csv")
+
+
+def _load_analytics_snapshot():
+    """Build a compact analytics summary from master_grades.csv for the system prompt.
+
+    Returns a short text block with class averages, rubric category performance,
+    student trends, and attention flags — enough for proactive recommendations
+    without needing a tool call.
+    """
+    import csv
+    from collections import defaultdict
 
-    master_file = os.path.join(output_folder, "master_grades.csv")
+    master_file = _analytics_master_file()
     if not os.path.exists(master_file):
         return ""
 
@@ -960,8 +989,8 @@ BEHAVIOR TRACKING:
 CRITICAL: If behavior tools return errors about missing data, call debug_behavior to diagnose, then report findings to the teacher. NEVER fabricate a behavior email without real data from the tools — the email MUST reference actual tracked incidents, not placeholders."""
 
 
-def _build_system_prompt():
-    """Build the system prompt dynamically, injecting teacher info from settings."""
+def _load_prompt_settings():
+    """Teacher info from ~/.graider_settings.json for the prompt sections."""
     teacher_name = ""
     subject = ""
     school_name = ""
@@ -1014,38 +1043,65 @@ def _build_system_prompt():
             parts.append(f"Email Signature:\n{email_signature}")
         teacher_context = "\n\nTeacher Information (use this for email signatures, letters, and communications):\n" + "\n".join(parts)
 
-    prompt = _base_assistant_system_prompt(teacher_context)
-
     # Inject global AI notes (teacher's custom grading/teaching instructions)
-    if global_ai_notes:
-        prompt += f"\n\n## TEACHER'S INSTRUCTIONS\n{global_ai_notes}"
+    notes = f"\n\n## TEACHER'S INSTRUCTIONS\n{global_ai_notes}" if global_ai_notes else ""
+
+    # Inject available ed-tech tools
+    tools = ""
+    if available_tools:
+        tools += "\n\n## AVAILABLE ED-TECH TOOLS\n"
+        tools += "The teacher has these tools enabled. Reference them in lesson plans, activity suggestions, and assessment recommendations:\n"
+        for tool in available_tools:
+            # Custom tools like "custom:Wayground" get formatted nicely
+            if tool.startswith("custom:"):
+                tools += f"- {tool.split(':', 1)[1]} (custom platform)\n"
+            else:
+                tools += f"- {tool.replace('_', ' ').title()}\n"
+
+    return {"teacher_context": teacher_context, "notes": notes, "tools": tools}
 
-    # Inject class differentiation
+
+def _prompt_section_settings():
+    return _load_prompt_settings(), [SETTINGS_FILE]
+
+
+def _prompt_section_differentiation():
+    """Inject class differentiation."""
+    deps = directory_deps(PERIODS_DIR, lambda name: name.endswith(".meta.json"))
     period_levels = _load_period_differentiation()
-    if period_levels:
-        level_groups = {}
-        for period, level in sorted(period_levels.items()):
-            level_groups.setdefault(level, []).append(period)
-        diff_lines = []
-        dok_map = {"advanced": "DOK 1-4", "standard": "DOK 1-3", "support": "DOK 1-2"}
-        for level in ["advanced", "standard", "support"]:
-            periods = level_groups.get(level, [])
-            if periods:
-                dok = dok_map.get(level, "DOK 1-3")
-                diff_lines.append(f"- {', '.join(periods)}: {level.capitalize()} ({dok})")
-        if diff_lines:
-            prompt += "\n\n## CLASS DIFFERENTIATION\n" + "\n".join(diff_lines)
-
-    # Inject accommodation summary (FERPA-safe: aggregate counts only)
+    if not period_levels:
+        return "", deps
+    level_groups = {}
+    for period, level in sorted(period_levels.items()):
+        level_groups.setdefault(level, []).append(period)
+    diff_lines = []
+    dok_map = {"advanced": "DOK 1-4", "standard": "DOK 1-3", "support": "DOK 1-2"}
+    for level in ["advanced", "standard", "support"]:
+        periods = level_groups.get(level, [])
+        if periods:
+            dok = dok_map.get(level, "DOK 1-3")
+            diff_lines.append(f"- {', '.join(periods)}: {level.capitalize()} ({dok})")
+    if not diff_lines:
+        return "", deps
+    return "\n\n## CLASS DIFFERENTIATION\n" + "\n".join(diff_lines), deps
+
+
+def _prompt_section_accommodations():
+    """Inject accommodation summary (FERPA-safe: aggregate counts only)."""
     accomm = _load_accommodation_summary()
-    if accomm:
-        prompt += f"\n\n## ACCOMMODATIONS IN USE\n- {accomm['total_students']} students have IEP/504 accommodations"
-        if accomm["preset_counts"]:
-            top_presets = sorted(accomm["preset_counts"].items(), key=lambda x: -x[1])[:5]
-            preset_str = ", ".join(f"{name.replace('_', ' ')} ({count})" for name, count in top_presets)
-            prompt += f"\n- Common presets: {preset_str}"
-
-    # Inject persistent memories from previous conversations
+    if not accomm:
+        return "", [ACCOMMODATIONS_FILE]
+    text = f"\n\n## ACCOMMODATIONS IN USE\n- {accomm['total_students']} students have IEP/504 accommodations"
+    if accomm["preset_counts"]:
+        top_presets = sorted(accomm["preset_counts"].items(), key=lambda x: -x[1])[:5]
+        preset_str = ", ".join(f"{name.replace('_', ' ')} ({count})" for name, count in top_presets)
+        text += f"\n- Common presets: {preset_str}"
+    return text, [ACCOMMODATIONS_FILE]
+
+
+def _prompt_section_memory():
+    """Inject persistent memories from previous conversations."""
+    text = ""
     try:
         if os.path.exists(MEMORY_FILE):
             with open(MEMORY_FILE, 'r', encoding='utf-8') as f:
@@ -1055,95 +1111,167 @@ def _build_system_prompt():
                 for m in memories:
                     fact = m.get("fact", m) if isinstance(m, dict) else str(m)
                     facts.append(f"- {fact}")
-                prompt += "\n\n## PERSISTENT MEMORY\nThese are facts you've saved from previous conversations with this teacher:\n"
-                prompt += "\n".join(facts)
-                prompt += "\nUse these to personalize your responses. Save new important facts with the save_memory tool."
+                text += "\n\n## PERSISTENT MEMORY\nThese are facts you've saved from previous conversations with this teacher:\n"
+                text += "\n".join(facts)
+                text += "\nUse these to personalize your responses. Save new important facts with the save_memory tool."
     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
         # Best-effort: persistent memory load failure means the assistant
         # answers without saved facts. Functional, just less personalized.
         logger.debug("Failed to inject persistent memory facts: %s", e)
+        text = ""
+    return text, [MEMORY_FILE]
+
 
-    # Standards: only inject a compact index (codes + short benchmarks).
-    # Full details (vocabulary, topics, learning targets) fetched on demand via get_standards tool.
+def _prompt_section_standards():
+    """Standards: only inject a compact index (codes + short benchmarks).
+
+    Full details (vocabulary, topics, learning targets) fetched on demand via
+    get_standards tool. _load_standards keys off state/subject/grade in the
+    'settings' storage record (Supabase first, then the settings file), so
+    the section depends on that record; the standards JSON files themselves
+    ship with the app.
+    """
+    deps = [StorageRecord('settings')]
     all_standards = _load_standards()
-    if all_standards:
-        compact = []
-        for s in all_standards:
-            code = s.get("code", "")
-            benchmark = s.get("benchmark", "")
-            dok = s.get("dok", "")
-            compact.append(f"{code} (DOK {dok}): {benchmark}")
-        prompt += f"\n\n## CURRICULUM STANDARDS INDEX ({len(all_standards)} standards)\n"
-        prompt += "Compact index — use get_standards tool with a topic keyword for full details (vocabulary, learning targets, essential questions).\n"
-        prompt += "\n".join(compact)
-
-    # Inject full resource content so the AI can answer directly without tool calls
+    if not all_standards:
+        return "", deps
+    compact = []
+    for s in all_standards:
+        code = s.get("code", "")
+        benchmark = s.get("benchmark", "")
+        dok = s.get("dok", "")
+        compact.append(f"{code} (DOK {dok}): {benchmark}")
+    text = f"\n\n## CURRICULUM STANDARDS INDEX ({len(all_standards)} standards)\n"
+    text += "Compact index — use get_standards tool with a topic keyword for full details (vocabulary, learning targets, essential questions).\n"
+    text += "\n".join(compact)
+    return text, deps
+
+
+def _prompt_section_resources():
+    """Inject full resource content so the AI can answer directly without tool calls."""
+    deps = directory_deps(DOCUMENTS_DIR)
     resource_content = _load_resource_content()
     if resource_content:
-        prompt += "\n\n## UPLOADED REFERENCE DOCUMENTS\n"
-        prompt += "The teacher has uploaded these documents. Their full content is included below — use it directly to answer questions about curriculum, pacing, and scheduling.\n\n"
-        prompt += resource_content
-    else:
-        resource_names = _load_resource_names()
-        if resource_names:
-            prompt += "\n\n## UPLOADED REFERENCE DOCUMENTS\n"
-            prompt += "The teacher has uploaded these documents. Use read_resource(filename) to access their content.\n"
-            prompt += "\n".join(f"- {r}" for r in resource_names)
-
-    # Inject rubric settings (grading categories, weights, style)
+        text = "\n\n## UPLOADED REFERENCE DOCUMENTS\n"
+        text += "The teacher has uploaded these documents. Their full content is included below — use it directly to answer questions about curriculum, pacing, and scheduling.\n\n"
+        text += resource_content
+        return text, deps
+    resource_names = _load_resource_names()
+    if resource_names:
+        text = "\n\n## UPLOADED REFERENCE DOCUMENTS\n"
+        text += "The teacher has uploaded these documents. Use read_resource(filename) to access their content.\n"
+        text += "\n".join(f"- {r}" for r in resource_names)
+        return text, deps
+    return "", deps
+
+
+def _prompt_section_rubric():
+    """Inject rubric settings (grading categories, weights, style)."""
     rubric_data = _load_rubric()
-    if rubric_data:
-        prompt += "\n\n## GRADING RUBRIC\n"
-        prompt += f"Grading Style: {rubric_data.get('gradingStyle', 'standard')}\n"
-        cats = rubric_data.get("categories", [])
-        if cats:
-            prompt += "Categories:\n"
-            for c in cats:
-                prompt += f"- {c.get('name', '')}: {c.get('description', '')} — {c.get('points', 0)} pts, weight {c.get('weight', 0)}%\n"
-        if rubric_data.get("generous"):
-            prompt += "Mode: Generous grading enabled (benefit of the doubt on borderline scores)\n"
-
-    # Inject live analytics snapshot so the assistant can proactively reference performance
+    if not rubric_data:
+        return "", [RUBRIC_FILE]
+    text = "\n\n## GRADING RUBRIC\n"
+    text += f"Grading Style: {rubric_data.get('gradingStyle', 'standard')}\n"
+    cats = rubric_data.get("categories", [])
+    if cats:
+        text += "Categories:\n"
+        for c in cats:
+            text += f"- {c.get('name', '')}: {c.get('description', '')} — {c.get('points', 0)} pts, weight {c.get('weight', 0)}%\n"
+    if rubric_data.get("generous"):
+        text += "Mode: Generous grading enabled (benefit of the doubt on borderline scores)\n"
+    return text, [RUBRIC_FILE]
+
+
+def _prompt_section_analytics():
+    """Inject live analytics snapshot so the assistant can proactively reference performance."""
+    deps = [GLOBAL_SETTINGS_FILE, _analytics_master_file()]
     analytics_snapshot = _load_analytics_snapshot()
-    if analytics_snapshot:
-        prompt += "\n\n## CURRENT CLASS PERFORMANCE\n"
-        prompt += "Live snapshot from graded assignments. Use this to proactively offer insights and recommendations without waiting for a tool call. For deeper analysis, use tools like analyze_grade_causes or get_student_summary.\n"
-        prompt += analytics_snapshot
+    if not analytics_snapshot:
+        return "", deps
+    text = "\n\n## CURRENT CLASS PERFORMANCE\n"
+    text += "Live snapshot from graded assignments. Use this to proactively offer insights and recommendations without waiting for a tool call. For deeper analysis, use tools like analyze_grade_causes or get_student_summary.\n"
+    text += analytics_snapshot
+    return text, deps
 
-    # Inject available ed-tech tools
-    if available_tools:
-        prompt += "\n\n## AVAILABLE ED-TECH TOOLS\n"
-        prompt += "The teacher has these tools enabled. Reference them in lesson plans, activity suggestions, and assessment recommendations:\n"
-        for tool in available_tools:
-            # Custom tools like "custom:Wayground" get formatted nicely
-            if tool.startswith("custom:"):
-                prompt += f"- {tool.split(':', 1)[1]} (custom platform)\n"
-            else:
-                prompt += f"- {tool.replace('_', ' ').title()}\n"
 
-    # Inject assessment templates (e.g., Wayground quiz format)
+def _prompt_section_templates():
+    """Inject assessment templates (e.g., Wayground quiz format)."""
+    deps = directory_deps(TEMPLATES_DIR, lambda name: name.endswith(".meta.json"))
     templates = _load_assessment_templates()
-    if templates:
-        prompt += "\n\n## ASSESSMENT TEMPLATES\n"
-        prompt += "These are the quiz/assessment CSV/XLSX templates the teacher has uploaded. When asked to generate a quiz for one of these platforms, produce output matching the EXACT column structure shown.\n"
-        for t in templates:
-            prompt += f"\n### {t['name']} ({t['platform']})\n"
-            prompt += f"Format: {t['extension']}\n"
-            prompt += f"Columns: {' | '.join(t['columns'])}\n"
-            if t.get("question_types"):
-                prompt += f"Supported question types: {', '.join(t['question_types'])}\n"
-            if t.get("sample_rows"):
-                prompt += "Example rows:\n"
-                for row in t["sample_rows"][:2]:
-                    prompt += f"  {' | '.join(str(v) for v in row)}\n"
-            prompt += f"\nWhen generating quizzes for {t['platform']}, output a CSV/table with these exact columns. For Correct Answer: use the option number (1-5) for Multiple Choice, comma-separated numbers for Checkbox, leave blank for Open-Ended/Poll/Draw/Fill-in-the-Blank.\n"
-
-    # Platform docs: do NOT inject the full user manual (~12K tokens).
-    # The assistant can answer most questions from its tool descriptions and context.
-    # Only inject a short note so it knows it can reference docs if asked.
-    prompt += "\n\nPLATFORM HELP: If asked how-to or troubleshooting questions about Graider, use read_resource with filename 'User_Manual.md' to look up the answer. Do NOT guess — check the docs."
-
-    return prompt
+    if not templates:
+        return "", deps
+    text = "\n\n## ASSESSMENT TEMPLATES\n"
+    text += "These are the quiz/assessment CSV/XLSX templates the teacher has uploaded. When asked to generate a quiz for one of these platforms, produce output matching the EXACT column structure shown.\n"
+    for t in templates:
+        text += f"\n### {t['name']} ({t['platform']})\n"
+        text += f"Format: {t['extension']}\n"
+        text += f"Columns: {' | '.join(t['columns'])}\n"
+        if t.get("question_types"):
+            text += f"Supported question types: {', '.join(t['question_types'])}\n"
+        if t.get("sample_rows"):
+            text += "Example rows:\n"
+            for row in t["sample_rows"][:2]:
+                text += f"  {' | '.join(str(v) for v in row)}\n"
+        text += f"\nWhen generating quizzes for {t['platform']}, output a CSV/table with these exact columns. For Correct Answer: use the option number (1-5) for Multiple Choice, comma-separated numbers for Checkbox, leave blank for Open-Ended/Poll/Draw/Fill-in-the-Blank.\n"
+    return text, deps
+
+
+# Platform docs: do NOT inject the full user manual (~12K tokens).
+# The assistant can answer most questions from its tool descriptions and context.
+# Only inject a short note so it knows it can reference docs if asked.
+_PLATFORM_HELP_NOTE = "\n\nPLATFORM HELP: If asked how-to or troubleshooting questions about Graider, use read_resource with filename 'User_Manual.md' to look up the answer. Do NOT guess — check the docs."
+
+
+def _assemble_system_prompt(sections):
+    """Concatenate cached sections in the historical prompt order.
+
+    A section whose builder raised is None and is left out.
+    """
+    settings = sections["settings"] or {"teacher_context": "", "notes": "", "tools": ""}
+    parts = [
+        _base_assistant_system_prompt(settings["teacher_context"]),
+        settings["notes"],
+        sections["differentiation"],
+        sections["accommodations"],
+        sections["memory"],
+        sections["standards"],
+        sections["resources"],
+        sections["rubric"],
+        sections["analytics"],
+        settings["tools"],
+        sections["templates"],
+        _PLATFORM_HELP_NOTE,
+    ]
+    return "".join(p for p in parts if p)
+
+
+# Lambdas late-bind the section functions so tests can patch them.
+_system_prompt_builder = TeacherContextBuilder(
+    [
+        PromptSection("settings", lambda: _prompt_section_settings()),
+        PromptSection("differentiation", lambda: _prompt_section_differentiation()),
+        PromptSection("accommodations", lambda: _prompt_section_accommodations()),
+        PromptSection("memory", lambda: _prompt_section_memory()),
+        PromptSection("standards", lambda: _prompt_section_standards()),
+        PromptSection("resources", lambda: _prompt_section_resources()),
+        PromptSection("rubric", lambda: _prompt_section_rubric()),
+        PromptSection("analytics", lambda: _prompt_section_analytics()),
+        PromptSection("templates", lambda: _prompt_section_templates()),
+    ],
+    _assemble_system_prompt,
+)
+
+
+def _build_system_prompt(teacher_id='local-dev'):
+    """Build the system prompt dynamically, injecting teacher info from settings.
+
+    Sections are cached by file dependency (see
+    backend/services/assistant_prompt_context.py): a turn where none of the
+    settings / periods / accommodations / memory / documents / rubric /
+    master_grades / template files changed re-stats them and reuses the
+    memoized prompt without reading any of them.
+    """
+    return _system_prompt_builder.build(teacher_id)
 
 
 def _audit_log(action, details=""):
@@ -1163,7 +1291,7 @@ logger = logging.getLogger(__name__)
 
 def _record_assistant_cost(input_tokens, output_tokens, model, tts_chars=0):
     """Record assistant API usage to persistent JSON file."""
-    from assignment_grader import MODEL_PRICING
+    from backend.services.grading_models import MODEL_PRICING
 
     pricing = MODEL_PRICING.get(model, {"input": 0, "output": 0})
     claude_cost = (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
@@ -1376,12 +1504,13 @@ def _finalize_assistant_stream_silent(**kwargs):
 
 
 def _cleanup_stale_sessions():
-    """Remove conversations older than TTL."""
-    now = time.time()
-    stale = [sid for sid, conv in conversations.items()
-             if now - conv["last_active"] > CONVERSATION_TTL]
-    for sid in stale:
-        del conversations[sid]
+    """Remove conversations older than TTL (in memory) and expired records on disk."""
+    for sid in _conversation_expiry.pop_expired():
+        conversations.pop(sid, None)
+    try:
+        _conversation_store.sweep()
+    except Exception as e:  # noqa: BLE001  # broad catch: error is logged
+        logger.warning("Failed to sweep persisted conversations: %s", e)
 
 
 # ── Send-tool user-message name guard ──────────────────────
@@ -1515,7 +1644,7 @@ def _check_send_tool_guard(tool_name, tool_input, resolved_students, last_user_t
 
 def _execute_tool_round(*, tool_use_blocks, session_id, teacher_id, _last_user_text,
                         _round_idx, full_response_text, executed_tools_this_turn,
-                        _flush_audio_queue):
+                        _flush_audio_queue, data_context=None):
     """Execute one round of tool calls and stream their SSE frames.
 
     Extracted verbatim from ``_run_assistant_stream``'s per-round body (CQ7
@@ -1523,7 +1652,8 @@ def _execute_tool_round(*, tool_use_blocks, session_id, teacher_id, _last_user_t
     byte-identical (de-indented by 12). Yields the same tool_start/tool_result
     SSE frames as before and returns the (assistant_content, tool_results) pair
     the caller appends to the conversation. ``_flush_audio_queue`` is passed in
-    as the caller's nested audio-flush generator.
+    as the caller's nested audio-flush generator. ``data_context`` is the
+    turn's ToolDataContext; tools run inside it so shared loads are reused.
     """
     # Build the assistant message with all content blocks (Anthropic format for conversation store)
     assistant_content = []
@@ -1536,14 +1666,35 @@ def _execute_tool_round(*, tool_use_blocks, session_id, teacher_id, _last_user_t
     # send_focus_comms uses "Cayden" from earlier conversation context)
     _resolved_students = []  # [{name, student_id}] from lookup_student_info
 
+    tool_inputs = []
     for tb in tool_use_blocks:
+        try:
+            tool_inputs.append(json.loads(tb["input_json"]) if tb["input_json"] else {})
+        except json.JSONDecodeError:
+            tool_inputs.append({})
+
+    # Consecutive read-only tools are executed concurrently ahead of the
+    # loop below, which still emits frames and applies guards in order.
+    _parallel = parallel_tool_calls_enabled()
+    _prefetched = {}  # block index -> (result, duration_ms)
+    if data_context is None:
+        data_context = ToolDataContext(teacher_id)
+    _execute = data_context.bind(execute_tool)
+
+    for _idx, tb in enumerate(tool_use_blocks):
         if session_id in cancelled_sessions:
             break
 
-        try:
-            tool_input = json.loads(tb["input_json"]) if tb["input_json"] else {}
-        except json.JSONDecodeError:
-            tool_input = {}
+        tool_input = tool_inputs[_idx]
+        if _parallel and _idx not in _prefetched and is_read_only_tool(tb["name"]):
+            _run_end = _idx
+            while _run_end < len(tool_use_blocks) and is_read_only_tool(tool_use_blocks[_run_end]["name"]):
+                tool_inputs[_run_end]["teacher_id"] = teacher_id
+                _run_end += 1
+            if _run_end - _idx > 1:
+                _batch = [(tool_use_blocks[i]["name"], tool_inputs[i]) for i in range(_idx, _run_end)]
+                for i, outcome in enumerate(run_concurrently(_execute, _batch), start=_idx):
+                    _prefetched[i] = outcome
 
         assistant_content.append({
             "type": "tool_use",
@@ -1581,11 +1732,19 @@ def _execute_tool_round(*, tool_use_blocks, session_id, teacher_id, _last_user_t
             )
 
         # ── Execute tool (only if no guard blocked it) ──
+        _duration_ms = None
         if result is None:
-            result = execute_tool(tb["name"], tool_input)
+            if _idx in _prefetched:
+                result, _duration_ms = _prefetched[_idx]
+            else:
+                result, _duration_ms = timed_execute(_execute, tb["name"], tool_input)
+                if not is_read_only_tool(tb["name"]):
+                    # May have written results/settings/rosters — later
+                    # tools in this turn must see the new data.
+                    data_context.invalidate()
 
         # Record execution for post-response claim checking
-        executed_tools_this_turn.append({"name": tb["name"], "result": result})
+        executed_tools_this_turn.append({"name": tb["name"], "result": result, "duration_ms": _duration_ms})
 
         # Inject verification message for guarded tools
         from backend.services.assistant_tool_guards import get_verification_message
@@ -1729,14 +1888,12 @@ def _stream_one_round(*, active_model, active_provider, api_key, messages, syste
         max_tokens=MAX_TOKENS,
     )
 
-    if active_provider == "anthropic":
-        _stream_adapter = AnthropicAdapter(api_key=api_key)
-    elif active_provider == "openai":
-        _stream_adapter = OpenAIAdapter(api_key=api_key)
-    elif active_provider == "gemini":
-        _stream_adapter = GeminiAdapter(api_key=api_key)
-    else:
+    adapter_name = _STREAM_ADAPTERS.get(active_provider)
+    if adapter_name is None:
         raise ValueError(f"Unknown provider: {active_provider}")
+    # Module attribute lookup (module __getattr__ below), so the adapter and
+    # its SDK load on the first stream and tests can patch the class here.
+    _stream_adapter = getattr(sys.modules[__name__], adapter_name)(api_key=api_key)
 
     # in-progress tool call: tool_call_id -> {id, name, args_fragments}
     _pending_tool: dict[str, dict] = {}
@@ -1792,6 +1949,18 @@ def _stream_one_round(*, active_model, active_provider, api_key, messages, syste
     return full_response_text, tool_use_blocks, deferred_tool_starts, _delta_in, _delta_out, _delta_tts
 
 
+def _emit_tool_data_stats(session_id, tool_data):
+    """Log how many dataset loads the turn's ToolDataContext performed/avoided."""
+    stats = tool_data.stats()
+    if not stats["loads"] and not stats["avoided"]:
+        return
+    try:
+        from backend.observability.events import emit
+        emit('assistant.tool_data.turn', session_id=session_id, **stats)
+    except Exception as e:  # noqa: BLE001  # broad catch: telemetry is best-effort; error is logged
+        logger.debug("Failed to emit assistant.tool_data.turn event: %s", e)
+
+
 def _run_assistant_stream(*, session_id, conv, voice_mode, model_info, api_key, teacher_id):
     """Module-level SSE generator for the assistant chat stream.
 
@@ -1847,15 +2016,16 @@ def _run_assistant_stream(*, session_id, conv, voice_mode, model_info, api_key,
     active_model_info = model_info
     active_model = active_model_info["model"]
     active_provider = active_model_info["provider"]
-    system_prompt = _build_system_prompt()
+    system_prompt = _build_system_prompt(teacher_id)
     max_rounds = MAX_TOOL_ROUNDS
     executed_tools_this_turn = []  # Track all tool calls across rounds for claim checking
+    tool_data = ToolDataContext(teacher_id)  # shared dataset loads for every tool this turn
     try:
         for _round_idx in range(max_rounds):
             try:
                 # Per-round cost check — warn and stop if getting expensive
                 if _round_idx > 0 and total_input_tokens > 0:
-                    from assignment_grader import MODEL_PRICING
+                    from backend.services.grading_models import MODEL_PRICING
                     _pricing = MODEL_PRICING.get(active_model, {"input": 0, "output": 0})
                     _est_cost = (total_input_tokens * _pricing["input"] + total_output_tokens * _pricing["output"]) / 1_000_000
                     if _est_cost > COST_WARNING_THRESHOLD:
@@ -1925,6 +2095,7 @@ def _run_assistant_stream(*, session_id, conv, voice_mode, model_info, api_key,
                     full_response_text=full_response_text,
                     executed_tools_this_turn=executed_tools_this_turn,
                     _flush_audio_queue=_flush_audio_queue,
+                    data_context=tool_data,
                 )
                 if session_id in cancelled_sessions:
                     break
@@ -1942,6 +2113,7 @@ def _run_assistant_stream(*, session_id, conv, voice_mode, model_info, api_key,
                 yield f"data: {json.dumps({'type': 'error', 'content': content})}\n\n"
                 break
 
+        _emit_tool_data_stats(session_id, tool_data)
 
         # Normal completion — finalizer replaces inline cleanup.
         # Disconnect mode is handled by the GeneratorExit branch below.
@@ -2035,63 +2207,79 @@ def assistant_chat():
     if not data or not data.get("messages"):
         return jsonify({"error": "messages required"}), 400
 
-    session_id = data.get("session_id", str(uuid.uuid4()))
-    user_messages = data["messages"]
-    uploaded_files = data.get("files", [])
-    voice_mode = data.get("voice_mode", False)
-
-    # Cleanup stale sessions periodically
-    _cleanup_stale_sessions()
-
-    # Get or create conversation — restore from disk if server restarted
-    if session_id not in conversations:
-        restored = _load_conversation(session_id)
-        if restored:
-            conversations[session_id] = restored
-            logger.info("Restored conversation %s from disk (%d messages)", session_id, len(restored.get("messages", [])))
-        else:
-            conversations[session_id] = {"messages": [], "last_active": time.time()}
-
-    conv = conversations[session_id]
-    conv["last_active"] = time.time()
+    # Each stream holds a gthread worker thread for its whole tool loop;
+    # cap streams per worker so sync routes (status polls) keep threads.
+    stream_lease = stream_slots.try_acquire()
+    if stream_lease is None:
+        resp = jsonify({
+            "error": "Assistant is busy — too many concurrent conversations",
+            "retry_after_seconds": stream_slots.RETRY_AFTER_SECONDS,
+        })
+        resp.status_code = 503
+        resp.headers["Retry-After"] = str(stream_slots.RETRY_AFTER_SECONDS)
+        return resp
 
-    # Build content blocks for files if any were uploaded
-    file_content_blocks = _build_file_content_blocks(uploaded_files) if uploaded_files else []
-
-    # Append new user message(s)
-    for msg in user_messages:
-        if msg.get("role") == "user":
-            if file_content_blocks:
-                # Multimodal message: files + text
-                content_blocks = list(file_content_blocks)
-                content_blocks.append({"type": "text", "text": msg["content"]})
-                conv["messages"].append({"role": "user", "content": content_blocks})
+    try:
+        session_id = data.get("session_id", str(uuid.uuid4()))
+        user_messages = data["messages"]
+        uploaded_files = data.get("files", [])
+        voice_mode = data.get("voice_mode", False)
+
+        # Cleanup stale sessions periodically
+        _cleanup_stale_sessions()
+
+        # Get or create conversation — restore from disk if server restarted
+        if session_id not in conversations:
+            restored = _load_conversation(session_id)
+            if restored:
+                conversations[session_id] = restored
+                logger.info("Restored conversation %s from disk (%d messages)", session_id, len(restored.get("messages", [])))
             else:
-                conv["messages"].append({"role": "user", "content": msg["content"]})
+                conversations[session_id] = {"messages": [], "last_active": time.time()}
+
+        conv = conversations[session_id]
+        _touch_conversation(session_id, conv)
+
+        # Build content blocks for files if any were uploaded
+        file_content_blocks = _build_file_content_blocks(uploaded_files) if uploaded_files else []
+
+        # Append new user message(s)
+        for msg in user_messages:
+            if msg.get("role") == "user":
+                if file_content_blocks:
+                    # Multimodal message: files + text
+                    content_blocks = list(file_content_blocks)
+                    content_blocks.append({"type": "text", "text": msg["content"]})
+                    conv["messages"].append({"role": "user", "content": content_blocks})
+                else:
+                    conv["messages"].append({"role": "user", "content": msg["content"]})
 
-    _audit_log("assistant_query", f"session={session_id}")
+        _audit_log("assistant_query", f"session={session_id}")
 
-    # teacher_id already captured at top of function (line ~1145) from g.user_id
-    # Log it so we can diagnose production issues
-    import logging
-    logging.getLogger(__name__).info("assistant_chat: teacher_id=%s host=%s", teacher_id, request.host)
+        # teacher_id already captured at top of function (line ~1145) from g.user_id
+        # Log it so we can diagnose production issues
+        import logging
+        logging.getLogger(__name__).info("assistant_chat: teacher_id=%s host=%s", teacher_id, request.host)
 
-    return Response(
-        stream_with_context(_run_assistant_stream(
-            session_id=session_id,
-            conv=conv,
-            voice_mode=voice_mode,
-            model_info=model_info,
-            api_key=api_key,
-            teacher_id=teacher_id,
-        )),
-        mimetype='text/event-stream',
-        headers={
-            'Cache-Control': 'no-cache',
-            'X-Accel-Buffering': 'no',
-            'Connection': 'keep-alive'
-        }
-    )
+        return Response(
+            stream_lease.wrap(stream_with_context(_run_assistant_stream(
+                session_id=session_id,
+                conv=conv,
+                voice_mode=voice_mode,
+                model_info=model_info,
+                api_key=api_key,
+                teacher_id=teacher_id,
+            ))),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no',
+                'Connection': 'keep-alive'
+            }
+        )
+    except BaseException:
+        stream_lease.release()
+        raise
 
 
 # ═══════════════════════════════════════════════════════
@@ -2107,7 +2295,8 @@ def clear_conversation():
     session_id = data.get("session_id")
     if session_id:
         conversations.pop(session_id, None)
-        _persist_conversation(session_id)  # Removes from disk file
+        _conversation_expiry.discard(session_id)
+        _persist_conversation(session_id)  # Removes the on-disk record
     return jsonify({"status": "cleared"})
 
 
@@ -24,6 +24,7 @@ from flask import Blueprint, request, redirect, jsonify, session, g
 import urllib.parse
 from urllib.parse import urlencode
 
+from backend import storage
 from backend.auth import establish_sso_session, resolve_classlink_user_id
 from backend.routes.sso_admin import apply_sso_admin_designation
 from backend.supabase_client import get_supabase
@@ -291,6 +292,12 @@ def _trigger_roster_sync(teacher_id, tenant_id):
     """Trigger background ClassLink roster sync after login (OneRoster 1.1)."""
     import threading
 
+    from backend.services import background_jobs
+    if background_jobs.background_jobs_enabled():
+        background_jobs.enqueue(teacher_id, 'classlink_roster_sync',
+                                {'tenant_id': tenant_id}, dedupe_key='login')
+        return
+
     def _bg_sync():
         try:
             _run_classlink_roster_sync(teacher_id, tenant_id)
@@ -298,6 +305,8 @@ def _trigger_roster_sync(teacher_id, tenant_id):
             logger.warning("Post-login ClassLink roster sync failed for %s: %s", teacher_id, e)
             sentry_sdk.capture_exception(e)
 
+    # Threads don't inherit the request's storage unit of work.
+    storage.flush()
     thread = threading.Thread(target=_bg_sync, daemon=True)
     thread.start()
 
@@ -35,12 +35,14 @@ from backend.auth import (
     resolve_clever_user_id,
     resolve_clever_user_id_or_create,
 )
+from backend import storage
 from backend.roster_sync import sync_roster_to_db as _shared_sync_roster_to_db
 from backend.supabase_client import get_supabase as _get_supabase_safe
 from backend.utils.errors import handle_route_errors
 from backend.utils.auth_decorators import require_clever_session
 from backend.utils.redaction import redact_email
 from backend.services.clever_roster_scope import filter_roster_to_teacher
+from backend.services.student_mastery_rollup import refresh_rollup_for_classes
 
 logger = logging.getLogger(__name__)
 
@@ -338,54 +340,68 @@ def _create_clever_student_session(clever_id, email):
         return None
 
 
-def _background_roster_sync(district_token, teacher_id):
-    """Run roster sync in a background thread so OAuth callback returns immediately."""
-    try:
-        roster = _run_async(sync_roster(district_token))
+def _run_clever_roster_sync(district_token, teacher_id):
+    """Login-triggered Clever roster sync, scoped to this teacher's sections.
 
-        # Scope to this teacher's sections (2026-05-14 dimensional review
-        # S2, background-sync variant per Codex revised-plan review). Same
-        # helper as the manual route + periodic cron.
-        if teacher_id.startswith("clever:"):
-            teacher_clever_id = teacher_id[len("clever:"):]
-        else:
-            links = load_clever_links()
-            teacher_clever_id = next(
-                (cid for cid, tid in links.items() if tid == teacher_id),
-                None,
-            )
-        if not teacher_clever_id:
+    Raises on failure. Returns the synced counts, or None when the teacher's
+    Clever ID cannot be resolved. Runs on a thread (_background_roster_sync)
+    or as the clever_roster_sync background job.
+    """
+    roster = _run_async(sync_roster(district_token))
+
+    # Scope to this teacher's sections (2026-05-14 dimensional review
+    # S2, background-sync variant per Codex revised-plan review). Same
+    # helper as the manual route + periodic cron.
+    if teacher_id.startswith("clever:"):
+        teacher_clever_id = teacher_id[len("clever:"):]
+    else:
+        links = load_clever_links()
+        teacher_clever_id = next(
+            (cid for cid, tid in links.items() if tid == teacher_id),
+            None,
+        )
+    if not teacher_clever_id:
+        logger.warning(
+            "Background roster sync skipped: could not resolve "
+            "Clever ID for teacher_hash=%s",
+            hashlib.sha256(str(teacher_id).encode()).hexdigest()[:8],
+        )
+        return None
+    sections, students = filter_roster_to_teacher(roster, teacher_clever_id)
+
+    if students:
+        persist_roster_as_csv(students, teacher_id)
+    db_counts = {"classes": 0, "students": 0, "enrollments": 0}
+    if sections:
+        persist_sections_as_periods(sections, teacher_id)
+        maybe_counts = _sync_classes_to_db(sections, students, teacher_id)
+        if isinstance(maybe_counts, dict):
+            db_counts = maybe_counts
+        if db_counts.get("students", 0) == 0:
             logger.warning(
-                "Background roster sync skipped: could not resolve "
-                "Clever ID for teacher_hash=%s",
+                "Background Clever roster sync persisted 0 student rows: "
+                "sections=%d filtered_students=%d teacher_hash=%s",
+                len(sections),
+                len(students),
                 hashlib.sha256(str(teacher_id).encode()).hexdigest()[:8],
             )
-            return
-        sections, students = filter_roster_to_teacher(roster, teacher_clever_id)
-
-        if students:
-            persist_roster_as_csv(students, teacher_id)
-        db_counts = {"classes": 0, "students": 0, "enrollments": 0}
-        if sections:
-            persist_sections_as_periods(sections, teacher_id)
-            maybe_counts = _sync_classes_to_db(sections, students, teacher_id)
-            if isinstance(maybe_counts, dict):
-                db_counts = maybe_counts
-            if db_counts.get("students", 0) == 0:
-                logger.warning(
-                    "Background Clever roster sync persisted 0 student rows: "
-                    "sections=%d filtered_students=%d teacher_hash=%s",
-                    len(sections),
-                    len(students),
-                    hashlib.sha256(str(teacher_id).encode()).hexdigest()[:8],
-                )
-        contacts = roster.get("contacts", [])
-        if contacts and students:
-            contact_map = extract_parent_contacts(contacts, students)
-            if contact_map:
-                persist_parent_contacts(contact_map, teacher_id)
-        logger.info("Background roster sync complete: %d students, %d sections, %d contacts",
-                    len(students), len(sections), len(contacts))
+    contacts = roster.get("contacts", [])
+    if contacts and students:
+        contact_map = extract_parent_contacts(contacts, students)
+        if contact_map:
+            persist_parent_contacts(contact_map, teacher_id)
+    logger.info("Background roster sync complete: %d students, %d sections, %d contacts",
+                len(students), len(sections), len(contacts))
+    return {"students": len(students), "sections": len(sections), "contacts": len(contacts),
+            "db_classes": db_counts.get("classes", 0),
+            "db_students": db_counts.get("students", 0),
+            "db_enrollments": db_counts.get("enrollments", 0)}
+
+
+def _background_roster_sync(district_token, teacher_id):
+    """Run roster sync in a background thread so OAuth callback returns immediately."""
+    try:
+        _run_clever_roster_sync(district_token, teacher_id)
     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
         logger.warning("Background roster sync failed: %s", str(e))
         sentry_sdk.capture_exception(e)
@@ -609,12 +625,24 @@ def clever_callback():
         logger.warning(
             "Clever roster sync skipped: FLAG_CLEVER_ROSTER_SYNC disabled")
     elif district_token and is_uuid:
-        thread = threading.Thread(
-            target=_background_roster_sync,
-            args=(district_token, resolved_id),
-            daemon=True,
-        )
-        thread.start()
+        from backend.services import background_jobs
+        if background_jobs.background_jobs_enabled():
+            # Job params are persisted: pass the district id and let the
+            # worker resolve the token, never store the token itself.
+            background_jobs.enqueue(
+                resolved_id, 'clever_roster_sync',
+                {'district_id': clever_user.get("district", "") or None},
+                dedupe_key='login',
+            )
+        else:
+            # Threads don't inherit the request's storage unit of work.
+            storage.flush()
+            thread = threading.Thread(
+                target=_background_roster_sync,
+                args=(district_token, resolved_id),
+                daemon=True,
+            )
+            thread.start()
     elif not district_token:
         logger.warning(
             "Clever teacher login skipped roster sync: district token missing "
@@ -909,6 +937,7 @@ def clever_delete_data():
                     if content_ids:
                         sb.table('student_submissions').delete().in_('content_id', content_ids).execute()
                         sb.table('published_content').delete().in_('id', content_ids).execute()
+                        refresh_rollup_for_classes(sb, class_ids)
 
                     # Delete enrollments
                     for cid in class_ids:
@@ -104,6 +104,34 @@ def _build_district_analytics():
     }
 
 
+def _load_district_analytics_rollup():
+    """District analytics from the trigger-maintained rollup (migration 0007),
+    or None to fall back to the full scan. Exact and uncapped, so it bypasses
+    _analytics_cache; last_activity still comes from the bounded audit_log
+    window, as in _enrich_teachers."""
+    from backend.routes.admin_routes import _last_activity_by_teacher
+    from backend.services import district_rollup
+    sb = _get_supabase()
+    if not sb:
+        return None
+    try:
+        data = district_rollup.load_district_analytics(sb)
+    except Exception as e:  # noqa: BLE001  # broad catch: falls back to the full scan
+        logger.warning("district rollup read failed, using full scan: %s", type(e).__name__)
+        sentry_sdk.capture_exception(e)
+        return None
+    teachers = data["teachers"]
+    if teachers:
+        try:
+            last = _last_activity_by_teacher(sb, [t["user_id"] for t in teachers])
+        except Exception as e:  # noqa: BLE001  # broad catch: error is logged
+            logger.warning("district last-activity lookup failed (non-fatal): %s", type(e).__name__)
+            last = {}
+        for t in teachers:
+            t["last_activity"] = last.get(t["user_id"])
+    return data
+
+
 def _get_district_password_hash():
     """Get stored password hash; bootstrap from env var on first use."""
     stored = storage_load(_KEY_PASSWORD_HASH, "system")
@@ -736,11 +764,15 @@ def district_teacher_search():
 @_require_district_admin
 @handle_route_errors
 def district_analytics():
-    now = time.time()
-    if _analytics_cache["data"] is None or (now - _analytics_cache["at"]) > _ANALYTICS_TTL:
-        _analytics_cache["data"] = _build_district_analytics()
-        _analytics_cache["at"] = now
+    from backend.services.district_rollup import rollup_reads_enabled
+    data = _load_district_analytics_rollup() if rollup_reads_enabled() else None
+    if data is None:
+        now = time.time()
+        if _analytics_cache["data"] is None or (now - _analytics_cache["at"]) > _ANALYTICS_TTL:
+            _analytics_cache["data"] = _build_district_analytics()
+            _analytics_cache["at"] = now
+        data = _analytics_cache["data"]
     audit_log("DISTRICT_VIEW_ANALYTICS",
-              f"teachers={_analytics_cache['data']['overview']['total_teachers']}",
+              f"teachers={data['overview']['total_teachers']}",
               user="district_admin", teacher_id="system")
-    return jsonify(_analytics_cache["data"])
+    return jsonify(data)
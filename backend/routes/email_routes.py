@@ -4,6 +4,7 @@ Handles sending grade feedback emails to students via Resend.
 """
 import logging
 import os
+import re
 import sys
 import json
 import subprocess
@@ -14,6 +15,7 @@ from flask import Blueprint, g, jsonify, request
 from backend.utils.auth_decorators import require_teacher
 from backend.utils.errors import handle_route_errors
 from backend.utils.audit import audit_log
+from backend.services.roster_index import RosterIndex, edit_distance
 import sentry_sdk
 
 email_bp = Blueprint('email', __name__)
@@ -71,6 +73,12 @@ def send_emails():
 
         sent = 0
         failed = 0
+        # FLAG_EMAIL_OUTBOX: compose here, send from a persistent outbox on a
+        # background thread, and report progress via /api/send-emails/status.
+        from backend.services import email_outbox
+        use_outbox = email_outbox.email_outbox_enabled()
+        teacher_id = getattr(g, 'user_id', 'local-dev')
+        outbox_messages = []
 
         for email, grades in students.items():
             # Extract first name correctly from "Last, First" or "First Last" formats
@@ -101,20 +109,20 @@ def send_emails():
                 body = f"Hi {first_name},\n\n"
 
                 if len(grades) == 1:
-                    g = grades[0]
-                    body += f"Here is your grade and feedback for {g.get('assignment', 'your assignment')}:\n\n"
+                    grade = grades[0]
+                    body += f"Here is your grade and feedback for {grade.get('assignment', 'your assignment')}:\n\n"
                     body += f"{'=' * 40}\n"
-                    body += f"GRADE: {g.get('score', 0)}/100 ({g.get('letter_grade', '')})\n"
+                    body += f"GRADE: {grade.get('score', 0)}/100 ({grade.get('letter_grade', '')})\n"
                     body += f"{'=' * 40}\n\n"
-                    body += f"FEEDBACK:\n{g.get('feedback', 'No feedback available.')}\n"
+                    body += f"FEEDBACK:\n{grade.get('feedback', 'No feedback available.')}\n"
                 else:
                     grading_period = grades[0].get('grading_period', 'this quarter')
                     body += f"Here are your grades and feedback for {grading_period} so far:\n\n"
-                    for g in grades:
+                    for grade in grades:
                         body += f"{'=' * 40}\n"
-                        body += f"📚 {g.get('assignment', 'Assignment')}\n"
-                        body += f"GRADE: {g.get('score', 0)}/100 ({g.get('letter_grade', '')})\n\n"
-                        body += f"FEEDBACK:\n{g.get('feedback', 'No feedback available.')}\n\n"
+                        body += f"📚 {grade.get('assignment', 'Assignment')}\n"
+                        body += f"GRADE: {grade.get('score', 0)}/100 ({grade.get('letter_grade', '')})\n\n"
+                        body += f"FEEDBACK:\n{grade.get('feedback', 'No feedback available.')}\n\n"
 
                 body += f"\n{'=' * 40}\n"
                 body += f"\nIf you have any questions, please see me during class.\n\n"
@@ -128,11 +136,29 @@ def send_emails():
             # Use teacher_email from request as Reply-To
             reply_to = teacher_email or emailer.config.get('teacher_email')
 
-            if emailer.send_email(email, first_name, subject, body, reply_to):
+            if use_outbox:
+                outbox_messages.append(email_outbox.new_message(
+                    email, subject, body, name=first_name, reply_to=reply_to, scope=teacher_id))
+            elif emailer.send_email(email, first_name, subject, body, reply_to):
                 sent += 1
             else:
                 failed += 1
 
+        if use_outbox:
+            record = email_outbox.create_outbox(teacher_id, outbox_messages, meta={'kind': 'grades'})
+            job = None
+            if record['status'] != 'done':
+                job = _start_outbox_drain(teacher_id, record['batch_id'], emailer)
+            audit_log(
+                "EMAIL_SEND_GRADES",
+                f"Queued grade emails via Resend outbox: batch={record['batch_id']}, "
+                f"total={len(record['messages'])}",
+            )
+            status = email_outbox.outbox_status(record)
+            if job is not None:
+                status['job_id'] = job['id']
+            return jsonify(status), 202
+
         audit_log(
             "EMAIL_SEND_GRADES",
             f"Sent grade emails via Resend: sent={sent}, failed={failed}, total={len(students)}",
@@ -146,6 +172,46 @@ def send_emails():
         return jsonify({"error": "An internal error occurred"}), 500
 
 
+def _start_outbox_drain(teacher_id, batch_id, emailer):
+    """Drain an outbox as a grade_emails job (FLAG_BACKGROUND_JOBS) or on a
+    thread in this process. Returns the job row, or None for a thread."""
+    from backend.services import background_jobs, email_outbox
+
+    if background_jobs.background_jobs_enabled():
+        return background_jobs.enqueue(teacher_id, 'grade_emails', {'batch_id': batch_id},
+                                       dedupe_key=batch_id)
+    email_outbox.start_drain(teacher_id, batch_id, emailer)
+    return None
+
+
+@email_bp.route('/api/send-emails/status')
+@require_teacher
+@handle_route_errors
+def send_emails_status():
+    """Get progress of a queued grade-email send (FLAG_EMAIL_OUTBOX)."""
+    from backend.services import email_outbox
+
+    batch_id = request.args.get('batch_id', '')
+    if not re.fullmatch(r'[0-9a-f]{24}', batch_id):
+        return jsonify({"error": "batch_id is required"}), 400
+
+    teacher_id = getattr(g, 'user_id', 'local-dev')
+    record = email_outbox.load_outbox(teacher_id, batch_id)
+    if record is None:
+        return jsonify({"error": "Email batch not found"}), 404
+
+    # The worker draining it died (deploy, crash): pick up the pending
+    # messages here. Idempotency keys make a duplicate drain harmless; a
+    # grade_emails job still queued or running is returned, not duplicated.
+    if email_outbox.is_stalled(record) and not email_outbox.is_draining(teacher_id, batch_id):
+        from backend.services.email_service import GraiderEmailer
+        emailer = GraiderEmailer()
+        if emailer.resend_available:
+            _start_outbox_drain(teacher_id, batch_id, emailer)
+
+    return jsonify(email_outbox.outbox_status(record))
+
+
 @email_bp.route('/api/test-email', methods=['POST'])
 @require_teacher
 @handle_route_errors
@@ -736,12 +802,13 @@ def _match_to_config_title(normalized_name, config_titles):
 
 
 
-def _find_in_roster(roster, parsed):
+def _find_in_roster(roster, parsed, index=None):
     """Find a student in the roster using multiple matching strategies.
 
     parse_filename() returns a single lookup_key like 'firstname lastname',
     but the roster may store names differently.  Try several fallbacks before
-    giving up.
+    giving up. Pass a RosterIndex built once for ``roster`` when resolving
+    many files; one is built on demand otherwise.
     """
     import re
 
@@ -777,48 +844,21 @@ def _find_in_roster(roster, parsed):
             if info:
                 return info
 
+    if index is None:
+        index = RosterIndex(roster)
+
     # Strategy 4: prefix match — handles last-initial-only filenames
     # e.g., "Serenity P" should match "Serenity Petite"
     if first and last and len(last) <= 2:
         first_lower = clean_first.lower() if clean_first else first.lower()
-        last_lower = last.lower()
-        seen_ids = set()
-        for key, val in roster.items():
-            vid = id(val)
-            if vid in seen_ids:
-                continue
-            seen_ids.add(vid)
-            r_first = val.get('first_name', '').split()[0].lower() if val.get('first_name') else ''
-            r_last = val.get('last_name', '').lower()
-            if r_first == first_lower and r_last.startswith(last_lower):
-                return val
+        info = index.match_last_initial(first_lower, last.lower())
+        if info:
+            return info
 
     # Strategy 5: fuzzy match — handles typos and nicknames
     # Match when one name is exact and the other is within edit distance 2
     if first and last:
-        first_lower = (clean_first or first).lower()
-        last_lower = (clean_last or last).lower()
-        best = None
-        best_dist = 3  # max acceptable distance
-        seen_ids = set()
-        for key, val in roster.items():
-            vid = id(val)
-            if vid in seen_ids:
-                continue
-            seen_ids.add(vid)
-            r_first = val.get('first_name', '').split()[0].lower() if val.get('first_name') else ''
-            r_last = val.get('last_name', '').lower()
-            if not r_first or not r_last:
-                continue
-            # Exact last + fuzzy first, or exact first + fuzzy last
-            if r_last == last_lower:
-                d = _edit_distance(first_lower, r_first)
-                if d < best_dist:
-                    best, best_dist = val, d
-            elif r_first == first_lower:
-                d = _edit_distance(last_lower, r_last)
-                if d < best_dist:
-                    best, best_dist = val, d
+        best = index.match_fuzzy((clean_first or first).lower(), (clean_last or last).lower())
         if best:
             return best
 
@@ -827,17 +867,7 @@ def _find_in_roster(roster, parsed):
 
 def _edit_distance(a, b):
     """Levenshtein distance between two strings."""
-    if len(a) < len(b):
-        return _edit_distance(b, a)
-    if not b:
-        return len(a)
-    prev = list(range(len(b) + 1))
-    for i, ca in enumerate(a):
-        curr = [i + 1]
-        for j, cb in enumerate(b):
-            curr.append(min(prev[j + 1] + 1, curr[j] + 1, prev[j] + (0 if ca == cb else 1)))
-        prev = curr
-    return prev[-1]
+    return edit_distance(a, b)
 
 
 @email_bp.route('/api/send-confirmation-emails', methods=['POST'])
@@ -872,6 +902,7 @@ def send_confirmation_emails():
         roster = build_roster_from_periods()
         if not roster:
             return jsonify({"error": "No students found in period CSVs (~/.graider_data/periods/)"}), 400
+        roster_index = RosterIndex(roster)
 
         # Load already-confirmed filenames from confirmations file + grading_state.
         # Closes GH #249: grading_state was a module-level global in grading_routes
@@ -936,7 +967,7 @@ def send_confirmation_emails():
                 continue
 
             parsed = parse_filename(filename)
-            student_info = _find_in_roster(roster, parsed)
+            student_info = _find_in_roster(roster, parsed, roster_index)
             if not student_info:
                 continue
 
@@ -993,7 +1024,7 @@ def send_confirmation_emails():
         all_student_submitted = defaultdict(set)
         for filepath in all_files:
             parsed = parse_filename(filepath.name)
-            student_info = _find_in_roster(roster, parsed)
+            student_info = _find_in_roster(roster, parsed, roster_index)
             if student_info:
                 sname = student_info.get('student_name', '')
                 raw_part = parsed.get('assignment_part', '') or 'Assignment'
@@ -1127,6 +1158,7 @@ def pending_confirmations():
         roster = build_roster_from_periods()
         if not roster:
             return jsonify({"count": 0, "students": []})
+        roster_index = RosterIndex(roster)
 
         # Load confirmed filenames
         confirmed_filenames = _load_confirmed_filenames()
@@ -1157,7 +1189,7 @@ def pending_confirmations():
                     continue
                 filename = filepath.name
                 parsed = parse_filename(filename)
-                student_info = _find_in_roster(roster, parsed)
+                student_info = _find_in_roster(roster, parsed, roster_index)
                 if not student_info:
                     continue
                 email = student_info.get('email', '')
@@ -22,10 +22,12 @@ helpers via a try/except ImportError fallback; this module replicates that
 resolution exactly (audit_log direct; the two history helpers via the same
 try/except ImportError fallback) so the namespace is equivalent and the move
 introduces no behavior change. ``save_results`` and
-``grade_with_parallel_detection`` are now imported (GH #423): pre-move
+``grade_with_parallel_detection`` are now bound (GH #423): pre-move
 ``app.py`` left them unbound, so the grade-individual / delete / approval
-bodies hit a latent ``NameError`` whenever those paths ran. Importing them
-here at module level closes that. ``base64`` / ``re`` are imported inside the
+bodies hit a latent ``NameError`` whenever those paths ran. Binding them
+here at module level closes that; ``grade_with_parallel_detection`` is a
+thin wrapper so the grading pipeline (and its provider SDKs) loads on first
+use rather than at blueprint import. ``base64`` / ``re`` are imported inside the
 bodies (unchanged) and need no module-level import. This module must never
 import the app module (no cycle).
 """
@@ -40,7 +42,6 @@ from flask import Blueprint, g, jsonify, request
 
 from backend.extensions import limiter
 from backend.grading.state import _get_state, save_results
-from backend.services.grading_pipeline import grade_with_parallel_detection
 from backend.paths import graider_export_dir
 from backend.utils.audit import audit_log
 from backend.utils.auth_decorators import require_teacher
@@ -55,6 +56,12 @@ grading_results_bp = Blueprint('grading_results', __name__)
 _logger = logging.getLogger(__name__)
 
 
+def grade_with_parallel_detection(*args, **kwargs):
+    """Module-level binding (GH #423) that imports the grading pipeline on first use."""
+    from backend.services.grading_pipeline import grade_with_parallel_detection as grade
+    return grade(*args, **kwargs)
+
+
 # ══════════════════════════════════════════════════════════════
 # INDIVIDUAL FILE GRADING (for paper/handwritten assignments)
 # ══════════════════════════════════════════════════════════════
@@ -0,0 +1,95 @@
+"""
+Background Jobs API
+===================
+Status, cancellation and result download for background jobs
+(backend/services/background_jobs.py, FLAG_BACKGROUND_JOBS).
+
+POST /api/jobs                    start an enqueueable kind ({"kind": ...})
+GET  /api/jobs                    the teacher's recent jobs (?kind=, ?limit=)
+GET  /api/jobs/<job_id>           one job's status and progress
+POST /api/jobs/<job_id>/cancel    cancel a queued job / stop a running one
+GET  /api/jobs/<job_id>/result    download a succeeded job's file
+
+Routes that used to do the work inline (send-emails, export-district-report,
+sync-to-cloud, export-slides, slides/pdf) return a job status with 202 when
+the flag is on; the UI polls /api/jobs/<job_id> from there.
+"""
+from flask import Blueprint, Response, g, jsonify, request
+
+from backend.services import background_jobs
+from backend.utils.auth_decorators import require_teacher
+from backend.utils.errors import handle_route_errors
+
+jobs_bp = Blueprint('jobs', __name__)
+
+MAX_LIST_LIMIT = 100
+
+
+def _teacher_id():
+    return getattr(g, 'user_id', 'local-dev')
+
+
+@jobs_bp.route('/api/jobs', methods=['POST'])
+@require_teacher
+@handle_route_errors
+def start_job():
+    """Start a job of an enqueueable kind; one active job per kind."""
+    data = request.get_json(silent=True) or {}
+    kind = background_jobs.KINDS.get(data.get('kind') or '')
+    if kind is None or not kind.enqueueable:
+        return jsonify({"error": "Unknown job kind"}), 400
+    job = background_jobs.enqueue(_teacher_id(), kind.name, dedupe_key=kind.name)
+    return jsonify(background_jobs.job_status(job)), 202
+
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+@require_teacher
+@handle_route_errors
+def list_jobs():
+    """The teacher's most recent jobs, newest first."""
+    kind = request.args.get('kind') or None
+    if kind is not None and kind not in background_jobs.KINDS:
+        return jsonify({"error": "Unknown job kind"}), 400
+    limit = min(max(request.args.get('limit', 20, type=int) or 20, 1), MAX_LIST_LIMIT)
+    jobs = background_jobs.list_jobs(_teacher_id(), kind=kind, limit=limit)
+    return jsonify({"jobs": [background_jobs.job_status(j) for j in jobs]})
+
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+@require_teacher
+@handle_route_errors
+def get_job(job_id):
+    """One job's status, progress and result summary."""
+    job = background_jobs.get_job(_teacher_id(), job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(background_jobs.job_status(job))
+
+
+@jobs_bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@require_teacher
+@handle_route_errors
+def cancel_job(job_id):
+    """Cancel a queued job, or ask a running one to stop at its next check."""
+    job = background_jobs.request_cancel(_teacher_id(), job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(background_jobs.job_status(job))
+
+
+@jobs_bp.route('/api/jobs/<job_id>/result', methods=['GET'])
+@require_teacher
+@handle_route_errors
+def download_job_result(job_id):
+    """Download the file a succeeded job produced."""
+    job = background_jobs.get_job(_teacher_id(), job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    result = background_jobs.read_result_file(job)
+    if result is None:
+        return jsonify({"error": "This job has no result file"}), 409
+    data, filename, content_type = result
+    return Response(
+        data, mimetype=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -20,14 +20,17 @@ logger = logging.getLogger(__name__)
 # Import storage abstraction
 try:
     from backend.storage import load as storage_load, save as storage_save, delete as storage_delete, list_keys as storage_list_keys
+    from backend.storage import load_prefix as storage_load_prefix
 except ImportError:
     try:
         from storage import load as storage_load, save as storage_save, delete as storage_delete, list_keys as storage_list_keys
+        from storage import load_prefix as storage_load_prefix
     except ImportError:
         storage_load = None
         storage_save = None
         storage_delete = None
         storage_list_keys = None
+        storage_load_prefix = None
 
 lesson_bp = Blueprint('lesson', __name__)
 
@@ -86,10 +89,9 @@ def list_lessons():
     units = {}
     all_lessons = []
 
-    if storage_list_keys and storage_load:
-        keys = storage_list_keys('lesson:', teacher_id)
-        for key in keys:
-            data = storage_load(key, teacher_id) or {}
+    if storage_load_prefix:
+        lessons_by_key = storage_load_prefix('lesson:', teacher_id)
+        for key, data in lessons_by_key.items():
             parts = key.split(':', 2)
             unit_name = parts[1] if len(parts) > 1 else 'General'
             title_part = parts[2] if len(parts) > 2 else ''
@@ -105,7 +107,7 @@ def list_lessons():
                 units[unit_name] = []
             units[unit_name].append(lesson_info)
             all_lessons.append(lesson_info)
-        if keys:
+        if lessons_by_key:
             return jsonify({"units": units, "lessons": all_lessons})
 
     # Fallback to file
@@ -583,12 +585,8 @@ def list_resources():
     content_type_filter = request.args.get('type')
 
     resources = []
-    if storage_list_keys and storage_load:
-        keys = storage_list_keys('resource:', teacher_id)
-        for key in keys:
-            data = storage_load(key, teacher_id)
-            if data is None:
-                continue
+    if storage_load_prefix:
+        for key, data in storage_load_prefix('resource:', teacher_id).items():
             if content_type_filter and data.get('content_type') != content_type_filter:
                 continue
             resources.append({
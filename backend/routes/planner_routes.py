@@ -22,9 +22,10 @@ from backend.paths import graider_export_dir
 
 ALLOWED_DOC_EXTENSIONS = {'.docx', '.pdf', '.txt', '.doc', '.rtf', '.png', '.jpg', '.jpeg'}
 
-# Import MODEL_PRICING for token cost tracking
+# Import MODEL_PRICING for token cost tracking (from the pricing table itself:
+# assignment_grader would load the whole grading pipeline at blueprint import)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-from assignment_grader import MODEL_PRICING
+from backend.services.grading_models import MODEL_PRICING
 
 # Import storage abstraction for saving grading configs to Supabase
 try:
@@ -66,8 +67,11 @@ from backend.services.planner_standards import (  # noqa: F401
     _get_standards_map,
     _grade_matches,
     _load_standards_file,
+    get_standards_by_code,
     load_standards,
     load_support_documents_for_planning,
+    preselect_standards,
+    suggest_standard_for_question,
 )
 
 # ── Tier 2 PR2: document / visual / platform-export rendering extracted to ──
@@ -232,6 +236,11 @@ def align_document_to_standards():
     if not standards:
         return jsonify({"error": f"No standards found for {state} {subject} grade {grade}. Check that a standards file exists in backend/data/."})
 
+    # Rank locally and send only the top-K candidates in full (limit token
+    # usage); the gap analysis still covers every code for the grade.
+    all_codes = [s.get("code", "") for s in standards if s.get("code")]
+    standards = preselect_standards(standards, doc_text)
+
     # Build condensed standards reference for AI prompt (limit token usage)
     standards_ref = []
     for s in standards:
@@ -253,6 +262,7 @@ def align_document_to_standards():
 
         return jsonify(align_document_to_standards_content(
             doc_text=doc_text, standards_ref=standards_ref, api_key=api_key,
+            all_codes=all_codes,
         ))
 
     except Exception:
@@ -275,9 +285,24 @@ def rewrite_for_alignment():
     if not questions:
         return jsonify({"error": "No questions provided for rewriting"})
 
-    result = load_standards(state, subject, grade)
-    standards = result['standards']
-    standards_by_code = {s.get("code"): s for s in standards} if standards else {}
+    standards_by_code = get_standards_by_code(
+        state, subject, [q.get('target_standard', '') for q in questions],
+    )
+    # Questions sent without a target are rewritten as before; the best local
+    # match is returned alongside as a suggestion for the teacher to confirm.
+    suggested_standards = []
+    if any(not q.get('target_standard') for q in questions):
+        grade_standards = load_standards(state, subject, grade)['standards']
+        for i, q in enumerate(questions):
+            if q.get('target_standard') or not grade_standards:
+                continue
+            match = suggest_standard_for_question(grade_standards, q.get('original_text', ''))
+            if match:
+                suggested_standards.append({
+                    "question_index": i,
+                    "code": match.get('code', ''),
+                    "benchmark": match.get('benchmark', ''),
+                })
 
     # Enrich questions with full standard details
     enriched_questions = []
@@ -302,10 +327,13 @@ def rewrite_for_alignment():
         if not api_key or api_key.strip() == "" or "your-key-here" in api_key:
             return jsonify({"error": "Missing or placeholder OpenAI API Key"})
 
-        return jsonify(rewrite_for_alignment_content(
+        result = rewrite_for_alignment_content(
             enriched_questions=enriched_questions, doc_text=doc_text,
             grade=grade, subject=subject, api_key=api_key,
-        ))
+        )
+        if suggested_standards and 'error' not in result:
+            result = {**result, "suggested_standards": suggested_standards}
+        return jsonify(result)
 
     except Exception:
         _logger.exception("Rewrite for alignment failed")
@@ -2160,6 +2188,14 @@ def export_slides():
     if not slide_data or not slide_data.get('slides'):
         return jsonify({"error": "No slide data provided."}), 400
 
+    # FLAG_BACKGROUND_JOBS: assemble on a job worker; the UI polls
+    # /api/jobs/<id> and downloads from /api/jobs/<id>/result.
+    from backend.services import background_jobs
+    if background_jobs.background_jobs_enabled():
+        teacher_id = getattr(g, 'user_id', 'local-dev')
+        job = background_jobs.enqueue(teacher_id, 'slides_pptx', payload={'slides': slide_data})
+        return jsonify(background_jobs.job_status(job)), 202
+
     title = slide_data.get("title", "Slide Deck")
     safe_title = "".join(c for c in title if c.isalnum() or c in " -_").strip()[:80]
     export_dir = _get_export_dir()
@@ -2227,6 +2263,11 @@ def slides_pdf():
     deck, images = _deck_and_images_from_request()
     if not deck.get('slides'):
         return jsonify({"error": "No slides to render"}), 400
+    from backend.services import background_jobs
+    if background_jobs.background_jobs_enabled():
+        teacher_id = getattr(g, 'user_id', 'local-dev')
+        job = background_jobs.enqueue(teacher_id, 'slides_pdf', payload={'slides': deck})
+        return jsonify(background_jobs.job_status(job)), 202
     html = build_deck_html(deck, images)
     try:
         pdf_bytes = html_to_pdf(html)
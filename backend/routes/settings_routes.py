@@ -39,14 +39,18 @@ except ImportError:
 # Import storage abstraction
 try:
     from backend.storage import load as storage_load, save as storage_save, list_keys as storage_list_keys, sync_all_to_cloud
+    from backend.storage import load_many as storage_load_many, load_prefix as storage_load_prefix
 except ImportError:
     try:
         from storage import load as storage_load, save as storage_save, list_keys as storage_list_keys, sync_all_to_cloud
+        from storage import load_many as storage_load_many, load_prefix as storage_load_prefix
     except ImportError:
         storage_load = None
         storage_save = None
         storage_list_keys = None
         sync_all_to_cloud = None
+        storage_load_many = None
+        storage_load_prefix = None
 
 settings_bp = Blueprint('settings', __name__)
 _logger = logging.getLogger(__name__)
@@ -475,15 +479,18 @@ def list_periods():
     periods = []
 
     # Try cloud storage first for non-local users
-    if teacher_id != 'local-dev' and storage_list_keys and storage_load:
-        meta_keys = storage_list_keys('period_meta:', teacher_id)
-        for key in meta_keys:
+    if teacher_id != 'local-dev' and storage_load_prefix and storage_load_many:
+        # Two round trips total: every metadata blob, then every period it names
+        metas = storage_load_prefix('period_meta:', teacher_id)
+        period_blobs = storage_load_many(
+            [f"period:{m.get('filename', '')}" for m in metas.values() if m], teacher_id,
+        )
+        for key, metadata in metas.items():
             try:
-                metadata = storage_load(key, teacher_id)
                 if metadata:
                     # Load student data from stored period JSON
                     filename = metadata.get('filename', '')
-                    period_data = storage_load(f'period:{filename}', teacher_id)
+                    period_data = period_blobs.get(f'period:{filename}')
                     if period_data and period_data.get('rows'):
                         metadata['students'] = _get_students_from_period_rows(period_data['rows'])
                     else:
@@ -1240,11 +1247,9 @@ def get_all_student_accommodations():
     # Build student ID → name lookup from period data for name resolution
     id_to_name = {}
     # Try cloud period data first
-    if teacher_id != 'local-dev' and storage_list_keys and storage_load:
-        period_keys = storage_list_keys('period:', teacher_id)
-        for key in period_keys:
+    if teacher_id != 'local-dev' and storage_load_prefix:
+        for key, period_data in storage_load_prefix('period:', teacher_id).items():
             try:
-                period_data = storage_load(key, teacher_id)
                 if period_data and period_data.get('rows'):
                     students = _get_students_from_period_rows(period_data['rows'])
                     for s in students:
@@ -1753,7 +1758,10 @@ def import_from_focus():
     # thread so the subprocess reads the right file.
     creds_path = _portal_credentials_file_for(teacher_id)
 
-    # Start import in background thread
+    # Start import in background thread. Threads don't inherit the request's
+    # storage unit of work, so make its buffered saves visible first.
+    from backend import storage
+    storage.flush()
     thread = threading.Thread(
         target=_run_focus_import, args=(creds_path,), daemon=True,
     )
@@ -2162,6 +2170,13 @@ def sync_to_cloud():
     if not sync_all_to_cloud:
         return jsonify({"error": "Storage module not available"}), 500
 
+    # FLAG_BACKGROUND_JOBS: run as a job (on this host: it reads local
+    # files) and let the UI poll /api/jobs/<id>.
+    from backend.services import background_jobs
+    if background_jobs.background_jobs_enabled():
+        job = background_jobs.enqueue(teacher_id, 'cloud_sync', dedupe_key='cloud_sync')
+        return jsonify(background_jobs.job_status(job)), 202
+
     try:
         summary = sync_all_to_cloud(teacher_id)
         if "error" in summary:
@@ -25,6 +25,7 @@ import sentry_sdk
 from flask import Blueprint, request, jsonify, g
 from backend.supabase_client import get_supabase_or_raise as _get_supabase
 from backend.services.submission_repository import SubmissionPathType
+from backend.services.student_mastery_rollup import refresh_rollup_for_submission
 # Phase 4.5: this module has MIXED auth paths. Teacher endpoints use
 # get_request_supabase() so their requests land under RLS when the
 # USE_PER_USER_JWT flag is on. Student-session endpoints (authenticated
@@ -53,6 +54,7 @@ def _get_teacher_id():
     return teacher_id
 
 
+from backend import storage
 from backend.utils.auth_decorators import require_teacher
 from backend.utils.errors import error_response, handle_route_errors
 
@@ -80,6 +82,8 @@ def _spawn_grading_thread_safe(*, target, args, kwargs=None):
     """Start a daemon thread for grading work; capture to Sentry on failure.
     Returns the started Thread, or None if spawn failed."""
     try:
+        # Threads don't inherit the request's storage unit of work.
+        storage.flush()
         t = threading.Thread(target=target, args=args, kwargs=kwargs or {}, daemon=True)
         t.start()
         return t
@@ -807,6 +811,7 @@ def grade_portal_submission():
             update_data['percentage'] = instant_results.get('percentage')
 
         db.table('student_submissions').update(update_data).eq('id', submission_id).execute()
+        refresh_rollup_for_submission(db, submission_id)
 
         # Spawn multipass for written questions
         if needs_multipass:
@@ -821,6 +826,8 @@ def grade_portal_submission():
             published_accommodations = content.data[0].get('settings', {}).get('student_accommodations', {}) if content.data else {}
 
             import threading
+            # Threads don't inherit the request's storage unit of work.
+            storage.flush()
             thread = threading.Thread(
                 target=run_portal_grading_thread,
                 args=(
@@ -1226,6 +1233,10 @@ def submit_student_work(content_id):
 
         submission_id = result.data[0]['id']
 
+        # Instant (MC/TF) results already carry standards_mastery — keep the
+        # progress-rank rollup current without waiting for multipass.
+        refresh_rollup_for_submission(db, submission_id)
+
         # Spawn multipass grading thread for written questions
         if needs_multipass:
             from backend.services.grading_service import load_teacher_config
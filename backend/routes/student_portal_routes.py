@@ -10,7 +10,7 @@ import secrets
 import string
 import uuid
 from datetime import datetime, timezone
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, current_app, request, jsonify, g
 from backend.supabase_client import get_supabase_or_raise as get_supabase
 from backend.services.submission_repository import SubmissionPathType
 # Phase 4.5: this module has MIXED auth paths. Teacher-authenticated
@@ -26,16 +26,28 @@ _logger = logging.getLogger(__name__)
 
 from backend.utils.auth_decorators import require_teacher
 from backend.utils.errors import error_response, handle_route_errors
-from backend.utils.ttl_cache import TTLCache
-
-# Process-local cache for the class-scoped progress-rank grid. The
-# computation re-aggregates thousands of submissions for districts with
-# 150+ students × multiple periods × multiple assessments. A 30-second
-# TTL turns repeated polls (the dashboard auto-refreshes) into O(1)
-# lookups while keeping data freshness within a teacher's tolerance.
-# Followup work: replace with a `student_standards_mastery` materialized
-# rollup table, see docs/perf-progress-rank.md.
-_progress_rank_cache = TTLCache(ttl_seconds=30)
+from backend.utils.ttl_cache import SharedTTLCache
+from backend.services.student_mastery_rollup import (
+    MASTERY_CONTENT_TYPES,
+    PROGRESS_RANK_CACHE_NAMESPACE,
+    refresh_rollup_for_classes,
+    refresh_rollup_for_students,
+    refresh_rollup_for_submission,
+)
+
+# Shared cache for the class-scoped progress-rank grid. The computation
+# re-aggregates thousands of submissions for districts with 150+ students
+# × multiple periods × multiple assessments. A 30-second TTL turns repeated
+# polls (the dashboard auto-refreshes) into O(1) lookups; the Redis tier
+# means one pod computes for every worker, and get_or_compute coalesces a
+# stampede of polls into a single computation. Grading / recall hooks in
+# student_mastery_rollup bump the per-class version, so a new grade shows
+# up on the next poll instead of after the TTL. With
+# FLAG_MASTERY_ROLLUP_READS on, misses read the `student_standards_mastery`
+# rollup instead (docs/perf-progress-rank.md).
+_progress_rank_cache = SharedTTLCache(
+    PROGRESS_RANK_CACHE_NAMESPACE, ttl_seconds=30, scope_of=lambda key: key[1],
+)
 from backend.extensions import limiter
 from backend.services.grading_service import grade_deterministic_question, grade_student_submission, grade_instant_only
 # Phase 4.2 #12 / Phase 4.3 Sprint 2: shared DOK helpers live in
@@ -55,6 +67,12 @@ from backend.services.student_gradebook import (
     build_submission_detail,
 )
 from backend.services.student_comparison import build_assessment_comparison
+from backend.services.student_assessment_projection import (
+    PROJECTION_COLUMNS,
+    build_student_projection,
+    projection_columns_for,
+    serialize_projection,
+)
 
 
 def _spawn_thread_grading(submission_id, assessment, answers, student_info,
@@ -71,7 +89,10 @@ def _spawn_thread_grading(submission_id, assessment, answers, student_info,
     accommodations.
     """
     import threading
+    from backend import storage
     from backend.services.portal_grading import run_portal_grading_thread
+    # Threads don't inherit the request's storage unit of work.
+    storage.flush()
     thread = threading.Thread(
         target=run_portal_grading_thread,
         args=(submission_id, assessment, answers, student_info,
@@ -231,8 +252,7 @@ def publish_assessment():
             "due_date": settings.get('due_date'),
         }
 
-        # Caller-generated UUID makes this retry-safe under full retry policy.
-        result = db.table('published_assessments').upsert({
+        row = {
             "id": str(uuid.uuid4()),
             "join_code": join_code,
             "title": assessment.get('title', 'Untitled Assessment'),
@@ -242,7 +262,13 @@ def publish_assessment():
             "teacher_name": settings.get('teacher_name', 'Teacher'),
             "teacher_email": settings.get('teacher_email'),
             "is_active": True,
-        }, on_conflict='id').execute()
+        }
+        # Pre-serialize the student-facing payload once here instead of
+        # stripping the answer key on every /api/student/join request.
+        row.update(projection_columns_for(row))
+
+        # Caller-generated UUID makes this retry-safe under full retry policy.
+        result = db.table('published_assessments').upsert(row, on_conflict='id').execute()
 
         if not result.data:
             return jsonify({"error": "Failed to publish assessment"}), 500
@@ -575,6 +601,10 @@ def get_assessment_for_student(code):
     Get assessment details for a student joining with a code.
     Returns assessment without answers for student to take.
 
+    Serves the student-safe projection stored by publish_assessment (see
+    backend/services/student_assessment_projection.py) with an ETag, so a
+    class reloading the same test gets 304s instead of full bodies.
+
     Rate-limited at 30/min per IP (Phase 4.6) to prevent join-code
     enumeration attacks. Typical student traffic is <5/min per IP.
     """
@@ -583,7 +613,9 @@ def get_assessment_for_student(code):
         db = get_supabase()
         code = code.upper()
 
-        result = db.table('published_assessments').select('*').eq('join_code', code).execute()
+        result = db.table('published_assessments').select(
+            PROJECTION_COLUMNS
+        ).eq('join_code', code).execute()
 
         if not result.data:
             return jsonify({"error": "Assessment not found. Check your join code."}), 404
@@ -594,79 +626,25 @@ def get_assessment_for_student(code):
         if not data.get('is_active', True):
             return jsonify({"error": "This assessment is no longer accepting submissions."}), 403
 
-        assessment = data.get('assessment', {})
-        settings = data.get('settings', {})
-
-        # Shared study-material content (study guide, flashcards, etc.) — return directly
-        content_type = settings.get('content_type') or assessment.get('content_type')
-        # Only study materials get the material response format.
-        # Assignments and assessments both get the sections/questions format.
-        material_types = ('study_guide', 'flashcards', 'slide_deck', 'mind_map',
-                          'audio_overview', 'video_overview', 'infographic', 'data_table')
-        if content_type and content_type in material_types:
-            resp = {
-                "content_type": content_type,
-                "title": assessment.get('title', data.get('title', content_type)),
-                "teacher": data.get('teacher_name', 'Teacher'),
-            }
-            # JSON types: quiz, flashcards, mind_map
-            if assessment.get('data'):
-                resp["data"] = assessment['data']
-            # Legacy flashcards format
-            if assessment.get('cards'):
-                resp["data"] = assessment['cards']
-            # Text types: study_guide
-            if assessment.get('content'):
-                resp["content"] = assessment['content']
-            # Media types: provide URL
-            if assessment.get('shared_file'):
-                resp["media_url"] = "/api/student/shared-media/" + code
-            return jsonify(resp)
-
-        # Remove answers from questions before sending to student
-        sanitized_sections = []
-        for section in assessment.get('sections', []):
-            sanitized_questions = []
-            for q in section.get('questions', []):
-                student_question = {
-                    "number": q.get('number'),
-                    "question": q.get('question'),
-                    "type": q.get('type') or q.get('question_type', 'short_answer'),
-                    "points": q.get('points'),
-                    "options": q.get('options'),
-                    "terms": q.get('terms'),
-                    "definitions": q.get('definitions'),
-                }
-                sanitized_questions.append(student_question)
-
-            sanitized_sections.append({
-                "name": section.get('name'),
-                "instructions": section.get('instructions'),
-                "questions": sanitized_questions,
-            })
+        body = data.get('student_projection')
+        etag = data.get('student_projection_etag')
+        if not body or not etag:
+            # Published before the stored projection existed (or a survey
+            # row): load the full row and project it for this request.
+            full = db.table('published_assessments').select('*').eq('join_code', code).execute()
+            if not full.data:
+                return jsonify({"error": "Assessment not found. Check your join code."}), 404
+            body, etag = serialize_projection(
+                build_student_projection({**full.data[0], 'join_code': code})
+            )
 
-        # Check for student restrictions (makeup exams)
-        restricted_students = settings.get('restricted_students', [])
-        student_accommodations = settings.get('student_accommodations', {})
-        is_makeup = settings.get('is_makeup', False)
-
-        return jsonify({
-            "title": assessment.get('title'),
-            "instructions": assessment.get('instructions'),
-            "total_points": assessment.get('total_points'),
-            "time_estimate": assessment.get('time_estimate'),
-            "sections": sanitized_sections,
-            "settings": {
-                "content_type": content_type or 'assessment',
-                "time_limit_minutes": settings.get('time_limit_minutes'),
-                "require_name": settings.get('require_name', True),
-                "is_makeup": is_makeup,
-                "restricted_students": restricted_students,  # Frontend checks if student allowed
-                "period": settings.get('period', ''),
-            },
-            "student_accommodations": student_accommodations,  # Accommodations per student
-            "teacher": data.get('teacher_name', 'Teacher'),
-        })
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        # Students must revalidate so a teacher's republish is picked up, but
+        # an unchanged assessment costs a 304 with no body.
+        response.cache_control.no_cache = True
+        response.cache_control.private = True
+        return response.make_conditional(request)
 
     except Exception as e:
         _logger.exception("Get assessment for student error")
@@ -822,6 +800,10 @@ def submit_assessment(code):
             # Do NOT catch bare Exception — programming bugs
             # (serialization, missing decorator) must surface loudly.
             import kombu.exceptions
+            from backend import storage
+            # The worker reads storage directly: flush this request's
+            # buffered saves (storage unit of work) before enqueueing.
+            storage.flush()
             try:
                 district_id = getattr(g, 'district_id', None)
                 user_id = getattr(g, 'user_id', None)
@@ -949,13 +931,16 @@ def delete_shared_resource(resource_id):
         db = _get_teacher_supabase()
 
         # Verify ownership
-        check = db.table('published_content').select('id').eq(
+        check = db.table('published_content').select('id, class_id, content_type').eq(
             'id', resource_id
         ).eq('teacher_id', g.teacher_id).execute()
         if not check.data:
             return jsonify({"error": "Resource not found"}), 404
 
         db.table('published_content').delete().eq('id', resource_id).execute()
+        # Standards that only came from this content must leave the rollup.
+        if check.data[0].get('content_type') in MASTERY_CONTENT_TYPES:
+            refresh_rollup_for_classes(db, [check.data[0].get('class_id')])
         return jsonify({"success": True})
 
     except Exception as e:
@@ -1050,6 +1035,8 @@ def end_student_attempt(submission_id):
             'submitted_at': datetime.now(timezone.utc).isoformat(),
             'results': {'force_ended_by_teacher': True},
         }).eq('id', submission_id).execute()
+        # A force-ended attempt becomes the "latest" for mastery selection.
+        refresh_rollup_for_submission(db, submission_id)
 
         return jsonify({"success": True})
     except Exception as e:
@@ -1169,11 +1156,11 @@ def get_class_progress_rank(class_id):
     Query params:
       attempt_mode: 'latest' (default) | 'best' | 'average'
 
-    Caching: 30-second per-(teacher, class, attempt_mode) TTL cache on the
+    Caching: 30-second per-(teacher, class, attempt_mode) shared cache on the
     full response. Auth check is OUTSIDE the cache, so a teacher who loses
     access to a class will hit the 403 path within one TTL window even on
-    a cached response. See docs/perf-progress-rank.md for the planned
-    materialized rollup that replaces this in a follow-up.
+    a cached response. See docs/perf-progress-rank.md for the
+    materialized rollup that misses read from when its flag is on.
     """
     try:
         db = _get_teacher_supabase()
@@ -1190,16 +1177,14 @@ def get_class_progress_rank(class_id):
         # Cache lookup AFTER auth — keyed by (teacher, class, mode) so two
         # teachers viewing the same class via different scopes don't share.
         cache_key = (g.teacher_id, class_id, attempt_mode)
-        cached = _progress_rank_cache.get(cache_key)
-        if cached is not None:
-            return jsonify(cached)
         class_name = cls.data[0].get('name')
 
         # Heavy assembly extracted to the service (Wave 5 Slice 3). The cache
         # asymmetry is preserved: only the full payload is cacheable.
-        payload, cacheable = build_class_progress_rank(db, class_id, class_name, attempt_mode)
-        if cacheable:
-            _progress_rank_cache.set(cache_key, payload)
+        payload = _progress_rank_cache.get_or_compute(
+            cache_key,
+            lambda: build_class_progress_rank(db, class_id, class_name, attempt_mode),
+        )
         return jsonify(payload)
     except Exception as e:
         _logger.exception("Progress rank error")
@@ -2334,6 +2319,10 @@ def recall_remediation(class_id, rem_id):
         'id', rem_id
     ).eq('class_id', class_id).execute()
 
+    # Recompute the targeted students' mastery rollup from their remaining
+    # submissions (docs/perf-progress-rank.md "Recall path").
+    refresh_rollup_for_students(db, class_id, rem.get('target_student_ids') or [])
+
     _logger.info(
         "remediation.recalled rem_id=%s class=%s teacher=%s already_recalled=False",
         rem_id, class_id, g.teacher_id,
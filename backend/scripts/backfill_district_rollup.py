@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Backfill + verify the district analytics rollup.
+
+Why
+---
+Migration 0007 creates `district_rollup_units` / `district_teacher_rollup`
+empty. Its triggers keep them current from then on, but every teacher with
+data from BEFORE the deploy needs one rebuild. Reads only switch to the
+rollup when FLAG_DISTRICT_ROLLUP_READS is on, so the order is:
+
+  1. deploy (migration 0007)
+  2. run this script with --apply
+  3. run it again with --verify until it reports 0 mismatches
+  4. set FLAG_DISTRICT_ROLLUP_READS=true
+
+--apply calls the district_rollup_rebuild RPC once per teacher: it
+recomputes the teacher's units from source under a lock, so writes landing
+during the backfill are not lost. Teachers that own nothing any more have
+their stale row removed.
+
+--verify recomputes /api/district/analytics the pre-rollup way
+(district_routes._build_district_analytics) and compares the overview and
+every teacher's counts against what the rollup serves. If the live
+computation hit its hard cap it says so: on such districts the rollup is
+the exact one and overview mismatches are expected.
+
+Usage
+-----
+    # dry run (default) — lists how many teachers WOULD be rebuilt
+    SUPABASE_URL=... SUPABASE_SERVICE_KEY=... python backend/scripts/backfill_district_rollup.py
+
+    # rebuild every teacher (or one with --teacher-id)
+    ... python backend/scripts/backfill_district_rollup.py --apply [--teacher-id <id>]
+
+    # compare rollup against the live computation
+    ... python backend/scripts/backfill_district_rollup.py --verify
+"""
+import argparse
+import os
+import sys
+
+# Allow running without installing the package: add the repo root (this file
+# lives at <repo>/backend/scripts/, so go up three levels) to sys.path.
+sys.path.insert(
+    0,
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+)
+
+_OVERVIEW_KEYS = ("total_teachers", "total_students", "total_assessments",
+                  "average_score", "grade_distribution")
+_TEACHER_KEYS = ("email", "name", "classes_count", "students_count", "assessments_count")
+
+
+def compare_analytics(rolled, live):
+    """Return a list of human-readable differences between two payloads."""
+    mismatches = []
+    for key in _OVERVIEW_KEYS:
+        if rolled["overview"].get(key) != live["overview"].get(key):
+            mismatches.append(f"overview.{key}: rollup={rolled['overview'].get(key)!r} "
+                              f"live={live['overview'].get(key)!r}")
+    rolled_teachers = {t["user_id"]: t for t in rolled["teachers"]}
+    live_teachers = {t["user_id"]: t for t in live["teachers"]}
+    for tid in sorted(set(rolled_teachers) | set(live_teachers)):
+        if tid not in rolled_teachers:
+            mismatches.append(f"teacher {tid}: missing from rollup")
+        elif tid not in live_teachers:
+            mismatches.append(f"teacher {tid}: in rollup but owns no data")
+        else:
+            for key in _TEACHER_KEYS:
+                a, b = rolled_teachers[tid].get(key), live_teachers[tid].get(key)
+                if a != b:
+                    mismatches.append(f"teacher {tid}.{key}: rollup={a!r} live={b!r}")
+    return mismatches
+
+
+def _teacher_ids(sb):
+    """Every teacher owning source data, plus any with a (possibly stale) row."""
+    from backend.routes.district_routes import _district_teacher_ids
+    from backend.services.district_rollup import load_teacher_rows
+
+    ids = _district_teacher_ids(sb)
+    ids |= {str(r["teacher_id"]) for r in load_teacher_rows(sb) if r.get("teacher_id")}
+    return sorted(ids)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apply", action="store_true",
+                        help="Rebuild the rollup (default: dry run).")
+    parser.add_argument("--verify", action="store_true",
+                        help="Compare the rollup against the live computation.")
+    parser.add_argument("--teacher-id", help="Limit --apply to one teacher.")
+    args = parser.parse_args()
+
+    if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_SERVICE_KEY"):
+        print("ERROR: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set.", file=sys.stderr)
+        return 2
+
+    # Route through the canonical accessor (NOT supabase.create_client directly —
+    # enforced by tests/test_no_direct_create_client.py).
+    from backend.supabase_client import get_supabase_or_raise
+    from backend.services.district_rollup import load_district_analytics, rebuild_teacher
+
+    sb = get_supabase_or_raise()
+
+    if args.verify:
+        from backend.routes.district_routes import _build_district_analytics
+
+        live = _build_district_analytics()
+        if live.get("approximate"):
+            print("NOTE: the live computation hit its hard cap (approximate); "
+                  "overview mismatches are expected — the rollup is exact.")
+        mismatches = compare_analytics(load_district_analytics(sb), live)
+        for m in mismatches:
+            print(f"  ✗ {m}")
+        print(f"\nVerify done. {len(mismatches)} mismatch(es).")
+        return 1 if mismatches else 0
+
+    teacher_ids = [args.teacher_id] if args.teacher_id else _teacher_ids(sb)
+    print(f"{len(teacher_ids)} teacher(s) in scope.")
+
+    if not args.apply:
+        print("DRY RUN — no changes written. Re-run with --apply to backfill.")
+        return 0
+
+    failures = 0
+    for tid in teacher_ids:
+        try:
+            row = rebuild_teacher(sb, tid)
+            if row:
+                print(f"  ✓ teacher {tid}: {row.get('scored_count', 0)} scored submission(s)")
+            else:
+                print(f"  ✓ teacher {tid}: owns no data, row removed")
+        except Exception as e:  # noqa: BLE001 — operator script, report-and-continue
+            failures += 1
+            print(f"  ✗ FAILED teacher {tid}: {e}", file=sys.stderr)
+
+    print(f"\nDone. {len(teacher_ids) - failures} teacher(s) rebuilt, {failures} failed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
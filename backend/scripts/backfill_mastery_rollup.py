@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Backfill + verify the student_standards_mastery rollup.
+
+Why
+---
+Migration 0004 creates `student_standards_mastery` empty. The write hooks in
+backend/services/student_mastery_rollup.py keep it current from then on, but
+every (student, class) graded BEFORE the deploy needs one rebuild. Reads only
+switch to the rollup when FLAG_MASTERY_ROLLUP_READS is on, so the order is:
+
+  1. deploy (migration + write hooks)
+  2. run this script with --apply
+  3. run it again with --verify until it reports 0 mismatches
+  4. set FLAG_MASTERY_ROLLUP_READS=true
+
+--verify recomputes each class's progress-rank mastery the pre-rollup way
+(student_progress_reports._aggregate_class_mastery) for every attempt mode
+and compares it against what the rollup serves.
+
+Usage
+-----
+    # dry run (default) — lists the classes that WOULD be rebuilt
+    SUPABASE_URL=... SUPABASE_SERVICE_KEY=... python backend/scripts/backfill_mastery_rollup.py
+
+    # rebuild every class (or one with --class-id)
+    ... python backend/scripts/backfill_mastery_rollup.py --apply [--class-id <uuid>]
+
+    # compare rollup against the live computation
+    ... python backend/scripts/backfill_mastery_rollup.py --verify [--class-id <uuid>]
+"""
+import argparse
+import os
+import sys
+
+# Allow running without installing the package: add the repo root (this file
+# lives at <repo>/backend/scripts/, so go up three levels) to sys.path.
+sys.path.insert(
+    0,
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+)
+
+
+def verify_class(sb, class_id):
+    """Return a list of (attempt_mode, student_id) pairs whose mastery differs."""
+    from backend.services.student_mastery_rollup import (
+        ATTEMPT_MODES,
+        fetch_class_content,
+        load_class_mastery,
+    )
+    from backend.services.student_progress_reports import _aggregate_class_mastery
+
+    content_ids, content_titles = fetch_class_content(sb, class_id)
+    if not content_ids:
+        return []
+    mismatches = []
+    for mode in ATTEMPT_MODES:
+        rolled, rolled_standards = load_class_mastery(sb, class_id, mode, content_titles)
+        student_ids = sorted(set(rolled) | _submitting_student_ids(sb, content_ids))
+        live, live_standards = _aggregate_class_mastery(
+            sb, student_ids, content_ids, content_titles, mode,
+        )
+        if rolled_standards != live_standards:
+            mismatches.append((mode, '<standards>'))
+        for sid in student_ids:
+            if rolled.get(sid, {}) != live.get(sid, {}):
+                mismatches.append((mode, sid))
+    return mismatches
+
+
+def _submitting_student_ids(sb, content_ids):
+    from backend.services.student_mastery_rollup import fetch_paged
+    rows = fetch_paged(lambda: sb.table('student_submissions').select('student_id').in_(
+        'content_id', content_ids
+    ).neq('status', 'draft'))
+    return {r['student_id'] for r in rows if r.get('student_id')}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apply", action="store_true",
+                        help="Rebuild the rollup (default: dry run).")
+    parser.add_argument("--verify", action="store_true",
+                        help="Compare the rollup against the live computation.")
+    parser.add_argument("--class-id", help="Limit to one class.")
+    args = parser.parse_args()
+
+    if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_SERVICE_KEY"):
+        print("ERROR: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set.", file=sys.stderr)
+        return 2
+
+    # Route through the canonical accessor (NOT supabase.create_client directly —
+    # enforced by tests/test_no_direct_create_client.py).
+    from backend.supabase_client import get_supabase_or_raise
+    from backend.services.student_mastery_rollup import fetch_paged, backfill_class_rollup
+
+    sb = get_supabase_or_raise()
+    if args.class_id:
+        class_ids = [args.class_id]
+    else:
+        class_ids = [r['id'] for r in fetch_paged(lambda: sb.table('classes').select('id').order('id'))]
+    print(f"{len(class_ids)} class(es) in scope.")
+
+    if args.verify:
+        total = 0
+        for cid in class_ids:
+            mismatches = verify_class(sb, cid)
+            total += len(mismatches)
+            for mode, sid in mismatches:
+                print(f"  ✗ class {cid} mode={mode} student={sid}")
+        print(f"\nVerify done. {total} mismatch(es).")
+        return 1 if total else 0
+
+    if not args.apply:
+        print("DRY RUN — no changes written. Re-run with --apply to backfill.")
+        return 0
+
+    failures = 0
+    for cid in class_ids:
+        try:
+            written = backfill_class_rollup(sb, cid)
+            print(f"  ✓ class {cid}: {written} row(s)")
+        except Exception as e:  # noqa: BLE001 — operator script, report-and-continue
+            failures += 1
+            print(f"  ✗ FAILED class {cid}: {e}", file=sys.stderr)
+
+    print(f"\nDone. {len(class_ids) - failures} class(es) rebuilt, {failures} failed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
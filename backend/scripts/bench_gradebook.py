@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Benchmark the class gradebook: multi-query Python path vs class_gradebook_grid RPC.
+
+Why
+---
+`build_class_gradebook` historically made 4+ PostgREST round trips per
+request plus 15 paginated submission pages for a district-sized class
+(180 students × 40 assessments × ~2 attempts ≈ 14k rows). Migration 0005
+adds the `class_gradebook_grid` RPC that returns the whole grid in one
+call with attempt selection in SQL. This script measures both.
+
+Modes
+-----
+Synthetic (default) — no database. Seeds the in-memory fake Supabase with a
+180-student × 40-assessment class, then for each attempt mode reports:
+  * Python path: round trips + wall time with --latency-ms injected per
+    round trip (to model the Railway → Supabase hop).
+  * RPC path: the Python-side assembly cost (build_gradebook_from_grid on
+    the equivalent grid) + ONE injected round trip. SQL execution time is
+    not modelled — use --live for that.
+It also asserts both paths produce identical payloads.
+
+Live — times both paths against a real project:
+    SUPABASE_URL=... SUPABASE_SERVICE_KEY=... \\
+        python backend/scripts/bench_gradebook.py --live --class-id <uuid>
+
+Usage
+-----
+    python backend/scripts/bench_gradebook.py [--students 180] [--assessments 40]
+        [--attempts 3] [--latency-ms 25] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+# Allow running without installing the package: add the repo root (this file
+# lives at <repo>/backend/scripts/, so go up three levels) to sys.path.
+sys.path.insert(
+    0,
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+)
+
+ATTEMPT_MODES = ('latest', 'best', 'average')
+
+
+class MeteredDB:
+    """Wrap a PostgREST-shaped client: count .execute() calls, add latency."""
+
+    def __init__(self, db, latency_s=0.0):
+        self._db = db
+        self._latency_s = latency_s
+        self.round_trips = 0
+
+    def table(self, name):
+        return _MeteredQuery(self, self._db.table(name))
+
+    def rpc(self, fn, params=None):
+        return _MeteredQuery(self, self._db.rpc(fn, params))
+
+    def _hit(self):
+        self.round_trips += 1
+        if self._latency_s:
+            time.sleep(self._latency_s)
+
+
+class _MeteredQuery:
+    def __init__(self, meter, query):
+        self._meter = meter
+        self._query = query
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == 'execute':
+            def execute():
+                self._meter._hit()
+                return attr()
+            return execute
+        return lambda *a, **kw: _MeteredQuery(self._meter, attr(*a, **kw))
+
+
+def seed_class(db, n_students, n_assessments, max_attempts, seed=7):
+    """Populate a fake db with one class. Returns the class id."""
+    rng = random.Random(seed)
+    class_id = str(uuid.uuid4())
+    students = [{'id': str(uuid.uuid4()), 'first_name': f'First{i:03d}', 'last_name': f'Last{i:03d}'}
+                for i in range(n_students)]
+    content = [{'id': str(uuid.uuid4()), 'class_id': class_id, 'title': f'Assessment {j}',
+                'content_type': 'assessment' if j % 2 else 'assignment',
+                'created_at': f'2026-0{1 + j // 28}-{1 + j % 28:02d}T08:00:00+00:00',
+                'due_date': None, 'is_active': True, 'target_student_ids': None,
+                'content': {'sections': []}}
+               for j in range(n_assessments)]
+    submissions = []
+    for s in students:
+        for c in content:
+            for attempt in range(1, rng.randint(0, max_attempts) + 1):
+                submissions.append({
+                    'id': str(uuid.uuid4()), 'student_id': s['id'], 'content_id': c['id'],
+                    'attempt_number': attempt,
+                    'submitted_at': f'2026-05-{attempt:02d}T{rng.randint(8, 20):02d}:00:00+00:00',
+                    'percentage': rng.choice([None, rng.randint(0, 100), round(rng.uniform(0, 100), 1)]),
+                    'status': rng.choice(['graded'] * 9 + ['draft']),
+                })
+    db.table('class_students').insert([{'class_id': class_id, 'student_id': s['id']} for s in students]).execute()
+    db.table('students').insert(students).execute()
+    db.table('published_content').insert(content).execute()
+    db.table('student_submissions').insert(submissions).execute()
+    return class_id
+
+
+def grid_from_payload(payload, db, class_id):
+    """Build the RPC document equivalent to a Python-path payload.
+
+    Stands in for the SQL function in synthetic mode so the RPC-side
+    assembly can be timed and compared without Postgres.
+    """
+    students = {r['id']: r for r in db.table('students').select('*').execute().data}
+    content = {r['id']: r for r in db.table('published_content').select('*').eq('class_id', class_id).execute().data}
+    subs = db.table('student_submissions').select('*').neq('status', 'draft').execute().data
+    sums = {}
+    for s in subs:
+        k = (s['student_id'], s['content_id'])
+        sums[k] = sums.get(k, 0) + (s.get('percentage') or 0)
+    return {
+        'roster': [{k: students[s['student_id']][k] for k in ('id', 'first_name', 'last_name')}
+                   for s in payload['students']],
+        'content': [{**{k: content[a['content_id']].get(k) for k in (
+            'id', 'title', 'content_type', 'created_at', 'due_date', 'is_active', 'target_student_ids')},
+            'remediation_content': None} for a in payload['assessments']],
+        'grades': [{'student_id': sid, 'content_id': cid, **cell,
+                    'percentage_sum': sums.get((sid, cid), 0)}
+                   for sid, row in payload['grades'].items() for cid, cell in row.items()],
+    }
+
+
+def _time(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return result, statistics.median(samples)
+
+
+def run_synthetic(args):
+    from backend.services.student_gradebook import _build_class_gradebook_python, build_gradebook_from_grid
+    from backend.testing.fake_supabase import FakeSupabaseClient
+
+    db = FakeSupabaseClient()
+    class_id = seed_class(db, args.students, args.assessments, args.attempts)
+    latency = args.latency_ms / 1000.0
+    print(f"Synthetic class: {args.students} students × {args.assessments} assessments, "
+          f"≤{args.attempts} attempts, {args.latency_ms} ms/round trip")
+    mismatches = 0
+    for mode in ATTEMPT_MODES:
+        metered = MeteredDB(db, latency)
+        payload, py_ms = _time(lambda: _build_class_gradebook_python(metered, class_id, 'P1', mode), args.repeat)
+        trips = metered.round_trips // args.repeat
+        grid = grid_from_payload(payload, db, class_id)
+        rpc_payload, asm_ms = _time(
+            lambda: build_gradebook_from_grid({k: [dict(r) for r in v] for k, v in grid.items()},
+                                              class_id, 'P1', mode),
+            args.repeat,
+        )
+        if rpc_payload != payload:
+            mismatches += 1
+        print(f"  {mode:<8} python: {trips:>3} round trips, {py_ms:8.1f} ms | "
+              f"rpc: 1 round trip, {asm_ms + args.latency_ms:8.1f} ms (+ SQL time)"
+              f"{'' if rpc_payload == payload else '  ✗ PAYLOAD MISMATCH'}")
+    return 1 if mismatches else 0
+
+
+def run_live(args):
+    if not args.class_id:
+        print("ERROR: --live requires --class-id.", file=sys.stderr)
+        return 2
+    if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_SERVICE_KEY"):
+        print("ERROR: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set.", file=sys.stderr)
+        return 2
+    from backend.supabase_client import get_supabase_or_raise
+    from backend.services.student_gradebook import (
+        _build_class_gradebook_python,
+        build_gradebook_from_grid,
+        fetch_gradebook_grid,
+    )
+
+    sb = get_supabase_or_raise()
+    mismatches = 0
+    for mode in ATTEMPT_MODES:
+        metered = MeteredDB(sb)
+        payload, py_ms = _time(lambda: _build_class_gradebook_python(metered, args.class_id, 'P1', mode), args.repeat)
+        trips = metered.round_trips // args.repeat
+        rpc_payload, rpc_ms = _time(
+            lambda: build_gradebook_from_grid(fetch_gradebook_grid(sb, args.class_id, mode) or {},
+                                              args.class_id, 'P1', mode),
+            args.repeat,
+        )
+        if rpc_payload != payload:
+            mismatches += 1
+        print(f"  {mode:<8} python: {trips:>3} round trips, {py_ms:8.1f} ms | rpc: {rpc_ms:8.1f} ms"
+              f"{'' if rpc_payload == payload else '  ✗ PAYLOAD MISMATCH'}")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=180)
+    parser.add_argument("--assessments", type=int, default=40)
+    parser.add_argument("--attempts", type=int, default=3, help="Max attempts per (student, assessment).")
+    parser.add_argument("--latency-ms", type=float, default=25.0, help="Injected per round trip (synthetic).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="Benchmark against SUPABASE_URL.")
+    parser.add_argument("--class-id", help="Class to benchmark in --live mode.")
+    args = parser.parse_args()
+    return run_live(args) if args.live else run_synthetic(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
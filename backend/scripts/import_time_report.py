@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Startup import-time report for the web app and the Celery worker.
+
+Why
+---
+Every gunicorn worker (and every recycled one, --max-requests) imports
+backend.app before it can answer /healthz, and every Celery worker imports
+its app and task modules before it consumes. Heavy third-party packages
+(provider SDKs, python-docx, matplotlib, sympy, playwright, numpy)
+and the grading pipeline are imported on first use instead; this report
+shows what startup actually pays for and flags any of them that crept back
+into the startup import graph.
+
+How
+---
+Runs ``python -X importtime -c "import <modules>"`` in a fresh interpreter
+(so nothing is cached), parses the per-module self / cumulative
+microseconds from stderr, and prints:
+  * total startup import time,
+  * the slowest top-level packages (summed self time),
+  * the slowest modules by cumulative time,
+  * deferred heavy modules that were loaded anyway, with the import chain
+    that pulled each in (--why shows the chain for any module).
+
+tests/test_startup_imports.py enforces the same targets: no deferred heavy
+module at startup and total import time within the target's budget
+(BUDGETS_S; override with STARTUP_IMPORT_BUDGET_WEB_S /
+STARTUP_IMPORT_BUDGET_WORKER_S on slow runners). The exit status is 1 when
+either is violated.
+
+Usage
+-----
+    python backend/scripts/import_time_report.py [web|worker|all] [--top 25]
+        [--why google.genai]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Startup targets: what each process imports before it serves work.
+TARGETS = {
+    # gunicorn imports app:app (backend/app.py builds the app and registers
+    # every blueprint at import).
+    'web': ('backend.app',),
+    # celery -A backend.celery_app worker: the app, its included task
+    # modules, and what worker_process_init imports in each pool child.
+    'worker': (
+        'backend.celery_app',
+        'backend.tasks.grading_tasks',
+        'backend.tasks.job_tasks',
+        'backend.observability.sentry',
+        'backend.supabase_client',
+        'backend.observability.llm_metrics',
+    ),
+}
+
+# Env the targets need to import without real services. Values are only
+# read, never connected to, at import time.
+TARGET_ENV = {
+    'FLASK_ENV': 'development',
+    'CELERY_BROKER_URL': 'redis://localhost:6379/1',
+}
+
+# Startup import budgets (seconds, measured under -X importtime, which adds
+# some overhead). Before deferral the web app imported in ~4.4s, ~2.7s of it
+# the three provider SDKs; after, ~1.7s on an idle dev machine, most of it
+# supabase. Wall-clock time varies a lot by host (over 3s on a loaded 1-CPU
+# box), so the pytest budget check is opt-in (STARTUP_IMPORT_BUDGET_CHECK=1)
+# and this script is the place to enforce it.
+BUDGETS_S = {'web': 3.0, 'worker': 2.5}
+
+# Imported on first use, never at startup.
+DEFERRED_MODULES = (
+    'anthropic',
+    'openai',
+    'google.genai',
+    'docx',
+    'matplotlib',
+    'sympy',
+    'playwright',
+    'numpy',
+    'assignment_grader',
+    'backend.services.grading_pipeline',
+)
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    parent: str = ''
+
+
+@dataclass
+class ImportProfile:
+    target: str
+    records: list = field(default_factory=list)
+
+    @property
+    def loaded(self):
+        return {r.name for r in self.records}
+
+    @property
+    def total_us(self):
+        # Top-level (depth 0) entries partition the whole run.
+        return sum(r.cumulative_us for r in self.records if r.depth == 0)
+
+    def chain(self, module):
+        """Import chain root -> ``module`` (empty if it was not imported)."""
+        by_name = {r.name: r for r in self.records}
+        if module not in by_name:
+            return []
+        path = [module]
+        while by_name[path[-1]].parent:
+            path.append(by_name[path[-1]].parent)
+        return path[::-1]
+
+    def deferred_loaded(self):
+        return [m for m in DEFERRED_MODULES if m in self.loaded]
+
+    def by_package(self):
+        totals = {}
+        for r in self.records:
+            root = r.name.split('.')[0]
+            totals[root] = totals.get(root, 0) + r.self_us
+        return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output into records with their importing parent.
+
+    Lines are emitted when a module finishes importing, children before
+    their parent, with the name indented two spaces per nesting level.
+    """
+    records = []
+    pending = {}  # depth -> records finished at that depth awaiting a parent
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_part, cumulative_part, raw = line.split('|', 2)
+        depth = (len(raw) - len(raw.lstrip(' ')) - 1) // 2
+        record = ImportRecord(raw.strip(), int(self_part.split(':', 1)[1]),
+                              int(cumulative_part), depth)
+        for child in pending.pop(depth + 1, []):
+            child.parent = record.name
+        pending.setdefault(depth, []).append(record)
+        records.append(record)
+    return records
+
+
+def budget_s(target):
+    return float(os.getenv(f'STARTUP_IMPORT_BUDGET_{target.upper()}_S') or BUDGETS_S[target])
+
+
+def measure(target, python=sys.executable):
+    """Import ``target``'s modules in a fresh interpreter and profile it."""
+    modules = TARGETS[target]
+    env = {**os.environ, **TARGET_ENV, 'PYTHONPATH': REPO_ROOT}
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', 'import ' + ', '.join(modules)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=300,
+    )
+    if proc.returncode != 0:
+        tail = '\n'.join(proc.stderr.splitlines()[-15:])
+        raise RuntimeError(f'importing {target} modules failed:\n{tail}')
+    return ImportProfile(target, parse_importtime(proc.stderr))
+
+
+def _ms(us):
+    return f'{us / 1000:8.1f} ms'
+
+
+def report(profile, top=25, why=()):
+    print(f'== {profile.target}: {", ".join(TARGETS[profile.target])}')
+    print(f'   total import time {_ms(profile.total_us)}  ({len(profile.records)} modules, '
+          f'budget {budget_s(profile.target):.1f} s)')
+    print('\n   slowest packages (self time):')
+    for name, us in profile.by_package()[:top]:
+        print(f'   {_ms(us)}  {name}')
+    print('\n   slowest modules (cumulative):')
+    for r in sorted(profile.records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f'   {_ms(r.cumulative_us)}  {r.name}')
+    offenders = profile.deferred_loaded()
+    print('\n   deferred modules loaded at startup: ' + (', '.join(offenders) or 'none'))
+    for module in list(offenders) + [m for m in why if m not in offenders]:
+        path = profile.chain(module)
+        print(f'   {module}: ' + (' -> '.join(path) if path else 'not imported'))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('target', nargs='?', default='all', choices=[*TARGETS, 'all'])
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--why', action='append', default=[],
+                        help='print the import chain for this module (repeatable)')
+    args = parser.parse_args()
+    failed = False
+    for target in (TARGETS if args.target == 'all' else (args.target,)):
+        profile = measure(target)
+        report(profile, top=args.top, why=args.why)
+        over_budget = profile.total_us / 1e6 > budget_s(target)
+        failed = failed or over_budget or bool(profile.deferred_loaded())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
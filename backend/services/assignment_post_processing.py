@@ -28,7 +28,7 @@ _planner_cost_lock = threading.Lock()
 
 # Import MODEL_PRICING for token cost tracking
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-from assignment_grader import MODEL_PRICING
+from backend.services.grading_models import MODEL_PRICING
 from backend.retry import with_retry
 
 
@@ -0,0 +1,290 @@
+"""Per-session persistence for assistant conversations.
+
+The assistant used to keep every session in ONE JSON file
+(`~/.graider_data/assistant_conversations.json`): each turn re-read the whole
+file, mutated one session, pruned and rewrote it with `indent=2`, and each
+restore re-parsed it. That is O(total sessions) I/O per message, and two
+workers writing at once lost each other's sessions.
+
+`ConversationStore` keeps one record per session instead:
+
+- one compact JSON file per session under `<root>/<xx>/<sha256>.json`
+  (the session id is client-supplied, so it is hashed, never used as a path);
+- atomic writes (temp file in the same directory + `os.replace`), so a
+  reader never sees a half-written record and concurrent writers of
+  DIFFERENT sessions never touch each other's bytes;
+- the file mtime is set to the record's `last_active`, which makes expiry
+  indexable without parsing JSON;
+- an in-memory LRU front (validated against the file's mtime_ns, so a
+  newer write from another worker is never masked);
+- `sweep()` pops only expired entries off an `ExpiryIndex` heap instead of
+  scanning every session.
+
+The legacy single file is imported once, on first use, then renamed to
+`*.migrated` so it is never read again.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import heapq
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 86400   # matches the old 24h prune of the shared file
+DEFAULT_MAX_CACHED = 512
+
+
+class ExpiryIndex:
+    """Min-heap of (expires_at, key) with lazy deletion.
+
+    `touch(key, last_active)` records the key's newest activity; superseded
+    heap entries are skipped when popped. `pop_expired(now)` is
+    O(k log n) in the number k of entries that are actually due, rather
+    than O(n) over every live key.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._heap: list[tuple[float, str]] = []
+        self._last_active: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, key: str, last_active: float) -> None:
+        with self._lock:
+            self._last_active[key] = last_active
+            heapq.heappush(self._heap, (last_active + self.ttl_seconds, key))
+            # Lazy deletion lets superseded entries pile up for hot keys;
+            # rebuild once they dominate so the heap stays O(live keys).
+            if len(self._heap) > 2 * len(self._last_active) + 64:
+                self._heap = [(ts + self.ttl_seconds, k) for k, ts in self._last_active.items()]
+                heapq.heapify(self._heap)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._last_active.pop(key, None)
+
+    def pop_expired(self, now: float | None = None) -> list[str]:
+        now = time.time() if now is None else now
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, key = heapq.heappop(self._heap)
+                last_active = self._last_active.get(key)
+                if last_active is None or last_active + self.ttl_seconds != expires_at:
+                    continue  # discarded, or superseded by a later touch
+                del self._last_active[key]
+                expired.append(key)
+        return expired
+
+    def __len__(self) -> int:
+        return len(self._last_active)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._last_active
+
+
+def _atomic_write_json(path: str, payload: dict, mtime: float | None = None) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+class ConversationStore:
+    """One atomically-written JSON record per assistant session.
+
+    Records are `{"session_id", "messages", "last_active"}`; callers decide
+    what goes in `messages` (the route persists text-only, last 40).
+    All methods raise OSError / ValueError on disk or decode failures so the
+    route keeps its own log-and-continue policy.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_cached: int = DEFAULT_MAX_CACHED,
+        legacy_file: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.root_dir = root_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_cached = max_cached
+        self.legacy_file = legacy_file
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Both keyed by record path (sha256 of the session id), so records
+        # written before this process started are indexable without parsing.
+        # path -> (mtime_ns, record)
+        self._cache: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+        self._index = ExpiryIndex(ttl_seconds)
+        self._indexed = False
+
+    # ── paths ────────────────────────────────────────────────────────
+
+    def _path_for(self, session_id: str) -> str:
+        digest = hashlib.sha256(session_id.encode('utf-8')).hexdigest()
+        return os.path.join(self.root_dir, digest[:2], digest + '.json')
+
+    # ── public API ───────────────────────────────────────────────────
+
+    def get(self, session_id: str) -> dict | None:
+        """Return `{"messages": [...], "last_active": ts}` or None."""
+        self._ensure_index()
+        path = self._path_for(session_id)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._cache.pop(path, None)
+            return None
+        if st.st_mtime + self.ttl_seconds <= self._clock():
+            return None
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == st.st_mtime_ns:
+                self._cache.move_to_end(path)
+                return _public(cached[1])
+        with open(path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if record.get('session_id') != session_id:
+            return None  # not this session's record: treat as absent
+        self._remember(path, st.st_mtime_ns, record)
+        return _public(record)
+
+    def put(self, session_id: str, messages: list, last_active: float) -> None:
+        self._ensure_index()
+        record = {'session_id': session_id, 'messages': messages, 'last_active': last_active}
+        path = self._path_for(session_id)
+        _atomic_write_json(path, record, mtime=last_active)
+        self._remember(path, os.stat(path).st_mtime_ns, record)
+        self._index.touch(path, last_active)
+
+    def delete(self, session_id: str) -> None:
+        self._ensure_index()
+        path = self._path_for(session_id)
+        with self._lock:
+            self._cache.pop(path, None)
+        self._index.discard(path)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+    def sweep(self) -> int:
+        """Delete records idle past the TTL. Returns how many were removed.
+
+        Another worker may have refreshed a record since this process indexed
+        it, so the file's mtime is re-checked before unlinking.
+        """
+        self._ensure_index()
+        now = self._clock()
+        removed = 0
+        for path in self._index.pop_expired(now):
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime + self.ttl_seconds > now:
+                self._index.touch(path, mtime)
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self._cache.pop(path, None)
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        self._ensure_index()
+        return len(self._index)
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _remember(self, path: str, mtime_ns: int, record: dict) -> None:
+        with self._lock:
+            self._cache[path] = (mtime_ns, record)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def _ensure_index(self) -> None:
+        """Build the expiry index once per process from file mtimes.
+
+        Only `os.scandir` + stat — no JSON is parsed.
+        """
+        if self._indexed:
+            return
+        with self._lock:
+            if self._indexed:
+                return
+            self._indexed = True
+        self._migrate_legacy_file()
+        for path, mtime in _iter_records(self.root_dir):
+            self._index.touch(path, mtime)
+
+    def _migrate_legacy_file(self) -> None:
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            cutoff = self._clock() - self.ttl_seconds
+            imported = 0
+            for session_id, conv in (legacy or {}).items():
+                last_active = conv.get('last_active', 0) if isinstance(conv, dict) else 0
+                if last_active <= cutoff or os.path.exists(self._path_for(session_id)):
+                    continue
+                _atomic_write_json(
+                    self._path_for(session_id),
+                    {'session_id': session_id, 'messages': conv.get('messages', []),
+                     'last_active': last_active},
+                    mtime=last_active,
+                )
+                imported += 1
+            os.replace(self.legacy_file, self.legacy_file + '.migrated')
+            logger.info("Migrated %d assistant conversations from %s", imported, self.legacy_file)
+        except Exception as e:  # noqa: BLE001  # broad catch: legacy import is best-effort; error is logged
+            logger.warning("Failed to migrate legacy conversations file %s: %s", self.legacy_file, e)
+
+
+def _iter_records(root_dir: str) -> Iterable[tuple[str, float]]:
+    try:
+        buckets = list(os.scandir(root_dir))
+    except FileNotFoundError:
+        return
+    for bucket in buckets:
+        if not bucket.is_dir():
+            continue
+        for entry in os.scandir(bucket.path):
+            if entry.name.endswith('.json') and not entry.name.startswith('.tmp-'):
+                try:
+                    yield entry.path, entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+
+
+def _public(record: dict) -> dict:
+    # Fresh list so the caller can append turns without mutating the cache.
+    return {'messages': list(record.get('messages', [])), 'last_active': record.get('last_active', 0)}
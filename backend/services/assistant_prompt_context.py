@@ -0,0 +1,239 @@
+"""Section-cached builder for the assistant system prompt.
+
+`_build_system_prompt` used to re-read the settings file, scan the periods,
+documents and templates directories, extract every uploaded document's text
+and re-parse the whole master_grades.csv on EVERY chat turn, although these
+inputs change on a teacher-settings cadence, not a per-message one.
+
+The prompt is now assembled from named sections. Each section's builder
+returns `(value, dependencies)`; the value is reused until a dependency's
+`(mtime_ns, size)` changes (or it appears / disappears). A dependency is a
+file path, re-validated with `os.stat` only — no open, listdir or parse — or
+a `StorageRecord` for inputs read through backend.storage, re-validated with
+`storage.record_version` (the teacher_data row's `updated_at`, so a save made
+on another pod invalidates the section too). A directory dependency covers
+files being added, removed or renamed; builders that read files inside a
+directory list those files too, which covers in-place edits.
+
+The assembled prompt is memoized per teacher and reused while every section
+is still at the generation it was assembled from. `stats()` exposes per-section
+hit/rebuild counts and the last build time, and the builder emits an
+`assistant.prompt.built` event with per-section timings whenever anything
+was rebuilt.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PROMPTS = 256
+# Coarse-mtime filesystems (ext3, HFS+, some overlays) round to 1-2s; a file
+# touched this close to a build is not trusted as "unchanged since read".
+_MTIME_SLACK_NS = 2_000_000_000
+
+
+def path_fingerprint(path: str) -> tuple[int, int] | None:
+    """`(mtime_ns, size)` for `path`, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+@dataclass(frozen=True)
+class StorageRecord:
+    """Dependency on the record `backend.storage.load(data_key, teacher_id)` reads."""
+    data_key: str
+    teacher_id: str = 'local-dev'
+
+
+def dependency_fingerprint(dep: str | StorageRecord) -> tuple[int, int] | None:
+    """Fingerprint of a path or StorageRecord dependency (None when absent)."""
+    if isinstance(dep, StorageRecord):
+        from backend import storage
+        version: tuple[int, int] | None = storage.record_version(dep.data_key, dep.teacher_id)
+        return version
+    return path_fingerprint(dep)
+
+
+def _fingerprints(deps: tuple[str | StorageRecord, ...]) -> tuple | None:
+    """Fingerprints for `deps`, or None when one could not be read."""
+    try:
+        return tuple(dependency_fingerprint(d) for d in deps)
+    except Exception as e:  # noqa: BLE001  # broad catch: treated as changed, section rebuilds; error is logged
+        logger.warning("Assistant prompt dependency check failed: %s", e)
+        return None
+
+
+def directory_deps(path: str, predicate: Callable[[str], bool] | None = None) -> list[str]:
+    """Dependency list for a builder that reads files in `path`.
+
+    The directory itself (entries added/removed) plus every regular file
+    whose name passes `predicate` (in-place edits). Called on rebuild only.
+    """
+    deps = [path]
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        return deps
+    for name in names:
+        full = os.path.join(path, name)
+        if (predicate is None or predicate(name)) and os.path.isfile(full):
+            deps.append(full)
+    return deps
+
+
+@dataclass
+class PromptSection:
+    """One independently cached piece of the prompt.
+
+    `build()` returns `(value, dependencies)`: file paths and/or
+    `StorageRecord`s.
+    """
+    name: str
+    build: Callable[[], tuple[Any, Iterable[str | StorageRecord]]]
+
+
+@dataclass
+class _SectionEntry:
+    value: Any
+    deps: tuple[str | StorageRecord, ...]
+    fingerprints: tuple
+    generation: int
+
+
+@dataclass
+class _SectionStats:
+    hits: int = 0
+    builds: int = 0
+    last_build_ms: float = 0.0
+    total_build_ms: float = 0.0
+    errors: int = 0
+
+
+class TeacherContextBuilder:
+    """Memoize prompt sections by file dependency and the assembled prompt per teacher."""
+
+    def __init__(
+        self,
+        sections: Iterable[PromptSection],
+        assemble: Callable[[dict[str, Any]], str],
+        *,
+        max_prompts: int = DEFAULT_MAX_PROMPTS,
+    ):
+        self._sections = list(sections)
+        self._assemble = assemble
+        self._max_prompts = max_prompts
+        self._lock = threading.Lock()
+        self._entries: dict[str, _SectionEntry] = {}
+        self._stats = {s.name: _SectionStats() for s in self._sections}
+        self._generation = 0
+        # teacher_id -> (section generations, prompt)
+        self._prompts: OrderedDict[str, tuple[tuple[int, ...], str]] = OrderedDict()
+
+    def build(self, teacher_id: str = 'local-dev') -> str:
+        values = {}
+        generations = []
+        rebuilt = {}
+        for section in self._sections:
+            entry, build_ms = self._section(section)
+            values[section.name] = entry.value
+            generations.append(entry.generation)
+            if build_ms is not None:
+                rebuilt[section.name] = round(build_ms, 2)
+        key = tuple(generations)
+        cacheable = -1 not in key  # an uncached section must not pin an old prompt
+        with self._lock:
+            memo = self._prompts.get(teacher_id)
+            if cacheable and memo and memo[0] == key:
+                self._prompts.move_to_end(teacher_id)
+                return memo[1]
+        prompt = self._assemble(values)
+        if cacheable:
+            with self._lock:
+                self._prompts[teacher_id] = (key, prompt)
+                self._prompts.move_to_end(teacher_id)
+                while len(self._prompts) > self._max_prompts:
+                    self._prompts.popitem(last=False)
+        if rebuilt:
+            _emit_built(rebuilt, len(prompt))
+        return prompt
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Drop one section (or all) so the next build re-reads it."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._prompts.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    'hits': s.hits,
+                    'builds': s.builds,
+                    'errors': s.errors,
+                    'last_build_ms': round(s.last_build_ms, 3),
+                    'total_build_ms': round(s.total_build_ms, 3),
+                }
+                for name, s in self._stats.items()
+            }
+
+    def _section(self, section: PromptSection) -> tuple[_SectionEntry, float | None]:
+        with self._lock:
+            entry = self._entries.get(section.name)
+        if entry is not None and _fingerprints(entry.deps) == entry.fingerprints:
+            with self._lock:
+                self._stats[section.name].hits += 1
+            return entry, None
+
+        started_wall_ns = time.time_ns()
+        started = time.perf_counter()
+        try:
+            value, deps = section.build()
+        except Exception as e:  # noqa: BLE001  # broad catch: a failing section is omitted from the prompt; error is logged
+            logger.warning("Assistant prompt section %s failed to build: %s", section.name, e)
+            with self._lock:
+                self._stats[section.name].errors += 1
+            # Not cached: the next turn retries.
+            return _SectionEntry(None, (), (), -1), None
+        build_ms = (time.perf_counter() - started) * 1000
+        deps = tuple(deps)
+        fingerprints = _fingerprints(deps)
+        if fingerprints is None:
+            return _SectionEntry(value, (), (), -1), build_ms
+        if any(fp and fp[0] >= started_wall_ns - _MTIME_SLACK_NS for fp in fingerprints):
+            # A dependency was written while we were reading it: use the
+            # value for this turn but do not cache it under the new
+            # fingerprint, or the stale value would stick.
+            return _SectionEntry(value, (), (), -1), build_ms
+        with self._lock:
+            self._generation += 1
+            entry = _SectionEntry(value, deps, fingerprints, self._generation)
+            self._entries[section.name] = entry
+            st = self._stats[section.name]
+            st.builds += 1
+            st.last_build_ms = build_ms
+            st.total_build_ms += build_ms
+        return entry, build_ms
+
+
+def _emit_built(section_ms: dict[str, float], prompt_chars: int) -> None:
+    try:
+        from backend.observability.events import emit
+        emit('assistant.prompt.built', level='debug', rebuilt_sections=section_ms,
+             prompt_chars=prompt_chars)
+    except Exception as e:  # noqa: BLE001  # broad catch: telemetry is best-effort; error is logged
+        logger.debug("Failed to emit assistant.prompt.built event: %s", e)
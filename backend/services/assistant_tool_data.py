@@ -0,0 +1,173 @@
+"""Turn-scoped memoized data access for assistant tool handlers.
+
+Tool handlers in `assistant_tools_*.py` each call `_load_results`,
+`_load_master_csv`, `_load_roster` and `_load_settings` themselves, and
+every call goes back to storage and re-parses. One multi-tool assistant
+turn could load the whole results blob five or more times (it is also
+re-loaded inside `_load_master_csv`).
+
+`ToolDataContext` is created once per assistant turn by the route and
+activated around each tool execution (`bind`). While active, the loaders
+decorated with `memoized_loader` in `assistant_tools.py` load each
+`(loader, arguments)` combination at most once and hand every caller its
+own copy, so a handler that sorts or appends to its rows cannot affect
+the next handler. The context also offers lazy, read-only grouped views
+of the full master rows (`by_student`, `by_assignment`, `by_period`),
+built on first use, for handlers that accept a `data_context` argument
+(`execute_tool` passes it to any handler whose signature names it).
+
+The route drops every cached dataset after a side-effecting (non
+read-only) tool runs, so a write earlier in the turn is visible to the
+reads after it. `stats()` reports loads performed vs. loads avoided.
+
+Outside an active context (tests, Celery, CLI) the loaders behave exactly
+as before.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar["ToolDataContext | None"] = contextvars.ContextVar(
+    'assistant_tool_data_context', default=None,
+)
+
+
+def current_data_context() -> "ToolDataContext | None":
+    return _current.get()
+
+
+def _clone(value: Any) -> Any:
+    """Copy the dict/list structure of a loaded dataset (leaves are immutable)."""
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+
+class ToolDataContext:
+    """Datasets loaded at most once per assistant turn."""
+
+    def __init__(self, teacher_id: str = 'local-dev'):
+        self.teacher_id = teacher_id
+        self._lock = threading.Lock()
+        self._values: dict[tuple, Any] = {}
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self._views: dict[str, dict] = {}
+        self.loads = 0
+        self.avoided = 0
+
+    # ── activation ───────────────────────────────────────────────────
+
+    def bind(self, fn: Callable) -> Callable:
+        """Wrap ``fn`` so the context is active for the duration of each call."""
+        @functools.wraps(fn)
+        def bound(*args, **kwargs):
+            token = _current.set(self)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current.reset(token)
+        return bound
+
+    # ── memoized loads ───────────────────────────────────────────────
+
+    def load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """Return a private copy of ``loader()``, calling it once per key."""
+        return _clone(self._shared(key, loader))
+
+    def _shared(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._values:
+                self.avoided += 1
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Per-key lock: concurrent read-only tools asking for the same
+        # dataset wait for one load instead of each parsing it. Different
+        # keys (e.g. master CSV loading results) proceed independently.
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    self.avoided += 1
+                    return self._values[key]
+            value = loader()
+            with self._lock:
+                self._values[key] = value
+                self.loads += 1
+            return value
+
+    def invalidate(self) -> None:
+        """Forget every dataset (after a tool that may have written data)."""
+        with self._lock:
+            self._values.clear()
+            self._views.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {'loads': self.loads, 'avoided': self.avoided}
+
+    # ── lazy grouped views over the full master rows ─────────────────
+
+    def master_rows(self) -> list[dict]:
+        """All master rows for this teacher (shared; treat as read-only)."""
+        from backend.services.assistant_tools import _load_master_csv
+        key = ('_load_master_csv', ('period_filter', 'all'), ('teacher_id', self.teacher_id))
+        # Unwrapped: the shared value, not a copy, backs the views.
+        return self._shared(key, lambda: _load_master_csv.__wrapped__('all', self.teacher_id))
+
+    def by_student(self) -> dict[str, list[dict]]:
+        """student_id -> rows, in master-row order."""
+        return self._view('student_id')
+
+    def by_assignment(self) -> dict[str, list[dict]]:
+        """assignment name -> rows, in master-row order."""
+        return self._view('assignment')
+
+    def by_period(self) -> dict[str, list[dict]]:
+        """period -> rows, in master-row order."""
+        return self._view('period')
+
+    def _view(self, column: str) -> dict[str, list[dict]]:
+        with self._lock:
+            view = self._views.get(column)
+        if view is not None:
+            return view
+        view = {}
+        for row in self.master_rows():
+            view.setdefault(row.get(column, ''), []).append(row)
+        with self._lock:
+            self._views.setdefault(column, view)
+            return self._views[column]
+
+
+def memoized_loader(fn: Callable) -> Callable:
+    """Memoize ``fn`` in the active ToolDataContext, keyed by its bound arguments."""
+    sig = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        ctx = _current.get()
+        if ctx is None:
+            return fn(*args, **kwargs)
+        try:
+            bound = sig.bind(*args, **kwargs)
+        except TypeError:
+            return fn(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            key = (fn.__name__,) + tuple(bound.arguments.items())
+            hash(key)
+        except TypeError:
+            return fn(*args, **kwargs)
+        return ctx.load(key, lambda: fn(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,106 @@
+"""Timed and concurrent execution of assistant tool calls.
+
+`_execute_tool_round` (backend/routes/assistant_routes.py) used to run every
+`tool_use` block of a round one after another, so a round asking for
+student info + analytics + standards paid the sum of their latencies.
+Tools listed in `assistant_tools.READ_ONLY_TOOLS` have no side effects, so
+a run of CONSECUTIVE read-only calls is now prefetched concurrently on a
+bounded pool. The route still walks the blocks in order and emits every SSE
+frame, audit line and guard decision in the original sequence — only the
+`execute_tool` calls overlap. Side-effecting tools (sends, previews,
+confirms, writes) are never prefetched, and a run never spans one, so
+ordering between a lookup and a later send is unchanged.
+
+Each call runs inside a copy of the caller's `contextvars` context, which
+carries Flask's request/app context (Flask >= 2.3 keeps them in
+contextvars), so handlers that read `flask.g` behave as they do inline.
+
+Every call — inline or prefetched — is timed; `timed_execute` returns the
+duration and emits an `assistant.tool.completed` event so slow handlers
+show up in the structured logs.
+
+Gated by FLAG_PARALLEL_TOOL_CALLS (default off): with the flag off the
+route executes inline exactly as before, with timing only.
+
+Flask-free at import: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from backend.feature_flags import flag_enabled
+
+logger = logging.getLogger(__name__)
+
+# Shared across requests so the total number of tool threads per worker is
+# bounded, not per-round.
+MAX_PARALLEL_TOOLS = int(os.getenv("ASSISTANT_MAX_PARALLEL_TOOLS", "4"))
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def parallel_tool_calls_enabled() -> bool:
+    return flag_enabled('parallel_tool_calls', default=False)
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=MAX_PARALLEL_TOOLS, thread_name_prefix='assistant-tool',
+                )
+    return _pool
+
+
+def timed_execute(execute: Callable[[str, dict], Any], tool_name: str, tool_input: dict,
+                  *, parallel: bool = False) -> tuple[Any, float]:
+    """Run ``execute(tool_name, tool_input)``; return ``(result, duration_ms)``."""
+    started = time.perf_counter()
+    result = execute(tool_name, tool_input)
+    duration_ms = (time.perf_counter() - started) * 1000
+    _emit_completed(tool_name, duration_ms, parallel)
+    return result, duration_ms
+
+
+def run_concurrently(execute: Callable[[str, dict], Any],
+                     calls: list[tuple[str, dict]]) -> list[tuple[Any, float]]:
+    """Execute ``calls`` concurrently; results come back in input order.
+
+    ``execute`` is expected to catch handler errors itself (execute_tool
+    does); anything that still escapes is returned as an error result for
+    that call rather than failing the others.
+    """
+    if len(calls) < 2:
+        return [timed_execute(execute, name, tool_input) for name, tool_input in calls]
+    pool = _get_pool()
+    futures = [
+        pool.submit(contextvars.copy_context().run, timed_execute, execute, name, tool_input,
+                    parallel=True)
+        for name, tool_input in calls
+    ]
+    results = []
+    for (name, _), future in zip(calls, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:  # noqa: BLE001  # broad catch: surfaced as that tool's error result; error is logged
+            logger.warning("Parallel tool %s raised: %s", name, e)
+            results.append(({"error": f"Tool execution error: {str(e)}"}, 0.0))
+    return results
+
+
+def _emit_completed(tool_name: str, duration_ms: float, parallel: bool) -> None:
+    try:
+        from backend.observability.events import emit
+        emit('assistant.tool.completed', tool=tool_name,
+             duration_ms=round(duration_ms, 2), parallel=parallel)
+    except Exception as e:  # noqa: BLE001  # broad catch: telemetry is best-effort; error is logged
+        logger.debug("Failed to emit assistant.tool.completed event: %s", e)
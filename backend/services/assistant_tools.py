@@ -29,19 +29,24 @@ from datetime import datetime
 import sentry_sdk
 
 from backend.paths import graider_export_dir
+from backend.services.assistant_tool_data import current_data_context, memoized_loader
+from backend.services.roster_index import fuzzy_name_match
 
 _logger = logging.getLogger(__name__)
 
 # Import storage abstraction
 try:
     from backend.storage import load as storage_load, save as storage_save, list_keys as storage_list_keys
+    from backend.storage import load_prefix as storage_load_prefix
 except ImportError:
     try:
         from storage import load as storage_load, save as storage_save, list_keys as storage_list_keys
+        from storage import load_prefix as storage_load_prefix
     except ImportError:
         storage_load = None
         storage_save = None
         storage_list_keys = None
+        storage_load_prefix = None
 
 
 # Paths
@@ -69,53 +74,9 @@ CALENDAR_FILE = os.path.expanduser("~/.graider_data/teaching_calendar.json")
 # SHARED UTILITY FUNCTIONS
 # ═══════════════════════════════════════════════════════
 
-def _fuzzy_name_match(search, full_name):
-    """Word-based name matching. Returns True if every word in search appears
-    as a word (or word-prefix) in full_name. Order-independent, case-insensitive.
-
-    Also handles middle name mismatch: if search has 3+ words and full_name
-    has fewer, tries matching first + last words only (middle names are often
-    dropped or abbreviated in different systems).
-
-    Examples:
-        _fuzzy_name_match("Dicen Wilkins", "Dicen Macheil Wilkins Reels") → True
-        _fuzzy_name_match("Dicen Wilkins", "Wilkins Reels, Dicen Macheil") → True
-        _fuzzy_name_match("Luke Lundell", "Luke J Lundell") → True
-        _fuzzy_name_match("John Smith", "Jane Smith") → False
-        _fuzzy_name_match("Troy Jaxson Mikell", "Troy Mikell") → True
-    """
-    import re
-    # Strip punctuation (commas, semicolons, periods) and normalize
-    clean = lambda s: re.sub(r'[,;.\'"]+', ' ', s.lower()).split()
-    search_words = clean(search)
-    name_words = clean(full_name)
-    if not search_words:
-        return False
-
-    def _words_match(sw_list, nw_list):
-        return all(
-            any(nw.startswith(sw) or (len(nw) >= 2 and sw.startswith(nw)) for nw in nw_list)
-            for sw in sw_list
-        )
-
-    # Strict: all search words match
-    if _words_match(search_words, name_words):
-        return True
-
-    # Middle name tolerance: if search has 3+ words and more words than
-    # full_name, try first + last only (covers "Troy Jaxson Mikell" → "Troy Mikell")
-    if len(search_words) >= 3 and len(search_words) > len(name_words):
-        key_words = [search_words[0], search_words[-1]]
-        if _words_match(key_words, name_words):
-            return True
-
-    # Reverse: full_name has more words, try matching with first + last of full_name
-    if len(name_words) >= 3 and len(name_words) > len(search_words):
-        key_name = [name_words[0], name_words[-1]]
-        if _words_match(search_words, key_name):
-            return True
-
-    return False
+# Word/prefix name matching lives in roster_index (shared with NameMatcher);
+# the old name stays importable for the assistant_tools_* modules.
+_fuzzy_name_match = fuzzy_name_match
 
 
 def _extract_first_name(name):
@@ -232,7 +193,12 @@ def _normalize_period(p):
 # ═══════════════════════════════════════════════════════
 # DATA LOADING FUNCTIONS
 # ═══════════════════════════════════════════════════════
+# The four loaders most tools share are @memoized_loader: inside an
+# assistant turn (ToolDataContext active) each argument combination is
+# loaded once and every caller gets its own copy. See
+# backend/services/assistant_tool_data.py.
 
+@memoized_loader
 def _load_results(teacher_id='local-dev'):
     """Load grading results from storage."""
     if storage_load:
@@ -250,6 +216,7 @@ def _load_results(teacher_id='local-dev'):
         return []
 
 
+@memoized_loader
 def _load_master_csv(period_filter='all', teacher_id='local-dev'):
     """Load and parse the master grades CSV, then merge in any results from
     the results JSON that aren't already present. This ensures the Assistant
@@ -455,6 +422,7 @@ def _load_accommodations(teacher_id='local-dev'):
     return accommodations
 
 
+@memoized_loader
 def _load_settings(teacher_id='local-dev'):
     """Load teacher settings (subject, state, grade level, AI notes)."""
     if storage_load:
@@ -482,7 +450,7 @@ def _load_standards():
 
     # Use the planner's load_standards which handles mapping + fallback
     try:
-        from backend.routes.planner_routes import load_standards as _planner_load
+        from backend.services.planner_standards import load_standards as _planner_load
         result = _planner_load(state, subject, grade)
         return result.get('standards', [])
     except Exception:  # noqa: BLE001  # broad catch: error is logged
@@ -521,10 +489,8 @@ def _load_standards():
 def _load_saved_lessons(teacher_id='local-dev'):
     """Load saved lesson plan titles and topics."""
     lessons = []
-    if storage_list_keys and storage_load:
-        keys = storage_list_keys('lesson:', teacher_id)
-        for key in keys:
-            data = storage_load(key, teacher_id) or {}
+    if storage_load_prefix:
+        for key, data in storage_load_prefix('lesson:', teacher_id).items():
             parts = key.split(':', 2)
             unit = parts[1] if len(parts) > 1 else ''
             lessons.append({
@@ -555,6 +521,7 @@ def _load_saved_lessons(teacher_id='local-dev'):
     return lessons
 
 
+@memoized_loader
 def _load_roster(teacher_id='local-dev'):
     """Load student roster from periods and Clever rosters.
 
@@ -569,27 +536,26 @@ def _load_roster(teacher_id='local-dev'):
 
     # --- Multi-tenant path: load from Supabase storage ---
     _sb_configured = bool(os.getenv('SUPABASE_URL') and os.getenv('SUPABASE_SERVICE_KEY'))
-    if teacher_id != 'local-dev' and _sb_configured and storage_list_keys:
-        period_keys = storage_list_keys('period:', teacher_id) or []
-        meta_keys = storage_list_keys('period_meta:', teacher_id) or []
+    if teacher_id != 'local-dev' and _sb_configured and storage_load_prefix:
+        # One query per prefix instead of list_keys + a load per key
+        period_blobs = storage_load_prefix('period:', teacher_id)
+        meta_blobs = storage_load_prefix('period_meta:', teacher_id)
 
         # Load metadata for period names and course codes
         period_meta = {}
-        for mk in meta_keys:
-            meta_data = storage_load(mk, teacher_id) if storage_load else None
+        for mk, meta_data in meta_blobs.items():
             if meta_data:
                 # key format: 'period_meta:filename.csv'
                 csv_name = mk.replace('period_meta:', '')
                 period_meta[csv_name] = meta_data
 
         # Load period CSV data (stored as {"headers": [...], "rows": [...]})
-        for pk in period_keys:
+        for pk, period_data in period_blobs.items():
             csv_name = pk.replace('period:', '')
             meta = period_meta.get(csv_name, {})
             period_name = meta.get('period_name', csv_name.replace('.csv', '').replace('_', ' '))
             course_codes = meta.get('course_codes', [])
 
-            period_data = storage_load(pk, teacher_id) if storage_load else None
             if not period_data:
                 continue
 
@@ -764,10 +730,8 @@ def _load_saved_assignments(teacher_id='local-dev'):
             norms.append(_normalize_assignment_name(imported_fn))
         return [n for n in norms if n]
 
-    if storage_list_keys and storage_load:
-        keys = storage_list_keys('assignment:', teacher_id)
-        for key in keys:
-            data = storage_load(key, teacher_id) or {}
+    if storage_load_prefix:
+        for key, data in storage_load_prefix('assignment:', teacher_id).items():
             title = data.get('title', key[len('assignment:'):])
             saved.append({
                 "title": title,
@@ -947,6 +911,37 @@ _STATELESS_TOOLS = {
 }
 
 
+# Pure lookups: no writes (storage, files, Supabase), no outbound messages,
+# no LLM calls, and not a send / preview / confirm tool. Consecutive calls
+# to these within one assistant round may run concurrently
+# (backend/services/assistant_tool_runner.py). Everything NOT listed is
+# treated as side-effecting and runs strictly in order.
+READ_ONLY_TOOLS = frozenset({
+    # grading / analytics reads
+    'query_grades', 'get_student_summary', 'get_class_analytics',
+    'get_assignment_stats', 'list_assignments', 'analyze_grade_causes',
+    'get_feedback_patterns', 'compare_periods', 'get_missing_assignments',
+    'compare_assignments', 'detect_score_outliers', 'flag_at_risk_students',
+    'get_grade_distribution', 'get_grade_trends', 'get_rubric_weakness',
+    'query_assessment_results', 'list_published_assessments',
+    # student / roster / behavior reads
+    'lookup_student_info', 'get_student_accommodations', 'get_student_streak',
+    'get_behavior_summary', 'debug_behavior', 'get_survey_results',
+    # curriculum / calendar / resources
+    'get_standards', 'list_all_standards', 'get_calendar', 'get_pacing_status',
+    'get_recent_lessons', 'recommend_next_lesson', 'list_resources',
+    'read_resource', 'list_document_styles',
+    # deterministic STEM checkers
+    'check_math_equivalence', 'grade_math_question', 'grade_data_table',
+    'grade_coordinates', 'grade_place_name',
+})
+
+
+def is_read_only_tool(tool_name):
+    """True if ``tool_name`` is a pure lookup that may run concurrently."""
+    return tool_name in READ_ONLY_TOOLS
+
+
 def execute_tool(tool_name, tool_input):
     """Execute a tool by name with the given input.
 
@@ -971,6 +966,15 @@ def execute_tool(tool_name, tool_input):
                 pass  # Audit failure should never block tool execution
                 sentry_sdk.capture_exception(e)
 
+        data_context = current_data_context()
+        if data_context is not None:
+            try:
+                if 'data_context' in inspect.signature(handler).parameters:
+                    tool_input = dict(tool_input or {}, data_context=data_context)
+            except (ValueError, TypeError) as e:
+                # Builtins/C callables have no signature: call without the context.
+                _logger.debug("No signature for tool %s: %s", tool_name, e)
+
         if tool_input:
             # Strip teacher_id if the handler doesn't accept it
             kwargs = dict(tool_input)
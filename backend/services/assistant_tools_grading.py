@@ -22,6 +22,7 @@ from backend.services.assistant_tools import (
     _normalize_assignment_name, _get_period_assignments,
     ASSIGNMENTS_DIR,
 )
+from backend.services.roster_index import NameMatcher
 from backend.utils.compliance import require_teacher_id
 from backend.paths import graider_export_dir
 
@@ -112,6 +113,8 @@ def _scan_submission_folder(roster_name_map, saved_norms, saved_display,
                 key = (clean[0].lower(), clean[-1].lower())
                 name_to_sid[key] = sid
 
+    roster_matcher = NameMatcher(roster_name_map)
+
     result = defaultdict(set)
     supported = {'.docx', '.pdf', '.txt', '.jpg', '.jpeg', '.png'}
 
@@ -139,12 +142,9 @@ def _scan_submission_folder(roster_name_map, saved_norms, saved_display,
         # Match student to roster
         sid = name_to_sid.get((first, last))
         if not sid:
-            # Try fuzzy: check all roster entries
+            # Try fuzzy: first roster entry whose name matches
             file_name_str = f"{parts[0].strip()} {parts[1].strip()}"
-            for roster_sid, roster_name in roster_name_map.items():
-                if _fuzzy_name_match(file_name_str, roster_name):
-                    sid = roster_sid
-                    break
+            sid = roster_matcher.first_match(file_name_str)
         if not sid:
             continue
 
@@ -284,10 +284,17 @@ def query_grades(student_name=None, assignment=None, period=None,
     }
 
 
-def get_student_summary(student_name, teacher_id='local-dev'):
-    """Get comprehensive summary for a specific student."""
+def get_student_summary(student_name, teacher_id='local-dev', data_context=None):
+    """Get comprehensive summary for a specific student.
+
+    ``data_context`` (passed by execute_tool during an assistant turn) serves
+    the rows and the per-student grouping from the turn's shared load.
+    """
     require_teacher_id(teacher_id)
-    rows = _load_master_csv(teacher_id=teacher_id)
+    if data_context is not None:
+        rows = data_context.master_rows()
+    else:
+        rows = _load_master_csv(teacher_id=teacher_id)
 
     # Find matching student (fuzzy word match — handles compound names)
     student_rows = [r for r in rows if _fuzzy_name_match(student_name, r["student_name"])]
@@ -301,7 +308,10 @@ def get_student_summary(student_name, teacher_id='local-dev'):
     # Re-filter: match by student_id (preferred) or exact name
     # This catches rows with truncated names but the same student_id
     if actual_id and actual_id != "UNKNOWN":
-        student_rows = [r for r in rows if r.get("student_id") == actual_id]
+        if data_context is not None:
+            student_rows = list(data_context.by_student().get(actual_id, []))
+        else:
+            student_rows = [r for r in rows if r.get("student_id") == actual_id]
         # Use the longest name variant as the display name
         for r in student_rows:
             if len(r["student_name"]) > len(actual_name):
@@ -465,10 +475,16 @@ def get_class_analytics(period=None, teacher_id='local-dev'):
     }
 
 
-def get_assignment_stats(assignment_name, teacher_id='local-dev'):
-    """Get statistics for a specific assignment."""
+def get_assignment_stats(assignment_name, teacher_id='local-dev', data_context=None):
+    """Get statistics for a specific assignment.
+
+    ``data_context`` works as in get_student_summary.
+    """
     require_teacher_id(teacher_id)
-    rows = _load_master_csv(teacher_id=teacher_id)
+    if data_context is not None:
+        rows = data_context.master_rows()
+    else:
+        rows = _load_master_csv(teacher_id=teacher_id)
 
     # Partial match on assignment name
     matched = [r for r in rows if assignment_name.lower() in r["assignment"].lower()]
@@ -478,7 +494,10 @@ def get_assignment_stats(assignment_name, teacher_id='local-dev'):
 
     # Get exact assignment name from first match
     actual_name = matched[0]["assignment"]
-    matched = [r for r in rows if r["assignment"] == actual_name]
+    if data_context is not None:
+        matched = list(data_context.by_assignment().get(actual_name, []))
+    else:
+        matched = [r for r in rows if r["assignment"] == actual_name]
 
     scores = [r["score"] for r in matched]
 
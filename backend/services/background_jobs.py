@@ -0,0 +1,578 @@
+"""Background jobs for long teacher-initiated operations.
+
+Bulk grade emails, district report exports, cloud sync, login roster syncs
+and slide exports used to run inline in the request (holding a gunicorn
+worker for minutes) or on ad-hoc daemon threads (lost on every deploy).
+Behind FLAG_BACKGROUND_JOBS they run as jobs instead:
+
+- ``enqueue`` persists a job row (status ``queued``) and dispatches it to the
+  Celery ``jobs`` queue (backend/tasks/job_tasks.py), so job workers scale
+  independently of the web tier. A broker outage, or no broker at all in
+  local dev, degrades to a daemon thread in this process.
+- ``run_job`` executes the kind's handler with a ``JobContext`` the handler
+  uses to report progress, honour cancellation and save a result file.
+- ``request_cancel`` cancels a queued job outright and asks a running one to
+  stop at its next ``check_cancelled()``.
+- with ``dedupe_key``, a queued or running row that has not been updated
+  for its kind's ``stale_after`` (a thread job lost on deploy, or a queued
+  task no jobs worker ever picked up) is marked failed, and a new job is
+  dispatched instead of returning the dead one.
+- the job row is the source of truth (Celery's result backend is off), read
+  back through ``get_job`` / ``list_jobs`` / ``job_status``.
+
+Storage: the ``background_jobs`` table (migration 0006) and the private
+``job-results`` bucket when Supabase is configured; JSON files and result
+files under ``~/.graider_data/jobs`` otherwise (local dev and tests).
+
+Kinds that read host-local files (``runs_on='web'``) always run in the web
+process; they still get a persisted row, progress and cancellation.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import sentry_sdk
+
+from backend import storage
+from backend.feature_flags import flag_enabled
+
+_logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+ACTIVE = (QUEUED, RUNNING)
+TERMINAL = (SUCCEEDED, FAILED, CANCELLED)
+
+JOB_TABLE = 'background_jobs'
+RESULT_BUCKET = 'job-results'
+JOB_QUEUE = 'jobs'
+
+# A running job re-reads its row for a cancel request at most this often.
+CANCEL_POLL_S = 2.0
+
+# Added to a kind's time_limit for its default stale cutoff: past it, even a
+# job the jobs worker hard-killed has had time to record its own end.
+STALE_GRACE_S = 300
+
+_JOB_ID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+
+class JobCancelled(Exception):
+    """Raised by ``JobContext.check_cancelled`` once a cancel was requested."""
+
+
+class JobError(Exception):
+    """A handler failure whose message is safe to show the teacher."""
+
+
+@dataclass(frozen=True)
+class JobKind:
+    name: str
+    handler: str          # 'module:function', imported when the job runs
+    runs_on: str = 'worker'
+    time_limit: int = 900  # seconds; the Celery hard limit for this kind
+    # Startable from POST /api/jobs with no payload. Other kinds are
+    # enqueued by the route that validates and prepares their input.
+    enqueueable: bool = False
+    # Seconds an active row may go without an update before dedupe treats it
+    # as dead; None means time_limit + STALE_GRACE_S.
+    stale_after: int | None = None
+
+
+KINDS = {k.name: k for k in (
+    JobKind('grade_emails', 'backend.tasks.job_handlers:send_grade_emails', time_limit=3600),
+    # build_district_report falls back to the teacher's local settings file
+    # and master_grades.csv, which only exist on the web host.
+    JobKind('district_report', 'backend.tasks.job_handlers:export_district_report',
+            runs_on='web', enqueueable=True),
+    # sync_all_to_cloud uploads the teacher's LOCAL ~/.graider_* files, which
+    # only exist on the host that serves the teacher's requests.
+    JobKind('cloud_sync', 'backend.tasks.job_handlers:sync_to_cloud', runs_on='web',
+            enqueueable=True),
+    JobKind('clever_roster_sync', 'backend.tasks.job_handlers:sync_clever_roster'),
+    JobKind('classlink_roster_sync', 'backend.tasks.job_handlers:sync_classlink_roster'),
+    JobKind('slides_pptx', 'backend.tasks.job_handlers:export_slides_pptx'),
+    JobKind('slides_pdf', 'backend.tasks.job_handlers:export_slides_pdf'),
+)}
+
+
+def background_jobs_enabled() -> bool:
+    return flag_enabled('background_jobs')
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _use_supabase() -> bool:
+    # Same detection as backend/storage.py; the fake e2e client has no
+    # background_jobs table or storage buckets, so it gets the file store.
+    return storage._is_supabase_configured()
+
+
+def _jobs_root() -> str:
+    return os.path.join(storage.HOME, '.graider_data', 'jobs')
+
+
+# ── Job rows ──────────────────────────────────────────────────
+
+class _SupabaseJobStore:
+    """Rows in public.background_jobs (service-role client)."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def insert(self, job: dict) -> None:
+        self.db.table(JOB_TABLE).insert(job).execute()
+
+    def get(self, job_id: str) -> dict | None:
+        rows = self.db.table(JOB_TABLE).select('*').eq('id', job_id).limit(1).execute().data
+        return rows[0] if rows else None
+
+    def update(self, job_id: str, fields: dict, *, only_status: tuple = ()) -> dict | None:
+        query = self.db.table(JOB_TABLE).update(fields).eq('id', job_id)
+        if only_status:
+            query = query.in_('status', list(only_status))
+        rows = query.execute().data
+        return rows[0] if rows else None
+
+    def list(self, teacher_id: str, *, kind: str | None = None, limit: int = 20) -> list:
+        query = self.db.table(JOB_TABLE).select('*').eq('teacher_id', teacher_id)
+        if kind:
+            query = query.eq('kind', kind)
+        return query.order('created_at', desc=True).limit(limit).execute().data or []
+
+    def find_active(self, teacher_id: str, kind: str, dedupe_key: str) -> dict | None:
+        rows = (self.db.table(JOB_TABLE).select('*')
+                .eq('teacher_id', teacher_id).eq('kind', kind).eq('dedupe_key', dedupe_key)
+                .in_('status', list(ACTIVE)).limit(1).execute().data)
+        return rows[0] if rows else None
+
+
+class _FileJobStore:
+    """One JSON file per job under ``root`` (local dev and tests)."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id + '.json')
+
+    def _read(self, path: str) -> dict | None:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, job: dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._path(job['id']) + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(tmp, self._path(job['id']))
+
+    def insert(self, job: dict) -> None:
+        with self._lock:
+            self._write(job)
+
+    def get(self, job_id: str) -> dict | None:
+        return self._read(self._path(job_id))
+
+    def update(self, job_id: str, fields: dict, *, only_status: tuple = ()) -> dict | None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or (only_status and job.get('status') not in only_status):
+                return None
+            job.update(fields)
+            self._write(job)
+            return job
+
+    def list(self, teacher_id: str, *, kind: str | None = None, limit: int = 20) -> list:
+        if not os.path.isdir(self.root):
+            return []
+        jobs = [self._read(os.path.join(self.root, name))
+                for name in os.listdir(self.root) if name.endswith('.json')]
+        jobs = [j for j in jobs if j and j.get('teacher_id') == teacher_id
+                and (not kind or j.get('kind') == kind)]
+        jobs.sort(key=lambda j: j.get('created_at') or '', reverse=True)
+        return jobs[:limit]
+
+    def find_active(self, teacher_id: str, kind: str, dedupe_key: str) -> dict | None:
+        for job in self.list(teacher_id, kind=kind, limit=1000):
+            if job.get('dedupe_key') == dedupe_key and job.get('status') in ACTIVE:
+                return job
+        return None
+
+
+def is_stale(job: dict) -> bool:
+    """True for a queued or running job whose row stopped being updated."""
+    if job.get('status') not in ACTIVE:
+        return False
+    kind = KINDS.get(job.get('kind', ''))
+    limit = kind.stale_after if kind and kind.stale_after is not None else (
+        (kind.time_limit if kind else 900) + STALE_GRACE_S)
+    try:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(job['updated_at'])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return age > timedelta(seconds=limit)
+
+
+def _find_live(store, teacher_id: str, kind: str, dedupe_key: str) -> dict | None:
+    """The active job for ``dedupe_key``, failing stale ones along the way."""
+    for _ in range(10):
+        job = store.find_active(teacher_id, kind, dedupe_key)
+        if job is None or not is_stale(job):
+            return job
+        _logger.warning("background job %s (%s) went stale in %s; marking it failed",
+                        job['id'], kind, job['status'])
+        now = _now()
+        store.update(job['id'], {'status': FAILED, 'error': 'The job stopped responding',
+                                 'finished_at': now, 'updated_at': now},
+                     only_status=ACTIVE)
+    return None
+
+
+def _store():
+    if _use_supabase():
+        from backend.supabase_client import get_supabase
+        return _SupabaseJobStore(get_supabase())
+    return _FileJobStore(os.path.join(_jobs_root(), 'rows'))
+
+
+# ── Result / input files ──────────────────────────────────────
+
+class _SupabaseBlobs:
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def put(self, path: str, data: bytes, content_type: str) -> None:
+        self.bucket.upload(path, data, {'content-type': content_type, 'upsert': 'true'})
+
+    def get(self, path: str) -> bytes:
+        return self.bucket.download(path)
+
+
+class _FileBlobs:
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, path: str, data: bytes, content_type: str) -> None:
+        full = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'wb') as f:
+            f.write(data)
+
+    def get(self, path: str) -> bytes:
+        with open(os.path.join(self.root, path), 'rb') as f:
+            return f.read()
+
+
+def _blobs():
+    if _use_supabase():
+        from backend.supabase_client import get_raw_supabase
+        return _SupabaseBlobs(get_raw_supabase().storage.from_(RESULT_BUCKET))
+    return _FileBlobs(os.path.join(_jobs_root(), 'files'))
+
+
+def _safe_filename(name: str, default: str = 'result') -> str:
+    safe = ''.join(c for c in (name or '') if c.isalnum() or c in ' -_.').strip(' .')
+    return safe[:120] or default
+
+
+# ── Handler context ───────────────────────────────────────────
+
+class JobContext:
+    """What a handler sees: its params, progress, cancellation and results."""
+
+    def __init__(self, job: dict, store=None, blobs=None, clock: Callable[[], float] = time.monotonic):
+        self.job = job
+        self.job_id = job['id']
+        self.teacher_id = job['teacher_id']
+        self.params = job.get('params') or {}
+        self.result_file = None
+        self._store = store or _store()
+        self._blobs = blobs
+        self._clock = clock
+        self._cancel_checked_at = None
+        self._cancelled = False
+
+    def progress(self, done: int | None = None, total: int | None = None,
+                 message: str | None = None) -> None:
+        progress = {k: v for k, v in (('done', done), ('total', total), ('message', message))
+                    if v is not None}
+        self.job['progress'] = progress
+        self._store.update(self.job_id, {'progress': progress, 'updated_at': _now()})
+
+    def cancel_requested(self) -> bool:
+        if self._cancelled:
+            return True
+        now = self._clock()
+        if self._cancel_checked_at is not None and now - self._cancel_checked_at < CANCEL_POLL_S:
+            return False
+        self._cancel_checked_at = now
+        row = self._store.get(self.job_id) or {}
+        self._cancelled = bool(row.get('cancel_requested')) or row.get('status') == CANCELLED
+        return self._cancelled
+
+    def check_cancelled(self) -> None:
+        if self.cancel_requested():
+            raise JobCancelled()
+
+    def payload(self) -> Any:
+        """The request body stored with ``enqueue(payload=...)``."""
+        path = self.params.get('payload_path')
+        if not path:
+            return None
+        return json.loads(self.blobs.get(path).decode('utf-8'))
+
+    @property
+    def blobs(self):
+        if self._blobs is None:
+            self._blobs = _blobs()
+        return self._blobs
+
+    def save_result_file(self, data: bytes, filename: str, content_type: str) -> None:
+        filename = _safe_filename(filename)
+        path = f"{self.job_id}/{filename}"
+        self.blobs.put(path, data, content_type)
+        self.result_file = {'path': path, 'filename': filename,
+                            'content_type': content_type, 'size': len(data)}
+
+
+# ── Lifecycle ─────────────────────────────────────────────────
+
+def enqueue(teacher_id: str, kind: str, params: dict | None = None, *,
+            payload: Any = None, dedupe_key: str | None = None) -> dict:
+    """Create a job and dispatch it. Returns the job row.
+
+    ``payload`` (a large request body, e.g. a slide deck with images) is
+    stored as a file next to the job's results instead of in the row and
+    the task message. With ``dedupe_key``, an existing queued or running job
+    of the same kind for this teacher is returned instead of a new one,
+    unless it is stale (``is_stale``): then it is marked failed and a new
+    job is created and dispatched.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown job kind: {kind}")
+    store = _store()
+    if dedupe_key:
+        existing = _find_live(store, teacher_id, kind, dedupe_key)
+        if existing is not None:
+            return existing
+
+    job_id = str(uuid.uuid4())
+    params = dict(params or {})
+    if payload is not None:
+        params['payload_path'] = f"{job_id}/input.json"
+        _blobs().put(params['payload_path'], json.dumps(payload).encode('utf-8'),
+                     'application/json')
+    now = _now()
+    job = {
+        'id': job_id,
+        'teacher_id': teacher_id,
+        'kind': kind,
+        'status': QUEUED,
+        'params': params,
+        'progress': {},
+        'result': None,
+        'error': None,
+        'cancel_requested': False,
+        'dedupe_key': dedupe_key,
+        'task_id': None,
+        'attempts': 0,
+        'created_at': now,
+        'updated_at': now,
+        'started_at': None,
+        'finished_at': None,
+    }
+    store.insert(job)
+    task_id = dispatch(job)
+    if task_id:
+        job['task_id'] = task_id
+        store.update(job_id, {'task_id': task_id})
+    return job
+
+
+def dispatch(job: dict) -> str | None:
+    """Send a queued job to the jobs queue (or a local thread).
+
+    Returns the Celery task id, or None when the job runs in this process.
+    """
+    kind = KINDS[job['kind']]
+    # The handler runs in another thread or process, outside this request's
+    # storage unit of work: make the request's buffered saves visible first.
+    storage.flush()
+    if kind.runs_on == 'web' or not os.getenv('CELERY_BROKER_URL'):
+        _run_in_thread(job['id'])
+        return None
+
+    # Catch ONLY broker-communication failures (same contract as the portal
+    # grading enqueue): programming errors must surface.
+    import kombu.exceptions
+    from backend.tasks.job_tasks import run_background_job
+    try:
+        result = run_background_job.apply_async(
+            args=[job['id']], queue=JOB_QUEUE,
+            time_limit=kind.time_limit, soft_time_limit=kind.time_limit - 60,
+        )
+    except (kombu.exceptions.OperationalError, kombu.exceptions.ConnectionError) as e:
+        with sentry_sdk.push_scope() as scope:
+            scope.set_tag('celery_enqueue_failure', True)
+            scope.level = 'warning'
+            sentry_sdk.capture_exception(e)
+        _run_in_thread(job['id'])
+        return None
+    return result.id
+
+
+def _run_in_thread(job_id: str) -> None:
+    threading.Thread(target=run_job, args=(job_id,), name=f'job-{job_id[:8]}', daemon=True).start()
+
+
+def _resolve_handler(kind: JobKind) -> Callable[[JobContext], dict | None]:
+    module_name, func_name = kind.handler.split(':')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def run_job(job_id: str, *, store=None, blobs=None) -> dict | None:
+    """Run a job to a terminal state and return its final row.
+
+    A redelivered job (worker died mid-run, acks_late) runs again from the
+    start; handlers are written to be safe to repeat. Terminal jobs are
+    left untouched.
+    """
+    store = store or _store()
+    job = store.get(job_id)
+    if job is None:
+        _logger.warning("background job %s not found", job_id)
+        return None
+    if job.get('status') not in ACTIVE:
+        return job
+    if job.get('cancel_requested'):
+        return _finish(store, job_id, CANCELLED)
+
+    started = store.update(job_id, {
+        'status': RUNNING,
+        'started_at': job.get('started_at') or _now(),
+        'attempts': int(job.get('attempts') or 0) + 1,
+        'updated_at': _now(),
+    }, only_status=ACTIVE)
+    if started is None:
+        return store.get(job_id)
+
+    ctx = JobContext(started, store=store, blobs=blobs)
+    try:
+        result = _resolve_handler(KINDS[job['kind']])(ctx) or {}
+    except JobCancelled:
+        _logger.info("background job %s (%s) cancelled", job_id, job['kind'])
+        return _finish(store, job_id, CANCELLED, result=_with_file({}, ctx))
+    except JobError as e:
+        return _finish(store, job_id, FAILED, error=str(e))
+    except Exception as e:  # noqa: BLE001  # broad catch: the job row records the failure; error is logged
+        _logger.exception("background job %s (%s) failed", job_id, job['kind'])
+        sentry_sdk.capture_exception(e)
+        return _finish(store, job_id, FAILED, error="An internal error occurred")
+    return _finish(store, job_id, SUCCEEDED, result=_with_file(result, ctx))
+
+
+def _with_file(result: dict, ctx: JobContext) -> dict:
+    if ctx.result_file:
+        result = {**result, 'file': ctx.result_file}
+    return result
+
+
+def _finish(store, job_id: str, status: str, *, result: dict | None = None,
+            error: str | None = None) -> dict | None:
+    now = _now()
+    fields = {'status': status, 'finished_at': now, 'updated_at': now, 'error': error}
+    if result is not None:
+        fields['result'] = result
+    return store.update(job_id, fields) or store.get(job_id)
+
+
+def get_job(teacher_id: str, job_id: str) -> dict | None:
+    """The job row if it exists and belongs to ``teacher_id``."""
+    if not _JOB_ID_RE.match(job_id or ''):
+        return None
+    job = _store().get(job_id)
+    if job is None or job.get('teacher_id') != teacher_id:
+        return None
+    return job
+
+
+def list_jobs(teacher_id: str, *, kind: str | None = None, limit: int = 20) -> list:
+    return _store().list(teacher_id, kind=kind, limit=limit)
+
+
+def request_cancel(teacher_id: str, job_id: str) -> dict | None:
+    """Cancel a queued job now; ask a running one to stop.
+
+    Returns the updated row (unchanged if already finished), or None if the
+    job does not exist for this teacher.
+    """
+    job = get_job(teacher_id, job_id)
+    if job is None:
+        return None
+    store = _store()
+    now = _now()
+    if job['status'] == QUEUED:
+        updated = store.update(job_id, {'status': CANCELLED, 'cancel_requested': True,
+                                        'finished_at': now, 'updated_at': now},
+                               only_status=(QUEUED,))
+        if updated is not None:
+            return updated
+        job = store.get(job_id)
+    if job['status'] == RUNNING:
+        return store.update(job_id, {'cancel_requested': True, 'updated_at': now},
+                            only_status=(RUNNING,)) or store.get(job_id)
+    return job
+
+
+def read_result_file(job: dict) -> tuple[bytes, str, str] | None:
+    """``(data, filename, content_type)`` for a succeeded job's file."""
+    info = (job.get('result') or {}).get('file')
+    if job.get('status') != SUCCEEDED or not info:
+        return None
+    return _blobs().get(info['path']), info['filename'], info['content_type']
+
+
+def job_status(job: dict) -> dict:
+    """The API view of a job row (no teacher id, params or storage paths)."""
+    result = dict(job.get('result') or {})
+    info = result.pop('file', None)
+    return {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job.get('progress') or {},
+        'result': result or None,
+        'download': (
+            {'url': f"/api/jobs/{job['id']}/result", 'filename': info['filename'],
+             'size': info.get('size')}
+            if info and job['status'] == SUCCEEDED else None
+        ),
+        'error': job.get('error'),
+        'cancel_requested': bool(job.get('cancel_requested')),
+        'created_at': job.get('created_at'),
+        'started_at': job.get('started_at'),
+        'finished_at': job.get('finished_at'),
+    }
@@ -0,0 +1,220 @@
+"""Anonymized district report (aggregate statistics only, no student PII).
+
+Extracted from backend/routes/analytics_routes.py export_district_report
+(behavior-preserving) so the export can also run as a background job
+(backend/services/background_jobs.py). Results come from storage, falling
+back to the host-local ~/.graider_global_settings.json and master_grades.csv
+(`_find_master_grades`, moved here from analytics_routes). Those files only
+exist on the web host, so the ``district_report`` job kind runs on the web
+process (``runs_on='web'``), never on a Celery worker.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+import csv
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable
+
+import sentry_sdk
+
+from backend import storage
+from backend.paths import graider_export_dir
+
+_logger = logging.getLogger(__name__)
+
+
+class DistrictReportUnavailable(Exception):
+    """There is no grading data to report on (``message`` is shown to the teacher)."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+def _find_master_grades():
+    """Find master_grades.csv by checking multiple known locations."""
+    # Check legacy global settings file
+    settings_file = os.path.expanduser("~/.graider_global_settings.json")
+    if os.path.exists(settings_file):
+        try:
+            with open(settings_file, 'r') as f:
+                settings = json.load(f)
+                folder = settings.get('output_folder', '')
+                if folder:
+                    path = os.path.join(folder, "master_grades.csv")
+                    if os.path.exists(path):
+                        return path
+        except Exception:  # noqa: BLE001  # broad catch: error is logged
+            _logger.debug("master grades CSV path resolution failed", exc_info=True)
+
+    # Check common locations
+    candidates = [
+        os.path.expanduser("~/.graider_data/output/master_grades.csv"),
+        graider_export_dir("Results", "master_grades.csv"),
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+
+def build_district_report(teacher_id: str,
+                          find_master_grades: Callable[[], str | None] = _find_master_grades) -> dict:
+    """Build the district report dict for ``teacher_id``.
+
+    Raises DistrictReportUnavailable when there are no grades to aggregate.
+    """
+    # Get teacher info from settings
+    teacher_name = "Unknown Teacher"
+    school_name = "Unknown School"
+    subject = "Social Studies"
+
+    # Try storage-based settings first (works for Clever/portal users)
+    try:
+        settings = storage.load("settings", teacher_id)
+        if settings:
+            teacher_name = settings.get("teacher_name", teacher_name)
+            school_name = settings.get("school_name", school_name)
+            subject = settings.get("subject", subject)
+    except Exception:  # noqa: BLE001  # broad catch: error is logged
+        _logger.debug("teacher settings load from storage failed", exc_info=True)
+
+    # Fallback to local file settings
+    if teacher_name == "Unknown Teacher":
+        settings_file = os.path.expanduser("~/.graider_global_settings.json")
+        if os.path.exists(settings_file):
+            try:
+                with open(settings_file, 'r') as f:
+                    file_settings = json.load(f)
+                    teacher_name = file_settings.get('teacher_name', teacher_name)
+                    school_name = file_settings.get('school_name', school_name)
+                    subject = file_settings.get('subject', subject)
+            except Exception:  # noqa: BLE001  # broad catch: error is logged
+                _logger.debug("teacher settings load from local file failed", exc_info=True)
+
+    # Collect anonymized aggregate data
+    all_grades = []
+    students = set()
+    assignments = defaultdict(list)
+    quarters = defaultdict(list)
+    categories = {"content": [], "completeness": [], "writing": [], "effort": []}
+
+    # Try results storage first (includes portal + file-based results)
+    try:
+        results = storage.load("results", teacher_id)
+        if results and isinstance(results, list):
+            for r in results:
+                score = int(r.get("score", 0) or 0)
+                all_grades.append(score)
+                students.add(r.get("student_id", r.get("student_name", "unknown")))
+                assignment_name = r.get("assignment", "Unknown")
+                assignments[assignment_name].append(score)
+                quarter = r.get("period", "")
+                if quarter:
+                    quarters[quarter].append(score)
+                bd = r.get("breakdown", {})
+                categories["content"].append(int(bd.get("content_accuracy", 0) or 0))
+                categories["completeness"].append(int(bd.get("completeness", 0) or 0))
+                categories["writing"].append(int(bd.get("writing_quality", 0) or 0))
+                categories["effort"].append(int(bd.get("effort_engagement", 0) or 0))
+    except Exception as e:  # noqa: BLE001  # broad catch: error is logged
+        sentry_sdk.capture_exception(e)
+
+    # Fall back to master_grades.csv if no results in storage
+    if not all_grades:
+        master_file = find_master_grades()
+        if not master_file:
+            raise DistrictReportUnavailable("No grading data available to export")
+
+        with open(master_file, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                score = int(float(row.get("Overall Score", 0) or 0))
+                all_grades.append(score)
+                students.add(row.get("Student ID", row.get("Student Name", "unknown")))
+                assignment_name = row.get("Assignment", "Unknown")
+                assignments[assignment_name].append(score)
+                quarter = row.get("Quarter", "")
+                if quarter:
+                    quarters[quarter].append(score)
+                categories["content"].append(int(float(row.get("Content Accuracy", 0) or 0)))
+                categories["completeness"].append(int(float(row.get("Completeness", 0) or 0)))
+                categories["writing"].append(int(float(row.get("Writing Quality", 0) or 0)))
+                categories["effort"].append(int(float(row.get("Effort Engagement", 0) or 0)))
+
+    if not all_grades:
+        raise DistrictReportUnavailable("No grades found in data")
+
+    # Calculate grade distribution
+    grade_distribution = {
+        "A (90-100)": len([s for s in all_grades if s >= 90]),
+        "B (80-89)": len([s for s in all_grades if 80 <= s < 90]),
+        "C (70-79)": len([s for s in all_grades if 70 <= s < 80]),
+        "D (60-69)": len([s for s in all_grades if 60 <= s < 70]),
+        "F (0-59)": len([s for s in all_grades if s < 60])
+    }
+
+    # Calculate assignment breakdown
+    assignment_stats = []
+    for name, scores in sorted(assignments.items()):
+        assignment_stats.append({
+            "assignment": name,
+            "submissions": len(scores),
+            "average": round(sum(scores) / len(scores), 1),
+            "highest": max(scores),
+            "lowest": min(scores)
+        })
+
+    # Calculate quarterly breakdown
+    quarter_stats = []
+    for qtr, scores in sorted(quarters.items()):
+        quarter_stats.append({
+            "quarter": qtr,
+            "submissions": len(scores),
+            "average": round(sum(scores) / len(scores), 1)
+        })
+
+    # Calculate category averages (normalized to percentage)
+    category_averages = {
+        "Content Accuracy": round(sum(categories["content"]) / len(categories["content"]) * 2.5, 1) if categories["content"] else 0,
+        "Completeness": round(sum(categories["completeness"]) / len(categories["completeness"]) * 4, 1) if categories["completeness"] else 0,
+        "Writing Quality": round(sum(categories["writing"]) / len(categories["writing"]) * 5, 1) if categories["writing"] else 0,
+        "Effort & Engagement": round(sum(categories["effort"]) / len(categories["effort"]) * 6.67, 1) if categories["effort"] else 0
+    }
+
+    # Build the report
+    report = {
+        "report_metadata": {
+            "report_type": "District Analytics Export",
+            "generated_at": datetime.now().isoformat(),
+            "teacher_name": teacher_name,
+            "school_name": school_name,
+            "subject": subject,
+            "data_period": f"{min(quarters.keys()) if quarters else 'N/A'} - {max(quarters.keys()) if quarters else 'N/A'}",
+            "ferpa_notice": "This report contains AGGREGATE DATA ONLY. No individual student information is included."
+        },
+        "summary_statistics": {
+            "total_students": len(students),
+            "total_submissions_graded": len(all_grades),
+            "total_assignments": len(assignments),
+            "class_average": round(sum(all_grades) / len(all_grades), 1),
+            "highest_score": max(all_grades),
+            "lowest_score": min(all_grades),
+            "median_score": sorted(all_grades)[len(all_grades) // 2]
+        },
+        "grade_distribution": grade_distribution,
+        "category_performance": category_averages,
+        "assignment_breakdown": assignment_stats,
+        "quarterly_trends": quarter_stats,
+        "students_at_risk": {
+            "below_70_average_count": len([s for s in all_grades if s < 70]),
+            "below_60_count": len([s for s in all_grades if s < 60]),
+            "percentage_at_risk": round(len([s for s in all_grades if s < 70]) / len(all_grades) * 100, 1)
+        }
+    }
+
+    return report
@@ -0,0 +1,101 @@
+"""Trigger-maintained district analytics rollup.
+
+Replaces the full district scan behind GET /api/district/analytics (and the
+per-pod 300s cache in front of it). `district_teacher_rollup` (migration
+0007) holds one row per district teacher — anyone owning a class,
+published_content or published_assessments row — with the same numbers the
+live path computes via admin_routes.compute_overview + _enrich_teachers:
+
+- classes_count / students_count / assessments_count (the teacher table)
+- total_assessments, scored_count, score_sum and the A-F grade counts (the
+  district overview is their column sum)
+- email / name from the auth user
+
+Postgres triggers keep the rows current as submissions are graded and
+classes, enrollments and published content change, so a read is one paged
+select with no hard cap (`approximate` is always False). Rows start empty:
+backend/scripts/backfill_district_rollup.py --apply rebuilds them from
+source, and --verify compares them against the live computation.
+
+Flag (backend/feature_flags.py):
+- FLAG_DISTRICT_ROLLUP_READS (default OFF — flip after the backfill's
+  --verify pass is clean)
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from backend.feature_flags import flag_enabled
+from backend.services.student_mastery_rollup import fetch_paged
+
+TEACHER_TABLE = 'district_teacher_rollup'
+REBUILD_RPC = 'district_rollup_rebuild'
+GRADE_BANDS = ('A', 'B', 'C', 'D', 'F')
+TEACHER_COLUMNS = (
+    'teacher_id, email, name, classes_count, students_count, assessments_count, '
+    'total_assessments, scored_count, score_sum, '
+    'grade_a, grade_b, grade_c, grade_d, grade_f'
+)
+
+
+def rollup_reads_enabled():
+    return flag_enabled('district_rollup_reads', default=False)
+
+
+def load_teacher_rows(db):
+    """Every district_teacher_rollup row, ordered by teacher_id."""
+    return fetch_paged(lambda: db.table(TEACHER_TABLE).select(TEACHER_COLUMNS).order('teacher_id'))
+
+
+def build_analytics(rows):
+    """Turn rollup rows into the /api/district/analytics payload.
+
+    Same shape as district_routes._build_district_analytics; teachers carry
+    `last_activity: None` (the route fills it from audit_log).
+    """
+    totals = {'students': 0, 'assessments': 0, 'scored': 0, 'score_sum': 0.0}
+    distribution = dict.fromkeys(GRADE_BANDS, 0)
+    teachers = []
+    for r in sorted(rows, key=lambda r: str(r.get('teacher_id') or '')):
+        tid = r.get('teacher_id')
+        if not tid:
+            continue
+        totals['students'] += int(r.get('students_count') or 0)
+        totals['assessments'] += int(r.get('total_assessments') or 0)
+        totals['scored'] += int(r.get('scored_count') or 0)
+        totals['score_sum'] += float(r.get('score_sum') or 0)
+        for band in GRADE_BANDS:
+            distribution[band] += int(r.get('grade_' + band.lower()) or 0)
+        teachers.append({
+            'user_id': str(tid),
+            'email': r.get('email') or '',
+            'name': r.get('name') or '—',
+            'classes_count': int(r.get('classes_count') or 0),
+            'students_count': int(r.get('students_count') or 0),
+            'assessments_count': int(r.get('assessments_count') or 0),
+            'last_activity': None,
+        })
+    average = round(totals['score_sum'] / totals['scored'], 1) if totals['scored'] else None
+    return {
+        'overview': {
+            'total_teachers': len(teachers),
+            'total_students': totals['students'],
+            'total_assessments': totals['assessments'],
+            'average_score': average,
+            'grade_distribution': distribution,
+        },
+        'teachers': teachers,
+        'approximate': False,
+    }
+
+
+def load_district_analytics(db):
+    """The district analytics payload, read from the rollup."""
+    return build_analytics(load_teacher_rows(db))
+
+
+def rebuild_teacher(db, teacher_id):
+    """Recompute one teacher's rollup from source (district_rollup_rebuild RPC).
+
+    Returns the rebuilt row, or None when the teacher no longer owns
+    anything (their row is deleted).
+    """
+    return db.rpc(REBUILD_RPC, {'p_teacher_id': teacher_id}).execute().data
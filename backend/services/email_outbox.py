@@ -0,0 +1,471 @@
+"""Persistent outbox and bulk delivery for grade feedback emails.
+
+/api/send-emails used to send one Resend call per student inside the
+request. A 150-student class meant 150 serial HTTPS round trips holding a
+web worker, and a request that died halfway left no record of who had
+already been emailed.
+
+Messages: `new_message()` gives every email an idempotency key, a SHA-256
+over (scope, recipient, subject, body) where scope is the teacher id. The
+same email composed twice gets the same key, and Resend drops a repeated
+Idempotency-Key for 24 hours. An outbox's batch id is derived from its
+message keys, so resubmitting the same send finds the existing outbox and
+resumes it instead of queueing a second copy.
+
+Delivery (`deliver_messages`): chunks of EMAIL_BATCH_SIZE messages (100,
+Resend's maximum) go out in one /emails/batch call each. The call carries
+one batch-level Idempotency-Key derived from the chunk's message keys; the
+per-message keys are not sent with it. A batch rejected at validation
+(nothing was sent) falls back to per-message sends for that chunk. Any
+other error retries the same chunk with the same key, up to
+EMAIL_SEND_MAX_ATTEMPTS times with backoff. Without batch support,
+messages go out individually on EMAIL_SEND_CONCURRENCY threads. Every
+provider call, batch or single, waits on a shared limiter of
+EMAIL_SEND_RATE_PER_S (Resend's default team limit is 2 requests/s).
+
+Outbox (`create_outbox` / `drain_outbox`): stored under the storage key
+``email_outbox:<batch_id>`` (a teacher_data row, or
+~/.graider_data/email_outbox/<batch_id>.json locally). Progress is saved
+after every chunk, and a message's recipient and body are dropped from the
+record once it is sent or failed. A drain that died midway resumes from
+the pending messages. A chunk that was accepted but not yet recorded is
+resent with the same keys, and Resend deduplicates it. Failed messages are
+not retried automatically. Resubmitting the same send within RESUME_WINDOW
+moves them back to pending and sends them again under the key of their
+first attempt. A message that failed inside a batch call remembers that
+call's ``batch_key``, and its whole original chunk is resent as one batch
+under that key; a per-message failure is resent under its own key. Either
+way a send that did go through the first time is deduplicated by Resend.
+(If batch sends are unavailable on the retry, a failed batch's messages
+fall back to their own keys, which Resend cannot match to the batch.)
+`prune_outboxes` (run by every `create_outbox`) deletes finished outboxes
+past RESUME_WINDOW and any outbox idle for OUTBOX_RETENTION. `start_drain`
+runs a drain on a background thread (one per outbox per process); with
+FLAG_BACKGROUND_JOBS the drain is a ``grade_emails`` job instead
+(backend/services/background_jobs.py), which can be cancelled between
+chunks. `outbox_status` backs GET /api/send-emails/status.
+
+Gated by FLAG_EMAIL_OUTBOX (default off).
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from backend import storage
+from backend.feature_flags import flag_enabled
+from backend.services.email_service import BATCH_MAX, BatchRejected
+
+_logger = logging.getLogger(__name__)
+
+OUTBOX_KEY_PREFIX = 'email_outbox:'
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+# Resend keeps idempotency keys for 24 hours. A finished outbox older than
+# that no longer deduplicates anything, so the same send starts over.
+RESUME_WINDOW = timedelta(hours=24)
+
+# An unfinished outbox not saved for this long has lost its drain thread
+# (deploy, crash). A live drain saves after every chunk, and a chunk takes
+# at most a few backoffs or EACH_CHUNK rate-limited sends.
+STALL_AFTER = timedelta(minutes=2)
+
+# Unfinished outboxes (cancelled, or abandoned mid-drain) are deleted after
+# this long without progress.
+OUTBOX_RETENTION = timedelta(days=7)
+
+# Recipient and content fields, dropped once a message is sent or failed.
+_CONTENT_FIELDS = ('to', 'name', 'subject', 'text', 'reply_to')
+
+# Checkpoint interval for per-message sends. A batch call is one chunk.
+EACH_CHUNK = 10
+
+
+def email_outbox_enabled() -> bool:
+    return flag_enabled('email_outbox', default=False)
+
+
+def _env_int(name: str, default: str) -> int:
+    return int(os.getenv(name) or default)
+
+
+def batch_size() -> int:
+    return max(1, min(_env_int('EMAIL_BATCH_SIZE', str(BATCH_MAX)), BATCH_MAX))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _digest(payload) -> str:
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def message_key(scope: str, to: str, subject: str, text: str) -> str:
+    """Idempotency key for one email (stable across retries and resubmits)."""
+    return 'graider-' + _digest([scope or '', to.strip().lower(), subject, text])
+
+
+def new_message(to: str, subject: str, text: str, *, name: str = '',
+                reply_to: str | None = None, scope: str = '') -> dict:
+    """An outbox message; ``scope`` (the teacher id) namespaces its key."""
+    return {
+        'key': message_key(scope, to, subject, text),
+        'to': to,
+        'name': name,
+        'subject': subject,
+        'text': text,
+        'reply_to': reply_to or None,
+    }
+
+
+def _unique(messages: list) -> list:
+    """Drop repeated keys (the same email twice), keeping first-seen order."""
+    seen = {}
+    for m in messages:
+        seen.setdefault(m['key'], m)
+    return list(seen.values())
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads.
+
+    A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate_per_s: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self._interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+def default_limiter() -> RateLimiter:
+    return RateLimiter(float(os.getenv('EMAIL_SEND_RATE_PER_S') or '2'))
+
+
+def _send_one(emailer, message: dict, limiter: RateLimiter) -> dict:
+    limiter.wait()
+    ok = emailer.send_email(
+        message['to'], message.get('name') or message['to'], message['subject'],
+        message['text'], message.get('reply_to'), idempotency_key=message['key'],
+    )
+    return {'status': SENT} if ok else {'status': FAILED, 'error': 'send failed'}
+
+
+def _send_each(emailer, chunk: list, limiter: RateLimiter) -> dict:
+    workers = max(1, min(_env_int('EMAIL_SEND_CONCURRENCY', '4'), len(chunk)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='email-send') as pool:
+        outcomes = pool.map(lambda m: _send_one(emailer, m, limiter), chunk)
+        return {m['key']: outcome for m, outcome in zip(chunk, outcomes)}
+
+
+def _send_batch(emailer, chunk: list, limiter: RateLimiter,
+                sleep: Callable[[float], None], batch_key: str | None = None) -> dict:
+    batch_key = batch_key or 'graider-batch-' + _digest([m['key'] for m in chunk])
+    attempts = max(1, _env_int('EMAIL_SEND_MAX_ATTEMPTS', '3'))
+    error = ''
+    for attempt in range(1, attempts + 1):
+        limiter.wait()
+        try:
+            ids = emailer.send_batch(chunk, idempotency_key=batch_key)
+        except BatchRejected as e:
+            _logger.warning("email batch rejected (%s); sending its %d emails one by one",
+                            e, len(chunk))
+            return _send_each(emailer, chunk, limiter)
+        except Exception as e:  # noqa: BLE001  # broad catch: retried under the same idempotency key
+            error = type(e).__name__
+            _logger.warning("email batch attempt %d/%d failed: %s", attempt, attempts, e)
+            if attempt < attempts:
+                sleep(2 ** attempt)
+        else:
+            return {m['key']: {'status': SENT, 'provider_id': pid} for m, pid in zip(chunk, ids)}
+    # The outcome is unknown: record the batch key so a retry resends this
+    # exact chunk under it (see _chunks).
+    return {m['key']: {'status': FAILED, 'error': error, 'batch_key': batch_key} for m in chunk}
+
+
+def _chunks(messages: list, size: int) -> list:
+    """Split into ``(batch_key, chunk)`` pairs of at most ``size`` messages.
+
+    Messages carrying a ``batch_key`` (a retried batch whose first outcome
+    was unknown) keep their original chunk, whatever ``size`` is now.
+    """
+    retried = {}
+    fresh = []
+    for m in messages:
+        if m.get('batch_key'):
+            retried.setdefault(m['batch_key'], []).append(m)
+        else:
+            fresh.append(m)
+    return ([(key, chunk) for key, chunk in retried.items()]
+            + [(None, fresh[i:i + size]) for i in range(0, len(fresh), size)])
+
+
+def deliver_messages(emailer, messages: list, *, on_chunk: Callable[[dict], None] | None = None,
+                     limiter: RateLimiter | None = None,
+                     sleep: Callable[[float], None] = time.sleep,
+                     should_stop: Callable[[], bool] | None = None) -> dict:
+    """Send ``messages`` through ``emailer`` (a GraiderEmailer).
+
+    Returns ``{key: {'status': 'sent' | 'failed', ...}}`` with one entry per
+    distinct key. ``on_chunk(outcomes)`` runs after each chunk with that
+    chunk's outcomes so callers can checkpoint. When ``should_stop()`` turns
+    True, no further chunk is started; unsent messages get no entry.
+    """
+    limiter = limiter or default_limiter()
+    use_batch = emailer.batch_available and batch_size() > 1
+    size = batch_size() if use_batch else EACH_CHUNK
+    outcomes = {}
+    for batch_key, chunk in _chunks(_unique(messages), size):
+        if should_stop is not None and should_stop():
+            break
+        if use_batch or (batch_key and emailer.batch_available):
+            chunk_outcomes = _send_batch(emailer, chunk, limiter, sleep, batch_key)
+        else:
+            chunk_outcomes = _send_each(emailer, chunk, limiter)
+        outcomes.update(chunk_outcomes)
+        if on_chunk is not None:
+            on_chunk(chunk_outcomes)
+    return outcomes
+
+
+# ── Persistent outbox ─────────────────────────────────────────
+
+def outbox_key(batch_id: str) -> str:
+    return OUTBOX_KEY_PREFIX + batch_id
+
+
+def outbox_batch_id(messages: list) -> str:
+    return _digest(sorted({m['key'] for m in messages}))[:24]
+
+
+def load_outbox(teacher_id: str, batch_id: str) -> dict | None:
+    record = storage.load(outbox_key(batch_id), teacher_id)
+    return record if isinstance(record, dict) else None
+
+
+def _save(teacher_id: str, record: dict) -> None:
+    record['updated_at'] = _now()
+    storage.save(outbox_key(record['batch_id']), record, teacher_id)
+
+
+def _age(record: dict, field: str) -> timedelta | None:
+    try:
+        return datetime.now(timezone.utc) - datetime.fromisoformat(record[field])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _expired(record: dict) -> bool:
+    if record.get('status') != 'done':
+        return False
+    age = _age(record, 'created_at')
+    return age is None or age > RESUME_WINDOW
+
+
+def is_stalled(record: dict) -> bool:
+    """True for an unfinished outbox whose drain has stopped saving progress."""
+    if record.get('status') in ('done', 'cancelled'):
+        return False
+    age = _age(record, 'updated_at')
+    return age is None or age > STALL_AFTER
+
+
+def _prunable(record: dict) -> bool:
+    if _expired(record):
+        return True
+    age = _age(record, 'updated_at')
+    return age is None or age > OUTBOX_RETENTION
+
+
+def prune_outboxes(teacher_id: str) -> int:
+    """Delete a teacher's expired outbox records; returns how many.
+
+    Best-effort: a storage error is logged and nothing is deleted.
+    """
+    try:
+        records = storage.load_prefix(OUTBOX_KEY_PREFIX, teacher_id)
+        stale = [key for key, record in records.items()
+                 if isinstance(record, dict) and _prunable(record)]
+        for key in stale:
+            storage.delete(key, teacher_id)
+    except Exception as e:  # noqa: BLE001  # broad catch: pruning must never block a send
+        _logger.warning("email outbox prune failed for %s: %s", teacher_id, e)
+        return 0
+    return len(stale)
+
+
+def _requeue_failed(record: dict, messages: list) -> bool:
+    """Move ``record``'s failed messages back to pending, restoring their
+    content from the resubmitted ``messages``. A live drain is left alone.
+    """
+    if record.get('status') == 'sending' and not is_stalled(record):
+        return False
+    resubmitted = {m['key']: m for m in messages}
+    requeued = False
+    for i, message in enumerate(record['messages']):
+        if message.get('status') == FAILED and message['key'] in resubmitted:
+            retry = {**resubmitted[message['key']], 'status': PENDING}
+            if message.get('batch_key'):
+                retry['batch_key'] = message['batch_key']
+            record['messages'][i] = retry
+            requeued = True
+    if requeued:
+        record['status'] = 'queued'
+    return requeued
+
+
+def create_outbox(teacher_id: str, messages: list, *, meta: dict | None = None) -> dict:
+    """Persist an outbox for ``messages``, or return the existing one.
+
+    The same messages always map to the same batch id. A resubmit within
+    RESUME_WINDOW returns the stored record, so its sent messages are never
+    queued again; its failed messages go back to pending under their
+    original keys.
+    """
+    prune_outboxes(teacher_id)
+    batch_id = outbox_batch_id(messages)
+    existing = load_outbox(teacher_id, batch_id)
+    if existing is not None and not _expired(existing):
+        if _requeue_failed(existing, messages):
+            _save(teacher_id, existing)
+            storage.flush()
+        return existing
+
+    now = _now()
+    record = {
+        'batch_id': batch_id,
+        'status': 'queued',
+        'created_at': now,
+        'updated_at': now,
+        'meta': meta or {},
+        'messages': [{**m, 'status': PENDING} for m in _unique(messages)],
+    }
+    storage.save(outbox_key(batch_id), record, teacher_id)
+    # Inside a storage unit of work the save is buffered until the request
+    # ends; the drain thread loads the record directly, so write it now.
+    storage.flush()
+    return record
+
+
+def drain_outbox(teacher_id: str, batch_id: str, emailer, *,
+                 on_progress: Callable[[dict], None] | None = None,
+                 **deliver_kwargs) -> dict | None:
+    """Send an outbox's pending messages, saving progress after each chunk.
+
+    ``on_progress(outbox_status(record))`` runs after each checkpoint. If
+    ``should_stop`` (passed through to deliver_messages) stops the send, the
+    outbox ends ``cancelled`` with its unsent messages still pending, so a
+    resubmit resumes it. Returns the updated record, or None if no such
+    outbox exists.
+    """
+    record = load_outbox(teacher_id, batch_id)
+    if record is None:
+        return None
+    by_key = {m['key']: m for m in record['messages']}
+    pending = [m for m in record['messages'] if m['status'] == PENDING]
+
+    record['status'] = 'sending'
+    _save(teacher_id, record)
+
+    def checkpoint(outcomes):
+        for key, outcome in outcomes.items():
+            message = by_key[key]
+            message.update(outcome)
+            for field in _CONTENT_FIELDS:
+                message.pop(field, None)
+        _save(teacher_id, record)
+        if on_progress is not None:
+            on_progress(outbox_status(record))
+
+    deliver_messages(emailer, pending, on_chunk=checkpoint, **deliver_kwargs)
+    stopped = any(m['status'] == PENDING for m in record['messages'])
+    record['status'] = 'cancelled' if stopped else 'done'
+    _save(teacher_id, record)
+    _logger.info("email outbox %s %s: %s", batch_id, record['status'], outbox_status(record))
+    return record
+
+
+_active: set = set()
+_active_lock = threading.Lock()
+
+
+def start_drain(teacher_id: str, batch_id: str, emailer) -> bool:
+    """Drain an outbox on a background thread.
+
+    Returns False if this process is already draining it.
+    """
+    token = (teacher_id, batch_id)
+    with _active_lock:
+        if token in _active:
+            return False
+        _active.add(token)
+
+    def run():
+        try:
+            drain_outbox(teacher_id, batch_id, emailer)
+        except Exception as e:  # noqa: BLE001  # broad catch: background thread; the outbox stays resumable
+            _logger.exception("email outbox %s drain failed: %s", batch_id, e)
+        finally:
+            with _active_lock:
+                _active.discard(token)
+
+    threading.Thread(target=run, name=f'email-outbox-{batch_id[:8]}', daemon=True).start()
+    return True
+
+
+def is_draining(teacher_id: str, batch_id: str) -> bool:
+    with _active_lock:
+        return (teacher_id, batch_id) in _active
+
+
+def outbox_status(record: dict) -> dict:
+    """Progress counts for an outbox record (the status endpoint's payload)."""
+    counts = {PENDING: 0, SENT: 0, FAILED: 0}
+    for m in record.get('messages', []):
+        counts[m.get('status', PENDING)] = counts.get(m.get('status', PENDING), 0) + 1
+    total = len(record.get('messages', []))
+    status = record.get('status', 'queued')
+    if status == 'done':
+        message = f"Sent {counts[SENT]} emails" + (f", {counts[FAILED]} failed" if counts[FAILED] else "")
+    elif status == 'cancelled':
+        message = f"Cancelled after sending {counts[SENT]} of {total} emails"
+    else:
+        message = f"Sending emails... {counts[SENT] + counts[FAILED]}/{total}"
+    return {
+        'batch_id': record.get('batch_id'),
+        'status': status,
+        'total': total,
+        'sent': counts[SENT],
+        'failed': counts[FAILED],
+        'pending': counts[PENDING],
+        'created_at': record.get('created_at'),
+        'updated_at': record.get('updated_at'),
+        'message': message,
+    }
@@ -8,6 +8,10 @@ Setup:
 1. Add RESEND_API_KEY to .env file
 2. Verify your domain at https://resend.com/domains
 3. Emails will be sent from noreply@graider.live
+
+Bulk sends (/api/send-emails behind FLAG_EMAIL_OUTBOX, send_bulk_grades)
+go through backend/services/email_outbox.py, which uses send_batch (Resend's
+/emails/batch endpoint) and per-message idempotency keys.
 """
 
 import logging
@@ -25,6 +29,13 @@ except ImportError:
     RESEND_AVAILABLE = False
     _logger.warning("resend package not installed — run: pip install resend")
 
+# Resend's /emails/batch accepts at most 100 emails per call.
+BATCH_MAX = 100
+
+
+class BatchRejected(Exception):
+    """Resend rejected a whole batch at validation; none of it was sent."""
+
 
 class GraiderEmailer:
     """Send grade feedback emails via Resend API."""
@@ -91,8 +102,25 @@ class GraiderEmailer:
             os.chmod(self.config_path, 0o600)
         _logger.info("Email configuration saved to %s", self.config_path)
 
+    def _email_params(self, to_email: str, subject: str, body: str,
+                      reply_to: str = None) -> dict:
+        """Build Resend send params (reply-to falls back to the config's teacher email)."""
+        params = {
+            "from": self.from_email,
+            "to": [to_email],
+            "subject": subject,
+            "text": body,
+        }
+
+        # Add reply-to if provided (teacher's email)
+        if reply_to:
+            params["reply_to"] = reply_to
+        elif self.config.get('teacher_email'):
+            params["reply_to"] = self.config.get('teacher_email')
+        return params
+
     def send_email(self, to_email: str, student_name: str, subject: str, body: str,
-                   reply_to: str = None) -> bool:
+                   reply_to: str = None, idempotency_key: str = None) -> bool:
         """
         Send a single email via Resend.
 
@@ -102,6 +130,8 @@ class GraiderEmailer:
             subject: Email subject
             body: Email body (plain text)
             reply_to: Optional reply-to address (teacher's email)
+            idempotency_key: Optional Idempotency-Key; Resend drops repeats
+                of the same key for 24 hours, so retries never double-send
 
         Returns:
             True if successful
@@ -115,20 +145,12 @@ class GraiderEmailer:
             return False
 
         try:
-            params = {
-                "from": self.from_email,
-                "to": [to_email],
-                "subject": subject,
-                "text": body,
-            }
-
-            # Add reply-to if provided (teacher's email)
-            if reply_to:
-                params["reply_to"] = reply_to
-            elif self.config.get('teacher_email'):
-                params["reply_to"] = self.config.get('teacher_email')
+            params = self._email_params(to_email, subject, body, reply_to)
 
-            response = resend.Emails.send(params)
+            if idempotency_key:
+                response = resend.Emails.send(params, {"idempotency_key": idempotency_key})
+            else:
+                response = resend.Emails.send(params)
 
             if response and response.get('id'):
                 _logger.info("email sent to %s (%s)", student_name, to_email)
@@ -141,22 +163,54 @@ class GraiderEmailer:
             _logger.exception("email send raised for %s: %s", to_email, e)
             return False
 
-    def send_grade_email(self, student_info: dict, grade_result: dict,
-                         assignment_name: str, reply_to: str = None) -> bool:
+    @property
+    def batch_available(self) -> bool:
+        """True when send_batch can be used (configured, SDK has Batch)."""
+        return bool(RESEND_AVAILABLE and self.resend_available and hasattr(resend, 'Batch'))
+
+    def send_batch(self, messages: list, idempotency_key: str = None) -> list:
         """
-        Send a grade feedback email to a student.
+        Send up to BATCH_MAX emails in one Resend /emails/batch call.
 
         Args:
-            student_info: Dict with student_name, first_name, email
-            grade_result: Dict with score, letter_grade, feedback
-            assignment_name: Name of the assignment
-            reply_to: Teacher's email for replies
-        """
-        email = student_info.get('email', '')
-        if not email:
-            _logger.warning("no email on record for %s", student_info.get('student_name', 'Unknown'))
-            return False
+            messages: Dicts with to, subject, text and optional reply_to
+            idempotency_key: Optional Idempotency-Key for the whole call
 
+        Returns:
+            Resend email ids, in message order
+
+        Raises:
+            BatchRejected: the batch failed validation (strict mode), so no
+                email in it was sent and each can be retried on its own.
+            Exception: anything else (network, rate limit, 5xx). Whether
+                Resend accepted the batch is unknown; retry the same batch
+                with the same idempotency key.
+        """
+        if not self.batch_available:
+            raise RuntimeError("Resend batch sending is not available")
+        if len(messages) > BATCH_MAX:
+            raise ValueError(f"at most {BATCH_MAX} emails per batch")
+
+        params = [
+            self._email_params(m['to'], m['subject'], m['text'], m.get('reply_to'))
+            for m in messages
+        ]
+        options = {"idempotency_key": idempotency_key} if idempotency_key else None
+        try:
+            response = resend.Batch.send(params, options)
+        except (resend.exceptions.ValidationError,
+                resend.exceptions.MissingRequiredFieldsError) as e:
+            raise BatchRejected(str(e)) from e
+
+        ids = [item.get('id') for item in (response or {}).get('data') or []]
+        if len(ids) != len(messages) or not all(ids):
+            raise RuntimeError(f"batch response has {len(ids)} ids for {len(messages)} emails")
+        _logger.info("batch of %d emails sent", len(messages))
+        return ids
+
+    def grade_email_content(self, student_info: dict, grade_result: dict,
+                            assignment_name: str) -> tuple:
+        """Return (first_name, subject, body) for a grade feedback email."""
         first_name = student_info.get('first_name', 'Student').split()[0]
         teacher = self.config.get('teacher_name', 'Your Teacher')
 
@@ -180,7 +234,25 @@ If you have any questions about your grade, please see me during class.
 ---
 This email was sent by Graider (https://graider.live)
 """
+        return first_name, subject, body
+
+    def send_grade_email(self, student_info: dict, grade_result: dict,
+                         assignment_name: str, reply_to: str = None) -> bool:
+        """
+        Send a grade feedback email to a student.
+
+        Args:
+            student_info: Dict with student_name, first_name, email
+            grade_result: Dict with score, letter_grade, feedback
+            assignment_name: Name of the assignment
+            reply_to: Teacher's email for replies
+        """
+        email = student_info.get('email', '')
+        if not email:
+            _logger.warning("no email on record for %s", student_info.get('student_name', 'Unknown'))
+            return False
 
+        first_name, subject, body = self.grade_email_content(student_info, grade_result, assignment_name)
         return self.send_email(email, first_name, subject, body, reply_to)
 
     def send_bulk_grades(self, grades: list, assignment_name: str = None,
@@ -188,6 +260,10 @@ This email was sent by Graider (https://graider.live)
         """
         Send grade emails to all students in the grades list.
 
+        With FLAG_EMAIL_OUTBOX on, the emails go out through
+        email_outbox.deliver_messages (Resend batch calls, or bounded
+        concurrent sends, with idempotency keys) instead of one by one.
+
         Args:
             grades: List of grade dicts (from grading run)
             assignment_name: Override assignment name
@@ -196,8 +272,12 @@ This email was sent by Graider (https://graider.live)
         Returns:
             Dict with sent/failed/skipped counts
         """
+        from backend.services import email_outbox
+
         _logger.info("sending %d grade emails", len(grades))
 
+        use_outbox = email_outbox.email_outbox_enabled()
+        messages = []
         sent = 0
         failed = 0
         skipped = 0
@@ -227,11 +307,21 @@ This email was sent by Graider (https://graider.live)
 
             assignment = assignment_name or grade.get('assignment', 'Assignment')
 
-            if self.send_grade_email(student_info, grade_result, assignment, reply_to):
+            if use_outbox:
+                first_name, subject, body = self.grade_email_content(student_info, grade_result, assignment)
+                messages.append(email_outbox.new_message(email, subject, body, name=first_name,
+                                                         reply_to=reply_to))
+            elif self.send_grade_email(student_info, grade_result, assignment, reply_to):
                 sent += 1
             else:
                 failed += 1
 
+        if messages:
+            outcomes = email_outbox.deliver_messages(self, messages)
+            sent = sum(1 for o in outcomes.values() if o['status'] == email_outbox.SENT)
+            failed = len(outcomes) - sent
+            skipped += len(messages) - len(outcomes)  # identical emails go out once
+
         _logger.info("bulk email summary — sent: %d, failed: %d, skipped: %d", sent, failed, skipped)
 
         return {'sent': sent, 'failed': failed, 'skipped': skipped}
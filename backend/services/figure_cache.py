@@ -0,0 +1,252 @@
+"""Content-addressed cache of rendered figures (PNG bytes).
+
+The create_* helpers in visualization.py and
+planner_export._create_visual_for_question re-render a matplotlib figure at
+150 dpi on every export. A question's visual is usually rendered again for
+the answer key and again on every re-export. Each render costs tens to
+hundreds of milliseconds of matplotlib work.
+
+Renders are keyed by `figure_key(kind, spec, **options)`: a SHA-256 over
+the normalized visual spec (dict keys sorted, tuples as lists) plus render
+options and `RENDER_VERSION`. Integral floats are not folded to ints: the
+labels print the raw value, so 6 and 6.0 are different figures. Bump
+`RENDER_VERSION` whenever drawing code changes output so old entries stop
+matching.
+
+`FigureCache` keeps a bounded in-memory LRU in front of a directory of
+``<key>.png`` files (plus ``<key>.json`` for entries with metadata). Disk
+hits touch the file's mtime, and the disk is trimmed oldest-first when it
+goes over its byte budget. Disk errors are logged and the render just runs
+uncached.
+
+Gated by FLAG_FIGURE_CACHE (default off); with the flag off every call
+renders exactly as before.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+from backend.feature_flags import flag_enabled
+
+_logger = logging.getLogger(__name__)
+
+# Part of every key: bump when figure drawing code changes its output.
+RENDER_VERSION = 2
+
+_PNG_DATA_URL = "data:image/png;base64,"
+
+
+def figure_cache_enabled() -> bool:
+    return flag_enabled('figure_cache', default=False)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, bool) or value is None or isinstance(value, (int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if hasattr(value, 'tolist'):  # numpy arrays / scalars
+        return _normalize(value.tolist())
+    return repr(value)
+
+
+def figure_key(kind: str, spec: Any, **options: Any) -> str:
+    """Stable key for rendering ``spec`` as ``kind`` with ``options``."""
+    payload = json.dumps(
+        [RENDER_VERSION, kind, _normalize(spec), _normalize(options)],
+        sort_keys=True, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FigureCache:
+    """Memory LRU over a size-bounded directory of rendered figures."""
+
+    def __init__(self, directory: str | Path | None, max_memory_bytes: int = 32 << 20,
+                 max_disk_bytes: int = 256 << 20):
+        self.directory = Path(directory) if directory else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[bytes, dict]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[bytes, dict] | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, data: bytes, meta: dict | None = None) -> None:
+        entry = (data, meta or {})
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+            }
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def _remember(self, key: str, entry: tuple[bytes, dict]) -> None:
+        size = len(entry[0])
+        if size > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old[0])
+        self._memory[key] = entry
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.directory / f"{key}.png", self.directory / f"{key}.json"
+
+    def _read_disk(self, key: str) -> tuple[bytes, dict] | None:
+        if self.directory is None:
+            return None
+        png_path, meta_path = self._paths(key)
+        try:
+            data = png_path.read_bytes()
+            meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+            os.utime(png_path)  # LRU order for disk eviction
+            return data, meta
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa: BLE001  # broad catch: a bad entry is a miss
+            _logger.debug("figure cache read failed for %s", key, exc_info=True)
+            return None
+
+    def _write_disk(self, key: str, entry: tuple[bytes, dict]) -> None:
+        if self.directory is None:
+            return
+        data, meta = entry
+        png_path, meta_path = self._paths(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if meta:
+                meta_path.write_text(json.dumps(meta))
+            tmp = png_path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, png_path)
+        except Exception:  # noqa: BLE001  # broad catch: caching is best-effort; error is logged
+            _logger.warning("figure cache write failed for %s", key, exc_info=True)
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """Delete least-recently-used files until the directory fits its budget."""
+        try:
+            files = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob('*.png')]
+        except OSError:
+            _logger.debug("figure cache scan failed", exc_info=True)
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+                path.with_suffix('.json').unlink(missing_ok=True)
+                total -= size
+            except OSError:
+                _logger.debug("figure cache evict failed for %s", path, exc_info=True)
+        with self._lock:
+            self._disk_bytes = total
+
+
+_cache: FigureCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_figure_cache() -> FigureCache:
+    """Process-wide cache under ~/.graider_data/figure_cache (created lazily)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FigureCache(
+                    os.getenv('FIGURE_CACHE_DIR') or os.path.expanduser("~/.graider_data/figure_cache"),
+                    max_disk_bytes=int(os.getenv('FIGURE_CACHE_MAX_MB') or '256') << 20,
+                )
+    return _cache
+
+
+def cached_data_url(kind: str, render: Callable[[], str], spec: Any, **options: Any) -> str:
+    """Return ``render()``'s PNG data URL, served from the cache when enabled."""
+    if not figure_cache_enabled():
+        return render()
+    cache = get_figure_cache()
+    key = figure_key(kind, spec, **options)
+    entry = cache.get(key)
+    if entry is not None:
+        return _PNG_DATA_URL + base64.b64encode(entry[0]).decode('utf-8')
+    result = render()
+    if isinstance(result, str) and result.startswith(_PNG_DATA_URL):
+        cache.put(key, base64.b64decode(result[len(_PNG_DATA_URL):]))
+    return result
+
+
+def cached_figure(fn: Callable[..., str]) -> Callable[..., str]:
+    """Decorator for visualization helpers that return a PNG data URL.
+
+    The key is the function name plus its bound arguments (defaults
+    applied), so ``f(1)`` and ``f(min_val=1)`` share an entry.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not figure_cache_enabled():
+            return fn(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return cached_data_url(fn.__name__, lambda: fn(*args, **kwargs), dict(bound.arguments),
+                               dpi=150, fmt='png')
+
+    return wrapper
@@ -8,12 +8,14 @@ imports), each wrapped in with_retry(..., label=...). API keys resolve via backe
 (env / contextvars / per-teacher / district). Response schemas + token accounting come from
 backend.services.grading_models. Diagnostic prints became _logger calls on extraction; the
 RETURN VALUES (the grading contract) are unchanged and pinned by the SDK-fake golden net
-(tests/test_grader_golden.py).
+(tests/test_grader_golden.py). Each caller is timed as the ``llm`` stage of the current grading
+run (backend/observability/stage_timing.py).
 """
 import json
 import logging
 
 from backend.api_keys import get_api_key as _get_api_key
+from backend.observability import stage_timing
 from backend.retry import with_retry
 from backend.services.grader_json import _try_parse_json_fallback
 from backend.services.grader_text_prep import (
@@ -27,6 +29,7 @@ from backend.services.grading_prep import _is_math_subject
 _logger = logging.getLogger(__name__)
 
 
+@stage_timing.timed(stage_timing.LLM)
 def grade_per_question(question: str, student_answer: str, expected_answer: str,
                        points: int, grade_level: str, subject: str,
                        teacher_instructions: str, grading_style: str,
@@ -269,6 +272,7 @@ Read these FIRST, then score accordingly:
     }
 
 
+@stage_timing.timed(stage_timing.LLM)
 def detect_ai_plagiarism(student_responses: str, grade_level: str = '6', token_tracker: 'TokenTracker' = None, student_name: str = '') -> dict:
     """
     Dedicated AI/Plagiarism detection using GPT-4o-mini.
@@ -393,6 +397,7 @@ Respond ONLY with this JSON (no other text):
         }
 
 
+@stage_timing.timed(stage_timing.LLM)
 def _translate_feedback(feedback: str, target_language: str, ai_model: str = 'gpt-4o-mini', token_tracker: 'TokenTracker' = None, student_name: str = '') -> str:
     """
     Translate grading feedback into the target language using a dedicated API call.
@@ -465,6 +470,7 @@ FEEDBACK TO TRANSLATE:
         return ""
 
 
+@stage_timing.timed(stage_timing.LLM)
 def generate_feedback(question_results: list, total_score: int, total_possible: int,
                       letter_grade: str, grade_level: str, subject: str,
                       teacher_instructions: str = '', ell_language: str = None,
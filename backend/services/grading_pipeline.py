@@ -18,6 +18,7 @@ import re
 
 from backend.api_keys import get_api_key as _get_api_key
 from backend.retry import with_retry
+from backend.observability import stage_timing
 from backend.services.grader_json import _try_parse_json_fallback
 from backend.services.grader_text_prep import preprocess_for_ai_detection, sanitize_grading_prompt_for_ai, sanitize_pii_for_ai
 from backend.services.grading_leaves import (
@@ -1277,9 +1278,10 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
     is_fitb = _detect_fitb_assignment(content, custom_ai_instructions)
 
     # PRE-EXTRACT student responses to prevent AI hallucination
-    is_fitb, extraction_result, extracted_responses_text, early_result = _pre_extract_responses(
-        is_fitb, assignment_data, content, custom_markers, exclude_markers,
-        assignment_template, marker_config, extraction_mode)
+    with stage_timing.span(stage_timing.EXTRACTION):
+        is_fitb, extraction_result, extracted_responses_text, early_result = _pre_extract_responses(
+            is_fitb, assignment_data, content, custom_markers, exclude_markers,
+            assignment_template, marker_config, extraction_mode)
     if early_result is not None:
         return early_result
 
@@ -1296,7 +1298,8 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
     # FERPA: strip student PII from the assembled prompt before any external LLM call. Covers the
     # image-path message construction (which uses prompt_text directly); the text path's full_prompt
     # is sanitized again below after the extracted responses are appended.
-    prompt_text = sanitize_grading_prompt_for_ai(student_name, prompt_text)
+    with stage_timing.span(stage_timing.PII_SANITIZE):
+        prompt_text = sanitize_grading_prompt_for_ai(student_name, prompt_text)
 
     _logger.info(f"  🤖 Grading with AI...")
 
@@ -1304,7 +1307,8 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
         # FERPA COMPLIANCE: Sanitize PII from text content before sending to AI
         if assignment_data["type"] == "text":
             original_content = assignment_data['content']
-            anon_id, sanitized_content = sanitize_pii_for_ai(student_name, original_content)
+            with stage_timing.span(stage_timing.PII_SANITIZE):
+                anon_id, sanitized_content = sanitize_pii_for_ai(student_name, original_content)
 
             # Log if any PII was removed (for audit trail)
             if sanitized_content != original_content:
@@ -1317,7 +1321,8 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
                 _logger.info(f"  ✅ Using ONLY pre-extracted responses (hallucination prevention)")
                 full_prompt = prompt_text + f"\n\nSTUDENT'S VERIFIED RESPONSES (extracted from document):\n{extracted_responses_text}"
                 # FERPA: the appended extracted responses are raw — re-sanitize the full prompt.
-                full_prompt = sanitize_grading_prompt_for_ai(student_name, full_prompt)
+                with stage_timing.span(stage_timing.PII_SANITIZE):
+                    full_prompt = sanitize_grading_prompt_for_ai(student_name, full_prompt)
             else:
                 # Extraction failed or found nothing - REQUIRES MANUAL REVIEW
                 _logger.info(f"  ⚠️  HARD BLOCK: No responses extracted - flagging for manual review")
@@ -1379,11 +1384,12 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
             else:
                 claude_content = messages[0]["content"] if isinstance(messages[0]["content"], str) else messages[0]["content"][0]["text"]
 
-            response = with_retry(lambda: client.messages.create(
-                model=actual_model,
-                max_tokens=2000,
-                messages=[{"role": "user", "content": claude_content}]
-            ), label="grade_assignment_anthropic")
+            with stage_timing.span(stage_timing.LLM):
+                response = with_retry(lambda: client.messages.create(
+                    model=actual_model,
+                    max_tokens=2000,
+                    messages=[{"role": "user", "content": claude_content}]
+                ), label="grade_assignment_anthropic")
             if token_tracker:
                 token_tracker.record_anthropic(response, actual_model)
             response_text = response.content[0].text.strip()
@@ -1397,16 +1403,18 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
                     "data": image_data
                 }
                 full_prompt = prompt_text + "\n\nSTUDENT'S WORK (see attached image):\nIMPORTANT: Only grade what you can CLEARLY see in the image. If text is unclear or cut off, mark as incomplete rather than guessing."
-                response = with_retry(
-                    lambda: client.generate_content([full_prompt, image_part]),
-                    label="grade_assignment_gemini_image",
-                )
+                with stage_timing.span(stage_timing.LLM):
+                    response = with_retry(
+                        lambda: client.generate_content([full_prompt, image_part]),
+                        label="grade_assignment_gemini_image",
+                    )
             else:
                 text_content = messages[0]["content"] if isinstance(messages[0]["content"], str) else messages[0]["content"][0]["text"]
-                response = with_retry(
-                    lambda: client.generate_content(text_content),
-                    label="grade_assignment_gemini_text",
-                )
+                with stage_timing.span(stage_timing.LLM):
+                    response = with_retry(
+                        lambda: client.generate_content(text_content),
+                        label="grade_assignment_gemini_text",
+                    )
             if token_tracker:
                 token_tracker.record_gemini(response, actual_model)
             response_text = response.text.strip()
@@ -1414,14 +1422,15 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
         else:
             # OpenAI API call with structured output for guaranteed schema
             try:
-                response = with_retry(lambda: client.beta.chat.completions.parse(
-                    model=ai_model,
-                    messages=messages,
-                    response_format=GradingResponse,
-                    max_tokens=2000,
-                    temperature=0,
-                    seed=42
-                ), label="grade_assignment_structured")
+                with stage_timing.span(stage_timing.LLM):
+                    response = with_retry(lambda: client.beta.chat.completions.parse(
+                        model=ai_model,
+                        messages=messages,
+                        response_format=GradingResponse,
+                        max_tokens=2000,
+                        temperature=0,
+                        seed=42
+                    ), label="grade_assignment_structured")
                 if token_tracker:
                     token_tracker.record_openai(response, ai_model)
                 parsed = response.choices[0].message.parsed
@@ -1438,13 +1447,14 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
             except Exception as structured_err:  # noqa: BLE001  # broad catch: error is logged
                 # Structured output not supported for this model — fall back to standard call
                 _logger.info(f"  ⚠️  Structured output failed ({structured_err}), falling back to standard API")
-                response = with_retry(lambda: client.chat.completions.create(
-                    model=ai_model,
-                    messages=messages,
-                    max_tokens=2000,
-                    temperature=0,
-                    seed=42
-                ), label="grade_assignment_fallback")
+                with stage_timing.span(stage_timing.LLM):
+                    response = with_retry(lambda: client.chat.completions.create(
+                        model=ai_model,
+                        messages=messages,
+                        max_tokens=2000,
+                        temperature=0,
+                        seed=42
+                    ), label="grade_assignment_fallback")
                 if token_tracker:
                     token_tracker.record_openai(response, ai_model)
                 response_text = response.choices[0].message.content.strip()
@@ -1477,22 +1487,23 @@ def grade_assignment(student_name: str, assignment_data: dict, custom_ai_instruc
                 raise json.JSONDecodeError("Failed to parse response", response_text, 0)
 
         # Post-processing: fix double-escaped newlines from some AI providers
-        return _finalize_grading_result(
-            result,
-            original_text=original_text,
-            ell_language=ell_language,
-            ai_model=ai_model,
-            token_tracker=token_tracker,
-            student_name=student_name,
-            rubric_weights=rubric_weights,
-            grading_style=grading_style,
-            extraction_result=extraction_result,
-            student_id=student_id,
-            current_writing_style=current_writing_style,
-            style_comparison=style_comparison,
-            extracted_responses_section=extracted_responses_section,
-            teacher_id=teacher_id,
-        )
+        with stage_timing.span(stage_timing.POSTPROCESS):
+            return _finalize_grading_result(
+                result,
+                original_text=original_text,
+                ell_language=ell_language,
+                ai_model=ai_model,
+                token_tracker=token_tracker,
+                student_name=student_name,
+                rubric_weights=rubric_weights,
+                grading_style=grading_style,
+                extraction_result=extraction_result,
+                student_id=student_id,
+                current_writing_style=current_writing_style,
+                style_comparison=style_comparison,
+                extracted_responses_section=extracted_responses_section,
+                teacher_id=teacher_id,
+            )
 
     except json.JSONDecodeError as e:
         return _recover_grading_json_decode_error(response_text, e)
@@ -1665,7 +1676,7 @@ def _multipass_grade_questions_parallel(responses, marker_config, effort_points,
                     _logger.debug("SymPy equivalence check failed: %s", type(e).__name__)  # SymPy failed — fall through to normal AI grading
 
             f = executor.submit(
-                grade_per_question,
+                stage_timing.propagate(grade_per_question),
                 question=question,
                 student_answer=answer,
                 expected_answer=expected,
@@ -1728,8 +1739,9 @@ def grade_multipass(student_name: str, assignment_data: dict, custom_ai_instruct
     content = assignment_data.get("content", "")
 
     # === EXTRACTION ===
-    extraction_result, early_result = _multipass_perform_extraction(
-        assignment_data, content, custom_markers, exclude_markers, assignment_template)
+    with stage_timing.span(stage_timing.EXTRACTION):
+        extraction_result, early_result = _multipass_perform_extraction(
+            assignment_data, content, custom_markers, exclude_markers, assignment_template)
     if early_result is not None:
         return early_result
 
@@ -2009,15 +2021,16 @@ def grade_with_parallel_detection(student_name: str, assignment_data: dict, cust
     # Priority: Graider structured tables > Graider text fallback > regex extraction
     extraction_result = None
     graider_tables = assignment_data.get("graider_tables")
-    if graider_tables:
-        _logger.info(f"  📊 Parallel detection: Using Graider table extraction ({len(graider_tables)} tables)")
-        extraction_result = extract_from_tables(graider_tables, exclude_markers)
-    elif assignment_data.get("type") == "text" and content:
-        # Try GRAIDER tag plain-text fallback before generic extraction
-        if '[GRAIDER:' in content:
-            extraction_result = extract_from_graider_text(content, exclude_markers)
-        if not extraction_result or not extraction_result.get("extracted_responses"):
-            extraction_result = extract_student_responses(content, custom_markers, exclude_markers, assignment_template)
+    with stage_timing.span(stage_timing.EXTRACTION):
+        if graider_tables:
+            _logger.info(f"  📊 Parallel detection: Using Graider table extraction ({len(graider_tables)} tables)")
+            extraction_result = extract_from_tables(graider_tables, exclude_markers)
+        elif assignment_data.get("type") == "text" and content:
+            # Try GRAIDER tag plain-text fallback before generic extraction
+            if '[GRAIDER:' in content:
+                extraction_result = extract_from_graider_text(content, exclude_markers)
+            if not extraction_result or not extraction_result.get("extracted_responses"):
+                extraction_result = extract_student_responses(content, custom_markers, exclude_markers, assignment_template)
 
     if extraction_result and extraction_result.get("extracted_responses"):
         # Filter out FITB and vocab items — only send written responses to detection
@@ -2053,10 +2066,10 @@ def grade_with_parallel_detection(student_name: str, assignment_data: dict, cust
     # Run detection and grading in parallel using ThreadPoolExecutor
     with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
         # Submit both tasks
-        detection_future = executor.submit(detect_ai_plagiarism, detection_text, grade_level, token_tracker=tracker, student_name=student_name)
+        detection_future = executor.submit(stage_timing.propagate(detect_ai_plagiarism), detection_text, grade_level, token_tracker=tracker, student_name=student_name)
 
         if use_multipass:
-            grading_future = executor.submit(grade_multipass, student_name, assignment_data,
+            grading_future = executor.submit(stage_timing.propagate(grade_multipass), student_name, assignment_data,
                                              custom_ai_instructions, grade_level, subject,
                                              ai_model, student_id, assignment_template, rubric_prompt,
                                              custom_markers, exclude_markers, marker_config, effort_points,
@@ -2064,7 +2077,7 @@ def grade_with_parallel_detection(student_name: str, assignment_data: dict, cust
                                              student_history=student_history, rubric_weights=rubric_weights,
                                              teacher_id=teacher_id)
         else:
-            grading_future = executor.submit(grade_assignment, student_name, assignment_data,
+            grading_future = executor.submit(stage_timing.propagate(grade_assignment), student_name, assignment_data,
                                              custom_ai_instructions, grade_level, subject,
                                              ai_model, student_id, assignment_template, rubric_prompt,
                                              custom_markers, exclude_markers, marker_config, effort_points,
@@ -2216,7 +2229,7 @@ def grade_with_ensemble(student_name: str, assignment_data: dict, custom_ai_inst
         futures = {}
         for model in ensemble_models:
             future = executor.submit(
-                grade_assignment, student_name, assignment_data, custom_ai_instructions,
+                stage_timing.propagate(grade_assignment), student_name, assignment_data, custom_ai_instructions,
                 grade_level, subject, model, student_id, assignment_template, rubric_prompt,
                 custom_markers, exclude_markers, marker_config, effort_points, extraction_mode,
                 grading_style, rubric_weights=rubric_weights, teacher_id=teacher_id
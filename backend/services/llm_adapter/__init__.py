@@ -1,5 +1,6 @@
 """LLM provider adapter layer (Phase 5a PR D1 + D2)."""
-from typing import Iterator, Protocol, runtime_checkable
+import importlib
+from typing import TYPE_CHECKING, Iterator, Protocol, runtime_checkable
 
 from backend.services.llm_adapter.types import (
     ContentPart,
@@ -29,9 +30,23 @@ from backend.services.llm_adapter.streaming import (
     UsageEvent,
 )
 
-from backend.services.llm_adapter.anthropic_adapter import AnthropicAdapter
-from backend.services.llm_adapter.gemini_adapter import GeminiAdapter
-from backend.services.llm_adapter.openai_adapter import OpenAIAdapter
+# Adapter classes load on first access (PEP 562 __getattr__ below): each
+# imports its provider SDK, and anthropic / openai / google-genai together
+# add seconds to every process that merely imports the request types.
+_ADAPTER_MODULES = {
+    "AnthropicAdapter": "backend.services.llm_adapter.anthropic_adapter",
+    "GeminiAdapter": "backend.services.llm_adapter.gemini_adapter",
+    "OpenAIAdapter": "backend.services.llm_adapter.openai_adapter",
+}
+
+
+def __getattr__(name):
+    module = _ADAPTER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    adapter = getattr(importlib.import_module(module), name)
+    globals()[name] = adapter
+    return adapter
 
 
 @runtime_checkable
@@ -55,6 +70,12 @@ class LLMAdapter(Protocol):
     def generate_image(self, request: ImageRequest) -> ImageResponse: ...
 
 
+if TYPE_CHECKING:
+    from backend.services.llm_adapter.anthropic_adapter import AnthropicAdapter
+    from backend.services.llm_adapter.gemini_adapter import GeminiAdapter
+    from backend.services.llm_adapter.openai_adapter import OpenAIAdapter
+
+
 __all__ = [
     # Adapters + Protocol
     "AnthropicAdapter",
@@ -24,6 +24,12 @@ import sentry_sdk
 from backend.observability.events import emit
 from backend.retry import with_retry
 from backend.services.llm_adapter.breakers import get_breaker
+from backend.services.llm_adapter.telemetry import (
+    cached_prompt_tokens,
+    feature_label,
+    retry_observer,
+    time_first_token,
+)
 from backend.services.llm_adapter.streaming import (
     FinishEvent,
     StreamEvent,
@@ -201,6 +207,7 @@ class AnthropicAdapter:
             raw = with_retry(
                 _breakered,
                 label=f"anthropic.messages.create({request.model})",
+                on_retry=retry_observer(self._provider, request),
                 non_retryable=(pybreaker.CircuitBreakerError,),
             )
         except Exception as e:
@@ -210,6 +217,7 @@ class AnthropicAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 error_kind=type(e).__name__,
             )
@@ -275,9 +283,11 @@ class AnthropicAdapter:
             "llm.call.complete",
             provider=self._provider,
             model=request.model,
+            feature_label=feature_label(request),
             duration_ms=duration_ms,
             prompt_tokens=usage.prompt_tokens,
             completion_tokens=usage.completion_tokens,
+            cached_tokens=cached_prompt_tokens(raw.usage),
             cost_usd=usage.cost_usd,
             finish_reason=finish_reason,
         )
@@ -292,6 +302,10 @@ class AnthropicAdapter:
         )
 
     def stream_chat(self, request: LLMRequest) -> Iterator[StreamEvent]:
+        """Yield StreamEvents for ``request`` (see `_stream_chat`), timing the first token."""
+        return time_first_token(self._stream_chat(request), self._provider, request)
+
+    def _stream_chat(self, request: LLMRequest) -> Iterator[StreamEvent]:
         """Yield StreamEvent instances from an Anthropic streaming response.
 
         Uses client.messages.stream() context manager. The initial open
@@ -362,6 +376,7 @@ class AnthropicAdapter:
             stream = with_retry(
                 _breakered_open_stream,
                 label=f"anthropic.messages.stream({request.model})",
+                on_retry=retry_observer(self._provider, request),
                 non_retryable=(pybreaker.CircuitBreakerError,),
             )
         except Exception as e:
@@ -371,6 +386,7 @@ class AnthropicAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 streaming=True,
                 error_kind=type(e).__name__,
@@ -387,6 +403,7 @@ class AnthropicAdapter:
         block_meta: dict[int, dict[str, str]] = {}
         input_tokens = 0
         output_tokens = 0
+        cached_tokens = 0
         finish_reason_raw: str | None = None
 
         try:
@@ -396,6 +413,7 @@ class AnthropicAdapter:
                 if etype == "message_start":
                     try:
                         input_tokens = event.message.usage.input_tokens or 0
+                        cached_tokens = cached_prompt_tokens(event.message.usage)
                     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
                         # SDK-defensive: usage shape varies across anthropic
                         # versions. Missing → 0 input tokens (cost slightly
@@ -494,6 +512,7 @@ class AnthropicAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 streaming=True,
                 error_kind=type(e).__name__,
@@ -553,10 +572,12 @@ class AnthropicAdapter:
             "llm.call.complete",
             provider=self._provider,
             model=request.model,
+            feature_label=feature_label(request),
             duration_ms=duration_ms,
             streaming=True,
             prompt_tokens=input_tokens,
             completion_tokens=output_tokens,
+            cached_tokens=cached_tokens,
             cost_usd=usage.cost_usd,
             finish_reason=finish_reason,
         )
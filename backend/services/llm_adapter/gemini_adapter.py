@@ -31,6 +31,12 @@ from backend.services.llm_adapter.breakers import get_breaker
 
 from backend.observability.events import emit
 from backend.retry import with_retry
+from backend.services.llm_adapter.telemetry import (
+    cached_prompt_tokens,
+    feature_label,
+    retry_observer,
+    time_first_token,
+)
 from backend.services.llm_adapter.streaming import (
     FinishEvent,
     StreamEvent,
@@ -217,6 +223,7 @@ class GeminiAdapter:
             raw = with_retry(
                 _breakered,
                 label=f"gemini.generate_content({request.model})",
+                on_retry=retry_observer(self._provider, request),
                 non_retryable=(pybreaker.CircuitBreakerError,),
             )
         except Exception as e:
@@ -226,6 +233,7 @@ class GeminiAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 error_kind=type(e).__name__,
             )
@@ -301,9 +309,11 @@ class GeminiAdapter:
             "llm.call.complete",
             provider=self._provider,
             model=request.model,
+            feature_label=feature_label(request),
             duration_ms=duration_ms,
             prompt_tokens=usage.prompt_tokens,
             completion_tokens=usage.completion_tokens,
+            cached_tokens=cached_prompt_tokens(getattr(raw, "usage_metadata", None)),
             cost_usd=usage.cost_usd,
             finish_reason=finish_reason,
         )
@@ -323,6 +333,10 @@ class GeminiAdapter:
         )
 
     def stream_chat(self, request: LLMRequest) -> Iterator[StreamEvent]:
+        """Yield StreamEvents for ``request`` (see `_stream_chat`), timing the first token."""
+        return time_first_token(self._stream_chat(request), self._provider, request)
+
+    def _stream_chat(self, request: LLMRequest) -> Iterator[StreamEvent]:
         """Yield StreamEvent instances from a Gemini streaming response.
 
         Uses generate_content_stream(). The initial call is protected
@@ -395,6 +409,7 @@ class GeminiAdapter:
             stream = with_retry(
                 _breakered_stream,
                 label=f"gemini.generate_content(stream, {request.model})",
+                on_retry=retry_observer(self._provider, request),
                 non_retryable=(pybreaker.CircuitBreakerError,),
             )
         except Exception as e:
@@ -404,6 +419,7 @@ class GeminiAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 streaming=True,
                 error_kind=type(e).__name__,
@@ -418,6 +434,7 @@ class GeminiAdapter:
 
         prompt_tokens = 0
         completion_tokens = 0
+        cached_tokens = 0
         finish_reason_raw: str | None = None
 
         try:
@@ -481,6 +498,7 @@ class GeminiAdapter:
                         if hasattr(chunk, "usage_metadata") and chunk.usage_metadata:
                             prompt_tokens = getattr(chunk.usage_metadata, "prompt_token_count", 0) or 0
                             completion_tokens = getattr(chunk.usage_metadata, "candidates_token_count", 0) or 0
+                            cached_tokens = cached_prompt_tokens(chunk.usage_metadata)
                     except Exception as e:  # noqa: BLE001  # broad catch: error is logged
                         # SDK-defensive: streaming chunk usage_metadata schema
                         # varies. Missing → keep prior token counts.
@@ -506,6 +524,7 @@ class GeminiAdapter:
                     level="warning",
                     provider=self._provider,
                     model=request.model,
+                    feature_label=feature_label(request),
                     duration_ms=duration_ms,
                     streaming=True,
                     error_kind=type(e).__name__,
@@ -551,10 +570,12 @@ class GeminiAdapter:
             "llm.call.complete",
             provider=self._provider,
             model=request.model,
+            feature_label=feature_label(request),
             duration_ms=duration_ms,
             streaming=True,
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
             cost_usd=usage.cost_usd,
             finish_reason=finish_reason,
         )
@@ -17,6 +17,12 @@ from openai import OpenAI
 from backend.observability.events import emit
 from backend.services.llm_adapter.breakers import get_breaker
 from backend.retry import with_retry
+from backend.services.llm_adapter.telemetry import (
+    cached_prompt_tokens,
+    feature_label,
+    retry_observer,
+    time_first_token,
+)
 from backend.services.llm_adapter.streaming import (
     FinishEvent,
     StreamEvent,
@@ -238,6 +244,7 @@ class OpenAIAdapter:
             raw = with_retry(
                 _breakered,
                 label=f"openai.chat.completions.create({request.model})",
+                on_retry=retry_observer(self._provider, request),
                 non_retryable=(pybreaker.CircuitBreakerError,),
             )
         except Exception as e:
@@ -247,6 +254,7 @@ class OpenAIAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 error_kind=type(e).__name__,
             )
@@ -291,9 +299,11 @@ class OpenAIAdapter:
             "llm.call.complete",
             provider=self._provider,
             model=request.model,
+            feature_label=feature_label(request),
             duration_ms=duration_ms,
             prompt_tokens=usage.prompt_tokens,
             completion_tokens=usage.completion_tokens,
+            cached_tokens=cached_prompt_tokens(raw.usage),
             cost_usd=usage.cost_usd,
             finish_reason=finish_reason,
         )
@@ -308,6 +318,10 @@ class OpenAIAdapter:
         )
 
     def stream_chat(self, request: LLMRequest) -> Iterator[StreamEvent]:
+        """Yield StreamEvents for ``request`` (see `_stream_chat`), timing the first token."""
+        return time_first_token(self._stream_chat(request), self._provider, request)
+
+    def _stream_chat(self, request: LLMRequest) -> Iterator[StreamEvent]:
         """Yield StreamEvent instances from a streaming OpenAI completion.
 
         The initial stream-open call is protected by with_retry(); the
@@ -363,6 +377,7 @@ class OpenAIAdapter:
             stream = with_retry(
                 _breakered_stream,
                 label=f"openai.chat.completions.create(stream, {request.model})",
+                on_retry=retry_observer(self._provider, request),
                 non_retryable=(pybreaker.CircuitBreakerError,),
             )
         except Exception as e:
@@ -372,6 +387,7 @@ class OpenAIAdapter:
                 level="warning",
                 provider=self._provider,
                 model=request.model,
+                feature_label=feature_label(request),
                 duration_ms=duration_ms,
                 streaming=True,
                 error_kind=type(e).__name__,
@@ -387,6 +403,7 @@ class OpenAIAdapter:
         # pending_tool_calls: index -> {id, name, arguments_accumulated}
         pending_tool_calls: dict[int, dict[str, str]] = {}
         usage_event: UsageEvent | None = None
+        cached_tokens = 0
         finish_reason_raw: str | None = None
 
         try:
@@ -396,6 +413,7 @@ class OpenAIAdapter:
 
                     # Usage-only chunk (arrives when stream_options include_usage=True)
                     if chunk.usage and (not choice or not choice.delta.content):
+                        cached_tokens = cached_prompt_tokens(chunk.usage)
                         usage_event = UsageEvent(
                             usage=Usage(
                                 prompt_tokens=chunk.usage.prompt_tokens or 0,
@@ -465,6 +483,7 @@ class OpenAIAdapter:
                     level="warning",
                     provider=self._provider,
                     model=request.model,
+                    feature_label=feature_label(request),
                     duration_ms=duration_ms,
                     streaming=True,
                     error_kind=type(e).__name__,
@@ -527,10 +546,12 @@ class OpenAIAdapter:
             "llm.call.complete",
             provider=self._provider,
             model=request.model,
+            feature_label=feature_label(request),
             duration_ms=duration_ms,
             streaming=True,
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
             cost_usd=usage_event.usage.cost_usd if usage_event else 0.0,
             finish_reason=finish_reason,
         )
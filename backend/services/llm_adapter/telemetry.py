@@ -0,0 +1,94 @@
+"""Observability helpers shared by the LLM adapters.
+
+Everything here reports through `backend.observability.events.emit`, the
+same channel as ``llm.call.start`` / ``llm.call.complete``.
+backend/observability/llm_metrics.py turns those events into /metrics
+families.
+
+* `retry_observer` — ``with_retry(on_retry=...)`` callback emitting
+  ``llm.call.retry`` (including the backoff sleep, flagged when it was a
+  429 rate-limit wait).
+* `time_first_token` — wraps a stream_chat generator and emits
+  ``llm.stream.first_token`` with time-to-first-token.
+* `cached_prompt_tokens` — prompt-cache hits from any provider's usage
+  object.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Iterator
+
+from backend.observability.events import emit
+from backend.retry import _get_status_code
+from backend.services.llm_adapter.streaming import StreamEvent, TextDelta, ToolCallDelta
+from backend.services.llm_adapter.types import LLMRequest
+
+
+def feature_label(request: LLMRequest) -> str | None:
+    label = request.metadata.get("feature_label")
+    return label if isinstance(label, str) else None
+
+
+def _int_attr(obj: Any, name: str) -> int | None:
+    value = getattr(obj, name, None)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """Prompt tokens served from the provider's prompt cache (0 when unknown).
+
+    Anthropic: ``cache_read_input_tokens``; OpenAI:
+    ``prompt_tokens_details.cached_tokens``; Gemini:
+    ``cached_content_token_count``.
+    """
+    if usage is None:
+        return 0
+    for value in (
+        _int_attr(usage, "cache_read_input_tokens"),
+        _int_attr(getattr(usage, "prompt_tokens_details", None), "cached_tokens"),
+        _int_attr(usage, "cached_content_token_count"),
+    ):
+        if value:
+            return value
+    return 0
+
+
+def retry_observer(provider: str, request: LLMRequest) -> Callable[[int, BaseException, float], None]:
+    def _on_retry(attempt: int, exc: BaseException, delay_s: float) -> None:
+        emit(
+            "llm.call.retry",
+            provider=provider,
+            model=request.model,
+            feature_label=feature_label(request),
+            attempt=attempt,
+            delay_s=round(delay_s, 3),
+            rate_limited=_get_status_code(exc) == 429 or type(exc).__name__ == "RateLimitError",
+            error_kind=type(exc).__name__,
+        )
+    return _on_retry
+
+
+def time_first_token(events: Iterator[StreamEvent], provider: str, request: LLMRequest) -> Iterator[StreamEvent]:
+    """Pass ``events`` through, emitting ``llm.stream.first_token`` at the first delta.
+
+    Closing this generator closes ``events`` so the adapter's stream
+    cleanup still runs when a consumer stops early.
+    """
+    t0 = time.monotonic()
+    seen_first = False
+    try:
+        for event in events:
+            if not seen_first and isinstance(event, (TextDelta, ToolCallDelta)):
+                seen_first = True
+                emit(
+                    "llm.stream.first_token",
+                    provider=provider,
+                    model=request.model,
+                    feature_label=feature_label(request),
+                    ttft_ms=int((time.monotonic() - t0) * 1000),
+                )
+            yield event
+    finally:
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,304 @@
+"""Columnar, numpy-backed mastery aggregation for a whole class at once.
+
+`student_mastery._aggregate_mastery_for_student` walks nested dicts one
+student at a time. For a class-wide view (progress-rank) this engine
+flattens every selected submission into columnar arrays — one row per
+(student, content, standard[, DOK]) contribution — and does the sums,
+attempt averages and "last attempt wins" picks in a few numpy group-by
+passes (``np.bincount`` / ``np.maximum.at``).
+
+Output is byte-identical to calling the reference per student:
+
+- Rows are emitted in exactly the order the reference touches its
+  accumulators, and ``np.bincount`` adds weights sequentially in input
+  order, so every float sum sees the same operands in the same order.
+- Final rounding and dict construction use the same Python expressions
+  as the reference (``round`` on Python floats, stable ``sorted``).
+- Anything the arrays cannot represent exactly — non-numeric or bool
+  values, ints beyond 2**53, non-int question counts — marks that
+  student irregular, and the student is delegated to the reference
+  implementation (which then behaves, or raises, exactly as before).
+
+Enabled for progress-rank with FLAG_VECTORIZED_MASTERY (default off);
+tests/test_mastery_engine.py pins equivalence with randomized property
+tests.
+
+Flask-free; never imports a route module.
+"""
+import numpy as np
+
+from backend.feature_flags import flag_enabled
+from backend.services.student_mastery import (
+    _aggregate_mastery_for_student,
+    _normalize_mastery_shape,
+)
+
+_EXACT_INT_LIMIT = 2 ** 53
+
+
+def vectorized_mastery_enabled():
+    return flag_enabled('vectorized_mastery', default=False)
+
+
+class _Irregular(Exception):
+    """Raised while flattening a student whose data the arrays can't mirror exactly."""
+
+
+def _num(value):
+    # type() (not isinstance) so bools and numeric subclasses fall back.
+    if type(value) is float:
+        return value
+    if type(value) is int and -_EXACT_INT_LIMIT < value < _EXACT_INT_LIMIT:
+        return value
+    raise _Irregular
+
+
+def _count(value):
+    if type(value) is int and -_EXACT_INT_LIMIT < value < _EXACT_INT_LIMIT:
+        return value
+    raise _Irregular
+
+
+def _attempt(value):
+    if value is None or type(value) in (int, float):
+        return value
+    raise _Irregular
+
+
+class _Columns:
+    """Append-only columnar buffers plus the group bookkeeping for one pass."""
+
+    def __init__(self):
+        # Stage 1: per-attempt rows of the average branch, grouped by
+        # (student, content, code) or (student, content, code, dok).
+        self.att_gid, self.att_earned, self.att_possible, self.att_q = [], [], [], []
+        self.att_groups = 0
+        # Stage 2: contributions to the final totals, grouped by
+        # (student, code) or (student, code, dok). A slot is either direct
+        # (values inline) or refers to a stage-1 group (average).
+        self.slot_gid, self.slot_earned, self.slot_possible, self.slot_q, self.slot_ref = [], [], [], [], []
+        self.groups = 0
+
+    def mark(self):
+        return (len(self.att_gid), self.att_groups, len(self.slot_gid), self.groups)
+
+    def rollback(self, mark):
+        a, ag, s, g = mark
+        for col in (self.att_gid, self.att_earned, self.att_possible, self.att_q):
+            del col[a:]
+        for col in (self.slot_gid, self.slot_earned, self.slot_possible, self.slot_q, self.slot_ref):
+            del col[s:]
+        self.att_groups, self.groups = ag, g
+
+    def new_att_group(self):
+        self.att_groups += 1
+        return self.att_groups - 1
+
+    def new_group(self):
+        self.groups += 1
+        return self.groups - 1
+
+    def attempt(self, gid, earned, possible, q):
+        self.att_gid.append(gid)
+        self.att_earned.append(earned)
+        self.att_possible.append(possible)
+        self.att_q.append(q)
+
+    def slot(self, gid, earned=0.0, possible=0.0, q=0, ref=-1):
+        self.slot_gid.append(gid)
+        self.slot_earned.append(earned)
+        self.slot_possible.append(possible)
+        self.slot_q.append(q)
+        self.slot_ref.append(ref)
+
+    def totals(self):
+        """Return (earned, possible, question_count) per stage-2 group."""
+        slot_earned = np.asarray(self.slot_earned, dtype=np.float64)
+        slot_possible = np.asarray(self.slot_possible, dtype=np.float64)
+        slot_q = np.asarray(self.slot_q, dtype=np.float64)
+        ref = np.asarray(self.slot_ref, dtype=np.int64)
+        if self.att_gid:
+            gid = np.asarray(self.att_gid, dtype=np.int64)
+            earned = np.asarray(self.att_earned, dtype=np.float64)
+            possible = np.asarray(self.att_possible, dtype=np.float64)
+            pct = (earned / possible) * 100
+            pct_sum = np.bincount(gid, weights=pct, minlength=self.att_groups)
+            count = np.bincount(gid, minlength=self.att_groups)
+            last = np.full(self.att_groups, -1, dtype=np.int64)
+            np.maximum.at(last, gid, np.arange(len(gid)))
+            pts_poss = possible[last]
+            q_last = np.asarray(self.att_q, dtype=np.float64)[last]
+            avg_earned = ((pct_sum / count) / 100.0) * pts_poss
+            is_avg = ref >= 0
+            slot_earned[is_avg] = avg_earned[ref[is_avg]]
+            slot_possible[is_avg] = pts_poss[ref[is_avg]]
+            slot_q[is_avg] = q_last[ref[is_avg]]
+        slot_gid = np.asarray(self.slot_gid, dtype=np.int64)
+        return (
+            np.bincount(slot_gid, weights=slot_earned, minlength=self.groups),
+            np.bincount(slot_gid, weights=slot_possible, minlength=self.groups),
+            np.bincount(slot_gid, weights=slot_q, minlength=self.groups),
+        )
+
+
+def _flatten_student(selected_by_content, content_titles, attempt_mode, include_dok, ov, dk):
+    """Emit one student's rows; mirror the reference's accumulator touch order.
+
+    Returns (codes, contributing, dok_groups): code -> stage-2 group id in
+    first-touch order, code -> contributing list, code -> {dok: group id}.
+    """
+    codes = {}
+    contributing = {}
+    dok_groups = {}
+
+    def code_group(code):
+        if code not in codes:
+            codes[code] = ov.new_group()
+            contributing[code] = []
+            dok_groups[code] = {}
+        return codes[code]
+
+    def dok_group(code, dok):
+        groups = dok_groups[code]
+        if dok not in groups:
+            groups[dok] = dk.new_group()
+        return groups[dok]
+
+    for content_id, subs in selected_by_content.items():
+        if not subs:
+            continue
+        title = content_titles.get(content_id, '')
+        if attempt_mode == 'average' and len(subs) > 1:
+            per_code = {}       # code -> (stage-1 gid, attempts list, {dok: stage-1 gid})
+            for sub in subs:
+                mastery = (sub.get('results') or {}).get('standards_mastery') or {}
+                for code, raw_entry in mastery.items():
+                    normalized = _normalize_mastery_shape(raw_entry)
+                    if normalized is None:
+                        continue
+                    overall = normalized['overall']
+                    if not overall.get('points_possible'):
+                        continue
+                    earned = _num(overall.get('points_earned', 0))
+                    possible = _num(overall['points_possible'])
+                    if code not in per_code:
+                        per_code[code] = (ov.new_att_group(), [], {})
+                    gid, attempts, doks = per_code[code]
+                    ov.attempt(gid, earned, possible, _count(overall.get('question_count', 0)))
+                    attempts.append({
+                        'submission_id': sub.get('id'),
+                        'attempt_number': _attempt(sub.get('attempt_number', 1)),
+                        'points_earned': overall.get('points_earned', 0),
+                        'points_possible': overall['points_possible'],
+                    })
+                    if include_dok:
+                        for dok, d_agg in normalized.get('by_dok', {}).items():
+                            if not d_agg.get('points_possible'):
+                                continue
+                            if dok not in doks:
+                                doks[dok] = dk.new_att_group()
+                            dk.attempt(doks[dok], _num(d_agg.get('points_earned', 0)),
+                                       _num(d_agg['points_possible']),
+                                       _count(d_agg.get('question_count', 0)))
+            for code, (gid, attempts, doks) in per_code.items():
+                ov.slot(code_group(code), ref=gid)
+                for a in attempts:
+                    contributing[code].append({
+                        'submission_id': a['submission_id'],
+                        'title': title,
+                        'points_earned': a['points_earned'],
+                        'points_possible': a['points_possible'],
+                        'attempt_number': a['attempt_number'],
+                    })
+                for dok, d_gid in doks.items():
+                    dk.slot(dok_group(code, dok), ref=d_gid)
+        else:
+            for sub in subs:
+                mastery = (sub.get('results') or {}).get('standards_mastery') or {}
+                for code, raw_entry in mastery.items():
+                    normalized = _normalize_mastery_shape(raw_entry)
+                    if normalized is None:
+                        continue
+                    overall = normalized['overall']
+                    if not overall.get('points_possible'):
+                        continue
+                    ov.slot(code_group(code), _num(overall.get('points_earned', 0)),
+                            _num(overall['points_possible']), _count(overall.get('question_count', 0)))
+                    contributing[code].append({
+                        'submission_id': sub.get('id'),
+                        'title': title,
+                        'points_earned': overall.get('points_earned', 0),
+                        'points_possible': overall['points_possible'],
+                        'attempt_number': _attempt(sub.get('attempt_number', 1)),
+                    })
+                    if include_dok:
+                        for dok, d_agg in normalized.get('by_dok', {}).items():
+                            if not d_agg.get('points_possible'):
+                                continue
+                            dk.slot(dok_group(code, dok), _num(d_agg.get('points_earned', 0)),
+                                    _num(d_agg['points_possible']), _count(d_agg.get('question_count', 0)))
+    return codes, contributing, dok_groups
+
+
+def _shape(earned, possible, question_count):
+    earned, possible = float(earned), float(possible)
+    return {
+        'percentage': round((earned / possible) * 100, 1) if possible > 0 else 0,
+        'points_earned': round(earned, 2),
+        'points_possible': possible,
+        'question_count': int(question_count),
+    }
+
+
+def aggregate_mastery_by_student(selected_by_student, content_titles, attempt_mode, *, include_dok=False):
+    """Class-wide equivalent of ``_aggregate_mastery_for_student``.
+
+    Args:
+        selected_by_student: { student_id: { content_id: [submission, ...] } },
+            each inner dict already passed through _select_submissions_by_mode.
+        content_titles, attempt_mode, include_dok: as for the reference.
+    Returns:
+        { student_id: <exactly what _aggregate_mastery_for_student returns> }
+    """
+    ov, dk = _Columns(), _Columns()
+    flattened = {}
+    irregular = []
+    for sid, selected in selected_by_student.items():
+        mark_ov, mark_dk = ov.mark(), dk.mark()
+        try:
+            flattened[sid] = _flatten_student(selected, content_titles, attempt_mode, include_dok, ov, dk)
+        except _Irregular:
+            ov.rollback(mark_ov)
+            dk.rollback(mark_dk)
+            irregular.append(sid)
+
+    ov_earned, ov_possible, ov_q = ov.totals()
+    dk_earned, dk_possible, dk_q = dk.totals() if include_dok else (None, None, None)
+
+    out = {}
+    for sid in selected_by_student:
+        if sid not in flattened:
+            continue
+        codes, contributing, dok_groups = flattened[sid]
+        result = {}
+        for code, g in codes.items():
+            overall_out = _shape(ov_earned[g], ov_possible[g], ov_q[g])
+            overall_out['contributing_submissions'] = sorted(
+                contributing[code],
+                key=lambda c: c.get('attempt_number') or 0,
+                reverse=True,
+            )[:10]
+            if include_dok:
+                result[code] = {
+                    'overall': overall_out,
+                    'by_dok': {dok: _shape(dk_earned[d], dk_possible[d], dk_q[d])
+                               for dok, d in dok_groups[code].items()},
+                }
+            else:
+                result[code] = overall_out
+        out[sid] = result
+    for sid in irregular:
+        out[sid] = _aggregate_mastery_for_student(
+            selected_by_student[sid], content_titles, attempt_mode, include_dok=include_dok,
+        )
+    return {sid: out[sid] for sid in selected_by_student}
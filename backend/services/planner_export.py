@@ -3,6 +3,8 @@ import os
 import json
 import logging
 
+from backend.services.figure_cache import figure_cache_enabled, figure_key, get_figure_cache
+
 _logger = logging.getLogger(__name__)
 
 
@@ -948,23 +950,37 @@ def _create_visual_for_question(question: dict, show_answer: bool = False):
         import io
 
         q_type = question.get('question_type', question.get('visual_type', ''))
-        fig = _build_question_figure_part1(question, show_answer, q_type, plt, np, _math)
-        if fig is None:
-            fig = _build_question_figure_part2(question, show_answer, q_type, plt, np, _math)
-
-        if fig is None:
-            return None
-
-        # Save figure and calculate proper dimensions for PDF
-        plt.tight_layout()
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        buf.seek(0)
-
-        # Get the figure's aspect ratio to calculate proper height
-        fig_w, fig_h = fig.get_size_inches()
-        aspect_ratio = fig_h / fig_w
-        plt.close(fig)
+
+        # Student copy, answer key and re-exports render the same visual:
+        # reuse the PNG (and the aspect ratio it was laid out with) if cached.
+        cache_key = cached = None
+        if figure_cache_enabled():
+            cache_key = figure_key('planner_question', question, show_answer=show_answer, dpi=150)
+            cached = get_figure_cache().get(cache_key)
+        if cached is not None:
+            png, meta = cached
+            buf = io.BytesIO(png)
+            aspect_ratio = meta['aspect_ratio']
+        else:
+            fig = _build_question_figure_part1(question, show_answer, q_type, plt, np, _math)
+            if fig is None:
+                fig = _build_question_figure_part2(question, show_answer, q_type, plt, np, _math)
+
+            if fig is None:
+                return None
+
+            # Save figure and calculate proper dimensions for PDF
+            plt.tight_layout()
+            buf = io.BytesIO()
+            fig.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
+            buf.seek(0)
+
+            # Get the figure's aspect ratio to calculate proper height
+            fig_w, fig_h = fig.get_size_inches()
+            aspect_ratio = fig_h / fig_w
+            plt.close(fig)
+            if cache_key is not None:
+                get_figure_cache().put(cache_key, buf.getvalue(), {'aspect_ratio': float(aspect_ratio)})
 
         # Determine target width based on type, capped to page width (7 inches usable)
         if q_type in ['coordinate_plane', 'unit_circle', 'transformations']:
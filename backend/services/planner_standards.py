@@ -5,6 +5,13 @@ import logging
 from pathlib import Path
 
 from backend.services.assignment_post_processing import _extract_usage, _record_planner_cost
+from backend.services.standards_catalog import (  # noqa: F401
+    _extract_grade_from_code,
+    _grade_matches,
+    catalog as standards_catalog,
+    rank_standards,
+    select_candidates,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -93,67 +100,6 @@ def load_support_documents_for_planning() -> str:
 _standards_map_cache = None
 
 
-def _extract_grade_from_code(code):
-    """Extract grade level from a standards code across all frameworks."""
-    if not code:
-        return None
-    parts = code.split('.')
-
-    # NGSS: prefix-based (MS-PS1-1, HS-LS1-1)
-    if code.startswith('MS-'):
-        return 'MS'
-    if code.startswith('HS-'):
-        return 'HS'
-
-    # CCSS Math: CCSS.MATH.CONTENT.{G}.{DOMAIN}...
-    if code.startswith('CCSS.MATH') and len(parts) >= 4:
-        return parts[3]
-
-    # CCSS ELA: CCSS.ELA-LITERACY.{STRAND}.{G}...
-    if code.startswith('CCSS.ELA') and len(parts) >= 4:
-        return parts[3]
-
-    # C3 Social Studies: D2.His.1.6-8
-    if code.startswith('D') and len(code) > 1 and code[1:2].isdigit() and len(parts) >= 4:
-        return parts[3]
-
-    # FL B.E.S.T., TX TEKS, VA SOL: {SUBJ}.{G}.{DOMAIN}...
-    if len(parts) >= 2:
-        candidate = parts[1]
-        if candidate == 'K12':
-            return 'K12'
-        if candidate.isdigit() or candidate == 'K':
-            return candidate
-        if '-' in candidate:
-            return candidate
-
-    return None
-
-
-def _grade_matches(code_grade, requested_grade):
-    """Check if extracted grade matches the requested grade."""
-    if code_grade is None:
-        return False
-    if code_grade == 'K12':
-        return True
-    if code_grade == requested_grade:
-        return True
-    if code_grade == 'MS' and requested_grade in ('6', '7', '8'):
-        return True
-    if code_grade == 'HS' and requested_grade in ('9', '10', '11', '12'):
-        return True
-    if '-' in str(code_grade):
-        try:
-            lo, hi = code_grade.split('-')
-            req = int(requested_grade) if requested_grade.isdigit() else 0
-            return int(lo) <= req <= int(hi)
-        except (ValueError, IndexError):
-            _logger.debug("Unparseable grade range %r in standards filter", code_grade)
-    if code_grade == '912' and requested_grade in ('9', '10', '11', '12'):
-        return True
-    return False
-
-
 def _get_standards_map():
     """Load and cache standards_map.json."""
     global _standards_map_cache
@@ -169,25 +115,18 @@ def _get_standards_map():
 
 def _load_standards_file(filepath):
     """Load standards from a JSON file. Returns list or empty list."""
-    if not filepath.exists():
-        return []
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        if isinstance(data, list):
-            return data
-        return data.get('standards', [])
-    except Exception:  # noqa: BLE001  # broad catch: returns fallback
-        return []
+    entry = standards_catalog.get(filepath)
+    return entry.all() if entry is not None else []
 
 
-def load_standards(state, subject, grade=None):
-    """Load standards with mapping-based resolution and fallback.
+def resolve_standards(state, subject):
+    """Resolve (state, subject) to its parsed framework file in the catalog.
 
-    Returns dict: {standards, fallback_used, fallback_framework, no_framework, state_note}
+    Returns (StandardsFile or None, info) where info carries the
+    fallback_used / fallback_framework / no_framework / state_note flags
+    that load_standards reports.
     """
-    result = {
-        'standards': [],
+    info = {
         'fallback_used': False,
         'fallback_framework': None,
         'no_framework': False,
@@ -202,7 +141,7 @@ def load_standards(state, subject, grade=None):
     # Look up state config
     state_config = states.get(state.upper(), {}) if state else {}
     framework = state_config.get('framework', 'ccss')
-    result['state_note'] = state_config.get('note')
+    info['state_note'] = state_config.get('note')
 
     # Map subject to filename
     filename = subject_to_filename.get(subject)
@@ -210,10 +149,9 @@ def load_standards(state, subject, grade=None):
         filename = subject.lower().replace(' ', '_').replace('/', '-')
 
     # Try primary path: standards/{framework}/{filename}.json
-    primary_path = DATA_DIR / 'standards' / framework / (filename + '.json')
-    standards = _load_standards_file(primary_path)
+    entry = standards_catalog.get(DATA_DIR / 'standards' / framework / (filename + '.json'))
 
-    if not standards:
+    if entry is None:
         # Primary file not found — try subject-specific fallback
         # This handles: CCSS states needing NGSS for science, state-specific
         # frameworks missing certain subjects, etc.
@@ -221,26 +159,39 @@ def load_standards(state, subject, grade=None):
         if fallback_fw is None:
             # No fallback defined for this subject (e.g., Spanish, World Languages)
             if framework not in ('ccss', 'ngss'):
-                result['no_framework'] = True
+                info['no_framework'] = True
         elif fallback_fw and fallback_fw != framework:
-            fallback_path = DATA_DIR / 'standards' / fallback_fw / (filename + '.json')
-            standards = _load_standards_file(fallback_path)
-            if standards:
-                result['fallback_used'] = True
-                result['fallback_framework'] = fallback_fw
+            entry = standards_catalog.get(DATA_DIR / 'standards' / fallback_fw / (filename + '.json'))
+            if entry is not None:
+                info['fallback_used'] = True
+                info['fallback_framework'] = fallback_fw
 
-    if not standards:
+    if entry is None:
         # Legacy fallback: standards_{state}_{subject}.json
         subject_clean = subject.lower().replace(' ', '_').replace('/', '-')
-        legacy_path = DATA_DIR / ('standards_' + state.lower() + '_' + subject_clean + '.json')
-        standards = _load_standards_file(legacy_path)
+        entry = standards_catalog.get(DATA_DIR / ('standards_' + state.lower() + '_' + subject_clean + '.json'))
+
+    return entry, info
+
 
-    # Filter by grade
-    if grade and standards:
-        filtered = [s for s in standards if _grade_matches(_extract_grade_from_code(s.get('code', '')), str(grade))]
+def load_standards(state, subject, grade=None):
+    """Load standards with mapping-based resolution and fallback.
+
+    Returns dict: {standards, fallback_used, fallback_framework, no_framework, state_note}
+    """
+    entry, info = resolve_standards(state, subject)
+    result = {'standards': [], **info}
+    if entry is None:
+        return result
+
+    standards = entry.all()
+
+    # Filter by grade (partition precomputed per grade in the catalog)
+    if grade:
+        filtered = entry.grade(str(grade))
         if filtered:
             standards = filtered
-        elif not filtered:
+        else:
             # Preserve existing high school course mapping for FL
             GRADE_TO_COURSE = {
                 'math': {'9': 'Algebra 1', '10': 'Geometry', '11': 'Algebra 2', '12': 'Pre-Calculus'},
@@ -257,6 +208,38 @@ def load_standards(state, subject, grade=None):
     return result
 
 
+def get_standards_by_code(state, subject, codes):
+    """Look up standards by code via the catalog's code index.
+
+    Returns {code: standard} for the codes that exist in the resolved
+    framework (unknown codes are omitted).
+    """
+    entry, _ = resolve_standards(state, subject)
+    if entry is None:
+        return {}
+    return {code: entry.by_code[code] for code in codes if code in entry.by_code}
+
+
+def alignment_top_k():
+    """How many ranked standards an alignment prompt carries (0 = all)."""
+    return int(os.getenv('ALIGNMENT_STANDARDS_TOP_K') or '25')
+
+
+def preselect_standards(standards, text, k=None):
+    """Keep the ``k`` standards most relevant to ``text`` (BM25, local).
+
+    Used to shrink the standards list sent to the alignment model; ``k``
+    defaults to ALIGNMENT_STANDARDS_TOP_K.
+    """
+    return select_candidates(standards, text, alignment_top_k() if k is None else k)
+
+
+def suggest_standard_for_question(standards, question_text):
+    """Best-matching standard for one question, or None if nothing matches."""
+    ranked = rank_standards(standards, question_text, 1)
+    return ranked[0] if ranked else None
+
+
 def rewrite_for_alignment_content(*, enriched_questions, doc_text, grade, subject, api_key):
     """Call the LLM to rewrite questions for standards alignment; return the
     AI result dict + usage, or {'error': ...} on a non-JSON response (the route
@@ -304,11 +287,16 @@ def rewrite_for_alignment_content(*, enriched_questions, doc_text, grade, subjec
     return {**result, "usage": usage}
 
 
-def align_document_to_standards_content(*, doc_text, standards_ref, api_key):
+def align_document_to_standards_content(*, doc_text, standards_ref, api_key, all_codes=None):
     """Call the LLM to analyze a document against the given standards reference;
     return the alignment result dict + usage, or {'error': ...} on a non-JSON
     response (the route jsonifies either). Wave 6 Slice 9 - extracted from
     planner_routes.
+
+    ``all_codes`` is the grade's full code list when ``standards_ref`` is a
+    preselected subset: the model scores coverage against it, and
+    ``unmatched_standards`` is recomputed locally so gaps outside the subset
+    are still reported.
     """
     from backend.services.llm_adapter import LLMRequest, Message, OpenAIAdapter, ResponseFormat, TextPart
     adapter = OpenAIAdapter(api_key=api_key)
@@ -324,10 +312,17 @@ def align_document_to_standards_content(*, doc_text, standards_ref, api_key):
         "Sort matched_standards by confidence descending."
     )
 
-    user_prompt = json.dumps({
+    prompt = {
         "task": "Analyze this educational document and identify which standards it aligns to.",
         "document_text": truncated_doc,
         "available_standards": standards_ref,
+    }
+    if all_codes:
+        prompt["all_standard_codes"] = all_codes
+        prompt["gap_analysis"] = ("unmatched_standards and overall_alignment_score cover "
+                                  "all_standard_codes, not only available_standards")
+    user_prompt = json.dumps({
+        **prompt,
         "return_format": {
             "matched_standards": [{"code": "str", "benchmark": "str", "confidence": "float 0.0-1.0", "evidence": "brief quote or description from document", "alignment_notes": "what is well-covered vs missing"}],
             "unmatched_standards": ["standard codes not covered"],
@@ -353,6 +348,10 @@ def align_document_to_standards_content(*, doc_text, standards_ref, api_key):
         _logger.warning("[align-standards] Non-JSON response: %s", raw_content[:500])
         return {"error": "AI returned non-JSON response. Possibly rate limited."}
 
+    if all_codes:
+        matched = {m.get("code") for m in result.get("matched_standards") or [] if isinstance(m, dict)}
+        result["unmatched_standards"] = [c for c in all_codes if c not in matched]
+
     usage = _extract_usage(completion, "gpt-4o")
     _record_planner_cost(usage)
 
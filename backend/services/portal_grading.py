@@ -652,6 +652,13 @@ def _finalize_portal_grading(all_questions, answers, written_results, ai_notes,
         "status": "graded",
     })
 
+    # Class-based path: fold this grade into the student_standards_mastery
+    # rollup that progress-rank / report-card read. Best-effort; never raises.
+    if repo.table_name == SubmissionPathType.CLASS.value:
+        from backend.supabase_client import get_supabase
+        from backend.services.student_mastery_rollup import refresh_rollup_for_submission
+        refresh_rollup_for_submission(get_supabase(), submission_id)
+
     # Update student history for writing style tracking
     try:
         from backend.storage import save_student_history, load_student_history
@@ -0,0 +1,268 @@
+"""Compiled name-resolution index over a student roster.
+
+Three lookups used to scan the whole roster for every query. The grading
+pipeline's `_resolve_student` ran once per submitted file. Email's
+`_find_in_roster` had prefix and Levenshtein passes. The assistant used
+`_fuzzy_name_match` inside per-file loops. With a district roster and a
+folder of submissions, that is O(files × students) string normalization
+plus pure-Python edit distance.
+
+`RosterIndex` is built once per loaded roster (the ``lookup key -> entry``
+dict from grader_roster.load_roster) and keeps each unique entry's
+normalized keys:
+
+* a sorted first-name list, so a first-name prefix becomes a bisect range
+  (the trie lookup) for the pipeline's filename match;
+* first-word and last-name buckets for email's last-initial prefix match
+  and its "one name exact, the other within distance 2" fuzzy match, with
+  an early-exit bounded Levenshtein.
+
+`NameMatcher` does the same for `fuzzy_name_match` (word/prefix matching
+over ``key -> display name`` maps). A sorted word list narrows the
+candidates to names that share a word with the query's first word.
+
+Every method returns exactly what the scan it replaces returned. When
+several entries qualify, the first in roster order still wins.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import re
+from typing import Any, Hashable, Iterable, Mapping
+
+_APOSTROPHES = ("'", "\u2019")
+
+
+def _strip_apostrophes(s: str) -> str:
+    for ch in _APOSTROPHES:
+        s = s.replace(ch, "")
+    return s
+
+
+def _first_word(s: str) -> str:
+    parts = s.split()
+    return parts[0].lower() if parts else ''
+
+
+def _with_prefix(sorted_keys: list[tuple[str, int]], prefix: str) -> list[int]:
+    """Positions of every ``(key, pos)`` whose key starts with ``prefix``."""
+    positions = []
+    for i in range(bisect.bisect_left(sorted_keys, (prefix,)), len(sorted_keys)):
+        key, pos = sorted_keys[i]
+        if not key.startswith(prefix):
+            break
+        positions.append(pos)
+    return positions
+
+
+def edit_distance(a: str, b: str, bound: int | None = None) -> int:
+    """Levenshtein distance; with ``bound``, any result above it is ``bound + 1``."""
+    if len(a) < len(b):
+        a, b = b, a
+    if bound is not None and len(a) - len(b) > bound:
+        return bound + 1
+    if not b:
+        return len(a)
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a):
+        curr = [i + 1]
+        for j, cb in enumerate(b):
+            curr.append(min(prev[j + 1] + 1, curr[j] + 1, prev[j] + (0 if ca == cb else 1)))
+        if bound is not None and min(curr) > bound:
+            return bound + 1
+        prev = curr
+    return prev[-1]
+
+
+class RosterIndex:
+    """Normalized name keys for every unique entry of a grader-format roster."""
+
+    def __init__(self, roster: Mapping[Any, Any]):
+        self.roster = roster
+        self.entries: list[dict] = []
+        seen: set[int] = set()
+        for value in roster.values():
+            if id(value) in seen or not isinstance(value, dict):
+                continue
+            seen.add(id(value))
+            self.entries.append(value)
+
+        # Pipeline keys: full first name / last name, lowercased, apostrophes stripped.
+        self._first_norm_sorted: list[tuple[str, int]] = []
+        self._last_norm: list[str] = []
+        self._last_collapsed: list[str] = []
+        # Email keys: first word of the first name, lowercased last name.
+        self._by_first_word: dict[str, list[int]] = {}
+        self._by_last: dict[str, list[int]] = {}
+        self._first_word: list[str] = []
+        self._last_lower: list[str] = []
+
+        for pos, entry in enumerate(self.entries):
+            first = entry.get('first_name', '') or ''
+            last = entry.get('last_name', '') or ''
+            first_norm = _strip_apostrophes(first.lower())
+            last_norm = _strip_apostrophes(last.lower())
+            self._first_norm_sorted.append((first_norm, pos))
+            self._last_norm.append(last_norm)
+            self._last_collapsed.append(last_norm.replace(" ", "").replace("-", ""))
+
+            first_word = _first_word(first)
+            last_lower = last.lower()
+            self._first_word.append(first_word)
+            self._last_lower.append(last_lower)
+            self._by_first_word.setdefault(first_word, []).append(pos)
+            self._by_last.setdefault(last_lower, []).append(pos)
+        self._first_norm_sorted.sort()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match_filename_name(self, first_name: str, last_name: str) -> dict | None:
+        """First entry whose first name starts with ``first_name`` and whose
+        last name matches ``last_name`` by prefix, hyphen/space part, or
+        with spaces/hyphens collapsed. Apostrophes are ignored."""
+        first_norm = _strip_apostrophes(first_name.lower())
+        last_norm = _strip_apostrophes(last_name.lower())
+        last_collapsed = last_norm.replace(" ", "").replace("-", "")
+        for pos in sorted(_with_prefix(self._first_norm_sorted, first_norm)):
+            roster_last = self._last_norm[pos]
+            parts_hyphen = roster_last.split('-')
+            parts_space = roster_last.split(' ')
+            if (
+                roster_last.startswith(last_norm)
+                or parts_hyphen[0] == last_norm
+                or last_norm in parts_hyphen
+                or parts_space[0] == last_norm
+                or last_norm in parts_space
+                or self._last_collapsed[pos] == last_collapsed
+            ):
+                return self.entries[pos]
+        return None
+
+    def match_last_initial(self, first: str, last_prefix: str) -> dict | None:
+        """First entry with first word == ``first`` and last name starting with ``last_prefix``."""
+        for pos in self._by_first_word.get(first, ()):
+            if self._last_lower[pos].startswith(last_prefix):
+                return self.entries[pos]
+        return None
+
+    def match_fuzzy(self, first: str, last: str, max_distance: int = 2) -> dict | None:
+        """Closest entry where one name is exact and the other within ``max_distance``.
+
+        An exact last name compares first names; otherwise an exact first
+        word compares last names. Ties go to the earlier entry.
+        """
+        candidates = set(self._by_last.get(last, ())) | set(self._by_first_word.get(first, ()))
+        best = None
+        best_dist = max_distance + 1
+        for pos in sorted(candidates):
+            r_first = self._first_word[pos]
+            r_last = self._last_lower[pos]
+            if not r_first or not r_last:
+                continue
+            if r_last == last:
+                d = edit_distance(first, r_first, bound=max_distance)
+            elif r_first == first:
+                d = edit_distance(last, r_last, bound=max_distance)
+            else:
+                continue
+            if d < best_dist:
+                best, best_dist = self.entries[pos], d
+        return best
+
+
+_PUNCT_RE = re.compile(r'[,;.\'"]+')
+
+
+@functools.lru_cache(maxsize=8192)
+def name_words(name: str) -> tuple[str, ...]:
+    """Lowercased words of ``name`` with commas/semicolons/periods/quotes removed."""
+    return tuple(_PUNCT_RE.sub(' ', name.lower()).split())
+
+
+def _words_match(search_words: Iterable[str], name_words_: tuple[str, ...]) -> bool:
+    return all(
+        any(nw.startswith(sw) or (len(nw) >= 2 and sw.startswith(nw)) for nw in name_words_)
+        for sw in search_words
+    )
+
+
+def fuzzy_name_match(search: str, full_name: str) -> bool:
+    """Word-based name matching. Returns True if every word in search appears
+    as a word (or word-prefix) in full_name. Order-independent, case-insensitive.
+
+    Also handles middle name mismatch: if search has 3+ words and full_name
+    has fewer, tries matching first + last words only (middle names are often
+    dropped or abbreviated in different systems).
+
+    Examples:
+        fuzzy_name_match("Dicen Wilkins", "Dicen Macheil Wilkins Reels") → True
+        fuzzy_name_match("Dicen Wilkins", "Wilkins Reels, Dicen Macheil") → True
+        fuzzy_name_match("Luke Lundell", "Luke J Lundell") → True
+        fuzzy_name_match("John Smith", "Jane Smith") → False
+        fuzzy_name_match("Troy Jaxson Mikell", "Troy Mikell") → True
+    """
+    search_words = name_words(search)
+    words = name_words(full_name)
+    if not search_words:
+        return False
+
+    # Strict: all search words match
+    if _words_match(search_words, words):
+        return True
+
+    # Middle name tolerance: if search has 3+ words and more words than
+    # full_name, try first + last only (covers "Troy Jaxson Mikell" → "Troy Mikell")
+    if len(search_words) >= 3 and len(search_words) > len(words):
+        if _words_match((search_words[0], search_words[-1]), words):
+            return True
+
+    # Reverse: full_name has more words, try matching with first + last of full_name
+    if len(words) >= 3 and len(words) > len(search_words):
+        if _words_match(search_words, (words[0], words[-1])):
+            return True
+
+    return False
+
+
+class NameMatcher:
+    """`fuzzy_name_match` over a fixed ``key -> full name`` map."""
+
+    def __init__(self, names: Mapping[Hashable, str]):
+        self._items = list(names.items())
+        self._words_sorted: list[tuple[str, int]] = []
+        self._by_word: dict[str, set[int]] = {}
+        for pos, (_, full_name) in enumerate(self._items):
+            for word in set(name_words(full_name)):
+                self._by_word.setdefault(word, set()).add(pos)
+                self._words_sorted.append((word, pos))
+        self._words_sorted.sort()
+
+    def _candidates(self, search: str) -> list[int]:
+        # Every branch of fuzzy_name_match requires the first search word to
+        # match some name word (name word starts with it, or a 2+ char name
+        # word is its prefix), so only those names need the full check.
+        words = name_words(search)
+        if not words:
+            return []
+        first = words[0]
+        positions = set(_with_prefix(self._words_sorted, first))
+        for n in range(2, len(first)):
+            positions |= self._by_word.get(first[:n], set())
+        return sorted(positions)
+
+    def matches(self, search: str) -> list[tuple[Hashable, str]]:
+        """All ``(key, name)`` pairs matching ``search``, in map order."""
+        return [self._items[pos] for pos in self._candidates(search)
+                if fuzzy_name_match(search, self._items[pos][1])]
+
+    def first_match(self, search: str) -> Hashable | None:
+        """Key of the first matching name in map order, or None."""
+        for pos in self._candidates(search):
+            key, full_name = self._items[pos]
+            if fuzzy_name_match(search, full_name):
+                return key
+        return None
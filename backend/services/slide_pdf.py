@@ -3,48 +3,262 @@
 Synchronous: a typical deck renders in a few seconds, mirroring the existing
 PPTX export route. Raises SlidePdfError on any failure so routes return a clean
 message instead of a 500.
+
+Most of those seconds are Chromium launch, and concurrent exports each used
+to launch their own browser. With FLAG_SLIDE_PDF_POOL on, renders go to a
+`RendererPool` instead: a few long-lived browsers, each owned by one worker
+thread (Playwright's sync API is bound to the thread that started it), fed
+from a bounded queue. The pool size is the concurrency cap. A browser is
+health-checked before each job, relaunched when it has disconnected, and
+recycled after SLIDE_PDF_RECYCLE_AFTER renders so Chromium memory growth
+stays bounded. Every render still gets a fresh page (and therefore a fresh
+browser context), closed afterwards.
+
+`html_to_pdf_many` renders several decks/handouts in one browser session
+(one pool job, or one launch when the pool is off).
+
+Each pool job emits `slide_pdf.pool.job` (queue wait, render time, whether
+it paid for a browser launch).
 """
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 
-from playwright.sync_api import sync_playwright
+from backend.feature_flags import flag_enabled
 
 logger = logging.getLogger(__name__)
 
 
+def sync_playwright():
+    """Playwright's ``sync_playwright()``, imported on first render (not with the planner blueprint)."""
+    from playwright.sync_api import sync_playwright as _sync_playwright
+    return _sync_playwright()
+
+
 class SlidePdfError(RuntimeError):
     """Raised when PDF rendering is unavailable or fails."""
 
 
+def _launch(p):
+    # --no-sandbox: Chromium cannot enable its sandbox when running as
+    # root, the common container/Railway case. Safe here because the
+    # input HTML is server-generated and fully escaped (see
+    # slide_html_builder) — there is no untrusted page navigation.
+    return p.chromium.launch(args=["--no-sandbox"])
+
+
+def _render(browser, html: str) -> bytes:
+    """Render one deck in a fresh page of ``browser``; validates the bytes."""
+    page = browser.new_page()
+    try:
+        # The deck is self-contained (CSS + data-URI images inlined), so
+        # "load" fires promptly; an explicit timeout makes the bound
+        # intentional rather than inheriting the 30s default.
+        page.set_content(html, wait_until="load", timeout=15000)
+        # Ensure embedded @font-face are applied before printing: await
+        # fonts.ready, then one rAF so any font-metric reflow settles.
+        page.evaluate(
+            "async () => { await document.fonts.ready;"
+            " await new Promise(r => requestAnimationFrame(r)); }"
+        )
+        pdf = page.pdf(width="1280px", height="720px",
+                       print_background=True, prefer_css_page_size=True)
+    finally:
+        page.close()
+    if not pdf or pdf[:5] != b"%PDF-":
+        raise SlidePdfError("Playwright returned empty/invalid PDF")
+    return pdf
+
+
+def _render_oneshot(htmls: list) -> list:
+    """Launch a browser, render every deck in it, close it."""
+    with sync_playwright() as p:
+        browser = _launch(p)
+        try:
+            return [_render(browser, html) for html in htmls]
+        finally:
+            browser.close()
+
+
 def html_to_pdf(html: str) -> bytes:
     """Render a self-contained HTML deck to PDF bytes (1280x720 pages)."""
+    return html_to_pdf_many([html])[0]
+
+
+def html_to_pdf_many(htmls: list) -> list:
+    """Render several decks in one browser session; PDF bytes in input order.
+
+    All-or-nothing: any failed deck raises SlidePdfError for the batch.
+    """
+    if not htmls:
+        return []
     try:
-        with sync_playwright() as p:
-            # --no-sandbox: Chromium cannot enable its sandbox when running as
-            # root, the common container/Railway case. Safe here because the
-            # input HTML is server-generated and fully escaped (see
-            # slide_html_builder) — there is no untrusted page navigation.
-            browser = p.chromium.launch(args=["--no-sandbox"])
-            try:
-                page = browser.new_page()
-                # The deck is self-contained (CSS + data-URI images inlined), so
-                # "load" fires promptly; an explicit timeout makes the bound
-                # intentional rather than inheriting the 30s default.
-                page.set_content(html, wait_until="load", timeout=15000)
-                # Ensure embedded @font-face are applied before printing: await
-                # fonts.ready, then one rAF so any font-metric reflow settles.
-                page.evaluate(
-                    "async () => { await document.fonts.ready;"
-                    " await new Promise(r => requestAnimationFrame(r)); }"
-                )
-                pdf = page.pdf(width="1280px", height="720px",
-                               print_background=True, prefer_css_page_size=True)
-            finally:
-                browser.close()
-        if not pdf or pdf[:5] != b"%PDF-":
-            raise SlidePdfError("Playwright returned empty/invalid PDF")
-        return pdf
+        if flag_enabled("slide_pdf_pool", default=False):
+            return get_pool().render_many(htmls)
+        return _render_oneshot(list(htmls))
     except SlidePdfError:
         raise
     except Exception as e:  # browser missing, launch failure, timeout, etc.
         logger.warning("slide PDF render failed: %s", e)
         raise SlidePdfError(str(e)) from e
+
+
+class _Job:
+    __slots__ = ("htmls", "future", "enqueued_at")
+
+    def __init__(self, htmls):
+        self.htmls = htmls
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+_STOP = object()
+
+
+class RendererPool:
+    """Long-lived Chromium browsers behind a bounded job queue."""
+
+    def __init__(self, size=2, recycle_after=50, queue_max=16, wait_timeout=60.0):
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self.wait_timeout = wait_timeout
+        self._queue = queue.Queue(maxsize=max(1, queue_max))
+        self._lock = threading.Lock()
+        self._threads = []
+        self._closed = False
+        self._stats = {"jobs": 0, "renders": 0, "failures": 0,
+                       "launches": 0, "recycles": 0, "relaunches": 0}
+
+    def render_many(self, htmls) -> list:
+        job = _Job(list(htmls))
+        self._ensure_started()
+        try:
+            self._queue.put(job, timeout=self.wait_timeout)
+        except queue.Full:
+            raise SlidePdfError("PDF renderer queue is full") from None
+        try:
+            return job.future.result(timeout=self.wait_timeout)
+        except TimeoutError:
+            job.future.cancel()
+            raise SlidePdfError("PDF render timed out waiting for a browser") from None
+
+    def render(self, html: str) -> bytes:
+        return self.render_many([html])[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, workers=len(self._threads),
+                        queued=self._queue.qsize())
+
+    def close(self) -> None:
+        """Stop the workers and close their browsers (atexit, tests)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(_STOP)
+        for t in threads:
+            t.join(timeout=10)
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._closed:
+                raise SlidePdfError("PDF renderer pool is closed")
+            while len(self._threads) < self.size:
+                t = threading.Thread(target=self._worker, daemon=True,
+                                     name=f"slide-pdf-{len(self._threads)}")
+                self._threads.append(t)
+                t.start()
+
+    def _worker(self):
+        p = None
+        browser = None
+        renders = 0
+        try:
+            while True:
+                job = self._queue.get()
+                if job is _STOP:
+                    return
+                if not job.future.set_running_or_notify_cancel():
+                    continue  # caller already gave up waiting
+                started = time.monotonic()
+                launched = False
+                try:
+                    if p is None:
+                        p = sync_playwright().start()
+                    if browser is not None and renders >= self.recycle_after:
+                        self._count("recycles")
+                        browser = _close_quietly(browser)
+                    if browser is not None and not browser.is_connected():
+                        self._count("relaunches")
+                        browser = _close_quietly(browser)
+                    if browser is None:
+                        browser = _launch(p)
+                        renders = 0
+                        launched = True
+                        self._count("launches")
+                    pdfs = []
+                    for html in job.htmls:
+                        pdfs.append(_render(browser, html))
+                        renders += 1
+                    self._count("jobs")
+                    self._count("renders", len(pdfs))
+                    _emit_job(job, started, launched)
+                    job.future.set_result(pdfs)
+                except Exception as e:  # noqa: BLE001  # broad catch: surfaced to the caller via the future
+                    self._count("failures")
+                    # A failed render may have left the browser wedged; start clean.
+                    browser = _close_quietly(browser)
+                    job.future.set_exception(e)
+        finally:
+            _close_quietly(browser)
+            if p is not None:
+                try:
+                    p.stop()
+                except Exception:  # noqa: BLE001  # broad catch: shutdown is best-effort
+                    logger.debug("playwright shutdown failed", exc_info=True)
+
+
+def _emit_job(job, started, launched):
+    from backend.observability.events import emit
+    emit("slide_pdf.pool.job", decks=len(job.htmls), launched=launched,
+         queue_wait_ms=round((started - job.enqueued_at) * 1000),
+         render_ms=round((time.monotonic() - started) * 1000))
+
+
+def _close_quietly(browser):
+    if browser is not None:
+        try:
+            browser.close()
+        except Exception:  # noqa: BLE001  # broad catch: browser may already be gone
+            logger.debug("browser close failed", exc_info=True)
+    return None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> RendererPool:
+    """Process-wide pool, created on first use (sized from env)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RendererPool(
+                    size=int(os.getenv("SLIDE_PDF_POOL_SIZE") or "2"),
+                    recycle_after=int(os.getenv("SLIDE_PDF_RECYCLE_AFTER") or "50"),
+                    queue_max=int(os.getenv("SLIDE_PDF_QUEUE_MAX") or "16"),
+                )
+                atexit.register(_pool.close)
+    return _pool
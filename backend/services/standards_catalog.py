@@ -0,0 +1,298 @@
+"""In-process standards catalog: parsed framework files + lookup indexes.
+
+`planner_standards.load_standards` used to re-open and re-parse the
+framework JSON (up to ~1 MB) on every call and then run the
+`_extract_grade_from_code` regexes over every standard to filter by grade.
+The planner routes, the alignment endpoints and every assistant standards
+tool call it, often several times per request.
+
+`StandardsCatalog` parses each framework file once per process, lazily on
+first use, and keeps per file:
+
+* ``grade(requested)`` — the grade partition (same `_grade_matches` rule),
+  computed once per requested grade from grades extracted once per code;
+* ``by_code`` — code -> standard hash index;
+* ``search(query)`` — BM25 ranking over code, benchmark, topics,
+  vocabulary and item specs (the inverted index is built on the first
+  search).
+
+`select_candidates` ranks an arbitrary list (e.g. one grade's standards)
+against a document so alignment prompts carry only the top K.
+
+Entries are keyed by path and revalidated with one ``stat`` per lookup, so
+an edited or replaced file (tests writing temp fixtures, an operator
+refreshing a framework) is re-parsed instead of served stale.
+
+The grade rules (`_extract_grade_from_code`, `_grade_matches`) live here
+so the partitions can be built without importing planner_standards, which
+re-exports them.
+
+Standards dicts are shared between callers: treat them as read-only.
+Lists handed out are copies.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no signal in benchmark text and would otherwise dominate
+# short queries.
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it its of on or that the "
+    "their them these this to was what when which who why will with students "
+    "student describe explain identify".split()
+)
+
+# Standard BM25 parameters.
+_K1 = 1.5
+_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def _searchable_text(standard: dict) -> str:
+    parts = [
+        standard.get('code', ''),
+        standard.get('benchmark', ''),
+        " ".join(standard.get('topics', []) or []),
+        " ".join(standard.get('vocabulary', []) or []),
+        standard.get('item_specs', '') or '',
+    ]
+    return " ".join(p for p in parts if isinstance(p, str))
+
+
+def _extract_grade_from_code(code):
+    """Extract grade level from a standards code across all frameworks."""
+    if not code:
+        return None
+    parts = code.split('.')
+
+    # NGSS: prefix-based (MS-PS1-1, HS-LS1-1)
+    if code.startswith('MS-'):
+        return 'MS'
+    if code.startswith('HS-'):
+        return 'HS'
+
+    # CCSS Math: CCSS.MATH.CONTENT.{G}.{DOMAIN}...
+    if code.startswith('CCSS.MATH') and len(parts) >= 4:
+        return parts[3]
+
+    # CCSS ELA: CCSS.ELA-LITERACY.{STRAND}.{G}...
+    if code.startswith('CCSS.ELA') and len(parts) >= 4:
+        return parts[3]
+
+    # C3 Social Studies: D2.His.1.6-8
+    if code.startswith('D') and len(code) > 1 and code[1:2].isdigit() and len(parts) >= 4:
+        return parts[3]
+
+    # FL B.E.S.T., TX TEKS, VA SOL: {SUBJ}.{G}.{DOMAIN}...
+    if len(parts) >= 2:
+        candidate = parts[1]
+        if candidate == 'K12':
+            return 'K12'
+        if candidate.isdigit() or candidate == 'K':
+            return candidate
+        if '-' in candidate:
+            return candidate
+
+    return None
+
+
+def _grade_matches(code_grade, requested_grade):
+    """Check if extracted grade matches the requested grade."""
+    if code_grade is None:
+        return False
+    if code_grade == 'K12':
+        return True
+    if code_grade == requested_grade:
+        return True
+    if code_grade == 'MS' and requested_grade in ('6', '7', '8'):
+        return True
+    if code_grade == 'HS' and requested_grade in ('9', '10', '11', '12'):
+        return True
+    if '-' in str(code_grade):
+        try:
+            lo, hi = code_grade.split('-')
+            req = int(requested_grade) if requested_grade.isdigit() else 0
+            return int(lo) <= req <= int(hi)
+        except (ValueError, IndexError):
+            _logger.debug("Unparseable grade range %r in standards filter", code_grade)
+    if code_grade == '912' and requested_grade in ('9', '10', '11', '12'):
+        return True
+    return False
+
+
+class _Bm25Index:
+    """Inverted index with BM25 scoring over a fixed list of documents."""
+
+    def __init__(self, documents: list[str]):
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths: list[int] = []
+        for doc_id, text in enumerate(documents):
+            terms = Counter(tokenize(text))
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+        self._avg_len = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        n = len(self._lengths)
+        self._idf = {
+            term: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self._postings.items()
+        }
+
+    def scores(self, query: str) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        avg = self._avg_len or 1.0
+        # Query terms are weighted sub-linearly by their count so a whole
+        # document can be used as the query without one repeated word
+        # drowning out the rest.
+        for term, qtf in Counter(tokenize(query)).items():
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = self._idf[term] * (1 + math.log(qtf))
+            for doc_id, tf in posting:
+                norm = tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * self._lengths[doc_id] / avg))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * norm
+        return scores
+
+
+class StandardsFile:
+    """One parsed framework file and its indexes."""
+
+    def __init__(self, standards: list[dict]):
+        self.standards = standards
+        self.by_code = {s.get('code'): s for s in standards if isinstance(s, dict) and s.get('code')}
+        self._code_grades = [
+            _extract_grade_from_code(s.get('code', '')) if isinstance(s, dict) else None
+            for s in standards
+        ]
+        self._lock = threading.Lock()
+        self._grade_partitions: dict[str, list[dict]] = {}
+        self._index: _Bm25Index | None = None
+
+    def all(self) -> list[dict]:
+        return list(self.standards)
+
+    def grade(self, requested_grade: str) -> list[dict]:
+        """Standards whose code matches ``requested_grade`` (may be empty)."""
+        requested_grade = str(requested_grade)
+        with self._lock:
+            partition = self._grade_partitions.get(requested_grade)
+            if partition is None:
+                partition = [
+                    s for s, g in zip(self.standards, self._code_grades)
+                    if _grade_matches(g, requested_grade)
+                ]
+                self._grade_partitions[requested_grade] = partition
+        return list(partition)
+
+    def search(self, query: str, limit: int = 10,
+               within: list[dict] | None = None) -> list[tuple[dict, float]]:
+        """Top ``limit`` standards for ``query`` by BM25, best first.
+
+        ``within`` restricts results to a subset (e.g. a grade partition);
+        ties keep file order.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = _Bm25Index([
+                    _searchable_text(s) if isinstance(s, dict) else '' for s in self.standards
+                ])
+            index = self._index
+        scores = index.scores(query)
+        if within is not None:
+            allowed = {id(s) for s in within}
+            scores = {i: sc for i, sc in scores.items() if id(self.standards[i]) in allowed}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.standards[i], score) for i, score in ranked]
+
+
+def rank_standards(standards: list[dict], query: str, limit: int) -> list[dict]:
+    """Standards from ``standards`` that match ``query``, best first.
+
+    Builds a throwaway index over just this list (a grade partition is a
+    few hundred entries), so IDF reflects the candidate pool. Standards
+    with no matching term are not returned.
+    """
+    index = _Bm25Index([_searchable_text(s) if isinstance(s, dict) else '' for s in standards])
+    ranked = sorted(index.scores(query).items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [standards[i] for i, _ in ranked]
+
+
+def select_candidates(standards: list[dict], text: str, k: int) -> list[dict]:
+    """Top ``k`` standards for ``text`` to send to the model.
+
+    Lists of ``k`` or fewer (and ``k <= 0``) are returned unchanged. When
+    fewer than ``k`` standards match, the rest are filled in file order so
+    the model still sees a full candidate set.
+    """
+    if k <= 0 or len(standards) <= k:
+        return list(standards)
+    selected = rank_standards(standards, text, k)
+    if len(selected) < k:
+        chosen = {id(s) for s in selected}
+        selected.extend([s for s in standards if id(s) not in chosen][:k - len(selected)])
+    return selected
+
+
+class StandardsCatalog:
+    """Process-wide cache of parsed standards files, keyed by path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: dict[str, tuple[tuple[int, int], StandardsFile]] = {}
+
+    def get(self, filepath: Path | str) -> StandardsFile | None:
+        """Parsed file at ``filepath``, or None if it is missing/unreadable/empty."""
+        path = str(filepath)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        fingerprint = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        standards = _parse_standards_file(path)
+        if not standards:
+            return None
+        entry = StandardsFile(standards)
+        with self._lock:
+            self._files[path] = (fingerprint, entry)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+
+
+def _parse_standards_file(path: str) -> list[Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            return data
+        return data.get('standards', [])
+    except Exception:  # noqa: BLE001  # broad catch: returns fallback
+        _logger.debug("standards file parse failed: %s", path, exc_info=True)
+        return []
+
+
+catalog = StandardsCatalog()
@@ -0,0 +1,127 @@
+"""Student-safe projection of a published join-code assessment.
+
+`/api/student/join/<code>` used to load the full published_assessments row
+(answer key included) and strip it on every request — a whole class opening
+the same test at once repeated the identical transformation 30+ times.
+`publish_assessment` now calls `build_student_projection` once and stores the
+serialized body plus its ETag on the row (`student_projection`,
+`student_projection_etag`, migration 0003). The join route serves that body
+verbatim and answers conditional GETs with 304.
+
+Rows published before 0003 (and survey rows, which are inserted by
+survey_routes) have no stored projection; the join route falls back to
+building one per request from the full row, so behavior is unchanged for them.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+import hashlib
+import json
+
+# Study-material content types get the "material" response shape; assignments
+# and assessments both get the sections/questions shape.
+MATERIAL_CONTENT_TYPES = (
+    'study_guide', 'flashcards', 'slide_deck', 'mind_map',
+    'audio_overview', 'video_overview', 'infographic', 'data_table',
+)
+
+# Columns the join route needs when a stored projection exists. Keeping the
+# select this narrow is what avoids shipping the answer key from Postgres.
+PROJECTION_COLUMNS = 'id, join_code, is_active, student_projection, student_projection_etag'
+
+
+def _sanitize_sections(assessment):
+    """Strip answer keys / rubrics: keep only what a student needs to render."""
+    sanitized_sections = []
+    for section in assessment.get('sections', []):
+        sanitized_questions = []
+        for q in section.get('questions', []):
+            sanitized_questions.append({
+                "number": q.get('number'),
+                "question": q.get('question'),
+                "type": q.get('type') or q.get('question_type', 'short_answer'),
+                "points": q.get('points'),
+                "options": q.get('options'),
+                "terms": q.get('terms'),
+                "definitions": q.get('definitions'),
+            })
+        sanitized_sections.append({
+            "name": section.get('name'),
+            "instructions": section.get('instructions'),
+            "questions": sanitized_questions,
+        })
+    return sanitized_sections
+
+
+def _material_projection(row, assessment, content_type):
+    resp = {
+        "content_type": content_type,
+        "title": assessment.get('title', row.get('title', content_type)),
+        "teacher": row.get('teacher_name', 'Teacher'),
+    }
+    # JSON types: quiz, flashcards, mind_map
+    if assessment.get('data'):
+        resp["data"] = assessment['data']
+    # Legacy flashcards format
+    if assessment.get('cards'):
+        resp["data"] = assessment['cards']
+    # Text types: study_guide
+    if assessment.get('content'):
+        resp["content"] = assessment['content']
+    # Media types: provide URL
+    if assessment.get('shared_file'):
+        resp["media_url"] = "/api/student/shared-media/" + (row.get('join_code') or '').upper()
+    return resp
+
+
+def build_student_projection(row):
+    """Return the student-facing payload for a published_assessments row.
+
+    `row` needs `assessment`, `settings`, `teacher_name` and `join_code` (the
+    latter only for shared-media URLs). The result never contains answers,
+    rubrics or model responses.
+    """
+    assessment = row.get('assessment') or {}
+    settings = row.get('settings') or {}
+
+    content_type = settings.get('content_type') or assessment.get('content_type')
+    if content_type and content_type in MATERIAL_CONTENT_TYPES:
+        return _material_projection(row, assessment, content_type)
+
+    return {
+        "title": assessment.get('title'),
+        "instructions": assessment.get('instructions'),
+        "total_points": assessment.get('total_points'),
+        "time_estimate": assessment.get('time_estimate'),
+        "sections": _sanitize_sections(assessment),
+        "settings": {
+            "content_type": content_type or 'assessment',
+            "time_limit_minutes": settings.get('time_limit_minutes'),
+            "require_name": settings.get('require_name', True),
+            "is_makeup": settings.get('is_makeup', False),
+            # Frontend checks if the student is allowed (makeup exams)
+            "restricted_students": settings.get('restricted_students', []),
+            "period": settings.get('period', ''),
+        },
+        # Accommodations per student, resolved at publish time so the
+        # frontend looks up its own entry without another round trip.
+        "student_accommodations": settings.get('student_accommodations', {}),
+        "teacher": row.get('teacher_name', 'Teacher'),
+    }
+
+
+def serialize_projection(payload):
+    """Serialize a projection to its wire body and strong ETag.
+
+    Keys are sorted so the same payload always yields the same bytes (and so
+    the same ETag) regardless of dict construction order.
+    Returns (body: str, etag: str) — etag is unquoted; werkzeug quotes it.
+    """
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+    return body, etag
+
+
+def projection_columns_for(row):
+    """Return the `{student_projection, student_projection_etag}` columns for a row."""
+    body, etag = serialize_projection(build_student_projection(row))
+    return {"student_projection": body, "student_projection_etag": etag}
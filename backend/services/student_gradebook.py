@@ -6,6 +6,9 @@ Wave 5 Slice 4 - extracted from backend/routes/student_portal_routes.py
 and pass the resolved `db` handle + teacher_id/class_name in.
 - build_class_gradebook: roster/content/submissions fetch + canonical-grade
   assembly -> payload dict (two empty short-circuits return plain dicts; no cache).
+  With FLAG_GRADEBOOK_RPC on, the fetch is one `class_gradebook_grid` RPC call
+  (migration 0005) with attempt selection in SQL; any RPC failure (or a client
+  without .rpc, e.g. the fake Supabase) falls back to the Python path.
 - build_submission_detail: per-submission detail assembly -> (payload, err); the
   interleaved not-found/not-authorized cases return (None, (message, status)) for
   the route to translate via error_response.
@@ -15,6 +18,7 @@ the route module (no service->route imports).
 """
 import logging
 
+from backend.feature_flags import flag_enabled
 from backend.services.dok import _derive_uniform_dok, _validate_dok
 from backend.services.student_mastery import (
     _select_submissions_by_mode,
@@ -24,16 +28,134 @@ from backend.services.student_mastery import (
 
 _logger = logging.getLogger(__name__)
 
+GRADEBOOK_GRID_RPC = 'class_gradebook_grid'
+
+
+def gradebook_rpc_enabled():
+    return flag_enabled('gradebook_rpc', default=False)
+
 
 def build_class_gradebook(db, class_id, class_name, attempt_mode):
     """Assemble the per-(student, assessment) canonical-grade gradebook payload.
 
     The route keeps the class-ownership 403 check and resolves class_name; this
     function does steps 2-5 (roster, content metadata + remediation DOK,
-    paginated submissions fetch, canonical-grade map) and returns the payload
-    dict. The two empty short-circuits (no roster / no assessments) return their
-    payload dicts directly.
+    submissions fetch, canonical-grade map) and returns the payload dict. The
+    two empty short-circuits (no roster / no assessments) return their payload
+    dicts directly.
     """
+    if gradebook_rpc_enabled():
+        grid = fetch_gradebook_grid(db, class_id, attempt_mode)
+        if grid is not None:
+            return build_gradebook_from_grid(grid, class_id, class_name, attempt_mode)
+    return _build_class_gradebook_python(db, class_id, class_name, attempt_mode)
+
+
+def fetch_gradebook_grid(db, class_id, attempt_mode):
+    """Return the `class_gradebook_grid` RPC document, or None to fall back."""
+    rpc = getattr(db, 'rpc', None)
+    if rpc is None:
+        return None
+    try:
+        resp = rpc(GRADEBOOK_GRID_RPC, {'p_class_id': class_id, 'p_attempt_mode': attempt_mode}).execute()
+    except Exception as e:  # noqa: BLE001  # broad catch: Python path is the fallback; error is logged
+        _logger.warning("gradebook grid RPC failed for class %s; using Python path: %s", class_id, e)
+        return None
+    grid = resp.data
+    if not isinstance(grid, dict) or not all(isinstance(grid.get(k), list) for k in ('roster', 'content', 'grades')):
+        _logger.warning("gradebook grid RPC returned an unexpected shape for class %s; using Python path", class_id)
+        return None
+    return grid
+
+
+def _student_records(student_ids, students_by_id, class_id):
+    """Roster in enrollment order minus orphans, sorted by display name."""
+    records = []
+    for sid in student_ids:
+        sdata = students_by_id.get(sid)
+        if sdata is None:
+            _logger.debug("Orphan enrollment in class %s: student_id=%s missing from students table", class_id, sid)
+            continue
+        records.append({
+            'student_id': sid,
+            'student_name': ((sdata.get('first_name') or '') + ' ' + (sdata.get('last_name') or '')).strip(),
+        })
+    records.sort(key=lambda s: s['student_name'].lower())
+    return records
+
+
+def _gradebook_payload(class_id, class_name, attempt_mode, student_records, assessments,
+                       assessment_dok_by_id, grades):
+    return {
+        "class_id": class_id, "class_name": class_name, "attempt_mode": attempt_mode,
+        "students": [{'student_id': s['student_id'], 'student_name': s['student_name']} for s in student_records],
+        "assessments": [
+            {'content_id': c['id'], 'title': c.get('title', ''), 'content_type': c.get('content_type'),
+             # Response field kept as `publish_date` for backward compat with
+             # frontend consumers that may look for it; sourced from the actual
+             # `created_at` column.
+             'publish_date': c.get('created_at'), 'due_date': c.get('due_date'),
+             # Phase 4.2 #7: surface remediation flags for the badge UI.
+             'is_active': c.get('is_active'),
+             'target_student_ids': c.get('target_student_ids'),
+             # Phase 4.3 Sprint 1: uniform DOK for remediation rows only.
+             # Non-remediation rows always get None (no badge).
+             'assessment_dok': assessment_dok_by_id.get(c['id'])}
+            for c in assessments
+        ],
+        "grades": grades,
+    }
+
+
+def build_gradebook_from_grid(grid, class_id, class_name, attempt_mode):
+    """Assemble the gradebook payload from a `class_gradebook_grid` document.
+
+    The RPC has already joined roster to students (orphans drop out of the
+    join) and picked one canonical row per (student, content) for the mode;
+    this only shapes the output identically to the Python path.
+    """
+    roster = grid['roster']
+    student_records = _student_records(
+        [r['id'] for r in roster if r.get('id')], {r['id']: r for r in roster if r.get('id')}, class_id,
+    )
+    if not student_records:
+        return _gradebook_payload(class_id, class_name, attempt_mode, [], [], {}, {})
+
+    assessments = sorted(grid['content'], key=lambda c: (c.get('created_at') or '', c.get('id') or ''))
+    if not assessments:
+        return _gradebook_payload(class_id, class_name, attempt_mode, student_records, [], {}, {})
+
+    assessment_dok_by_id = {
+        c['id']: _derive_uniform_dok(c.get('remediation_content'))
+        for c in assessments if c.get('target_student_ids') and c.get('id')
+    }
+    for c in assessments:
+        c.pop('remediation_content', None)
+
+    grades = {}
+    for g in grid['grades']:
+        sid, cid = g.get('student_id'), g.get('content_id')
+        if not sid or not cid:
+            continue
+        total_attempts = g.get('total_attempts') or 0
+        percentage = g.get('percentage')
+        if attempt_mode == 'average':
+            # Rounded here, not in SQL, so half-way cases match the Python path.
+            percentage = round(float(g.get('percentage_sum') or 0) / total_attempts, 1) if total_attempts else 0
+        grades.setdefault(sid, {})[cid] = {
+            'submission_id': g.get('submission_id'),
+            'percentage': percentage,
+            'attempt_number': g.get('attempt_number'),
+            'submitted_at': g.get('submitted_at'),
+            'total_attempts': total_attempts,
+        }
+
+    return _gradebook_payload(class_id, class_name, attempt_mode, student_records, assessments,
+                              assessment_dok_by_id, grades)
+
+
+def _build_class_gradebook_python(db, class_id, class_name, attempt_mode):
+    """Multi-query gradebook assembly (the pre-RPC path and its fallback)."""
     # 2) Fetch class roster: enrollments + students. Skip orphans silently.
     enrollments = db.table('class_students').select('student_id').eq('class_id', class_id).execute()
     student_ids = [row['student_id'] for row in (enrollments.data or []) if row.get('student_id')]
@@ -44,16 +166,7 @@ def build_class_gradebook(db, class_id, class_name, attempt_mode):
             'id, first_name, last_name'
         ).in_('id', student_ids).execute()
         seen = {s['id']: s for s in (students_rows.data or []) if s.get('id')}
-        for sid in student_ids:
-            sdata = seen.get(sid)
-            if sdata is None:
-                _logger.debug("Orphan enrollment in class %s: student_id=%s missing from students table", class_id, sid)
-                continue
-            student_records.append({
-                'student_id': sid,
-                'student_name': ((sdata.get('first_name') or '') + ' ' + (sdata.get('last_name') or '')).strip(),
-            })
-        student_records.sort(key=lambda s: s['student_name'].lower())
+        student_records = _student_records(student_ids, seen, class_id)
 
     if not student_records:
         return {
@@ -185,25 +298,8 @@ def build_class_gradebook(db, class_id, class_name, attempt_mode):
         if per_student:
             grades[sid] = per_student
 
-    return {
-        "class_id": class_id, "class_name": class_name, "attempt_mode": attempt_mode,
-        "students": [{'student_id': s['student_id'], 'student_name': s['student_name']} for s in student_records],
-        "assessments": [
-            {'content_id': c['id'], 'title': c.get('title', ''), 'content_type': c.get('content_type'),
-             # Response field kept as `publish_date` for backward compat with
-             # frontend consumers that may look for it; sourced from the actual
-             # `created_at` column.
-             'publish_date': c.get('created_at'), 'due_date': c.get('due_date'),
-             # Phase 4.2 #7: surface remediation flags for the badge UI.
-             'is_active': c.get('is_active'),
-             'target_student_ids': c.get('target_student_ids'),
-             # Phase 4.3 Sprint 1: uniform DOK for remediation rows only.
-             # Non-remediation rows always get None (no badge).
-             'assessment_dok': assessment_dok_by_id.get(c['id'])}
-            for c in assessments
-        ],
-        "grades": grades,
-    }
+    return _gradebook_payload(class_id, class_name, attempt_mode, student_records, assessments,
+                              assessment_dok_by_id, grades)
 
 
 def build_submission_detail(db, submission_id, teacher_id):
@@ -0,0 +1,352 @@
+"""Materialized per-(student, class, standard) mastery rollup.
+
+Durable replacement for the progress-rank TTLCache sketched in
+docs/perf-progress-rank.md. The `student_standards_mastery` table (migration
+0004) holds, per student × class × standard, the `{overall, by_dok}` aggregate
+that `_aggregate_mastery_for_student(include_dok=True)` produces under each
+attempt mode. Reads then become a single indexed select per class instead of
+a bulk submissions fetch + per-student Python aggregation.
+
+Write path (all best-effort — a rollup failure never fails grading):
+- refresh_rollup_for_submission: after class-based grading finalizes
+  (portal_grading._finalize_portal_grading) and after the class submit /
+  regrade routes write instant results.
+- refresh_rollup_for_students: when a remediation is recalled.
+- refresh_rollup_for_classes: after class content is deleted
+  (delete_shared_resource, roster_sync.delete_roster_data and the Clever
+  data-delete route).
+- backfill_class_rollup: one-shot rebuild for a whole class
+  (backend/scripts/backfill_mastery_rollup.py).
+
+Every refresh recomputes the student's rows from source submissions through
+the SAME helpers progress-rank uses (_sanitize_standards_mastery,
+_select_submissions_by_mode, _aggregate_mastery_for_student), so the rollup
+is exact rather than an incrementally-drifting sum.
+
+Flags (backend/feature_flags.py):
+- FLAG_MASTERY_ROLLUP_WRITES (default ON — kill switch for the write hooks)
+- FLAG_MASTERY_ROLLUP_READS  (default OFF — flip after the backfill's
+  --verify pass is clean)
+
+Works against any PostgREST-shaped handle, including the in-memory
+backend.testing.fake_supabase used by the hermetic (no-Supabase) backend.
+Flask-free; never imports a route module.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from backend.feature_flags import flag_enabled
+from backend.services.dok import _validate_dok
+from backend.services.student_mastery import (
+    _aggregate_mastery_for_student,
+    _parse_ts,
+    _sanitize_standards_mastery,
+    _select_submissions_by_mode,
+)
+from backend.utils.ttl_cache import invalidate_scope
+
+_logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'student_standards_mastery'
+ATTEMPT_MODES = ('latest', 'best', 'average')
+MASTERY_CONTENT_TYPES = ['assessment', 'assignment']
+SUBMISSION_COLUMNS = 'id, student_id, content_id, attempt_number, submitted_at, percentage, results, status'
+_PAGE_SIZE = 1000
+
+# SharedTTLCache namespace of the progress-rank grid (student_portal_routes).
+# Every hook below bumps its per-class version so no pod keeps serving a
+# grid computed before the grade landed.
+PROGRESS_RANK_CACHE_NAMESPACE = 'progress_rank'
+
+
+def rollup_writes_enabled():
+    return flag_enabled('mastery_rollup_writes', default=True)
+
+
+def rollup_reads_enabled():
+    return flag_enabled('mastery_rollup_reads', default=False)
+
+
+def _mode_column(attempt_mode):
+    if attempt_mode not in ATTEMPT_MODES:
+        attempt_mode = 'latest'
+    return 'attempt_mode_' + attempt_mode
+
+
+def fetch_class_content(db, class_id):
+    """Return (content_ids, content_titles) for the class's mastery-bearing content."""
+    content = db.table('published_content').select(
+        'id, title, content_type'
+    ).eq('class_id', class_id).in_('content_type', MASTERY_CONTENT_TYPES).execute()
+    rows = content.data or []
+    return [c['id'] for c in rows], {c['id']: c.get('title', '') for c in rows}
+
+
+def fetch_paged(build_query):
+    """Run `build_query()` page by page (PostgREST caps responses at 1000 rows)."""
+    out = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + _PAGE_SIZE - 1).execute()
+        rows = page.data or []
+        out.extend(rows)
+        if len(rows) < _PAGE_SIZE:
+            return out
+        start += _PAGE_SIZE
+
+
+# ── Compute ────────────────────────────────────────────────────────────────
+
+def compute_student_rollup_rows(student_id, class_id, submissions, content_titles):
+    """Build the rollup rows for one student from their class submissions.
+
+    `submissions` are raw non-draft student_submissions rows for class
+    content, in the progress-rank fetch order (submitted_at DESC). They are
+    sanitized in place. Returns a list of row dicts, one per standard code
+    seen in any of the student's submissions.
+    """
+    for s in submissions:
+        _sanitize_standards_mastery(s)
+
+    by_content = defaultdict(list)
+    codes = set()
+    content_by_submission = {}
+    last_ts = None
+    for s in submissions:
+        cid = s.get('content_id')
+        if not cid:
+            continue
+        by_content[cid].append(s)
+        content_by_submission[s.get('id')] = cid
+        for code in ((s.get('results') or {}).get('standards_mastery') or {}):
+            if code:
+                codes.add(code)
+        ts = s.get('submitted_at')
+        if ts and (last_ts is None or _parse_ts(ts) > _parse_ts(last_ts)):
+            last_ts = ts
+
+    snapshots = {}
+    for mode in ATTEMPT_MODES:
+        selected = _select_submissions_by_mode(by_content, mode)
+        snapshots[mode] = _aggregate_mastery_for_student(
+            selected, content_titles, mode, include_dok=True,
+        )
+        # Record the content each contribution came from so reads can
+        # re-title it if the teacher renames the assessment later.
+        for entry in snapshots[mode].values():
+            for c in entry['overall']['contributing_submissions']:
+                c['content_id'] = content_by_submission.get(c.get('submission_id'))
+
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for code in sorted(codes):
+        latest = snapshots['latest'].get(code)
+        overall = latest['overall'] if latest else {}
+        rows.append({
+            'student_id': student_id,
+            'class_id': class_id,
+            'standard_code': code,
+            'percentage': overall.get('percentage'),
+            'points_earned': overall.get('points_earned'),
+            'points_possible': overall.get('points_possible'),
+            'question_count': overall.get('question_count'),
+            'attempt_mode_latest': latest,
+            'attempt_mode_best': snapshots['best'].get(code),
+            'attempt_mode_average': snapshots['average'].get(code),
+            'last_submission_at': last_ts,
+            'updated_at': now,
+        })
+    return rows
+
+
+def _hydrate_snapshot(snapshot, content_titles):
+    """Turn a stored `{overall, by_dok}` snapshot back into aggregator output.
+
+    Drops the internal `content_id` tag (after using it to refresh titles)
+    and restores integer DOK keys, which JSONB round-trips as strings.
+    """
+    overall = dict(snapshot.get('overall') or {})
+    contributing = []
+    for c in overall.get('contributing_submissions') or []:
+        c = dict(c)
+        content_id = c.pop('content_id', None)
+        if content_id in content_titles:
+            c['title'] = content_titles[content_id]
+        contributing.append(c)
+    overall['contributing_submissions'] = contributing
+    by_dok = {}
+    for k, v in (snapshot.get('by_dok') or {}).items():
+        dok = _validate_dok(k)
+        if dok is not None and isinstance(v, dict):
+            by_dok[dok] = v
+    return {'overall': overall, 'by_dok': by_dok}
+
+
+# ── Write ──────────────────────────────────────────────────────────────────
+
+def _replace_student_rows(db, class_id, student_id, rows):
+    """Upsert `rows` and delete rollup rows for codes the student no longer has."""
+    existing = db.table(ROLLUP_TABLE).select('standard_code').eq(
+        'class_id', class_id
+    ).eq('student_id', student_id).execute()
+    keep = {r['standard_code'] for r in rows}
+    stale = [r['standard_code'] for r in (existing.data or []) if r.get('standard_code') not in keep]
+    if rows:
+        db.table(ROLLUP_TABLE).upsert(
+            rows, on_conflict='student_id,class_id,standard_code'
+        ).execute()
+    if stale:
+        db.table(ROLLUP_TABLE).delete().eq('class_id', class_id).eq(
+            'student_id', student_id
+        ).in_('standard_code', stale).execute()
+
+
+def refresh_student_rollup(db, class_id, student_id, content=None):
+    """Recompute one student's rollup rows for one class from source.
+
+    `content` is an optional pre-fetched (content_ids, content_titles) pair.
+    Returns the number of rows written.
+    """
+    content_ids, content_titles = content or fetch_class_content(db, class_id)
+    submissions = []
+    if content_ids:
+        submissions = db.table('student_submissions').select(SUBMISSION_COLUMNS).eq(
+            'student_id', student_id
+        ).in_('content_id', content_ids).neq('status', 'draft').order(
+            'submitted_at', desc=True
+        ).execute().data or []
+    rows = compute_student_rollup_rows(student_id, class_id, submissions, content_titles)
+    _replace_student_rows(db, class_id, student_id, rows)
+    return len(rows)
+
+
+def refresh_rollup_for_submission(db, submission_id):
+    """Best-effort rollup refresh after a class-based submission changed.
+
+    Resolves (student, class) from the submission row and invalidates the
+    class's cached progress-rank grid. Never raises: the caller is a grading
+    path whose outcome must not depend on the rollup.
+    """
+    if not db or not submission_id:
+        return
+    try:
+        sub = db.table('student_submissions').select(
+            'student_id, content_id'
+        ).eq('id', submission_id).execute()
+        if not sub.data:
+            return
+        student_id = sub.data[0].get('student_id')
+        content_id = sub.data[0].get('content_id')
+        if not student_id or not content_id:
+            return
+        pc = db.table('published_content').select('class_id').eq('id', content_id).execute()
+        class_id = pc.data[0].get('class_id') if pc.data else None
+        if not class_id:
+            return
+        invalidate_scope(PROGRESS_RANK_CACHE_NAMESPACE, class_id)
+        if rollup_writes_enabled():
+            refresh_student_rollup(db, class_id, student_id)
+    except Exception as e:  # noqa: BLE001  # broad catch: rollup is derived data; error is logged
+        _logger.warning("mastery rollup refresh failed for submission: %s", e)
+
+
+def refresh_rollup_for_students(db, class_id, student_ids):
+    """Best-effort rollup refresh for several students in one class."""
+    if not class_id:
+        return
+    invalidate_scope(PROGRESS_RANK_CACHE_NAMESPACE, class_id)
+    if not db or not rollup_writes_enabled():
+        return
+    try:
+        content = fetch_class_content(db, class_id)
+        for sid in student_ids or []:
+            if sid:
+                refresh_student_rollup(db, class_id, sid, content=content)
+    except Exception as e:  # noqa: BLE001  # broad catch: rollup is derived data; error is logged
+        _logger.warning("mastery rollup refresh failed for class %s: %s", class_id, e)
+
+
+def refresh_rollup_for_classes(db, class_ids):
+    """Best-effort rollup refresh after class content was deleted.
+
+    Rebuilds each class from its remaining content, so standards that only
+    came from the removed content drop out of the rollup.
+    """
+    for class_id in class_ids or []:
+        if not class_id:
+            continue
+        invalidate_scope(PROGRESS_RANK_CACHE_NAMESPACE, class_id)
+        if not db or not rollup_writes_enabled():
+            continue
+        try:
+            backfill_class_rollup(db, class_id)
+        except Exception as e:  # noqa: BLE001  # broad catch: rollup is derived data; error is logged
+            _logger.warning("mastery rollup refresh failed for class %s: %s", class_id, e)
+
+
+def backfill_class_rollup(db, class_id):
+    """Rebuild every rollup row for a class. Returns rows written.
+
+    Covers every student with a submission in class content — including
+    students no longer enrolled, whose standards still appear in the
+    progress-rank column union.
+    """
+    content_ids, content_titles = fetch_class_content(db, class_id)
+    by_student = defaultdict(list)
+    if content_ids:
+        submissions = fetch_paged(lambda: db.table('student_submissions').select(
+            SUBMISSION_COLUMNS
+        ).in_('content_id', content_ids).neq('status', 'draft').order('submitted_at', desc=True))
+        for s in submissions:
+            if s.get('student_id') and s.get('content_id'):
+                by_student[s['student_id']].append(s)
+
+    existing = fetch_paged(lambda: db.table(ROLLUP_TABLE).select('student_id').eq('class_id', class_id))
+    student_ids = set(by_student) | {r['student_id'] for r in existing if r.get('student_id')}
+
+    written = 0
+    for sid in sorted(student_ids):
+        rows = compute_student_rollup_rows(sid, class_id, by_student.get(sid, []), content_titles)
+        _replace_student_rows(db, class_id, sid, rows)
+        written += len(rows)
+    return written
+
+
+# ── Read ───────────────────────────────────────────────────────────────────
+
+def load_class_mastery(db, class_id, attempt_mode, content_titles):
+    """Return ({student_id: {code: flat_mastery}}, sorted_standard_codes).
+
+    The flat per-standard shape is what _aggregate_mastery_for_student emits
+    by default (the `overall` half of the include_dok shape).
+    """
+    column = _mode_column(attempt_mode)
+    rows = fetch_paged(lambda: db.table(ROLLUP_TABLE).select(
+        'student_id, standard_code, ' + column
+    ).eq('class_id', class_id))
+    mastery = defaultdict(dict)
+    standards = set()
+    for r in rows:
+        code = r.get('standard_code')
+        if not code:
+            continue
+        standards.add(code)
+        snapshot = r.get(column)
+        if snapshot:
+            mastery[r.get('student_id')][code] = _hydrate_snapshot(snapshot, content_titles)['overall']
+    return mastery, sorted(standards)
+
+
+def load_student_mastery(db, class_id, student_id, attempt_mode, content_titles):
+    """Return {code: {overall, by_dok}} for one student (report-card shape)."""
+    column = _mode_column(attempt_mode)
+    rows = db.table(ROLLUP_TABLE).select('standard_code, ' + column).eq(
+        'class_id', class_id
+    ).eq('student_id', student_id).execute()
+    out = {}
+    for r in rows.data or []:
+        snapshot = r.get(column)
+        if r.get('standard_code') and snapshot:
+            out[r['standard_code']] = _hydrate_snapshot(snapshot, content_titles)
+    return out
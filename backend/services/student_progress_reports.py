@@ -8,7 +8,20 @@ functions only assemble data over `db`.
 
 Mastery helpers are imported from backend.services.student_mastery (a sibling
 service) — never from the route module (no service->route imports).
+
+When FLAG_MASTERY_ROLLUP_READS is on, per-student mastery comes from the
+student_standards_mastery rollup (backend/services/student_mastery_rollup.py)
+instead of re-aggregating every class submission per request. When it is off
+and FLAG_VECTORIZED_MASTERY is on, the re-aggregation runs through the
+columnar engine in backend/services/mastery_engine.py (imported on first
+use: it pulls in numpy, which the student portal blueprint should not pay
+for at startup).
 """
+from backend.services.student_mastery_rollup import (
+    load_class_mastery,
+    load_student_mastery,
+    rollup_reads_enabled,
+)
 from backend.services.student_mastery import (
     _sanitize_standards_mastery,
     _select_submissions_by_mode,
@@ -18,6 +31,61 @@ from backend.services.student_mastery import (
 )
 
 
+def _aggregate_class_mastery(db, student_ids, content_ids, content_titles, attempt_mode):
+    """Aggregate per-student mastery from raw class submissions (pre-rollup path).
+
+    Returns ``({student_id: {code: flat_mastery}}, sorted_standard_codes)``.
+    The standards union spans every submission in the class content, not just
+    the enrolled students'. Also the reference the rollup backfill verifies
+    against.
+    """
+    # Fetch all non-draft submissions for those contents, ordered for deterministic selection
+    # Select only columns we need to keep payload bounded
+    subs = db.table('student_submissions').select(
+        'id, student_id, content_id, attempt_number, submitted_at, percentage, results, status'
+    ).in_('content_id', content_ids).neq('status', 'draft').order(
+        'submitted_at', desc=True
+    ).execute()
+
+    # Sanitize malformed standards_mastery in place so column-union and
+    # aggregation don't 500 on a single corrupt row. Phase 2b extracted
+    # this from get_student_report_card to share between endpoints.
+    for s in subs.data or []:
+        _sanitize_standards_mastery(s)
+
+    # Group submissions by (student_id, content_id)
+    from collections import defaultdict
+    subs_by_student_content = defaultdict(lambda: defaultdict(list))
+    all_standards_in_class = set()  # Union across the whole class — used for columns
+    for s in subs.data or []:
+        sid = s.get('student_id')
+        cid = s.get('content_id')
+        if sid and cid:
+            subs_by_student_content[sid][cid].append(s)
+            # Track every standard seen anywhere in the class for column union
+            results = s.get('results') or {}
+            mastery = results.get('standards_mastery') or {}
+            for code in mastery.keys():
+                if code:
+                    all_standards_in_class.add(code)
+
+    # Build per-student mastery
+    selected_by_student = {
+        sid: _select_submissions_by_mode(subs_by_student_content.get(sid, {}), attempt_mode)
+        for sid in student_ids
+    }
+    from backend.services.mastery_engine import aggregate_mastery_by_student, vectorized_mastery_enabled
+    if vectorized_mastery_enabled():
+        # One columnar pass over the whole class; byte-identical output.
+        mastery_by_student = aggregate_mastery_by_student(selected_by_student, content_titles, attempt_mode)
+    else:
+        mastery_by_student = {
+            sid: _aggregate_mastery_for_student(selected, content_titles, attempt_mode)
+            for sid, selected in selected_by_student.items()
+        }
+    return mastery_by_student, sorted(all_standards_in_class)
+
+
 def build_class_progress_rank(db, class_id, class_name, attempt_mode):
     """Assemble the class progress-rank grid payload.
 
@@ -72,54 +140,24 @@ def build_class_progress_rank(db, class_id, class_name, attempt_mode):
             "students": [{'student_id': s['student_id'], 'student_name': s['student_name'], 'mastery': {}} for s in student_records],
         }, False)
 
-    # Fetch all non-draft submissions for those contents, ordered for deterministic selection
-    # Select only columns we need to keep payload bounded
-    subs = db.table('student_submissions').select(
-        'id, student_id, content_id, attempt_number, submitted_at, percentage, results, status'
-    ).in_('content_id', content_ids).neq('status', 'draft').order(
-        'submitted_at', desc=True
-    ).execute()
-
-    # Sanitize malformed standards_mastery in place so column-union and
-    # aggregation don't 500 on a single corrupt row. Phase 2b extracted
-    # this from get_student_report_card to share between endpoints.
-    for s in subs.data or []:
-        _sanitize_standards_mastery(s)
-
-    # Group submissions by (student_id, content_id)
-    from collections import defaultdict
-    subs_by_student_content = defaultdict(lambda: defaultdict(list))
-    all_standards_in_class = set()  # Union across the whole class — used for columns
-    for s in subs.data or []:
-        sid = s.get('student_id')
-        cid = s.get('content_id')
-        if sid and cid:
-            subs_by_student_content[sid][cid].append(s)
-            # Track every standard seen anywhere in the class for column union
-            results = s.get('results') or {}
-            mastery = results.get('standards_mastery') or {}
-            for code in mastery.keys():
-                if code:
-                    all_standards_in_class.add(code)
+    if rollup_reads_enabled():
+        mastery_by_student, standards = load_class_mastery(db, class_id, attempt_mode, content_titles)
+    else:
+        mastery_by_student, standards = _aggregate_class_mastery(
+            db, [s['student_id'] for s in student_records], content_ids, content_titles, attempt_mode,
+        )
 
-    # Build per-student mastery
-    students_output = []
-    for student in student_records:
-        sid = student['student_id']
-        by_content = subs_by_student_content.get(sid, {})
-        selected = _select_submissions_by_mode(by_content, attempt_mode)
-        mastery = _aggregate_mastery_for_student(selected, content_titles, attempt_mode)
-        students_output.append({
-            'student_id': sid,
-            'student_name': student['student_name'],
-            'mastery': mastery,
-        })
+    students_output = [{
+        'student_id': student['student_id'],
+        'student_name': student['student_name'],
+        'mastery': mastery_by_student.get(student['student_id'], {}),
+    } for student in student_records]
 
     payload = {
         "class_id": class_id,
         "class_name": class_name,
         "attempt_mode": attempt_mode,
-        "standards": sorted(all_standards_in_class),
+        "standards": standards,
         "students": students_output,
     }
     return (payload, True)
@@ -179,10 +217,13 @@ def build_student_report_card(db, class_id, class_name, student_id, student_name
         cid = s.get('content_id')
         if cid:
             subs_by_content[cid].append(s)
-    selected = _select_submissions_by_mode(subs_by_content, attempt_mode)
-    mastery_by_code = _aggregate_mastery_for_student(
-        selected, content_titles, attempt_mode, include_dok=True,
-    )
+    if rollup_reads_enabled():
+        mastery_by_code = load_student_mastery(db, class_id, student_id, attempt_mode, content_titles)
+    else:
+        selected = _select_submissions_by_mode(subs_by_content, attempt_mode)
+        mastery_by_code = _aggregate_mastery_for_student(
+            selected, content_titles, attempt_mode, include_dok=True,
+        )
     submission_lookup = {s.get('id'): s for s in submissions if s.get('id')}
     standards_breakdown = _build_standards_breakdown_for_student(mastery_by_code, submission_lookup)
 
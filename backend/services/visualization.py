@@ -9,6 +9,10 @@ Supports:
 - Box plots (statistics)
 - Bar/line/scatter charts (data analysis)
 - Geometric shapes (triangles, rectangles)
+
+Every create_* helper (and render_latex) is wrapped in
+figure_cache.cached_figure, so identical calls reuse the rendered PNG when
+FLAG_FIGURE_CACHE is on.
 """
 
 import io
@@ -16,6 +20,8 @@ import base64
 import logging
 from pathlib import Path
 
+from backend.services.figure_cache import cached_figure
+
 _logger = logging.getLogger(__name__)
 
 # Lazy import matplotlib to avoid startup overhead
@@ -64,6 +70,7 @@ def save_figure(fig, filepath: str):
 # LATEX / MATH NOTATION
 # =============================================================================
 
+@cached_figure
 def render_latex(latex: str, font_size: int = 20) -> str:
     """Render a LaTeX math expression to a base64 PNG using matplotlib mathtext.
 
@@ -101,6 +108,7 @@ def render_latex(latex: str, font_size: int = 20) -> str:
 # NUMBER LINES
 # =============================================================================
 
+@cached_figure
 def create_number_line(
     min_val: float = -10,
     max_val: float = 10,
@@ -172,6 +180,7 @@ def create_number_line(
 # COORDINATE PLANE
 # =============================================================================
 
+@cached_figure
 def create_coordinate_plane(
     x_range: tuple = (-10, 10),
     y_range: tuple = (-10, 10),
@@ -252,6 +261,7 @@ def create_coordinate_plane(
 # BOX PLOTS
 # =============================================================================
 
+@cached_figure
 def create_box_plot(
     data: list,
     labels: list = None,
@@ -323,6 +333,7 @@ def create_box_plot(
 # BAR/LINE/SCATTER CHARTS
 # =============================================================================
 
+@cached_figure
 def create_bar_chart(
     categories: list,
     values: list,
@@ -364,6 +375,7 @@ def create_bar_chart(
     return result
 
 
+@cached_figure
 def create_line_graph(
     x_data: list,
     y_data: list,
@@ -403,6 +415,7 @@ def create_line_graph(
     return result
 
 
+@cached_figure
 def create_scatter_plot(
     x_data: list,
     y_data: list,
@@ -452,6 +465,7 @@ def create_scatter_plot(
 # GEOMETRIC SHAPES
 # =============================================================================
 
+@cached_figure
 def create_triangle(
     base: float = 6,
     height: float = 4,
@@ -503,6 +517,7 @@ def create_triangle(
     return result
 
 
+@cached_figure
 def create_rectangle(
     width: float = 6,
     height: float = 4,
@@ -552,6 +567,7 @@ def create_rectangle(
 # FUNCTION GRAPHS
 # =============================================================================
 
+@cached_figure
 def create_function_graph(
     expressions: list,
     x_range: tuple = (-10, 10),
@@ -652,6 +668,7 @@ def create_function_graph(
 # CIRCLES
 # =============================================================================
 
+@cached_figure
 def create_circle(
     radius: float = 5,
     center: tuple = (0, 0),
@@ -725,6 +742,7 @@ def create_circle(
 # REGULAR POLYGONS
 # =============================================================================
 
+@cached_figure
 def create_polygon(
     sides: int = 5,
     side_length: float = 4,
@@ -805,6 +823,7 @@ def create_polygon(
 # HISTOGRAMS
 # =============================================================================
 
+@cached_figure
 def create_histogram(
     data: list,
     bins: int = 10,
@@ -862,6 +881,7 @@ def create_histogram(
 # PIE CHARTS
 # =============================================================================
 
+@cached_figure
 def create_pie_chart(
     categories: list,
     values: list,
@@ -913,6 +933,7 @@ def create_pie_chart(
     return result
 
 
+@cached_figure
 def create_dot_plot(
     categories: list = None,
     dots: dict = None,
@@ -962,6 +983,7 @@ def create_dot_plot(
     return result
 
 
+@cached_figure
 def create_stem_and_leaf(
     data: list = None,
     title: str = None,
@@ -1005,6 +1027,7 @@ def create_stem_and_leaf(
     return result
 
 
+@cached_figure
 def create_venn_diagram(
     sets: int = 2,
     labels: list = None,
@@ -1073,6 +1096,7 @@ def create_venn_diagram(
     return result
 
 
+@cached_figure
 def create_protractor(
     given_angle: float = 45,
     show_answer: bool = True,
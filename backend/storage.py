@@ -1,12 +1,17 @@
 """
 Storage Abstraction Layer for Graider
 ======================================
-Provides load/save/delete/list_keys for teacher data with two backends:
+Provides load/save/delete/list_keys (plus the bulk readers load_many and
+load_prefix) for teacher data with two backends:
   - File backend (local dev): reads/writes to ~/.graider_* files
   - Supabase backend (production): upserts to teacher_data / student_history tables
 
 Detection: USE_SUPABASE = True when SUPABASE_URL and SUPABASE_SERVICE_KEY are set.
 Local-dev (teacher_id == 'local-dev') always uses files regardless.
+
+Inside a request/task unit of work (backend/storage_uow.py, behind
+FLAG_STORAGE_UNIT_OF_WORK) load is cached per key and save is buffered
+until the unit ends or flush() is called.
 """
 
 import os
@@ -16,6 +21,7 @@ import logging
 from pathlib import Path
 from datetime import datetime, timezone
 from backend.retry import with_retry
+from backend.storage_uow import current_unit_of_work, submit_file_write
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +92,7 @@ def _key_to_filepath(data_key, teacher_id='local-dev'):
       'period:{filename}'          -> ~/.graider_data/periods/{filename}
       'period_meta:{filename}'     -> ~/.graider_data/periods/{filename}.meta.json
       'lesson:{unit}:{title}'      -> ~/.graider_lessons/{unit}/{title}.json
+      'email_outbox:{batch_id}'    -> ~/.graider_data/email_outbox/{batch_id}.json
     """
     home = _tenant_home(teacher_id)
     graider_data = os.path.join(home, ".graider_data")
@@ -140,6 +147,9 @@ def _key_to_filepath(data_key, teacher_id='local-dev'):
     elif data_key.startswith('resource:'):
         resource_id = data_key[len('resource:'):]
         return os.path.join(resources, f"{resource_id}.json")
+    elif data_key.startswith('email_outbox:'):
+        batch_id = data_key[len('email_outbox:'):]
+        return os.path.join(graider_data, "email_outbox", f"{batch_id}.json")
     elif data_key.startswith('clever_link:'):
         clever_id = data_key[len('clever_link:'):]
         clever_dir = os.path.join(graider_data, "clever_links")
@@ -228,6 +238,7 @@ def _file_list_keys(prefix, teacher_id='local-dev'):
     lessons_dir = os.path.join(home, ".graider_lessons")
     periods_dir = os.path.join(home, ".graider_data", "periods")
     resources_dir = os.path.join(home, ".graider_data", "resources")
+    outbox_dir = os.path.join(home, ".graider_data", "email_outbox")
 
     if prefix == 'assignment:' or prefix.startswith('assignment:'):
         if os.path.exists(assignments_dir):
@@ -267,9 +278,25 @@ def _file_list_keys(prefix, teacher_id='local-dev'):
                     resource_id = f[:-5]
                     keys.append(f"resource:{resource_id}")
 
+    elif prefix == 'email_outbox:' or prefix.startswith('email_outbox:'):
+        if os.path.exists(outbox_dir):
+            for f in os.listdir(outbox_dir):
+                if f.endswith('.json'):
+                    keys.append(f"email_outbox:{f[:-5]}")
+
     return sorted(keys)
 
 
+def _file_load_prefix(prefix, teacher_id='local-dev'):
+    """Load every key under a prefix from local files (one directory pass)."""
+    result = {}
+    for key in _file_list_keys(prefix, teacher_id):
+        data = _file_load(key, teacher_id)
+        if data is not None:
+            result[key] = data
+    return result
+
+
 # ══════════════════════════════════════════════════════════════
 # SUPABASE BACKEND
 # ══════════════════════════════════════════════════════════════
@@ -353,6 +380,65 @@ def _sb_list_keys(prefix, teacher_id):
         return None
 
 
+# PostgREST encodes `in_` filters into the URL; keep each batch well under
+# typical proxy URL limits.
+_SB_IN_BATCH = 100
+
+
+def _sb_load_many(data_keys, teacher_id):
+    """Load several keys from teacher_data with one `in_` query per batch.
+
+    Returns {data_key: data} for the rows found, or None if a query failed.
+    """
+    def _op():
+        sb = _get_supabase()
+        if not sb:
+            return None
+        found = {}
+        for i in range(0, len(data_keys), _SB_IN_BATCH):
+            result = sb.table('teacher_data') \
+                .select('data_key, data') \
+                .eq('teacher_id', teacher_id) \
+                .in_('data_key', data_keys[i:i + _SB_IN_BATCH]) \
+                .execute()
+            for row in result.data or []:
+                found[row['data_key']] = row['data']
+        return found
+    try:
+        return with_retry(_op, label="supabase_load_many", max_retries=3)
+    except Exception as e:  # noqa: BLE001  # broad catch: error is logged
+        logger.error("Supabase load_many failed for %d keys teacher=%s: %s", len(data_keys), teacher_id, e)
+        return None
+
+
+def _sb_load_prefix(prefix, teacher_id):
+    """Load every key under a prefix from teacher_data with one `like` query.
+
+    Returns {data_key: data}, or None if the query failed.
+    """
+    def _op():
+        sb = _get_supabase()
+        if not sb:
+            return None
+        result = sb.table('teacher_data') \
+            .select('data_key, data') \
+            .eq('teacher_id', teacher_id) \
+            .like('data_key', f"{prefix}%") \
+            .execute()
+        # `_` is a LIKE wildcard ('period_meta:' would also match
+        # 'periodXmeta:'), so re-check the literal prefix.
+        return {
+            row['data_key']: row['data']
+            for row in result.data or []
+            if row['data_key'].startswith(prefix) and row['data'] is not None
+        }
+    try:
+        return with_retry(_op, label="supabase_load_prefix", max_retries=3)
+    except Exception as e:  # noqa: BLE001  # broad catch: error is logged
+        logger.error("Supabase load_prefix failed for prefix=%s teacher=%s: %s", prefix, teacher_id, e)
+        return None
+
+
 # ══════════════════════════════════════════════════════════════
 # STUDENT HISTORY (separate table)
 # ══════════════════════════════════════════════════════════════
@@ -515,6 +601,13 @@ def load(data_key, teacher_id='local-dev'):
     Returns:
         Parsed JSON data (dict or list), or None if not found.
     """
+    uow = current_unit_of_work()
+    if uow is not None:
+        return uow.load(data_key, teacher_id, lambda: _load_direct(data_key, teacher_id))
+    return _load_direct(data_key, teacher_id)
+
+
+def _load_direct(data_key, teacher_id):
     if _use_supabase(teacher_id):
         result = _sb_load(data_key, teacher_id)
         if result is not None:
@@ -562,8 +655,16 @@ def save(data_key, data, teacher_id='local-dev'):
         teacher_id: Teacher's Supabase UUID, or 'local-dev' for file backend
 
     Returns:
-        True on success.
+        True on success. Inside a unit of work the save is buffered and
+        True means "accepted"; it is written when the unit ends.
     """
+    uow = current_unit_of_work()
+    if uow is not None:
+        return uow.save(data_key, data, teacher_id)
+    return _save_direct(data_key, data, teacher_id)
+
+
+def _save_direct(data_key, data, teacher_id, *, mirror_in_background=False):
     if _use_supabase(teacher_id):
         sb_ok = _sb_save(data_key, data, teacher_id)
         # Skip file write for sensitive data when not local-dev
@@ -571,7 +672,10 @@ def save(data_key, data, teacher_id='local-dev'):
         # Issue #353: even when the dual-write happens, it lands under the
         # per-tenant subdirectory so the file backend stays isolated too.
         if not _is_sensitive_key(data_key):
-            _file_save(data_key, data, teacher_id)
+            if mirror_in_background:
+                submit_file_write(_file_save, data_key, data, teacher_id)
+            else:
+                _file_save(data_key, data, teacher_id)
         return sb_ok
 
     # Local-dev (or non-local-dev with Supabase unconfigured): file only,
@@ -585,6 +689,9 @@ def delete(data_key, teacher_id='local-dev'):
     Returns:
         True on success.
     """
+    uow = current_unit_of_work()
+    if uow is not None:
+        uow.forget(data_key, teacher_id)
     # Issue #353: per-tenant shard so deleting in one tenant's namespace
     # doesn't touch any other tenant's file.
     file_ok = _file_delete(data_key, teacher_id)
@@ -605,6 +712,7 @@ def list_keys(prefix, teacher_id='local-dev'):
     Returns:
         Sorted list of matching data_key strings.
     """
+    flush()
     if _use_supabase(teacher_id):
         keys = _sb_list_keys(prefix, teacher_id)
         if keys is not None:
@@ -615,6 +723,104 @@ def list_keys(prefix, teacher_id='local-dev'):
     return _file_list_keys(prefix, teacher_id)
 
 
+def load_many(data_keys, teacher_id='local-dev'):
+    """Load several keys at once — one round trip instead of one per key.
+
+    Same per-key semantics as `load` (including the file fallback for
+    non-sensitive keys missing from Supabase).
+
+    Args:
+        data_keys: Iterable of keys
+        teacher_id: Teacher's Supabase UUID, or 'local-dev' for file backend
+
+    Returns:
+        Dict mapping every requested key to its data, or None if not found.
+    """
+    keys = list(dict.fromkeys(data_keys))
+    if not keys:
+        return {}
+    flush()
+    if _use_supabase(teacher_id):
+        found = _sb_load_many(keys, teacher_id) or {}
+        result = {}
+        for key in keys:
+            data = found.get(key)
+            if data is None and not _is_sensitive_key(key):
+                data = _file_load(key, teacher_id)
+            result[key] = data
+        return result
+    return {key: _file_load(key, teacher_id) for key in keys}
+
+
+def load_prefix(prefix, teacher_id='local-dev'):
+    """Load every key under a prefix — `list_keys` + `load` in one query.
+
+    Args:
+        prefix: Key prefix (e.g. 'period:', 'lesson:')
+        teacher_id: Teacher's Supabase UUID
+
+    Returns:
+        Dict of data_key -> data in sorted key order (keys with no data omitted).
+    """
+    flush()
+    if _use_supabase(teacher_id):
+        result = _sb_load_prefix(prefix, teacher_id)
+        if result is not None:
+            return dict(sorted(result.items()))
+        # Same fallback rule as list_keys: files only when the query failed
+        logger.warning("load_prefix: Supabase query returned None for prefix=%s, falling back to files", prefix)
+    return _file_load_prefix(prefix, teacher_id)
+
+
+def record_version(data_key, teacher_id='local-dev'):
+    """Cheap change marker for the record `load(data_key, teacher_id)` reads.
+
+    `(updated_at_ns, 0)` from the Supabase teacher_data row, or the local
+    file's `(mtime_ns, size)` when the record is file-backed (or has no
+    Supabase row yet, matching load()'s fallback). None when it is absent.
+    Raises if the Supabase lookup fails, so a caller never mistakes an
+    outage for "unchanged".
+    """
+    if _use_supabase(teacher_id):
+        sb = _get_supabase()
+        if sb:
+            result = sb.table('teacher_data') \
+                .select('updated_at') \
+                .eq('teacher_id', teacher_id) \
+                .eq('data_key', data_key) \
+                .execute()
+            if result.data:
+                stamp = result.data[0].get('updated_at')
+                if not stamp:
+                    return (0, 0)
+                dt = datetime.fromisoformat(str(stamp).replace('Z', '+00:00'))
+                return (int(dt.timestamp() * 1_000_000) * 1000, 0)
+            if _is_sensitive_key(data_key):
+                return None
+    filepath = _key_to_filepath(data_key, teacher_id)
+    if not filepath:
+        return None
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def flush():
+    """Write this unit of work's buffered saves now (no-op outside one).
+
+    Returns:
+        Number of saves that failed.
+    """
+    uow = current_unit_of_work()
+    if uow is None:
+        return 0
+    return uow.flush(
+        lambda key, data, tid: _save_direct(key, data, tid, mirror_in_background=True)
+    )
+
+
 def load_student_history(teacher_id='local-dev', student_id=None):
     """Load a student's grading history.
 
@@ -687,16 +893,28 @@ def delete_student_history(teacher_id='local-dev', student_id=None):
 # SYNC: Upload all local files to Supabase for a teacher
 # ══════════════════════════════════════════════════════════════
 
-def sync_all_to_cloud(teacher_id):
+_SYNC_STEPS = ('settings', 'assignments', 'lessons', 'periods', 'period rosters',
+               'resources', 'student history')
+
+
+def sync_all_to_cloud(teacher_id, progress=None):
     """Upload all local ~/.graider_* data to Supabase for the given teacher.
 
+    ``progress(done, total, step)`` is called before each step (the
+    cloud_sync background job reports it and may raise to cancel).
+
     Returns:
         Summary dict of what was synced.
     """
     if not teacher_id or teacher_id == 'local-dev':
         return {"error": "Cannot sync without a valid teacher ID (must be logged in)"}
 
+    def _step(name):
+        if progress is not None:
+            progress(_SYNC_STEPS.index(name), len(_SYNC_STEPS), name)
+
     summary = {}
+    _step('settings')
 
     # Single-key data files
     single_keys = [
@@ -720,6 +938,7 @@ def sync_all_to_cloud(teacher_id):
         else:
             summary[key] = "no local data"
 
+    _step('assignments')
     # Assignments
     assignment_keys = _file_list_keys('assignment:', teacher_id)
     synced_assignments = 0
@@ -730,6 +949,7 @@ def sync_all_to_cloud(teacher_id):
                 synced_assignments += 1
     summary['assignments'] = f"{synced_assignments} synced"
 
+    _step('lessons')
     # Lessons
     lesson_keys = _file_list_keys('lesson:', teacher_id)
     synced_lessons = 0
@@ -740,6 +960,7 @@ def sync_all_to_cloud(teacher_id):
                 synced_lessons += 1
     summary['lessons'] = f"{synced_lessons} synced"
 
+    _step('periods')
     # Period metadata
     period_meta_keys = _file_list_keys('period_meta:', teacher_id)
     synced_periods = 0
@@ -750,6 +971,7 @@ def sync_all_to_cloud(teacher_id):
                 synced_periods += 1
     summary['periods'] = f"{synced_periods} synced"
 
+    _step('period rosters')
     # Period CSV data — must round-trip through `_file_load('period:*')`,
     # which returns the raw CSV string (storage.py:135-137). Issue #341:
     # was uploading `{"headers": ..., "rows": ...}` dicts, breaking any
@@ -766,6 +988,7 @@ def sync_all_to_cloud(teacher_id):
             logger.warning("Failed to sync period CSV %s: %s", key, e)
             sentry_sdk.capture_exception(e)
 
+    _step('resources')
     # Sync resources
     # Gemini quality-review 2026-05-10: was `if data:` which dropped
     # valid empty `{}` / `[]` from sync. Standardize on `is not None`
@@ -779,6 +1002,7 @@ def sync_all_to_cloud(teacher_id):
                 synced_resources += 1
     summary['resources'] = f"{synced_resources} synced"
 
+    _step('student history')
     # Student history — VB2b (audit #3): read THIS teacher's tenant history
     # dir, never the global directory. On a multi-tenant server the global
     # dir holds other tenants' (and pre-migration) records; reading it here
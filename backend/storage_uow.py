@@ -0,0 +1,227 @@
+"""Request/task-scoped unit of work for backend/storage.py.
+
+Every `storage.load` is a Supabase round trip (with retries) and every
+`storage.save` is a synchronous Supabase upsert plus a file dual-write.
+One HTTP request commonly loads `settings` / `results` / `rubric` several
+times and sometimes saves the same key more than once.
+
+While a `StorageUnitOfWork` is active (bound to a Flask request by
+`register(app)` or to a Celery task by the signal handlers in
+backend/celery_app.py):
+
+* `load` is deduplicated per (teacher_id, key); callers get a deep copy,
+  so mutating a loaded dict never changes what the next caller sees.
+* `save` is buffered (last writer wins) and visible to later loads in the
+  same unit; all buffered saves are flushed once when the unit ends.
+* The file-backend mirror of a Supabase save goes to a single background
+  writer thread instead of blocking the flush (one thread, so writes to
+  the same file stay in order).
+* `delete`, `list_keys`, `load_many` and `load_prefix` flush pending
+  saves first, so they always see this unit's writes.
+
+Plain threads don't inherit the unit (contextvars are not copied into a new
+thread) and Celery tasks read the database, so buffered saves are invisible
+to both. Every point that hands work to one calls `storage.flush()` first:
+`background_jobs.dispatch`, the portal-grading Celery enqueue and thread
+spawns (student_portal_routes, student_account_routes), the post-login
+Clever / ClassLink roster-sync threads, the Focus import thread and the
+email-outbox drain (`email_outbox.create_outbox`). New dispatch points must
+do the same.
+
+Each unit emits `storage.uow.completed` with loads/saves requested vs.
+performed so the round trips saved are visible per request.
+
+Gated by FLAG_STORAGE_UNIT_OF_WORK (default off); with the flag off no
+unit is ever started and storage behaves exactly as before.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+import sentry_sdk
+
+from backend.feature_flags import flag_enabled
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar["StorageUnitOfWork | None"] = contextvars.ContextVar(
+    'storage_unit_of_work', default=None,
+)
+
+_MISSING = object()
+
+_file_writer: ThreadPoolExecutor | None = None
+_file_writer_lock = threading.Lock()
+
+
+def storage_unit_of_work_enabled() -> bool:
+    return flag_enabled('storage_unit_of_work', default=False)
+
+
+def current_unit_of_work() -> "StorageUnitOfWork | None":
+    return _current.get()
+
+
+def submit_file_write(fn: Callable, *args) -> None:
+    """Run a file-backend mirror write on the single background writer."""
+    global _file_writer
+    if _file_writer is None:
+        with _file_writer_lock:
+            if _file_writer is None:
+                _file_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='storage-file-mirror')
+    _file_writer.submit(_run_file_write, fn, *args)
+
+
+def _run_file_write(fn: Callable, *args) -> None:
+    try:
+        fn(*args)
+    except Exception as e:  # noqa: BLE001  # broad catch: mirror write is best-effort; error is logged
+        logger.warning("Background file mirror write failed: %s", e)
+        sentry_sdk.capture_exception(e)
+
+
+def wait_for_file_writes() -> None:
+    """Block until every queued mirror write has run (tests, shutdown)."""
+    if _file_writer is not None:
+        _file_writer.submit(lambda: None).result()
+
+
+class StorageUnitOfWork:
+    """Per-request cache of loaded keys plus a buffer of pending saves."""
+
+    def __init__(self, scope: str = 'request'):
+        self.scope = scope
+        self._lock = threading.RLock()
+        self._cache: dict[tuple[str, str], Any] = {}
+        self._pending: dict[tuple[str, str], Any] = {}
+        self.loads_requested = 0
+        self.loads_performed = 0
+        self.saves_requested = 0
+        self.saves_performed = 0
+        self.save_failures = 0
+
+    def load(self, data_key: str, teacher_id: str, loader: Callable[[], Any]) -> Any:
+        ident = (teacher_id, data_key)
+        with self._lock:
+            self.loads_requested += 1
+            value = self._pending.get(ident, _MISSING)
+            if value is _MISSING:
+                value = self._cache.get(ident, _MISSING)
+            if value is _MISSING:
+                value = loader()
+                self.loads_performed += 1
+                self._cache[ident] = value
+            return copy.deepcopy(value)
+
+    def save(self, data_key: str, data: Any, teacher_id: str) -> bool:
+        ident = (teacher_id, data_key)
+        snapshot = copy.deepcopy(data)
+        with self._lock:
+            self.saves_requested += 1
+            # Re-insert so flush order follows the most recent write.
+            self._pending.pop(ident, None)
+            self._pending[ident] = snapshot
+            self._cache[ident] = snapshot
+        return True
+
+    def forget(self, data_key: str, teacher_id: str) -> None:
+        """Drop a key from the cache and the pending writes (on delete)."""
+        ident = (teacher_id, data_key)
+        with self._lock:
+            self._cache.pop(ident, None)
+            self._pending.pop(ident, None)
+
+    def flush(self, saver: Callable[[str, Any, str], bool]) -> int:
+        """Write every pending save via ``saver``; returns the failure count."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            failures = 0
+            for (teacher_id, data_key), data in pending.items():
+                try:
+                    ok = saver(data_key, data, teacher_id)
+                except Exception as e:  # noqa: BLE001  # broad catch: one failed key must not drop the rest; error is logged
+                    logger.error("Deferred save failed for key=%s teacher=%s: %s", data_key, teacher_id, e)
+                    sentry_sdk.capture_exception(e)
+                    ok = False
+                self.saves_performed += 1
+                if not ok:
+                    failures += 1
+                    # Don't serve a value we failed to persist.
+                    self._cache.pop((teacher_id, data_key), None)
+            self.save_failures += failures
+            return failures
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'loads_requested': self.loads_requested,
+                'loads_performed': self.loads_performed,
+                'saves_requested': self.saves_requested,
+                'saves_performed': self.saves_performed,
+                'save_failures': self.save_failures,
+                'round_trips_saved': (self.loads_requested - self.loads_performed)
+                + (self.saves_requested - self.saves_performed),
+            }
+
+
+def begin(scope: str = 'request') -> contextvars.Token | None:
+    """Start a unit of work if the flag is on and none is active."""
+    if _current.get() is not None or not storage_unit_of_work_enabled():
+        return None
+    return _current.set(StorageUnitOfWork(scope))
+
+
+def end(token: contextvars.Token | None) -> None:
+    """Flush and close the unit started by ``begin`` (no-op for None)."""
+    if token is None:
+        return
+    uow = _current.get()
+    try:
+        if uow is not None:
+            from backend.storage import flush
+            flush()
+            stats = uow.stats()
+            if stats['loads_requested'] or stats['saves_requested']:
+                from backend.observability.events import emit
+                emit('storage.uow.completed', scope=uow.scope, **stats)
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def unit_of_work(scope: str = 'task') -> Iterator["StorageUnitOfWork | None"]:
+    """``with unit_of_work():`` — for scripts and jobs outside Flask/Celery hooks."""
+    token = begin(scope)
+    try:
+        yield _current.get()
+    finally:
+        end(token)
+
+
+def register(app) -> None:
+    """Bind one unit of work to each Flask request. Called from backend/app.py.
+
+    Flushed in teardown, which Flask runs before the response body is
+    handed to the server, and which also runs when the view raised (saves
+    made before the error were already durable before this layer existed).
+    """
+    from flask import g
+
+    @app.before_request
+    def _storage_uow_begin():
+        g._storage_uow_token = begin('request')
+
+    @app.teardown_request
+    def _storage_uow_end(exc):
+        token = g.pop('_storage_uow_token', None)
+        try:
+            end(token)
+        except Exception as e:  # noqa: BLE001  # broad catch: teardown must not raise; error is logged
+            logger.error("Storage unit-of-work flush failed: %s", e)
+            sentry_sdk.capture_exception(e)
@@ -0,0 +1,144 @@
+"""Per-worker admission control for long-lived streaming responses.
+
+The web service runs gunicorn's ``gthread`` worker (backend/gunicorn.conf.py):
+each worker process serves GUNICORN_THREADS requests concurrently, so an
+assistant SSE stream holds one thread for the length of its tool loop
+instead of the whole worker. Streams are still bounded: if every thread of
+a worker were streaming, that worker could not answer /api/status polls or
+any other sync route. `StreamSlots` caps concurrent streams per process at
+SSE_STREAM_SLOTS (default: GUNICORN_THREADS minus 4 threads kept for sync
+routes, at least 1) and the route answers 503 + Retry-After when the cap is
+reached:
+
+    lease = stream_slots.try_acquire()
+    if lease is None:
+        return <503 + Retry-After>
+    return Response(lease.wrap(stream_with_context(generate())), ...)
+
+The slot is released when the wrapped iterator is exhausted or closed
+(WSGI servers close the response iterable on completion and on client
+disconnect), exactly once, even if the generator never started. Wrap
+outside `stream_with_context`: its primed generator does not close the
+inner one when it is closed before the first chunk.
+
+Flask-free: no request/g access. Never imports a route module.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Iterator, TypeVar
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SYNC_RESERVED_THREADS = 4
+RETRY_AFTER_SECONDS = 5
+
+
+def default_capacity() -> int:
+    """SSE_STREAM_SLOTS, else GUNICORN_THREADS minus the sync reserve (min 1)."""
+    configured = os.getenv("SSE_STREAM_SLOTS")
+    if configured:
+        return max(1, int(configured))
+    threads = int(os.getenv("GUNICORN_THREADS") or "16")
+    return max(1, threads - _SYNC_RESERVED_THREADS)
+
+
+class StreamLease:
+    """One held stream slot; released once by `release` or the wrapped iterator."""
+
+    def __init__(self, slots: StreamSlots) -> None:
+        self._slots = slots
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._slots._release()
+
+    def wrap(self, iterable: Iterator[T]) -> Iterator[T]:
+        return _LeasedIterator(iterable, self)
+
+
+class _LeasedIterator:
+    """Iterator proxy that releases its lease on exhaustion, error or close()."""
+
+    def __init__(self, iterable: Iterator[T], lease: StreamLease) -> None:
+        self._it = iter(iterable)
+        self._lease = lease
+
+    def __iter__(self) -> _LeasedIterator:
+        return self
+
+    def __next__(self) -> T:
+        try:
+            return next(self._it)
+        except BaseException:
+            self._lease.release()
+            raise
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._it, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._lease.release()
+
+
+class StreamSlots:
+    """Counting gate of concurrent streams in this process."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.active = 0
+        self.rejected_total = 0
+
+    def try_acquire(self) -> StreamLease | None:
+        """A lease, or None (and a counted rejection) when every slot is taken."""
+        with self._lock:
+            if self.active >= self.capacity:
+                self.rejected_total += 1
+                rejected = True
+            else:
+                self.active += 1
+                rejected = False
+        if rejected:
+            _logger.warning("All %d stream slots in use; rejecting stream", self.capacity)
+            return None
+        return StreamLease(self)
+
+    def _release(self) -> None:
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+
+_slots: StreamSlots | None = None
+_slots_lock = threading.Lock()
+
+
+def get_slots() -> StreamSlots:
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = StreamSlots(default_capacity())
+    return _slots
+
+
+def try_acquire() -> StreamLease | None:
+    return get_slots().try_acquire()
+
+
+def reset() -> None:
+    """Drop the process gate (tests; capacity is re-read from env)."""
+    global _slots
+    with _slots_lock:
+        _slots = None
@@ -6,6 +6,7 @@ import sentry_sdk
 from celery import Task
 
 from backend.celery_app import celery_app
+from backend.celery_metrics import note_outcome
 
 _logger = logging.getLogger(__name__)
 
@@ -151,6 +152,7 @@ def grade_portal_submission(
         raise  # permanent — let it propagate to PortalGradingTask.on_failure
     if not ctx:
         _logger.warning("Submission not found for grading: %s", submission_id)
+        note_outcome(self.request.id, 'not_found')
         return
 
     # Guard against partial context: if published_assessments fetch failed
@@ -183,6 +185,7 @@ def grade_portal_submission(
             )
         except Exception as e:  # noqa: BLE001  # broad catch: error is logged
             _logger.warning("submission mark_failed (missing content) failed: %s", type(e).__name__)
+        note_outcome(self.request.id, 'assessment_unavailable')
         return
 
     grade_portal_submission_sync(
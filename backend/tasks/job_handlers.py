@@ -0,0 +1,149 @@
+"""Handlers for background job kinds (backend/services/background_jobs.py).
+
+Each handler takes a JobContext, does the work a route used to do inline
+(or on an ad-hoc thread), and returns a JSON-safe result summary. Files
+(reports, decks) are saved with ``ctx.save_result_file`` and downloaded from
+GET /api/jobs/<id>/result. Handlers must be safe to run again: a job whose
+worker died mid-run is redelivered and starts over.
+
+Imports are deferred to the handler body so the worker only pays for the
+kinds it actually runs (python-pptx, Playwright, the roster clients).
+"""
+import json
+import logging
+import os
+import tempfile
+
+from backend.services.background_jobs import JobCancelled, JobContext, JobError
+
+_logger = logging.getLogger(__name__)
+
+
+def send_grade_emails(ctx: JobContext) -> dict:
+    """Drain a grade-email outbox (created by /api/send-emails)."""
+    from backend.services import email_outbox
+    from backend.services.email_service import GraiderEmailer
+
+    emailer = GraiderEmailer()
+    if not emailer.resend_available:
+        raise JobError("Email not configured. Make sure RESEND_API_KEY is in .env file.")
+
+    def progress(status):
+        ctx.progress(status['sent'] + status['failed'], status['total'], status['message'])
+
+    record = email_outbox.drain_outbox(ctx.teacher_id, ctx.params['batch_id'], emailer,
+                                       on_progress=progress, should_stop=ctx.cancel_requested)
+    if record is None:
+        raise JobError("Email batch not found")
+    if record['status'] == 'cancelled':
+        raise JobCancelled()
+    status = email_outbox.outbox_status(record)
+    return {k: status[k] for k in ('batch_id', 'total', 'sent', 'failed', 'message')}
+
+
+def export_district_report(ctx: JobContext) -> dict:
+    """Build the anonymized district report and save it as JSON."""
+    from datetime import date
+
+    from backend.services.district_report import (
+        DistrictReportUnavailable,
+        build_district_report,
+    )
+
+    try:
+        report = build_district_report(ctx.teacher_id)
+    except DistrictReportUnavailable as e:
+        raise JobError(e.message) from e
+    ctx.save_result_file(json.dumps(report, indent=2).encode('utf-8'),
+                         f"district_report_{date.today().isoformat()}.json",
+                         'application/json')
+    return {'summary_statistics': report['summary_statistics']}
+
+
+def sync_to_cloud(ctx: JobContext) -> dict:
+    """Upload the teacher's local ~/.graider_* data to Supabase."""
+    from backend.storage import sync_all_to_cloud
+
+    def progress(done, total, step):
+        ctx.check_cancelled()
+        ctx.progress(done, total, f"Syncing {step}...")
+
+    summary = sync_all_to_cloud(ctx.teacher_id, progress=progress)
+    if 'error' in summary:
+        raise JobError(summary['error'])
+    return {'summary': summary}
+
+
+def sync_clever_roster(ctx: JobContext) -> dict:
+    """Login-triggered Clever roster sync."""
+    from backend.api_keys import resolve_clever_district_token
+    from backend.routes.clever_routes import _run_clever_roster_sync
+
+    district_token = resolve_clever_district_token(ctx.params.get('district_id'))
+    if not district_token:
+        raise JobError("District token not configured")
+    counts = _run_clever_roster_sync(district_token, ctx.teacher_id)
+    if counts is None:
+        raise JobError("Could not resolve this teacher's Clever account")
+    return {'counts': counts}
+
+
+def sync_classlink_roster(ctx: JobContext) -> dict:
+    """Login-triggered ClassLink (OneRoster 1.1) roster sync."""
+    from backend.routes.classlink_routes import _run_classlink_roster_sync
+
+    _run_classlink_roster_sync(ctx.teacher_id, ctx.params.get('tenant_id'))
+    return {}
+
+
+def _deck_title(deck: dict, default: str) -> str:
+    title = deck.get('title') or default
+    return "".join(c for c in title if c.isalnum() or c in " -_").strip()[:80] or default
+
+
+def export_slides_pptx(ctx: JobContext) -> dict:
+    """Assemble a generated slide deck as PowerPoint (.pptx)."""
+    import base64
+
+    from backend.services.slide_generator import assemble_pptx
+
+    deck = (ctx.payload() or {}).get('slides') or {}
+    if not deck.get('slides'):
+        raise JobError("No slide data provided.")
+    images = {}
+    for k, v in deck.get("_image_data", {}).items():
+        try:
+            images[int(k)] = base64.b64decode(v)
+        except Exception:  # noqa: BLE001  # broad catch: error is logged
+            _logger.debug("slide image base64 decode failed", exc_info=True)
+
+    safe_title = _deck_title(deck, "Slide Deck")
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "deck.pptx")
+        assemble_pptx(deck["slides"], deck.get("theme", {}),
+                      deck.get("title", "Slide Deck"), images, filepath)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    ctx.save_result_file(
+        data, safe_title + ".pptx",
+        'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    )
+    return {'slides': len(deck['slides'])}
+
+
+def export_slides_pdf(ctx: JobContext) -> dict:
+    """Render a slide deck to a 16:9 PDF."""
+    from backend.services.slide_html_builder import build_deck_html
+    from backend.services.slide_pdf import SlidePdfError, html_to_pdf
+
+    deck = (ctx.payload() or {}).get('slides') or {}
+    if not deck.get('slides'):
+        raise JobError("No slides to render")
+    html = build_deck_html(deck, deck.get('_image_data') or {})
+    try:
+        pdf_bytes = html_to_pdf(html)
+    except SlidePdfError as e:
+        raise JobError("PDF rendering is temporarily unavailable. "
+                       "Use the Download PowerPoint export instead.") from e
+    ctx.save_result_file(pdf_bytes, _deck_title(deck, "slides") + ".pdf", 'application/pdf')
+    return {'slides': len(deck['slides'])}
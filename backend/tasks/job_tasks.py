@@ -0,0 +1,21 @@
+"""Background job Celery task (backend/services/background_jobs.py).
+
+One generic task runs every job kind: the message carries only the job id,
+and the job row holds the kind, params, progress and result. Jobs go to
+the ``jobs`` queue so the Procfile's ``jobs_worker`` scales independently
+of portal grading on the default queue.
+"""
+from backend.celery_app import celery_app
+from backend.celery_metrics import note_outcome
+
+
+# No autoretry: run_job records handler failures on the job row, and
+# acks_late + task_reject_on_worker_lost (celery_app) redeliver a job whose
+# worker died mid-run. Per-kind time limits are set at enqueue.
+@celery_app.task(name='jobs.run', bind=True, acks_late=True, time_limit=3600, soft_time_limit=3540)
+def run_background_job(self, job_id: str) -> None:
+    """Run background job ``job_id`` to a terminal state."""
+    from backend.services import background_jobs
+
+    job = background_jobs.run_job(job_id)
+    note_outcome(self.request.id, job['status'] if job else 'not_found')
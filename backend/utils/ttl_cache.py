@@ -1,65 +1,148 @@
 """
-Tiny thread-safe in-process TTL cache.
+Thread-safe TTL caches: a process-local LRU tier and an optional shared
+Redis tier on top of it.
 
 Used for short-window memoization of expensive read endpoints (e.g. the
 class progress-rank grid, where re-aggregating thousands of submissions
 on every poll is wasteful when the underlying data changes infrequently
 on a teacher-dashboard cadence).
 
-Not meant to replace a proper materialized view or Redis cache — those
-arrive in a follow-up. This is the 5%-effort fix that buys 80% of the
-perf headroom while the materialized rollup design is built.
+``TTLCache`` is process-local: each gunicorn worker / Railway pod has its
+own copy. Entries are bounded by ``max_entries`` (least-recently-used
+eviction) as well as by TTL.
 
-Process-local: each Railway worker has its own cache. Acceptable for a
-short TTL (≤60s) where cache divergence is bounded by the TTL itself.
+``SharedTTLCache`` adds a Redis tier (REDIS_URL) so every worker and pod
+reuses one computed payload, plus:
+
+- single-flight: ``get_or_compute`` lets one caller per key compute while
+  concurrent callers (same process: a lock; other processes: a short Redis
+  lock) wait for its result instead of stampeding the database;
+- version-key invalidation: entries are keyed under a per-scope version
+  (e.g. per class). ``invalidate_scope(namespace, scope)`` bumps that
+  version, which every process observes on its next read — no key scans;
+- hit / miss / eviction counters via ``stats()``.
+
+Redis is strictly an accelerator. Without REDIS_URL, or while Redis is
+failing, the shared cache degrades to the local tier (versions then only
+invalidate within the calling process, bounded by the TTL as before).
 """
 from __future__ import annotations
 
+import json
+import logging
+import os
 import threading
 import time
-from typing import Any
+from collections import OrderedDict
+from typing import Any, Callable
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# How long a failed Redis call takes the shared tier offline before retrying.
+# Keeps a Redis outage from adding a socket timeout to every request.
+_REDIS_BACKOFF_SECONDS = 30.0
+
+_MISSING = object()
 
 
 class TTLCache:
-    """Thread-safe TTL cache. Keys are arbitrary hashables.
+    """Thread-safe TTL + LRU cache. Keys are arbitrary hashables.
 
-    Lazy expiry: stale entries are evicted on the next get() / set() that
-    touches them. There is no background reaper. For a small dashboard
-    cache this is fine; for high-cardinality keys add a periodic prune
-    or migrate to Redis.
+    Expiry is lazy (on the next get() that touches a stale key); size is
+    bounded eagerly — set() evicts the least-recently-used entry once
+    ``max_entries`` is exceeded, so high-cardinality keys cannot grow the
+    process without limit.
     """
 
-    def __init__(self, ttl_seconds: float):
+    def __init__(self, ttl_seconds: float, max_entries: int = DEFAULT_MAX_ENTRIES):
         if ttl_seconds <= 0:
             raise ValueError("ttl_seconds must be > 0")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
         self._ttl = float(ttl_seconds)
-        self._store: dict[Any, tuple[float, Any]] = {}
+        self._max_entries = int(max_entries)
+        self._store: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
         self._lock = threading.Lock()
+        self._inflight: dict[Any, threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
 
-    def get(self, key: Any) -> Any:
-        """Return the cached value, or None if missing / expired.
-
-        Note: None is also a valid stored value in principle. Callers that
-        need to distinguish "absent" from "explicitly cached None" should
-        use a sentinel — this cache is not used that way today.
-        """
+    def _local_get(self, key: Any) -> Any:
         now = time.monotonic()
         with self._lock:
             entry = self._store.get(key)
             if entry is None:
-                return None
+                return _MISSING
             expires_at, value = entry
             if expires_at < now:
                 # Lazy expiry
                 self._store.pop(key, None)
-                return None
+                self._stats["expirations"] += 1
+                return _MISSING
+            self._store.move_to_end(key)
             return value
 
+    def _local_set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            self._store[key] = (expires_at, value)
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value, or None if missing / expired.
+
+        Note: None is also a valid stored value in principle. Callers that
+        need to distinguish "absent" from "explicitly cached None" should
+        use a sentinel — this cache is not used that way today.
+        """
+        value = self._local_get(key)
+        if value is _MISSING:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return value
+
     def set(self, key: Any, value: Any) -> None:
         """Store value at key with a fresh TTL window."""
-        expires_at = time.monotonic() + self._ttl
+        self._local_set(key, value)
+
+    def get_or_compute(self, key: Any, compute: Callable[[], tuple[Any, bool]]) -> Any:
+        """Return the cached value for key, computing it at most once at a time.
+
+        ``compute()`` returns ``(value, cacheable)``; uncacheable results
+        (e.g. progress-rank's empty-roster short circuit) are returned but
+        not stored. Concurrent callers for the same key block on the first
+        caller's computation and then re-read the cache.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._inflight_lock(key):
+            value = self._local_get(key)
+            if value is not _MISSING:
+                return value
+            value, cacheable = compute()
+            if cacheable:
+                self.set(key, value)
+            return value
+
+    def _inflight_lock(self, key: Any) -> threading.Lock:
         with self._lock:
-            self._store[key] = (expires_at, value)
+            lock = self._inflight.get(key)
+            if lock is None:
+                # Bounded alongside the store: stale locks are harmless.
+                if len(self._inflight) > self._max_entries:
+                    self._inflight.clear()
+                lock = self._inflight[key] = threading.Lock()
+            return lock
 
     def invalidate(self, key: Any) -> None:
         """Drop a single key. No-op if missing."""
@@ -71,6 +154,266 @@ class TTLCache:
         with self._lock:
             self._store.clear()
 
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of hit/miss/eviction counters plus current size."""
+        with self._lock:
+            return {**self._stats, "size": len(self._store)}
+
     def __len__(self) -> int:
         with self._lock:
             return len(self._store)
+
+
+# ── Shared (Redis) tier ─────────────────────────────────────────────────────
+
+# Process-local scope versions, used when Redis is unavailable. Keyed by
+# (namespace, scope); bumped by invalidate_scope().
+_local_versions: dict[tuple[str, str], int] = {}
+_local_versions_lock = threading.Lock()
+
+_default_redis: Any | None = None
+_default_redis_lock = threading.Lock()
+
+
+def _get_default_redis() -> Any | None:
+    """Return a lazily-built Redis client for REDIS_URL, or None.
+
+    Bounded timeouts + no retries, same as the limiter/session clients in
+    backend/extensions.py and backend/app.py, so a Redis outage fails fast.
+    """
+    global _default_redis
+    url = os.getenv('REDIS_URL')
+    if not url:
+        return None
+    with _default_redis_lock:
+        if _default_redis is None:
+            try:
+                import redis
+                from redis.backoff import NoBackoff
+                from redis.retry import Retry
+                _default_redis = redis.from_url(
+                    url,
+                    socket_timeout=1.0,
+                    socket_connect_timeout=1.0,
+                    retry=Retry(NoBackoff(), retries=0),
+                )
+            except Exception as e:  # noqa: BLE001  # broad catch: cache degrades to local tier; error is logged
+                _logger.warning("Shared cache Redis client unavailable: %s", e)
+                return None
+        return _default_redis
+
+
+def _version_key(prefix: str, namespace: str, scope: Any) -> str:
+    return f"{prefix}:{namespace}:v:{scope}"
+
+
+def invalidate_scope(namespace: str, scope: Any, redis_client: Any | None = None) -> None:
+    """Bump the version for (namespace, scope) so cached entries stop matching.
+
+    Callable from any write path without a reference to the cache instance
+    (e.g. ``invalidate_scope('progress_rank', class_id)`` after a grade
+    lands). Best-effort: a Redis failure is logged and the local bump still
+    applies to this process.
+    """
+    if scope is None:
+        return
+    with _local_versions_lock:
+        k = (namespace, str(scope))
+        _local_versions[k] = _local_versions.get(k, 0) + 1
+    client = redis_client if redis_client is not None else _get_default_redis()
+    if client is None:
+        return
+    try:
+        client.incr(_version_key(SharedTTLCache.KEY_PREFIX, namespace, scope))
+    except Exception as e:  # noqa: BLE001  # broad catch: invalidation falls back to TTL; error is logged
+        _logger.warning("Shared cache invalidation failed for %s/%s: %s", namespace, scope, e)
+
+
+class SharedTTLCache(TTLCache):
+    """Two-tier cache: local LRU in front of a shared Redis tier.
+
+    ``namespace`` prefixes every Redis key. ``scope_of(key)`` picks the
+    invalidation scope for a key (e.g. the class id out of a
+    ``(teacher_id, class_id, mode)`` tuple); keys without a scope are only
+    invalidated by TTL. Values must be JSON-serializable.
+
+    ``local_ttl_seconds`` bounds how long the local tier may serve an entry
+    without checking the shared tier; it defaults to the full TTL because
+    every read already resolves the scope version from Redis.
+    """
+
+    KEY_PREFIX = 'graider:cache'
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        *,
+        scope_of: Callable[[Any], Any] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        local_ttl_seconds: float | None = None,
+        lock_timeout_seconds: float = 10.0,
+        redis_client: Any | None = None,
+    ) -> None:
+        super().__init__(ttl_seconds, max_entries=max_entries)
+        self._namespace = namespace
+        self._scope_of = scope_of
+        self._local_ttl = min(self._ttl, local_ttl_seconds or self._ttl)
+        self._lock_timeout = float(lock_timeout_seconds)
+        self._redis_client = redis_client
+        self._redis_down_until = 0.0
+        self._stats.update({"redis_hits": 0, "redis_errors": 0, "coalesced": 0})
+
+    # -- Redis plumbing --------------------------------------------------
+
+    def _redis(self) -> Any | None:
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis_client is not None:
+            return self._redis_client
+        return _get_default_redis()
+
+    def _redis_failed(self, op: str, err: Exception) -> None:
+        self._count("redis_errors")
+        self._redis_down_until = time.monotonic() + _REDIS_BACKOFF_SECONDS
+        _logger.warning("Shared cache %s %s failed; using local tier: %s", self._namespace, op, err)
+
+    def _scope_version(self, scope: Any) -> int:
+        local = _local_versions.get((self._namespace, str(scope)), 0)
+        client = self._redis()
+        if client is None:
+            return local
+        try:
+            raw = client.get(_version_key(self.KEY_PREFIX, self._namespace, scope))
+        except Exception as e:  # noqa: BLE001  # broad catch: degrade to local tier; error is logged
+            self._redis_failed("version read", e)
+            return local
+        return int(raw) if raw else 0
+
+    def _versioned(self, key: Any) -> tuple[Any, str]:
+        """Return (local_key, redis_key) for key under its scope's current version."""
+        scope = self._scope_of(key) if self._scope_of else None
+        version = self._scope_version(scope) if scope is not None else 0
+        parts = key if isinstance(key, tuple) else (key,)
+        redis_key = f"{self.KEY_PREFIX}:{self._namespace}:{version}:" + ":".join(str(p) for p in parts)
+        return (version, key), redis_key
+
+    # -- Public API --------------------------------------------------------
+
+    def get(self, key: Any) -> Any:
+        local_key, redis_key = self._versioned(key)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.get(redis_key)
+            except Exception as e:  # noqa: BLE001  # broad catch: degrade to local tier; error is logged
+                self._redis_failed("get", e)
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._local_set(local_key, value, ttl=self._local_ttl)
+                self._count("redis_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: Any, value: Any) -> None:
+        local_key, redis_key = self._versioned(key)
+        self._store_both(local_key, redis_key, value)
+
+    def _store_both(self, local_key: Any, redis_key: str, value: Any) -> None:
+        self._local_set(local_key, value, ttl=self._local_ttl)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.set(redis_key, json.dumps(value, default=str), px=int(self._ttl * 1000))
+        except Exception as e:  # noqa: BLE001  # broad catch: degrade to local tier; error is logged
+            self._redis_failed("set", e)
+
+    def get_or_compute(self, key: Any, compute: Callable[[], tuple[Any, bool]]) -> Any:
+        """Single-flight across threads AND processes (see TTLCache.get_or_compute).
+
+        Within a process the first caller holds a per-key lock. Across
+        processes the first caller takes a short Redis ``SET NX`` lock; the
+        others poll the shared tier until the value appears or the lock
+        expires, then compute themselves rather than wait forever.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._inflight_lock(key):
+            local_key, redis_key = self._versioned(key)
+            value = self._local_get(local_key)
+            if value is not _MISSING:
+                self._count("coalesced")
+                return value
+            client = self._redis()
+            lock_key = redis_key + ':lock'
+            owns_lock = False
+            if client is not None:
+                try:
+                    owns_lock = bool(client.set(lock_key, '1', nx=True, px=int(self._lock_timeout * 1000)))
+                except Exception as e:  # noqa: BLE001  # broad catch: compute without the shared lock; error is logged
+                    self._redis_failed("lock", e)
+                    client = None
+                if client is not None and not owns_lock:
+                    value = self._wait_for_peer(client, redis_key, local_key)
+                    if value is not _MISSING:
+                        self._count("coalesced")
+                        return value
+            try:
+                value, cacheable = compute()
+                if cacheable:
+                    self._store_both(local_key, redis_key, value)
+                return value
+            finally:
+                if owns_lock and client is not None:
+                    try:
+                        client.delete(lock_key)
+                    except Exception as e:  # noqa: BLE001  # broad catch: lock expires on its own; error is logged
+                        self._redis_failed("unlock", e)
+
+    def _wait_for_peer(self, client: Any, redis_key: str, local_key: Any) -> Any:
+        deadline = time.monotonic() + self._lock_timeout
+        delay = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            try:
+                raw = client.get(redis_key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_set(local_key, value, ttl=self._local_ttl)
+                    return value
+                if not client.exists(redis_key + ':lock'):
+                    # Peer finished without caching (uncacheable) or died.
+                    return _MISSING
+            except Exception as e:  # noqa: BLE001  # broad catch: stop waiting, compute locally; error is logged
+                self._redis_failed("wait", e)
+                return _MISSING
+        return _MISSING
+
+    def invalidate(self, key: Any) -> None:
+        local_key, redis_key = self._versioned(key)
+        with self._lock:
+            self._store.pop(local_key, None)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(redis_key)
+        except Exception as e:  # noqa: BLE001  # broad catch: entry expires by TTL; error is logged
+            self._redis_failed("invalidate", e)
+
+    def invalidate_scope(self, scope: Any) -> None:
+        """Bump this namespace's version for scope (see module-level invalidate_scope)."""
+        invalidate_scope(self._namespace, scope, redis_client=self._redis())
+
+    def clear(self) -> None:
+        """Drop the local tier. Shared entries age out by TTL (tests use a fresh namespace)."""
+        super().clear()
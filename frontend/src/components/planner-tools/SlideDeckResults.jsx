@@ -53,7 +53,10 @@ export default function SlideDeckResults({ slideDeck, addToast, onShare }) {
         addToast(msg, "error");
         return;
       }
-      const blob = await resp.blob();
+      // Background jobs on: the deck is assembled on a worker.
+      const blob = resp.status === 202
+        ? await api.jobResultBlob(await resp.json())
+        : await resp.blob();
       const url = URL.createObjectURL(blob);
       const a = document.createElement("a");
       a.href = url;
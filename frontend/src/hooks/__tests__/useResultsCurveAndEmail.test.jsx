@@ -3,6 +3,7 @@ import { describe, it, expect, vi, beforeEach } from 'vitest';
 
 vi.mock('../../services/api', () => ({
   sendEmails: vi.fn(),
+  getSendEmailsStatus: vi.fn(),
   sendOutlookEmails: vi.fn(),
   updateApproval: vi.fn(),
   updateApprovalsBulk: vi.fn(),
@@ -77,6 +78,23 @@ describe('useResultsCurveAndEmail', () => {
     expect(props.setEmailStatus).toHaveBeenLastCalledWith(expect.objectContaining({ sending: false, sent: 1 }));
   });
 
+  it('sendEmails: polls a queued outbox send until it is done', async () => {
+    vi.useFakeTimers();
+    api.sendEmails.mockResolvedValue({ batch_id: 'b1', status: 'queued', sent: 0, failed: 0, total: 2 });
+    api.getSendEmailsStatus
+      .mockResolvedValueOnce({ batch_id: 'b1', status: 'sending', sent: 1, failed: 0, message: 'Sending emails... 1/2' })
+      .mockResolvedValueOnce({ batch_id: 'b1', status: 'done', sent: 2, failed: 0 });
+    const { result, props } = setup();
+    const done = result.current.sendEmails();
+    await vi.runAllTimersAsync();
+    await done;
+    vi.useRealTimers();
+    expect(api.getSendEmailsStatus).toHaveBeenCalledTimes(2);
+    expect(api.getSendEmailsStatus).toHaveBeenCalledWith('b1');
+    expect(props.setEmailStatus).toHaveBeenCalledWith(expect.objectContaining({ sending: true, message: 'Sending emails... 1/2' }));
+    expect(props.setEmailStatus).toHaveBeenLastCalledWith(expect.objectContaining({ sending: false, sent: 2, message: 'Sent 2 emails' }));
+  });
+
   it('sendSingleEmail: errors when there is no email address', async () => {
     const { result, props } = setup();
     await result.current.sendSingleEmail({ student_name: 'Y' }, 0); // no student_email, no edited email
@@ -9,6 +9,8 @@ import * as api from "../services/api";
  * App-local (also used by the render), so it is passed in. The ~18 state values/setters the
  * handlers close over are passed in; api is imported here (also stays imported in App).
  */
+const EMAIL_STATUS_POLL_MS = 1500;
+
 export function useResultsCurveAndEmail({
   addToast,
   status,
@@ -152,14 +154,27 @@ export function useResultsCurveAndEmail({
       message: "Sending emails...",
     });
     try {
-      const data = await api.sendEmails(results, config.teacher_email, config.teacher_name, config.email_signature);
+      let data = await api.sendEmails(results, config.teacher_email, config.teacher_name, config.email_signature);
+      // Email outbox on: the send was queued server-side; poll until it finishes.
+      while (data.batch_id && !data.error && !["done", "cancelled"].includes(data.status)) {
+        setEmailStatus({
+          sending: true,
+          sent: data.sent || 0,
+          failed: data.failed || 0,
+          message: data.message || "Sending emails...",
+        });
+        await new Promise((resolve) => setTimeout(resolve, EMAIL_STATUS_POLL_MS));
+        data = await api.getSendEmailsStatus(data.batch_id);
+      }
       setEmailStatus({
         sending: false,
         sent: data.sent || 0,
         failed: data.failed || 0,
         message: data.error
           ? `Error: ${data.error}`
-          : `Sent ${data.sent} emails${data.failed > 0 ? `, ${data.failed} failed` : ""}`,
+          : data.status === "cancelled"
+            ? data.message
+            : `Sent ${data.sent} emails${data.failed > 0 ? `, ${data.failed} failed` : ""}`,
       });
     } catch (e) {
       setEmailStatus({
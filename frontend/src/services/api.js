@@ -516,6 +516,56 @@ export async function sendEmails(results, teacherEmail = '', teacherName = '', e
   })
 }
 
+// Progress of a queued send (/api/send-emails answers 202 + batch_id when the
+// server-side email outbox is on).
+export async function getSendEmailsStatus(batchId) {
+  return fetchApi(`/api/send-emails/status?batch_id=${encodeURIComponent(batchId)}`)
+}
+
+// Background jobs (FLAG_BACKGROUND_JOBS): long operations answer 202 with a
+// job; poll it until it finishes, then download its file.
+const JOB_POLL_MS = 1500
+const JOB_FINISHED = ['succeeded', 'failed', 'cancelled']
+
+export async function getJob(jobId) {
+  return fetchApi(`/api/jobs/${encodeURIComponent(jobId)}`)
+}
+
+export async function cancelJob(jobId) {
+  return fetchApi(`/api/jobs/${encodeURIComponent(jobId)}/cancel`, { method: 'POST' })
+}
+
+export async function waitForJob(job, onProgress) {
+  while (job && job.job_id && !JOB_FINISHED.includes(job.status)) {
+    if (onProgress) onProgress(job)
+    await new Promise(function(r) { setTimeout(r, JOB_POLL_MS) })
+    job = await getJob(job.job_id)
+  }
+  return job
+}
+
+export async function downloadJobResult(jobId) {
+  const authHeaders = await getAuthHeaders()
+  const resp = await fetch(`${API_BASE}/api/jobs/${encodeURIComponent(jobId)}/result`, {
+    headers: { ...authHeaders },
+  })
+  if (!resp.ok) {
+    let msg = 'Download failed'
+    try { msg = (await resp.json()).error || msg } catch (e) { /* non-JSON error body */ }
+    throw new Error(msg)
+  }
+  return resp.blob()
+}
+
+// The file of a job that just finished, or an Error with the job's message.
+export async function jobResultBlob(job, onProgress) {
+  const done = await waitForJob(job, onProgress)
+  if (done.status !== 'succeeded') {
+    throw new Error(done.error || (done.status === 'cancelled' ? 'Cancelled' : 'Job failed'))
+  }
+  return downloadJobResult(done.job_id)
+}
+
 export async function updateApproval(filename, approval, graded_at) {
   return fetchApi('/api/update-approval', {
     method: 'POST',
@@ -1839,5 +1889,6 @@ export async function downloadSlidesPdf(slideDeck) {
     try { msg = (await resp.json()).error || msg; } catch (e) { /* non-JSON error body */ }
     throw new Error(msg);
   }
+  if (resp.status === 202) return jobResultBlob(await resp.json());
   return resp.blob();
 }
@@ -115,10 +115,13 @@ function AnalyticsFiltersHeader({
                 addToast(report.error, "error");
                 return;
               }
-              const blob = new Blob(
-                [JSON.stringify(report, null, 2)],
-                { type: "application/json" },
-              );
+              // Background jobs on: the report is built on a worker.
+              const blob = report.job_id
+                ? await api.jobResultBlob(report)
+                : new Blob(
+                  [JSON.stringify(report, null, 2)],
+                  { type: "application/json" },
+                );
               const url = URL.createObjectURL(blob);
               const a = document.createElement("a");
               a.href = url;
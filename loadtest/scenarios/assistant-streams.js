@@ -0,0 +1,134 @@
+// Concurrent assistant SSE streams + grading-status polls on one pod.
+//
+// Measures concurrent-stream capacity of the web worker model
+// (backend/gunicorn.conf.py: gthread workers, per-worker stream cap in
+// backend/stream_slots.py). While STREAMS teachers hold an
+// /api/assistant/chat stream open, another set of VUs polls /api/status
+// the way the grading UI does. What to read in the summary:
+//
+//   - stream_admitted / streams_rejected: streams beyond
+//     WEB_CONCURRENCY x SSE_STREAM_SLOTS get a fast 503 + Retry-After,
+//     never a hung connection.
+//   - http_req_duration{name:status_poll}: sync routes stay fast while
+//     every stream slot is taken (the old sync workers queued polls behind
+//     streams until they timed out).
+//   - http_req_waiting{name:assistant_chat}: time to the first SSE byte.
+//
+// Each stream is a real LLM call: point it at staging with a cheap model,
+// never at production. /api/assistant/chat is rate limited to 20/min per
+// client IP; the ramp below stays under that for streams of ~1 minute.
+// Short streams will hit 429s (counted in streams_rate_limited) — use a
+// prompt that triggers a tool loop, or run k6 from several hosts.
+//
+// Run:
+//   BASE_URL=https://staging.graider.live TEACHER_TOKEN=<supabase jwt> \
+//     k6 run scenarios/assistant-streams.js
+//
+// Smoke mode (CI / quick check):
+//   TEACHER_TOKEN=<jwt> k6 run --vus 1 --iterations 1 scenarios/assistant-streams.js
+
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { Counter, Rate } from 'k6/metrics';
+import { BASE_URL, JSON_HEADERS, checkResponse, requireEnv } from '../lib/http.js';
+
+// Default 30 concurrent streams: above the default 2 workers x 12 slots,
+// so the run shows both admitted and rejected streams.
+const STREAMS = parseInt(__ENV.STREAMS || '30', 10);
+const PROMPT = __ENV.PROMPT || 'List my classes and summarize how many students are in each.';
+
+const streamAdmitted = new Rate('stream_admitted');
+const streamsRejected = new Counter('streams_rejected');
+const streamsRateLimited = new Counter('streams_rate_limited');
+
+// 503 (stream cap) and 429 (rate limit) are expected outcomes for the
+// chat calls, not failures; http_req_failed then tracks real errors.
+const CHAT_STATUSES = http.expectedStatuses({ min: 200, max: 299 }, 429, 503);
+
+export const options = {
+  scenarios: {
+    streams: {
+      executor: 'ramping-vus',
+      exec: 'stream',
+      startVUs: 0,
+      stages: [
+        { duration: '90s', target: STREAMS },
+        { duration: '2m', target: STREAMS },
+        { duration: '30s', target: 0 },
+      ],
+      gracefulRampDown: '2m', // let open streams finish
+    },
+    status_polls: {
+      executor: 'constant-arrival-rate',
+      exec: 'poll',
+      rate: 1, // per second: under the 100/min default limit per IP
+      timeUnit: '1s',
+      duration: '4m',
+      preAllocatedVUs: 5,
+    },
+  },
+  thresholds: {
+    'http_req_duration{name:status_poll}': ['p(95)<500'],
+    'http_req_waiting{name:assistant_chat}': ['p(95)<5000'],
+    http_req_failed: ['rate<0.01'],
+  },
+};
+
+export function setup() {
+  return {
+    headers: {
+      ...JSON_HEADERS.headers,
+      Authorization: `Bearer ${requireEnv('TEACHER_TOKEN')}`,
+    },
+  };
+}
+
+export function stream(data) {
+  const body = JSON.stringify({
+    session_id: `loadtest-${__VU}-${__ITER}`,
+    messages: [{ role: 'user', content: PROMPT }],
+  });
+  // k6 reads the whole SSE body, so the VU holds the stream (and a server
+  // thread) until the assistant's tool loop finishes.
+  const res = http.post(`${BASE_URL}/api/assistant/chat`, body, {
+    headers: data.headers,
+    tags: { name: 'assistant_chat' },
+    timeout: '5m',
+    responseCallback: CHAT_STATUSES,
+  });
+
+  if (res.status === 503) {
+    streamsRejected.add(1);
+    streamAdmitted.add(false);
+    check(res, { 'rejected stream has Retry-After': (r) => !!r.headers['Retry-After'] });
+    sleep(parseInt(res.headers['Retry-After'] || '5', 10));
+    return;
+  }
+  if (res.status === 429) {
+    streamsRateLimited.add(1);
+    sleep(10);
+    return;
+  }
+
+  streamAdmitted.add(true);
+  check(res, {
+    'assistant_chat status is 200': (r) => r.status === 200,
+    'assistant_chat stream finished': (r) => typeof r.body === 'string' && r.body.includes('"type": "done"'),
+  });
+  sleep(1 + Math.random() * 2);
+}
+
+export function poll(data) {
+  const res = http.get(`${BASE_URL}/api/status`, {
+    headers: data.headers,
+    tags: { name: 'status_poll' },
+  });
+  checkResponse(res, 'status_poll');
+}
+
+// Smoke mode (`--vus 1 --iterations 1` replaces the scenarios above with
+// a single default-function run): one stream, then one poll.
+export default function (data) {
+  stream(data);
+  poll(data);
+}
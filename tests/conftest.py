@@ -171,6 +171,7 @@ def patch_paths(monkeypatch, mock_data_dir):
     monkeypatch.setattr(at, "storage_load", None)
     monkeypatch.setattr(at, "storage_save", None)
     monkeypatch.setattr(at, "storage_list_keys", None)
+    monkeypatch.setattr(at, "storage_load_prefix", None)
 
     results_file = os.path.join(mock_data_dir, "results.json")
     settings_file = os.path.join(mock_data_dir, "settings.json")
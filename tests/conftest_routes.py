@@ -32,6 +32,7 @@ def mock_grading_state():
         "cost_warning_pct": 80,
         "cost_limit_hit": False,
         "cost_warning_sent": False,
+        "timing": None,
     }
 
 
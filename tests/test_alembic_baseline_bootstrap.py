@@ -126,7 +126,7 @@ def test_baseline_creates_all_live_tables_from_empty(empty_migrated_db):
 def test_upgrade_reaches_head_revision(empty_migrated_db):
     cur = empty_migrated_db
     cur.execute("SELECT version_num FROM alembic_version")
-    assert cur.fetchone()[0] == "0002_subm_dedup"
+    assert cur.fetchone()[0] == "0007_district_rollup"
 
 
 def test_0002_applied_on_top_of_real_baseline(empty_migrated_db):
@@ -200,3 +200,57 @@ def test_join_code_trigger_live_behavior(empty_migrated_db):
     )
     code = cur.fetchone()[0]
     assert code and len(code) == 6
+
+
+def _district_rollup_row(cur, teacher_id):
+    cur.execute(
+        "SELECT classes_count, students_count, assessments_count, total_assessments, "
+        "scored_count, score_sum, grade_a, grade_b, grade_c, grade_d, grade_f "
+        "FROM district_teacher_rollup WHERE teacher_id = %s",
+        (teacher_id,),
+    )
+    return cur.fetchone()
+
+
+def test_district_rollup_triggers_match_rebuild(empty_migrated_db):
+    """0007's triggers keep district_teacher_rollup equal to a from-source
+    rebuild across grading, enrollment and ownership changes, and drop the
+    row once the teacher owns nothing."""
+    cur = empty_migrated_db
+    tid = str(uuid.uuid4())
+    cur.execute("INSERT INTO classes (teacher_id, name, join_code) "
+                "VALUES (%s, 'Rollup', '') RETURNING id", (tid,))
+    class_id = cur.fetchone()[0]
+    students = []
+    for n in range(2):
+        cur.execute("INSERT INTO students (teacher_id, student_id_number, first_name, last_name) "
+                    "VALUES (%s, %s, 'S', 'T') RETURNING id", (tid, f"rollup-{n}"))
+        students.append(cur.fetchone()[0])
+        cur.execute("INSERT INTO class_students (class_id, student_id) VALUES (%s, %s)",
+                    (class_id, students[-1]))
+    cur.execute("INSERT INTO published_content (teacher_id, class_id, content_type, title, content) "
+                "VALUES (%s, %s, 'assessment', 'Quiz', '{}') RETURNING id", (tid, class_id))
+    content_id = cur.fetchone()[0]
+    sub_ids = []
+    for sid, score in zip(students, (95, 55)):
+        cur.execute("INSERT INTO student_submissions (student_id, content_id, student_name, score) "
+                    "VALUES (%s, %s, 'S T', %s) RETURNING id", (sid, content_id, score))
+        sub_ids.append(cur.fetchone()[0])
+    cur.execute("UPDATE student_submissions SET score = 85 WHERE id = %s", (sub_ids[0],))
+    cur.execute("UPDATE student_submissions SET status = 'graded' WHERE id = %s", (sub_ids[1],))
+    cur.execute("INSERT INTO published_assessments (join_code, title, assessment, teacher_id) "
+                "VALUES ('RLP0007', 'Quiz', '{}', %s)", (tid,))
+    cur.execute("INSERT INTO submissions (join_code, student_name, answers, score) "
+                "VALUES ('RLP0007', 'Guest', '{}', 72)")
+
+    expected = (1, 2, 1, 2, 3, 212, 0, 1, 1, 0, 1)
+    assert _district_rollup_row(cur, tid) == expected
+    cur.execute("SELECT district_rollup_rebuild(%s)", (tid,))
+    assert _district_rollup_row(cur, tid) == expected
+
+    cur.execute("DELETE FROM submissions WHERE join_code = 'RLP0007'")
+    cur.execute("DELETE FROM published_assessments WHERE join_code = 'RLP0007'")
+    cur.execute("DELETE FROM student_submissions WHERE content_id = %s", (content_id,))
+    cur.execute("DELETE FROM published_content WHERE id = %s", (content_id,))
+    cur.execute("DELETE FROM classes WHERE id = %s", (class_id,))
+    assert _district_rollup_row(cur, tid) is None
@@ -127,3 +127,26 @@ def test_service_non_json_returns_error_dict():
         out = align_document_to_standards_content(doc_text="x", standards_ref=STANDARDS_REF,
                                                   api_key="fake-key")
     assert out == {"error": "AI returned non-JSON response. Possibly rate limited."}
+
+
+def test_align_gap_analysis_covers_standards_outside_preselected_subset(client, headers, monkeypatch):
+    monkeypatch.setenv('ALIGNMENT_STANDARDS_TOP_K', '1')
+    many = {'standards': STANDARDS['standards'] + [
+        {"code": "SS.7.C.2.1", "benchmark": "Define citizenship", "topics": ["citizens"]}]}
+    ai = json.dumps({"matched_standards": [{"code": "SS.7.C.1.1", "confidence": 0.8}],
+                     "unmatched_standards": [], "overall_alignment_score": 0.5,
+                     "suggestions": [], "question_analysis": []})
+    fake_adapter = MagicMock()
+    fake_adapter.chat.return_value = _completion(ai)
+    with patch('backend.routes.planner_routes.load_standards', return_value=many), \
+         patch('backend.api_keys.get_api_key', return_value='fake-key'), \
+         patch('backend.services.llm_adapter.OpenAIAdapter', return_value=fake_adapter):
+        resp = client.post('/api/align-document-to-standards',
+                          json={"documentText": "The republic is a form of government.",
+                                "grade": "7", "subject": "Civics", "state": "FL"},
+                          headers=headers)
+    body = resp.get_json()
+    assert body["unmatched_standards"] == ["SS.7.C.2.1"]
+    prompt = json.loads(fake_adapter.chat.call_args.args[0].messages[0].content[0].text)
+    assert [s["code"] for s in prompt["available_standards"]] == ["SS.7.C.1.1"]
+    assert prompt["all_standard_codes"] == ["SS.7.C.1.1", "SS.7.C.2.1"]
@@ -19,6 +19,7 @@ def patch_assignments_dir(monkeypatch, tmp_path, flask_app):
     monkeypatch.setattr(ar, 'storage_save', None)
     monkeypatch.setattr(ar, 'storage_delete', None)
     monkeypatch.setattr(ar, 'storage_list_keys', None)
+    monkeypatch.setattr(ar, 'storage_load_prefix', None)
 
 
 def _assignments_dir(tmp_path):
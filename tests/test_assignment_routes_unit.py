@@ -65,6 +65,7 @@ def patch_dirs(monkeypatch, tmp_path, flask_app):  # noqa: F811
     monkeypatch.setattr(ar, "storage_save", None)
     monkeypatch.setattr(ar, "storage_delete", None)
     monkeypatch.setattr(ar, "storage_list_keys", None)
+    monkeypatch.setattr(ar, "storage_load_prefix", None)
 
     # Output dirs for export/download endpoints
     downloads = tmp_path / "downloads"
@@ -336,8 +337,7 @@ class TestListAssignmentsStorage:
         }
         with patch.multiple(
             patch_dirs["ar"],
-            storage_list_keys=MagicMock(return_value=keys),
-            storage_load=MagicMock(side_effect=lambda k, t: loaded.get(k)),
+            storage_load_prefix=MagicMock(return_value={k: loaded[k] for k in keys}),
         ):
             resp = client.get("/api/list-assignments")
         body = resp.get_json()
@@ -0,0 +1,163 @@
+"""Tests for backend/services/assistant_conversation_store.py."""
+import json
+import os
+import threading
+
+from backend.services.assistant_conversation_store import ConversationStore, ExpiryIndex
+
+
+class _Clock:
+    def __init__(self, now=1_800_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _store(tmp_path, clock=None, **kw):
+    return ConversationStore(str(tmp_path / "convs"), clock=clock or _Clock(), **kw)
+
+
+def test_put_get_roundtrip_one_file_per_session(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    store.put("s1", [{"role": "user", "content": "hi"}], clock.now)
+    store.put("s2", [{"role": "user", "content": "yo"}], clock.now)
+
+    assert store.get("s1") == {"messages": [{"role": "user", "content": "hi"}], "last_active": clock.now}
+    assert store.get("missing") is None
+    files = [f for _, _, fs in os.walk(tmp_path / "convs") for f in fs]
+    assert len(files) == 2
+    assert not any("s1" in f for f in files)  # session ids are hashed, never used as paths
+
+
+def test_session_id_cannot_escape_root(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    store.put("../../etc/passwd", [], clock.now)
+    assert not (tmp_path / "etc").exists()
+    assert store.get("../../etc/passwd") == {"messages": [], "last_active": clock.now}
+
+
+def test_returned_messages_do_not_alias_cache(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    store.put("s1", [{"role": "user", "content": "hi"}], clock.now)
+    store.get("s1")["messages"].append({"role": "assistant", "content": "x"})
+    assert len(store.get("s1")["messages"]) == 1
+
+
+def test_lru_front_sees_writes_from_another_instance(tmp_path):
+    clock = _Clock()
+    a, b = _store(tmp_path, clock), _store(tmp_path, clock)
+    a.put("s1", [{"role": "user", "content": "one"}], clock.now)
+    assert b.get("s1")["messages"][0]["content"] == "one"
+    b.put("s1", [{"role": "user", "content": "two"}], clock.now + 5)
+    assert a.get("s1")["messages"][0]["content"] == "two"
+
+
+def test_lru_front_is_bounded(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock, max_cached=3)
+    for i in range(10):
+        store.put(f"s{i}", [], clock.now)
+    assert len(store._cache) == 3
+    assert store.get("s0") == {"messages": [], "last_active": clock.now}
+
+
+def test_delete_removes_record(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    store.put("s1", [], clock.now)
+    store.delete("s1")
+    store.delete("s1")  # idempotent
+    assert store.get("s1") is None
+    assert len(store) == 0
+
+
+def test_sweep_removes_only_expired_records(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock, ttl_seconds=100)
+    store.put("old", [], clock.now - 150)
+    store.put("fresh", [], clock.now - 10)
+
+    assert store.get("old") is None  # expired records are invisible before the sweep
+    assert store.sweep() == 1
+    assert store.get("fresh") is not None
+    assert len(store) == 1
+
+
+def test_sweep_rechecks_records_refreshed_by_another_worker(tmp_path):
+    clock = _Clock()
+    a, b = _store(tmp_path, clock, ttl_seconds=100), _store(tmp_path, clock, ttl_seconds=100)
+    a.put("s1", [], clock.now)
+    clock.now += 90
+    b.put("s1", [], clock.now)  # a's index still thinks s1 expires at +100
+    clock.now += 20
+    assert a.sweep() == 0
+    assert a.get("s1") is not None
+
+
+def test_index_is_rebuilt_from_disk_on_new_process(tmp_path):
+    clock = _Clock()
+    first = _store(tmp_path, clock, ttl_seconds=100)
+    first.put("s1", [], clock.now)
+    first.put("s2", [], clock.now - 500)
+
+    restarted = _store(tmp_path, clock, ttl_seconds=100)
+    assert len(restarted) == 2
+    assert restarted.sweep() == 1
+    assert restarted.get("s1") is not None
+
+
+def test_legacy_file_is_migrated_once(tmp_path):
+    clock = _Clock()
+    legacy = tmp_path / "assistant_conversations.json"
+    legacy.write_text(json.dumps({
+        "kept": {"messages": [{"role": "user", "content": "hi"}], "last_active": clock.now - 60},
+        "stale": {"messages": [], "last_active": clock.now - 200_000},
+    }))
+    store = _store(tmp_path, clock, legacy_file=str(legacy))
+
+    assert store.get("kept")["messages"] == [{"role": "user", "content": "hi"}]
+    assert store.get("stale") is None
+    assert not legacy.exists()
+    assert (tmp_path / "assistant_conversations.json.migrated").exists()
+
+
+def test_concurrent_writers_of_different_sessions_do_not_lose_data(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+
+    def worker(n):
+        for i in range(20):
+            store.put(f"w{n}-{i}", [{"role": "user", "content": str(i)}], clock.now)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    fresh = _store(tmp_path, clock)
+    assert all(fresh.get(f"w{n}-{i}") is not None for n in range(8) for i in range(20))
+
+
+def test_expiry_index_pops_only_due_keys_and_honours_touches():
+    index = ExpiryIndex(ttl_seconds=10)
+    index.touch("a", 0)
+    index.touch("b", 5)
+    index.touch("a", 8)  # refreshed: the (10, "a") entry is superseded
+
+    assert index.pop_expired(now=12) == []
+    assert index.pop_expired(now=15) == ["b"]
+    index.discard("a")
+    assert index.pop_expired(now=100) == []
+    assert len(index) == 0
+
+
+def test_expiry_index_heap_stays_bounded_for_hot_keys():
+    index = ExpiryIndex(ttl_seconds=10)
+    for i in range(10_000):
+        index.touch("hot", i)
+    assert len(index._heap) < 200
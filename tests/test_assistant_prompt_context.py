@@ -0,0 +1,185 @@
+"""Tests for backend/services/assistant_prompt_context.py."""
+import os
+import time
+
+from backend.services.assistant_prompt_context import (
+    PromptSection,
+    StorageRecord,
+    TeacherContextBuilder,
+    directory_deps,
+    path_fingerprint,
+)
+
+
+def _age(*paths, seconds=100):
+    """Backdate mtimes so files are outside the coarse-mtime slack window."""
+    ts = time.time() - seconds
+    for p in paths:
+        os.utime(p, (ts, ts))
+
+
+def _file_section(name, path, calls):
+    def build():
+        calls[name] = calls.get(name, 0) + 1
+        with open(path, encoding='utf-8') as f:
+            return f.read(), [path]
+    return PromptSection(name, build)
+
+
+def _builder(sections):
+    return TeacherContextBuilder(sections, lambda values: "|".join(str(values[s.name]) for s in sections))
+
+
+def test_unchanged_files_are_not_reread(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("A")
+    b.write_text("B")
+    _age(a, b)
+    calls = {}
+    builder = _builder([_file_section("a", str(a), calls), _file_section("b", str(b), calls)])
+
+    first = builder.build("t1")
+    second = builder.build("t1")
+
+    assert first == second == "A|B"
+    assert second is first  # memoized prompt object reused
+    assert calls == {"a": 1, "b": 1}
+    assert builder.stats()["a"]["hits"] == 1
+
+
+def test_changed_dependency_rebuilds_only_that_section(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("A")
+    b.write_text("B")
+    _age(a, b)
+    calls = {}
+    builder = _builder([_file_section("a", str(a), calls), _file_section("b", str(b), calls)])
+    builder.build("t1")
+
+    b.write_text("B2")
+    _age(b, seconds=50)
+
+    assert builder.build("t1") == "A|B2"
+    assert calls == {"a": 1, "b": 2}
+
+
+def test_missing_dependency_appearing_triggers_rebuild(tmp_path):
+    path = tmp_path / "later.json"
+    calls = {}
+
+    def build():
+        calls["n"] = calls.get("n", 0) + 1
+        return (path.read_text() if path.exists() else ""), [str(path)]
+
+    builder = _builder([PromptSection("s", build)])
+    assert builder.build() == ""
+    assert builder.build() == ""
+    path.write_text("now")
+    _age(path)
+    assert builder.build() == "now"
+    assert calls["n"] == 2
+
+
+def test_directory_deps_cover_added_and_edited_files(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "one.meta.json").write_text("1")
+    (docs / "notes.txt").write_text("x")
+
+    deps = directory_deps(str(docs), lambda n: n.endswith(".meta.json"))
+    assert deps == [str(docs), str(docs / "one.meta.json")]
+    assert directory_deps(str(tmp_path / "absent")) == [str(tmp_path / "absent")]
+
+    before = path_fingerprint(str(docs))
+    time.sleep(0.01)
+    (docs / "two.meta.json").write_text("2")
+    assert path_fingerprint(str(docs)) != before
+
+
+def test_recently_written_dependency_is_not_cached(tmp_path):
+    path = tmp_path / "hot.txt"
+    path.write_text("v1")  # mtime == now: inside the slack window
+    calls = {}
+    builder = _builder([_file_section("s", str(path), calls)])
+    builder.build()
+    builder.build()
+    assert calls["s"] == 2
+    _age(path)
+    builder.build()
+    builder.build()
+    assert calls["s"] == 3
+
+
+def test_failing_section_is_omitted_and_retried(tmp_path):
+    attempts = {"n": 0}
+
+    def build():
+        attempts["n"] += 1
+        if attempts["n"] == 1:
+            raise OSError("boom")
+        return "ok", []
+
+    builder = TeacherContextBuilder([PromptSection("s", build)], lambda v: str(v["s"]))
+    assert builder.build() == "None"
+    assert builder.build() == "ok"
+    assert builder.stats()["s"]["errors"] == 1
+
+
+def test_prompts_are_memoized_per_teacher_and_bounded(tmp_path):
+    builder = TeacherContextBuilder([PromptSection("s", lambda: ("x", []))],
+                                    lambda v: v["s"] * 2, max_prompts=2)
+    for tid in ("t1", "t2", "t3"):
+        builder.build(tid)
+    assert list(builder._prompts) == ["t2", "t3"]
+
+
+def test_invalidate_forces_rebuild():
+    calls = {"n": 0}
+
+    def build():
+        calls["n"] += 1
+        return calls["n"], []
+
+    builder = TeacherContextBuilder([PromptSection("s", build)], lambda v: str(v["s"]))
+    assert builder.build() == "1"
+    assert builder.build() == "1"
+    builder.invalidate("s")
+    assert builder.build() == "2"
+
+
+def test_storage_record_dependency_tracks_updated_at(monkeypatch):
+    """A settings save on another pod bumps teacher_data.updated_at, which
+    must invalidate a section that read the record through storage."""
+    from backend import storage
+    from backend.testing.fake_supabase import FakeSupabaseClient
+
+    sb = FakeSupabaseClient()
+    monkeypatch.setattr(storage, "_use_supabase", lambda tid: True)
+    monkeypatch.setattr(storage, "_get_supabase", lambda: sb)
+
+    def save(state, stamp):
+        sb.table("teacher_data").upsert({
+            "teacher_id": "t1", "data_key": "settings",
+            "data": {"state": state}, "updated_at": stamp,
+        }, on_conflict="teacher_id,data_key").execute()
+
+    calls = {"n": 0}
+
+    def build():
+        calls["n"] += 1
+        return storage.load("settings", "t1")["state"], [StorageRecord("settings", "t1")]
+
+    save("FL", "2026-01-01T00:00:00+00:00")
+    builder = TeacherContextBuilder([PromptSection("s", build)], lambda v: v["s"])
+    assert builder.build() == builder.build() == "FL"
+    assert calls["n"] == 1
+
+    save("TX", "2026-01-02T00:00:00.5+00:00")
+    assert builder.build() == "TX"
+    assert calls["n"] == 2
+
+    # An outage is never read as "unchanged".
+    monkeypatch.setattr(storage, "_get_supabase", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+    monkeypatch.setattr(storage, "load", lambda key, tid: {"state": "TX"})
+    builder.build()
+    assert calls["n"] == 3
@@ -0,0 +1,146 @@
+"""Tests for backend/services/assistant_tool_data.py."""
+import threading
+import time
+from unittest.mock import patch
+
+from backend.services.assistant_tool_data import (
+    ToolDataContext,
+    current_data_context,
+    memoized_loader,
+)
+
+TID = "teacher-1"
+
+
+def _counting_loader():
+    calls = {"n": 0}
+
+    @memoized_loader
+    def load_rows(period_filter="all", teacher_id="local-dev"):
+        calls["n"] += 1
+        return [{"period": period_filter, "teacher": teacher_id, "tags": ["a"]}]
+
+    return load_rows, calls
+
+
+def test_loader_is_a_plain_call_without_a_context():
+    load_rows, calls = _counting_loader()
+    load_rows()
+    load_rows()
+    assert calls["n"] == 2
+    assert current_data_context() is None
+
+
+def test_loads_once_per_argument_combination_inside_a_context():
+    load_rows, calls = _counting_loader()
+    ctx = ToolDataContext(TID)
+
+    def tool():
+        load_rows(teacher_id=TID)
+        load_rows("all", TID)  # same bound arguments -> same key
+        load_rows(period_filter="Period 2", teacher_id=TID)
+
+    ctx.bind(tool)()
+    ctx.bind(tool)()
+
+    assert calls["n"] == 2
+    assert ctx.stats() == {"loads": 2, "avoided": 4}
+
+
+def test_each_caller_gets_an_independent_copy():
+    load_rows, _ = _counting_loader()
+    ctx = ToolDataContext(TID)
+
+    first = ctx.bind(load_rows)()
+    first[0]["tags"].append("mutated")
+    first.append({"extra": True})
+
+    assert ctx.bind(load_rows)() == [{"period": "all", "teacher": "local-dev", "tags": ["a"]}]
+
+
+def test_invalidate_forces_a_reload():
+    load_rows, calls = _counting_loader()
+    ctx = ToolDataContext(TID)
+    ctx.bind(load_rows)()
+    ctx.invalidate()
+    ctx.bind(load_rows)()
+    assert calls["n"] == 2
+
+
+def test_concurrent_callers_share_one_load():
+    started = threading.Event()
+    calls = {"n": 0}
+
+    @memoized_loader
+    def slow():
+        calls["n"] += 1
+        started.set()
+        time.sleep(0.05)
+        return {"v": 1}
+
+    ctx = ToolDataContext(TID)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ctx.bind(slow)())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls["n"] == 1
+    assert results == [{"v": 1}] * 4
+
+
+def test_grouped_views_are_built_once_from_master_rows():
+    rows = [
+        {"student_id": "s1", "assignment": "Quiz", "period": "1"},
+        {"student_id": "s2", "assignment": "Quiz", "period": "2"},
+        {"student_id": "s1", "assignment": "Essay", "period": "1"},
+    ]
+    ctx = ToolDataContext(TID)
+    with patch("backend.services.assistant_tools._load_master_csv.__wrapped__",
+               return_value=rows) as raw:
+        by_student = ctx.by_student()
+        assert ctx.by_student() is by_student
+        assert [r["assignment"] for r in by_student["s1"]] == ["Quiz", "Essay"]
+        assert [r["student_id"] for r in ctx.by_assignment()["Quiz"]] == ["s1", "s2"]
+        assert sorted(ctx.by_period()) == ["1", "2"]
+    raw.assert_called_once_with("all", TID)
+
+
+def test_execute_tool_passes_the_context_to_handlers_that_accept_it():
+    from backend.services import assistant_tools
+
+    seen = {}
+
+    def handler(teacher_id="local-dev", data_context=None):
+        seen["ctx"] = data_context
+        return {"ok": True}
+
+    ctx = ToolDataContext(TID)
+    with patch.dict(assistant_tools.TOOL_HANDLERS, {"fake_tool": handler}):
+        assert assistant_tools.execute_tool("fake_tool", {"teacher_id": TID}) == {"ok": True}
+        assert seen["ctx"] is None
+        ctx.bind(assistant_tools.execute_tool)("fake_tool", {"teacher_id": TID})
+        assert seen["ctx"] is ctx
+
+
+def test_student_summary_with_context_matches_plain_call():
+    from backend.services.assistant_tools_grading import get_student_summary
+
+    rows = [
+        {"student_name": "Alice Smith", "student_id": "s1", "assignment": "Quiz 1", "score": 90,
+         "letter_grade": "A", "date": "2026-01-01", "period": "Period 1",
+         "content": 30, "completeness": 20, "writing": 20, "effort": 20},
+        {"student_name": "Bob Jones", "student_id": "s2", "assignment": "Quiz 1", "score": 70,
+         "letter_grade": "C", "date": "2026-01-01", "period": "Period 1",
+         "content": 20, "completeness": 20, "writing": 15, "effort": 15},
+        {"student_name": "Alice M Smith", "student_id": "s1", "assignment": "Quiz 2", "score": 80,
+         "letter_grade": "B", "date": "2026-01-08", "period": "Period 1",
+         "content": 25, "completeness": 20, "writing": 20, "effort": 15},
+    ]
+    with patch("backend.services.assistant_tools_grading._load_master_csv",
+               side_effect=lambda **kw: [dict(r) for r in rows]):
+        plain = get_student_summary("Alice", teacher_id=TID)
+    with patch("backend.services.assistant_tools._load_master_csv.__wrapped__", return_value=rows):
+        with_ctx = get_student_summary("Alice", teacher_id=TID, data_context=ToolDataContext(TID))
+    assert with_ctx == plain
@@ -0,0 +1,85 @@
+"""Tests for backend/services/assistant_tool_runner.py and the read-only registry."""
+import contextvars
+import threading
+import time
+
+import pytest
+
+from backend.services import assistant_tool_runner as runner
+from backend.services.assistant_tool_guards import GUARDED_ACTIONS
+from backend.services.assistant_tools import READ_ONLY_TOOLS, TOOL_HANDLERS, _merge_submodules
+
+
+def test_run_concurrently_overlaps_calls_and_keeps_order():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def execute(name, tool_input):
+        barrier.wait()  # only passes if all three run at the same time
+        return {"tool": name, "n": tool_input["n"]}
+
+    calls = [("a", {"n": 1}), ("b", {"n": 2}), ("c", {"n": 3})]
+    results = runner.run_concurrently(execute, calls)
+
+    assert [r for r, _ in results] == [{"tool": "a", "n": 1}, {"tool": "b", "n": 2}, {"tool": "c", "n": 3}]
+    assert all(ms >= 0 for _, ms in results)
+
+
+def test_single_call_runs_inline():
+    caller = threading.current_thread()
+    seen = []
+    runner.run_concurrently(lambda name, _: seen.append(threading.current_thread()), [("a", {})])
+    assert seen == [caller]
+
+
+def test_calls_see_the_callers_context():
+    var = contextvars.ContextVar("request_marker")
+    var.set("teacher-1")
+    results = runner.run_concurrently(lambda name, _: var.get(None), [("a", {}), ("b", {})])
+    assert [r for r, _ in results] == ["teacher-1", "teacher-1"]
+
+
+def test_escaping_exception_becomes_that_calls_error_result():
+    def execute(name, _):
+        if name == "bad":
+            raise RuntimeError("boom")
+        return {"ok": name}
+
+    results = runner.run_concurrently(execute, [("good", {}), ("bad", {}), ("good2", {})])
+    assert results[0][0] == {"ok": "good"}
+    assert results[1][0] == {"error": "Tool execution error: boom"}
+    assert results[2][0] == {"ok": "good2"}
+
+
+def test_timed_execute_reports_duration_and_emits_event(monkeypatch):
+    events = []
+    monkeypatch.setattr("backend.observability.events.emit",
+                        lambda event, **fields: events.append((event, fields)))
+
+    result, ms = runner.timed_execute(lambda n, i: time.sleep(0.01) or "done", "query_grades", {})
+
+    assert result == "done"
+    assert ms >= 10
+    assert events[0][0] == "assistant.tool.completed"
+    assert events[0][1]["tool"] == "query_grades"
+    assert events[0][1]["parallel"] is False
+
+
+@pytest.mark.parametrize("value,expected", [(None, False), ("1", True), ("off", False)])
+def test_flag_defaults_off(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("FLAG_PARALLEL_TOOL_CALLS", raising=False)
+    else:
+        monkeypatch.setenv("FLAG_PARALLEL_TOOL_CALLS", value)
+    assert runner.parallel_tool_calls_enabled() is expected
+
+
+def test_read_only_registry_excludes_guarded_and_send_tools():
+    guarded = set(GUARDED_ACTIONS)
+    guarded |= {entry["confirm_tool"] for entry in GUARDED_ACTIONS.values() if "confirm_tool" in entry}
+    guarded |= {"send_focus_comms", "send_behavior_email", "send_parent_emails", "save_memory"}
+    assert not READ_ONLY_TOOLS & guarded
+
+
+def test_read_only_registry_names_real_tools():
+    _merge_submodules()
+    assert READ_ONLY_TOOLS <= set(TOOL_HANDLERS)
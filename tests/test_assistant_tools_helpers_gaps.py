@@ -132,7 +132,7 @@ class TestLoadStandards:
                 "state": "FL", "subject": "Math", "grade_level": "9",
             }},
         ), patch(
-            "backend.routes.planner_routes.load_standards",
+            "backend.services.planner_standards.load_standards",
             return_value={"standards": [{"code": "FL.MATH.1"}]},
         ):
             result = mod._load_standards()
@@ -149,7 +149,7 @@ class TestLoadStandards:
                 "state": "FL", "subject": "Math", "grade_level": "9",
             }},
         ), patch(
-            "backend.routes.planner_routes.load_standards",
+            "backend.services.planner_standards.load_standards",
             side_effect=RuntimeError("planner dead"),
         ):
             result = mod._load_standards()
@@ -168,7 +168,7 @@ class TestLoadStandards:
                 "state": "FL", "subject": "Science", "grade_level": "7",
             }},
         ), patch(
-            "backend.routes.planner_routes.load_standards",
+            "backend.services.planner_standards.load_standards",
             side_effect=RuntimeError("dead"),
         ):
             result = mod._load_standards()
@@ -180,7 +180,7 @@ class TestLoadStandards:
             mod, "_load_settings",
             return_value={"config": {"state": "FL", "subject": "Math"}},
         ), patch(
-            "backend.routes.planner_routes.load_standards",
+            "backend.services.planner_standards.load_standards",
             side_effect=RuntimeError("dead"),
         ):
             assert mod._load_standards() == []
@@ -202,12 +202,11 @@ class TestLoadSavedLessons:
             "lesson:Math:Algebra": {"title": "Algebra"},
         }
         with patch.object(
-            mod, "storage_list_keys", return_value=keys,
-        ), patch.object(
-            mod, "storage_load",
-            side_effect=lambda k, t: loads.get(k),
-        ):
+            mod, "storage_load_prefix",
+            return_value={k: loads[k] for k in keys},
+        ) as load_prefix:
             lessons = mod._load_saved_lessons("teach-1")
+        load_prefix.assert_called_once_with("lesson:", "teach-1")
         assert len(lessons) == 2
         bio = next(l for l in lessons if l["unit"] == "Biology")
         assert bio["title"] == "Cells"
@@ -220,7 +219,7 @@ class TestLoadSavedLessons:
         (unit / "Cells.json").write_text(json.dumps({
             "title": "Cells", "standards": ["F1"],
         }))
-        with patch.object(mod, "storage_list_keys", None), patch.object(
+        with patch.object(mod, "storage_load_prefix", None), patch.object(
             mod, "storage_load", None,
         ):
             lessons = mod._load_saved_lessons()
@@ -232,7 +231,7 @@ class TestLoadSavedLessons:
             mod, "LESSONS_DIR",
             str(tmp_paths["lessons_dir"] / "no-such"),
         )
-        with patch.object(mod, "storage_list_keys", None), patch.object(
+        with patch.object(mod, "storage_load_prefix", None), patch.object(
             mod, "storage_load", None,
         ):
             assert mod._load_saved_lessons() == []
@@ -289,10 +288,8 @@ class TestLoadSavedAssignments:
             },
         }
         with patch.object(
-            mod, "storage_list_keys", return_value=keys,
-        ), patch.object(
-            mod, "storage_load",
-            side_effect=lambda k, t: loads.get(k),
+            mod, "storage_load_prefix",
+            return_value={k: loads[k] for k in keys},
         ):
             saved = mod._load_saved_assignments("teach-1")
         assert len(saved) == 1
@@ -306,7 +303,7 @@ class TestLoadSavedAssignments:
         f.write_text(json.dumps({
             "title": "Quiz", "aliases": ["q-alias"],
         }))
-        with patch.object(mod, "storage_list_keys", None), patch.object(
+        with patch.object(mod, "storage_load_prefix", None), patch.object(
             mod, "storage_load", None,
         ):
             saved = mod._load_saved_assignments()
@@ -429,7 +426,7 @@ class TestLoadRosterDevMode:
         }))
         # Force dev-mode (not multi-tenant)
         with patch.object(
-            mod, "storage_list_keys", None,
+            mod, "storage_load_prefix", None,
         ), patch.dict(os.environ, {}, clear=False):
             os.environ.pop("SUPABASE_URL", None)
             os.environ.pop("SUPABASE_SERVICE_KEY", None)
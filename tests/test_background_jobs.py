@@ -0,0 +1,292 @@
+"""Tests for backend/services/background_jobs.py and /api/jobs."""
+from __future__ import annotations
+
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask, g
+
+from backend.services import background_jobs as jobs
+from backend.services.background_jobs import JobCancelled, JobError, JobKind
+
+CALLS = []
+
+
+def _ok(ctx):
+    CALLS.append(ctx.params)
+    ctx.progress(1, 2, 'half way')
+    ctx.save_result_file(b'hello', 'out/../report.txt', 'text/plain')
+    return {'rows': 2}
+
+
+def _fails_cleanly(ctx):
+    raise JobError('No grading data available to export')
+
+
+def _crashes(ctx):
+    raise KeyError('boom')
+
+
+def _cancels(ctx):
+    ctx.check_cancelled()
+    return {'ran': True}
+
+
+def _reads_payload(ctx):
+    return {'payload': ctx.payload()}
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    for name in ('SUPABASE_URL', 'SUPABASE_SERVICE_KEY', 'CELERY_BROKER_URL',
+                 'FLAG_BACKGROUND_JOBS'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr('backend.storage.HOME', str(tmp_path))
+    monkeypatch.setattr(jobs, 'CANCEL_POLL_S', 0)
+    kinds = dict(jobs.KINDS)
+    for name in ('ok', 'fails_cleanly', 'crashes', 'cancels', 'reads_payload'):
+        kinds[f't_{name}'] = JobKind(f't_{name}', f'{__name__}:_{name}', enqueueable=True)
+    monkeypatch.setattr(jobs, 'KINDS', kinds)
+    CALLS.clear()
+
+
+@pytest.fixture
+def threads(monkeypatch):
+    """Capture would-be thread dispatches; run them with ``run``."""
+    started = []
+    monkeypatch.setattr(jobs, '_run_in_thread', started.append)
+
+    def run():
+        results = [jobs.run_job(job_id) for job_id in started]
+        started.clear()
+        return results
+
+    run.started = started
+    return run
+
+
+def test_enqueue_without_broker_runs_job_in_process(threads):
+    job = jobs.enqueue('t-1', 't_ok', {'n': 1})
+    assert job['status'] == jobs.QUEUED
+    assert threads.started == [job['id']]
+
+    [done] = threads()
+    assert done['status'] == jobs.SUCCEEDED
+    assert (done['attempts'], done['progress']) == (1, {'done': 1, 'total': 2, 'message': 'half way'})
+    assert CALLS == [{'n': 1}]
+    status = jobs.job_status(done)
+    assert status['result'] == {'rows': 2}
+    assert status['download'] == {'url': f"/api/jobs/{job['id']}/result",
+                                  'filename': 'out..report.txt', 'size': 5}
+    assert jobs.read_result_file(done) == (b'hello', 'out..report.txt', 'text/plain')
+    # Terminal jobs are never run again (e.g. a late redelivery).
+    assert jobs.run_job(job['id'])['attempts'] == 1
+    assert len(CALLS) == 1
+
+
+@pytest.mark.parametrize('kind,status,error', [
+    ('t_fails_cleanly', jobs.FAILED, 'No grading data available to export'),
+    ('t_crashes', jobs.FAILED, 'An internal error occurred'),
+])
+def test_handler_failures_are_recorded_on_the_row(threads, kind, status, error):
+    jobs.enqueue('t-1', kind)
+    [done] = threads()
+    assert (done['status'], done['error']) == (status, error)
+    assert jobs.read_result_file(done) is None
+
+
+def test_cancel_queued_job_skips_handler_and_flags_running_job(threads):
+    queued = jobs.enqueue('t-1', 't_ok')
+    assert jobs.request_cancel('t-1', queued['id'])['status'] == jobs.CANCELLED
+    assert threads()[0]['status'] == jobs.CANCELLED
+    assert CALLS == []
+
+    running = jobs.enqueue('t-1', 't_ok')
+    jobs._store().update(running['id'], {'status': jobs.RUNNING})
+    row = jobs.request_cancel('t-1', running['id'])
+    assert (row['status'], row['cancel_requested']) == (jobs.RUNNING, True)
+
+
+def test_running_job_that_is_asked_to_stop_ends_cancelled(threads, monkeypatch):
+    job = jobs.enqueue('t-1', 't_cancels')
+    real_get = jobs._FileJobStore.get
+
+    def get_with_cancel(self, job_id):
+        row = real_get(self, job_id)
+        if row and row['status'] == jobs.RUNNING:
+            row['cancel_requested'] = True  # cancel arrives while the handler runs
+        return row
+
+    monkeypatch.setattr(jobs._FileJobStore, 'get', get_with_cancel)
+    [done] = threads()
+    assert done['status'] == jobs.CANCELLED
+
+
+def test_dedupe_key_returns_active_job(threads):
+    first = jobs.enqueue('t-1', 't_ok', dedupe_key='report')
+    assert jobs.enqueue('t-1', 't_ok', dedupe_key='report')['id'] == first['id']
+    assert jobs.enqueue('t-2', 't_ok', dedupe_key='report')['id'] != first['id']
+    threads()
+    assert jobs.enqueue('t-1', 't_ok', dedupe_key='report')['id'] != first['id']
+
+
+def test_dedupe_fails_a_stale_active_job_and_dispatches_a_new_one(threads, monkeypatch):
+    lost = jobs.enqueue('t-1', 't_ok', dedupe_key='login')
+    jobs._store().update(lost['id'], {'status': jobs.RUNNING,
+                                      'updated_at': '2020-01-01T00:00:00+00:00'})
+    assert jobs.is_stale(jobs._store().get(lost['id']))
+
+    fresh = jobs.enqueue('t-1', 't_ok', dedupe_key='login')
+    assert fresh['id'] != lost['id']
+    assert threads.started == [lost['id'], fresh['id']]
+    row = jobs._store().get(lost['id'])
+    assert (row['status'], row['error']) == (jobs.FAILED, 'The job stopped responding')
+    # The new job is live, so it dedupes as before.
+    assert jobs.enqueue('t-1', 't_ok', dedupe_key='login')['id'] == fresh['id']
+
+    monkeypatch.setitem(jobs.KINDS, 't_ok', JobKind('t_ok', f'{__name__}:_ok', stale_after=0))
+    assert jobs.enqueue('t-1', 't_ok', dedupe_key='login')['id'] != fresh['id']
+
+
+def test_payload_is_stored_beside_the_job_not_in_params(threads):
+    deck = {'slides': {'title': 'Deck', '_image_data': {'0': 'aGk='}}}
+    job = jobs.enqueue('t-1', 't_reads_payload', payload=deck)
+    assert job['params'] == {'payload_path': f"{job['id']}/input.json"}
+    assert threads()[0]['result'] == {'payload': deck}
+
+
+def test_jobs_are_scoped_to_their_teacher(threads):
+    job = jobs.enqueue('t-1', 't_ok')
+    assert jobs.get_job('t-2', job['id']) is None
+    assert jobs.request_cancel('t-2', job['id']) is None
+    assert jobs.get_job('t-1', '../../etc/passwd') is None
+    assert [j['id'] for j in jobs.list_jobs('t-1')] == [job['id']]
+    assert jobs.list_jobs('t-2') == []
+
+
+def test_dispatch_sends_to_jobs_queue_and_falls_back_on_broker_errors(monkeypatch):
+    import kombu.exceptions
+
+    monkeypatch.setenv('CELERY_BROKER_URL', 'redis://localhost:6379/1')
+    task = MagicMock()
+    task.apply_async.return_value.id = 'celery-1'
+    monkeypatch.setitem(sys.modules, 'backend.tasks.job_tasks',
+                        MagicMock(run_background_job=task))
+    threaded = []
+    monkeypatch.setattr(jobs, '_run_in_thread', threaded.append)
+
+    job = jobs.enqueue('t-1', 'slides_pptx')
+    assert jobs._store().get(job['id'])['task_id'] == 'celery-1'
+    _, kwargs = task.apply_async.call_args
+    assert (kwargs['args'], kwargs['queue'], kwargs['time_limit']) == ([job['id']], 'jobs', 900)
+    assert threaded == []
+
+    # Host-local kinds never leave the web process.
+    local = [jobs.enqueue('t-1', kind)['id'] for kind in ('cloud_sync', 'district_report')]
+    assert threaded == local
+    assert task.apply_async.call_count == 1
+
+    task.apply_async.side_effect = kombu.exceptions.OperationalError('redis down')
+    fallback = jobs.enqueue('t-1', 'slides_pptx', dedupe_key='x')
+    assert threaded == local + [fallback['id']]
+
+
+def test_celery_routes_jobs_to_their_own_queue():
+    import importlib
+
+    with patch.dict('os.environ', {'CELERY_BROKER_URL': 'memory://'}):
+        celery_app_module = importlib.import_module('backend.celery_app')
+    conf = celery_app_module.celery_app.conf
+    assert conf.task_routes['jobs.run'] == {'queue': 'jobs'}
+    assert 'backend.tasks.job_tasks' in conf.include
+
+
+def _app(user_id='teacher-1'):
+    from backend.routes.analytics_routes import analytics_bp
+    from backend.routes.job_routes import jobs_bp
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+
+    @app.before_request
+    def _set_user():
+        g.user_id = user_id
+
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(analytics_bp)
+    return app
+
+
+def test_jobs_api_lifecycle(threads):
+    client = _app().test_client()
+    assert client.post('/api/jobs', json={'kind': 'grade_emails'}).status_code == 400
+    assert client.post('/api/jobs', json={'kind': 'nope'}).status_code == 400
+
+    resp = client.post('/api/jobs', json={'kind': 't_ok'})
+    assert resp.status_code == 202
+    job_id = resp.get_json()['job_id']
+    assert client.get(f'/api/jobs/{job_id}/result').status_code == 409
+
+    threads()
+    body = client.get(f'/api/jobs/{job_id}').get_json()
+    assert (body['status'], body['download']['filename']) == ('succeeded', 'out..report.txt')
+    result = client.get(body['download']['url'])
+    assert result.data == b'hello'
+    assert 'out..report.txt' in result.headers['Content-Disposition']
+    assert [j['job_id'] for j in client.get('/api/jobs?kind=t_ok').get_json()['jobs']] == [job_id]
+
+    other = _app('teacher-2').test_client()
+    assert other.get(f'/api/jobs/{job_id}').status_code == 404
+    assert other.get(f'/api/jobs/{job_id}/result').status_code == 404
+    assert other.post(f'/api/jobs/{job_id}/cancel').status_code == 404
+
+
+def test_district_report_route_runs_as_job_when_flag_on(threads, monkeypatch):
+    monkeypatch.setenv('FLAG_BACKGROUND_JOBS', 'true')
+    results = [
+        {'score': 95, 'student_id': 's1', 'assignment': 'Q1', 'period': 'Q1'},
+        {'score': 55, 'student_id': 's2', 'assignment': 'Q1', 'period': 'Q1'},
+    ]
+    client = _app().test_client()
+    with patch('backend.storage.load',
+               side_effect=lambda key, tid: results if key == 'results' else None):
+        resp = client.get('/api/export-district-report')
+        assert resp.status_code == 202
+        assert resp.get_json()['kind'] == 'district_report'
+        [done] = threads()
+
+    assert done['status'] == 'succeeded', done['error']
+    assert done['result']['summary_statistics']['total_submissions_graded'] == 2
+    data, filename, content_type = jobs.read_result_file(done)
+    assert filename.startswith('district_report_') and content_type == 'application/json'
+    assert b'"F (0-59)": 1' in data
+
+
+def test_grade_email_job_stops_between_chunks_when_cancelled(threads, monkeypatch):
+    from backend.services import email_outbox
+    from tests.test_email_outbox import FakeEmailer
+
+    monkeypatch.setenv('EMAIL_SEND_RATE_PER_S', '0')
+    messages = [email_outbox.new_message(f's{i}@school.edu', 'Grade', f'Hi {i}', scope='t-1')
+                for i in range(25)]
+    record = email_outbox.create_outbox('t-1', messages)
+    fake = FakeEmailer(batch_available=False)
+    job = jobs.enqueue('t-1', 'grade_emails', {'batch_id': record['batch_id']},
+                       dedupe_key=record['batch_id'])
+
+    def send_then_cancel(*args, **kwargs):
+        ok = FakeEmailer.send_email(fake, *args, **kwargs)
+        jobs._store().update(job['id'], {'cancel_requested': True})
+        return ok
+
+    emailer = MagicMock(resend_available=True, batch_available=False, send_email=send_then_cancel)
+    with patch('backend.services.email_service.GraiderEmailer', return_value=emailer):
+        [done] = threads()
+
+    assert done['status'] == jobs.CANCELLED
+    stored = email_outbox.load_outbox('t-1', record['batch_id'])
+    status = email_outbox.outbox_status(stored)
+    assert (stored['status'], status['sent'], status['pending']) == ('cancelled', 10, 15)
+    assert status['message'] == 'Cancelled after sending 10 of 25 emails'
+    assert not email_outbox.is_stalled(stored)
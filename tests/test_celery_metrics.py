@@ -0,0 +1,107 @@
+"""Tests for backend/celery_metrics.py (Celery task metrics exporter)."""
+import json
+import sys
+import urllib.request
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from backend import celery_metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch, tmp_path):
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+    celery_metrics._set_registry(None)
+    yield tmp_path
+    celery_metrics._set_registry(None)
+
+
+def _value(body, prefix):
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_queue_wait_duration_and_outcomes():
+    task = SimpleNamespace(name="grading.portal_submission",
+                           request=SimpleNamespace(headers={celery_metrics.ENQUEUED_AT_HEADER: 1000.0}))
+    with patch.object(celery_metrics.time, "time", return_value=1002.0):
+        celery_metrics.task_started("t1", task)
+    celery_metrics.note_outcome("t1", "not_found")
+    celery_metrics.task_finished("t1", task.name, "SUCCESS")
+    celery_metrics.task_started("t2", SimpleNamespace(name=task.name, request=SimpleNamespace()))
+    celery_metrics.note_outcome("t2", "not_found")
+    celery_metrics.task_finished("t2", task.name, "FAILURE")
+    celery_metrics.task_retried(task.name)
+
+    body = celery_metrics.get_registry().render()
+    assert _value(body, 'graider_celery_task_queue_wait_seconds_sum{task="grading.portal_submission"}') == 2.0
+    assert _value(body, 'graider_celery_task_outcomes_total{outcome="not_found",task="grading.portal_submission"}') is None
+    assert 'outcome="not_found"' in body and 'outcome="failure"' in body
+    assert _value(body, 'graider_celery_task_retries_total{task="grading.portal_submission"}') == 1.0
+    assert 'graider_celery_task_duration_seconds_count{task="grading.portal_submission",state="SUCCESS"} 1' in body
+    assert "graider_grading_runs_active" not in body  # web-only gauges
+
+
+def test_stamp_enqueued_at_keeps_existing_value():
+    headers = {celery_metrics.ENQUEUED_AT_HEADER: 5.0}
+    celery_metrics.stamp_enqueued_at(headers)
+    assert headers[celery_metrics.ENQUEUED_AT_HEADER] == 5.0
+    fresh = {}
+    celery_metrics.stamp_enqueued_at(fresh)
+    assert fresh[celery_metrics.ENQUEUED_AT_HEADER] > 0
+
+
+def test_exporter_serves_children_shards(fresh_registry):
+    (fresh_registry / f"celery_{__import__('os').getppid()}.json").write_text(json.dumps({
+        "counters": [["graider_celery_task_outcomes_total",
+                      [["task", "grading.portal_submission"], ["outcome", "success"]], 7]],
+        "histograms": [],
+    }))
+    server = celery_metrics.start_exporter(0, host="127.0.0.1")
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("text/plain")
+        assert 'graider_celery_task_outcomes_total{task="grading.portal_submission",outcome="success"} 7' in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_exporter_requires_metrics_token_when_set(monkeypatch):
+    import urllib.error
+
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    server = celery_metrics.start_exporter(0, host="127.0.0.1")
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    try:
+        with pytest.raises(urllib.error.HTTPError) as denied:
+            urllib.request.urlopen(url)
+        assert denied.value.code == 401
+        request = urllib.request.Request(url, headers={"Authorization": "Bearer s3cret"})
+        with urllib.request.urlopen(request) as resp:
+            assert resp.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_portal_task_records_not_found_outcome(monkeypatch):
+    monkeypatch.setenv('CELERY_BROKER_URL', 'redis://localhost:6379/15')
+    for mod in ('backend.celery_app', 'backend.tasks', 'backend.tasks.grading_tasks'):
+        sys.modules.pop(mod, None)
+    from backend.celery_app import celery_app
+    from backend.tasks.grading_tasks import grade_portal_submission
+    celery_app.conf.task_always_eager = True
+    try:
+        with patch('backend.services.portal_grading.fetch_submission_full_context', return_value=None):
+            grade_portal_submission.apply(args=['nope', 'teacher-1', 'submissions'])
+    finally:
+        celery_app.conf.task_always_eager = False
+    body = celery_metrics.get_registry().render()
+    assert 'graider_celery_task_outcomes_total{task="grading.portal_submission",outcome="not_found"} 1' in body
@@ -750,3 +750,43 @@ class TestDeleteCleverData:
         assert "restricted_students" not in scrubbed
         assert scrubbed.get("time_limit_minutes") == 30, "authored config must be preserved"
         assert result["published_assessments_scrubbed"] == 1
+
+    def test_deleted_student_is_gone_from_join_payload(self):
+        """The stored student_projection copies restricted_students and
+        student_accommodations; after the delete the join endpoint must not
+        serve them (and must serve a new ETag so caches revalidate)."""
+        from flask import Flask
+        from backend.routes.student_portal_routes import student_portal_bp
+        from backend.services.student_assessment_projection import projection_columns_for
+        from backend.testing.fake_supabase import FakeSupabaseClient
+
+        row = {
+            "id": "pa1", "join_code": "MAKEUP1", "teacher_id": "clever:t1",
+            "title": "Makeup", "teacher_name": "Ms. T", "is_active": True,
+            "assessment": {"title": "Makeup", "sections": []},
+            "settings": {"is_makeup": True, "restricted_students": ["Jane Doe"],
+                         "student_accommodations": {"Jane Doe": {"notes": "IEP: read aloud"}}},
+        }
+        row.update(projection_columns_for(row))
+        old_etag = row["student_projection_etag"]
+        sb = FakeSupabaseClient()
+        sb.table("published_assessments").insert(row).execute()
+
+        app = Flask(__name__)
+        app.register_blueprint(student_portal_bp)
+        client = app.test_client()
+        with patch("backend.routes.student_portal_routes.get_supabase", return_value=sb):
+            assert "Jane Doe" in client.get("/api/student/join/MAKEUP1").get_data(as_text=True)
+
+            with patch("backend.supabase_client.get_supabase", return_value=sb), \
+                 patch("backend.storage.list_student_history", return_value=[]), \
+                 patch("backend.storage.delete", return_value=True):
+                result = clever.delete_clever_data("clever:t1")
+
+            resp = client.get("/api/student/join/MAKEUP1")
+        body = resp.get_data(as_text=True)
+        assert resp.status_code == 200
+        assert "Jane Doe" not in body and "IEP" not in body
+        assert resp.get_json()["settings"]["is_makeup"] is True
+        assert resp.headers["ETag"].strip('"') != old_etag
+        assert result["published_assessments_scrubbed"] == 1
@@ -0,0 +1,114 @@
+"""Tests for backend/services/district_rollup.py and the rollup read path of
+GET /api/district/analytics. The triggers themselves are exercised against
+real Postgres in test_alembic_baseline_bootstrap.py."""
+import pytest
+from flask import Flask
+
+import backend.routes.district_routes as dr
+from backend.scripts.backfill_district_rollup import compare_analytics
+from backend.services import district_rollup
+from backend.testing.fake_supabase import FakeSupabaseClient
+
+
+def _row(tid, **kw):
+    row = {'teacher_id': tid, 'email': f'{tid}@x', 'name': tid.upper(),
+           'classes_count': 1, 'students_count': 0, 'assessments_count': 0,
+           'total_assessments': 0, 'scored_count': 0, 'score_sum': 0,
+           'grade_a': 0, 'grade_b': 0, 'grade_c': 0, 'grade_d': 0, 'grade_f': 0}
+    row.update(kw)
+    return row
+
+
+ROWS = [
+    _row('t2', name=None, students_count=3, total_assessments=2, scored_count=1,
+         score_sum=55, grade_f=1),
+    _row('t1', students_count=4, assessments_count=2, total_assessments=5,
+         scored_count=2, score_sum='177.50', grade_a=1, grade_b=1),
+]
+
+
+@pytest.fixture
+def db():
+    db = FakeSupabaseClient()
+    db.table(district_rollup.TEACHER_TABLE).insert(ROWS).execute()
+    db.table('audit_log').insert([
+        {'teacher_id': 't1', 'timestamp': '2026-10-01T00:00:00'},
+        {'teacher_id': 't1', 'timestamp': '2026-10-02T00:00:00'},
+    ]).execute()
+    return db
+
+
+def test_build_analytics_sums_teacher_rows():
+    data = district_rollup.build_analytics(ROWS)
+    assert data['overview'] == {
+        'total_teachers': 2,
+        'total_students': 7,
+        'total_assessments': 7,
+        'average_score': 77.5,
+        'grade_distribution': {'A': 1, 'B': 1, 'C': 0, 'D': 0, 'F': 1},
+    }
+    assert [t['user_id'] for t in data['teachers']] == ['t1', 't2']
+    assert data['teachers'][1]['name'] == '—'
+    assert data['approximate'] is False
+
+
+def test_build_analytics_empty_district():
+    data = district_rollup.build_analytics([])
+    assert data['overview']['average_score'] is None
+    assert data['overview']['total_teachers'] == 0
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__); app.config['TESTING'] = True; app.config['SECRET_KEY'] = 't'
+    app.register_blueprint(dr.district_bp)
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s['district_admin'] = True
+    dr._district_analytics_cache_clear()
+    yield client
+    dr._district_analytics_cache_clear()
+
+
+def test_route_serves_rollup_when_flag_on(client, db, monkeypatch):
+    monkeypatch.setenv('FLAG_DISTRICT_ROLLUP_READS', 'true')
+    monkeypatch.setattr(dr, '_get_supabase', lambda: db)
+    monkeypatch.setattr(dr, '_district_teacher_ids',
+                        lambda sb: pytest.fail('rollup read must not scan source tables'))
+
+    body = client.get('/api/district/analytics').get_json()
+    assert body['overview']['total_teachers'] == 2
+    assert body['overview']['average_score'] == 77.5
+    last = {t['user_id']: t['last_activity'] for t in body['teachers']}
+    assert last == {'t1': '2026-10-02T00:00:00', 't2': None}
+
+    # Not cached: a newly graded submission shows up on the next read.
+    db.table(district_rollup.TEACHER_TABLE).update(
+        {'scored_count': 3, 'score_sum': 272.5, 'grade_a': 2}).eq('teacher_id', 't1').execute()
+    body = client.get('/api/district/analytics').get_json()
+    assert body['overview']['grade_distribution']['A'] == 2
+
+
+def test_route_falls_back_to_scan_when_rollup_read_fails(client, monkeypatch):
+    monkeypatch.setenv('FLAG_DISTRICT_ROLLUP_READS', 'true')
+    monkeypatch.setattr(dr, '_get_supabase', lambda: object())
+    monkeypatch.setattr(district_rollup, 'load_district_analytics',
+                        lambda sb: (_ for _ in ()).throw(RuntimeError('relation does not exist')))
+    scanned = []
+    monkeypatch.setattr(dr, '_district_teacher_ids', lambda sb: scanned.append(sb) or set())
+
+    body = client.get('/api/district/analytics').get_json()
+    assert scanned and body['overview']['total_teachers'] == 0
+
+
+def test_compare_analytics_reports_drift():
+    rolled = district_rollup.build_analytics(ROWS)
+    live = district_rollup.build_analytics(ROWS)
+    assert compare_analytics(rolled, live) == []
+
+    live = district_rollup.build_analytics(
+        [ROWS[1], _row('t3')] + [dict(ROWS[0], students_count=2)])
+    mismatches = compare_analytics(rolled, live)
+    assert 'teacher t3: missing from rollup' in mismatches
+    assert 'teacher t2.students_count: rollup=3 live=2' in mismatches
+    assert any(m.startswith('overview.total_teachers') for m in mismatches)
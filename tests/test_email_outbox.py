@@ -0,0 +1,287 @@
+"""Tests for backend/services/email_outbox.py (bulk grade-email delivery)."""
+from __future__ import annotations
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask, g
+
+from backend.services import email_outbox
+from backend.services.email_service import BatchRejected
+
+
+class FakeEmailer:
+    """Records provider calls; ``batch_errors`` are raised by successive send_batch calls."""
+
+    def __init__(self, batch_available=True, batch_errors=(), failing=()):
+        self.batch_available = batch_available
+        self.resend_available = True
+        self.batch_errors = list(batch_errors)
+        self.failing = set(failing)
+        self.batches = []
+        self.singles = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages, idempotency_key=None):
+        self.batches.append(([m['to'] for m in messages], idempotency_key))
+        if self.batch_errors:
+            raise self.batch_errors.pop(0)
+        return [f"id-{m['to']}" for m in messages]
+
+    def send_email(self, to_email, student_name, subject, body, reply_to=None,
+                   idempotency_key=None):
+        with self._lock:
+            self.singles.append((to_email, idempotency_key))
+        return to_email not in self.failing
+
+
+def _messages(n, teacher_id='t-1'):
+    return [email_outbox.new_message(f's{i}@school.edu', 'Grade', f'Hi {i}', scope=teacher_id)
+            for i in range(n)]
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    for name in ('EMAIL_BATCH_SIZE', 'EMAIL_SEND_CONCURRENCY', 'EMAIL_SEND_MAX_ATTEMPTS',
+                 'SUPABASE_URL', 'SUPABASE_SERVICE_KEY'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('EMAIL_SEND_RATE_PER_S', '0')
+    monkeypatch.setattr('backend.storage.HOME', str(tmp_path))
+
+
+def test_message_keys_are_stable_and_scoped():
+    a = email_outbox.new_message('S@School.edu', 'Grade', 'body', scope='t-1')
+    assert a['key'] == email_outbox.new_message('s@school.edu', 'Grade', 'body', scope='t-1')['key']
+    assert a['key'] != email_outbox.new_message('s@school.edu', 'Grade', 'body', scope='t-2')['key']
+    assert a['key'] != email_outbox.new_message('s@school.edu', 'Grade', 'body!', scope='t-1')['key']
+
+
+def test_batch_endpoint_sends_chunks_of_batch_size(monkeypatch):
+    monkeypatch.setenv('EMAIL_BATCH_SIZE', '100')
+    emailer = FakeEmailer()
+    messages = _messages(150)
+    outcomes = email_outbox.deliver_messages(emailer, messages + messages[:3])
+
+    assert [len(to) for to, _ in emailer.batches] == [100, 50]
+    assert emailer.singles == []
+    assert len(outcomes) == 150
+    assert {o['status'] for o in outcomes.values()} == {email_outbox.SENT}
+    # Re-delivering the same messages reuses the same batch idempotency keys.
+    again = FakeEmailer()
+    email_outbox.deliver_messages(again, messages)
+    assert [key for _, key in again.batches] == [key for _, key in emailer.batches]
+
+
+def test_transient_batch_error_retries_with_same_key():
+    emailer = FakeEmailer(batch_errors=[ConnectionError('reset')])
+    sleeps = []
+    outcomes = email_outbox.deliver_messages(emailer, _messages(3), sleep=sleeps.append)
+
+    assert len(emailer.batches) == 2
+    assert emailer.batches[0][1] == emailer.batches[1][1]
+    assert sleeps == [2]
+    assert all(o['status'] == email_outbox.SENT for o in outcomes.values())
+
+
+def test_exhausted_batch_retries_fail_the_chunk(monkeypatch):
+    monkeypatch.setenv('EMAIL_SEND_MAX_ATTEMPTS', '2')
+    emailer = FakeEmailer(batch_errors=[ConnectionError(), ConnectionError()])
+    outcomes = email_outbox.deliver_messages(emailer, _messages(2), sleep=lambda s: None)
+
+    assert [o['status'] for o in outcomes.values()] == [email_outbox.FAILED] * 2
+    assert emailer.singles == []  # ambiguous failures are never re-sent under other keys
+
+
+def test_rejected_batch_falls_back_to_single_sends_with_message_keys():
+    messages = _messages(3)
+    emailer = FakeEmailer(batch_errors=[BatchRejected('invalid to')], failing={'s1@school.edu'})
+    outcomes = email_outbox.deliver_messages(emailer, messages)
+
+    assert sorted(emailer.singles) == sorted((m['to'], m['key']) for m in messages)
+    assert outcomes[messages[1]['key']]['status'] == email_outbox.FAILED
+    assert outcomes[messages[0]['key']]['status'] == email_outbox.SENT
+
+
+def test_without_batch_support_sends_concurrently_and_checkpoints(monkeypatch):
+    monkeypatch.setenv('EMAIL_SEND_CONCURRENCY', '4')
+    emailer = FakeEmailer(batch_available=False)
+    chunks = []
+    email_outbox.deliver_messages(emailer, _messages(25), on_chunk=chunks.append)
+
+    assert len(emailer.singles) == 25
+    assert [len(c) for c in chunks] == [10, 10, 5]
+
+
+def test_rate_limiter_spaces_calls():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(round(seconds, 3))
+
+    limiter = email_outbox.RateLimiter(2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.wait()
+    assert slept == [0.5, 1.0]
+
+
+def test_outbox_resumes_pending_messages_only():
+    messages = _messages(4)
+    record = email_outbox.create_outbox('t-1', messages)
+    assert record['status'] == 'queued'
+    # A previous drain got through the first two before the worker died.
+    for m in record['messages'][:2]:
+        m['status'] = email_outbox.SENT
+    record['status'] = 'sending'
+    email_outbox.storage.save(email_outbox.outbox_key(record['batch_id']), record, 't-1')
+
+    # Resubmitting the same send maps to the same outbox and does not reset it.
+    assert email_outbox.create_outbox('t-1', list(reversed(messages)))['batch_id'] == record['batch_id']
+    emailer = FakeEmailer()
+    done = email_outbox.drain_outbox('t-1', record['batch_id'], emailer)
+
+    assert emailer.batches[0][0] == ['s2@school.edu', 's3@school.edu']
+    status = email_outbox.outbox_status(done)
+    assert (status['status'], status['sent'], status['pending']) == ('done', 4, 0)
+    stored = email_outbox.load_outbox('t-1', record['batch_id'])
+    assert all('text' not in m for m in stored['messages'][2:])
+
+
+def test_resubmit_requeues_failed_messages_under_the_same_keys():
+    messages = _messages(3)
+    record = email_outbox.create_outbox('t-1', messages)
+    first = FakeEmailer(batch_available=False, failing={'s1@school.edu'})
+    done = email_outbox.drain_outbox('t-1', record['batch_id'], first)
+    assert email_outbox.outbox_status(done)['failed'] == 1
+    assert all(set(m) <= {'key', 'status', 'error', 'provider_id', 'batch_key'}
+               for m in done['messages'])
+
+    again = email_outbox.create_outbox('t-1', messages)
+    assert (again['status'], email_outbox.outbox_status(again)['pending']) == ('queued', 1)
+    retry = FakeEmailer(batch_available=False)
+    done = email_outbox.drain_outbox('t-1', record['batch_id'], retry)
+
+    assert retry.singles == [('s1@school.edu', messages[1]['key'])]
+    status = email_outbox.outbox_status(done)
+    assert (status['status'], status['sent'], status['failed']) == ('done', 3, 0)
+
+
+def test_resubmit_resends_a_failed_batch_as_the_same_chunk_and_key(monkeypatch):
+    monkeypatch.setenv('EMAIL_SEND_MAX_ATTEMPTS', '1')
+    messages = _messages(3)
+    record = email_outbox.create_outbox('t-1', messages)
+    first = FakeEmailer(batch_errors=[ConnectionError('timeout')])
+    email_outbox.drain_outbox('t-1', record['batch_id'], first, sleep=lambda s: None)
+
+    # A smaller chunk size now must not regroup the unknown-outcome batch.
+    monkeypatch.setenv('EMAIL_BATCH_SIZE', '2')
+    email_outbox.create_outbox('t-1', messages)
+    retry = FakeEmailer()
+    done = email_outbox.drain_outbox('t-1', record['batch_id'], retry)
+
+    assert retry.batches == first.batches
+    assert retry.singles == []
+    assert email_outbox.outbox_status(done)['sent'] == 3
+
+
+def test_create_outbox_prunes_expired_records():
+    old = email_outbox.create_outbox('t-1', _messages(2))
+    idle = email_outbox.create_outbox('t-1', _messages(3))
+    live = email_outbox.create_outbox('t-1', _messages(4))
+    stamp = '2020-01-01T00:00:00+00:00'
+    email_outbox.storage.save(email_outbox.outbox_key(old['batch_id']),
+                              {**old, 'status': 'done', 'created_at': stamp}, 't-1')
+    email_outbox.storage.save(email_outbox.outbox_key(idle['batch_id']),
+                              {**idle, 'status': 'cancelled', 'updated_at': stamp}, 't-1')
+
+    email_outbox.create_outbox('t-1', _messages(5))
+
+    assert email_outbox.load_outbox('t-1', old['batch_id']) is None
+    assert email_outbox.load_outbox('t-1', idle['batch_id']) is None
+    assert email_outbox.load_outbox('t-1', live['batch_id']) is not None
+
+
+def test_stalled_outbox_detection():
+    record = {'status': 'sending', 'updated_at': '2020-01-01T00:00:00+00:00'}
+    assert email_outbox.is_stalled(record)
+    assert not email_outbox.is_stalled({**record, 'status': 'done'})
+    assert not email_outbox.is_stalled({'status': 'sending', 'updated_at': email_outbox._now()})
+
+
+def test_send_bulk_grades_uses_outbox_delivery_when_flag_on(monkeypatch):
+    from backend.services.email_service import GraiderEmailer
+
+    monkeypatch.setenv('FLAG_EMAIL_OUTBOX', 'true')
+    emailer = GraiderEmailer.__new__(GraiderEmailer)
+    emailer.config = {'teacher_name': 'Ms. T'}
+    fake = FakeEmailer(failing={'b@x.com'})
+    emailer.send_batch = fake.send_batch
+    emailer.send_email = fake.send_email
+    grade = {'score': 90, 'letter_grade': 'A', 'feedback': 'x', 'assignment': 'Q'}
+    grades = [
+        {**grade, 'student_name': 'Ann', 'email': 'a@x.com'},
+        {**grade, 'student_name': 'Ann', 'email': 'a@x.com'},
+        {**grade, 'student_name': 'Bo', 'email': 'b@x.com'},
+        {**grade, 'student_name': 'Cy', 'email': ''},
+    ]
+
+    with patch.object(GraiderEmailer, 'batch_available', False):
+        result = emailer.send_bulk_grades(grades)
+
+    assert result == {'sent': 1, 'failed': 1, 'skipped': 2}
+    assert sorted(to for to, _ in fake.singles) == ['a@x.com', 'b@x.com']
+
+
+def _email_app():
+    from backend.routes.email_routes import email_bp
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+
+    @app.before_request
+    def _set_user():
+        g.user_id = 'teacher-1'
+
+    app.register_blueprint(email_bp)
+    return app
+
+
+def test_send_emails_route_queues_outbox_and_reports_status(monkeypatch):
+    monkeypatch.setenv('FLAG_EMAIL_OUTBOX', 'true')
+    emailer = MagicMock()
+    emailer.resend_available = True
+    emailer.config = {'teacher_name': 'Ms. T'}
+    drains = []
+    results = [
+        {'student_email': 'a@school.edu', 'student_name': 'Ann Lee', 'score': 90,
+         'letter_grade': 'A', 'feedback': 'ok', 'assignment': 'Q1'},
+        {'student_email': 'b@school.edu', 'student_name': 'Bo Chen', 'score': 80,
+         'letter_grade': 'B', 'feedback': 'ok', 'assignment': 'Q1'},
+    ]
+
+    with patch('backend.services.email_service.GraiderEmailer', return_value=emailer), \
+            patch.object(email_outbox, 'start_drain',
+                         side_effect=lambda *args: drains.append(args) or True):
+        client = _email_app().test_client()
+        resp = client.post('/api/send-emails', json={'results': results, 'teacher_email': 't@s.edu'})
+        body = resp.get_json()
+
+        assert resp.status_code == 202
+        assert (body['status'], body['total'], body['pending']) == ('queued', 2, 2)
+        emailer.send_email.assert_not_called()
+        assert drains == [('teacher-1', body['batch_id'], emailer)]
+
+        fake = FakeEmailer()
+        email_outbox.drain_outbox('teacher-1', body['batch_id'], fake)
+        assert fake.batches[0][0] == ['a@school.edu', 'b@school.edu']
+        status = client.get(f"/api/send-emails/status?batch_id={body['batch_id']}").get_json()
+        assert (status['status'], status['sent'], status['message']) == ('done', 2, 'Sent 2 emails')
+
+        # Resubmitting after it finished returns the finished outbox, no new drain.
+        resp = client.post('/api/send-emails', json={'results': results, 'teacher_email': 't@s.edu'})
+        assert resp.get_json()['batch_id'] == body['batch_id']
+        assert len(drains) == 1
+
+        assert client.get('/api/send-emails/status?batch_id=../../x').status_code == 400
+        assert client.get(f"/api/send-emails/status?batch_id={'0' * 24}").status_code == 404
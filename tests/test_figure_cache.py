@@ -0,0 +1,109 @@
+"""Tests for backend/services/figure_cache.py."""
+import os
+from unittest.mock import patch
+
+import pytest
+
+from backend.services import figure_cache
+from backend.services.figure_cache import FigureCache, cached_figure, figure_key
+
+
+@pytest.fixture
+def cache_on(monkeypatch, tmp_path):
+    monkeypatch.setenv("FLAG_FIGURE_CACHE", "1")
+    cache = FigureCache(tmp_path / "figs")
+    monkeypatch.setattr(figure_cache, "_cache", cache)
+    return cache
+
+
+def test_key_normalizes_spec_and_separates_options():
+    assert figure_key("k", {"a": 1, "b": (1, 2)}) == figure_key("k", {"b": [1, 2], "a": 1})
+    assert figure_key("k", {"a": 1}, show_answer=True) != figure_key("k", {"a": 1}, show_answer=False)
+    assert figure_key("k", {"a": 1}) != figure_key("other", {"a": 1})
+
+
+def test_memory_lru_evicts_oldest_and_disk_serves_after_restart(tmp_path):
+    cache = FigureCache(tmp_path, max_memory_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")  # a is now most recent
+    cache.put("c", b"12345")  # evicts b from memory
+    assert cache.stats()["memory_entries"] == 2
+
+    cache.clear_memory()
+    assert cache.get("b") == (b"12345", {})
+    assert cache.stats()["disk_hits"] == 1
+    cache.put("m", b"x", {"aspect_ratio": 0.5})
+    assert FigureCache(tmp_path).get("m") == (b"x", {"aspect_ratio": 0.5})
+
+
+def test_disk_is_trimmed_least_recently_used_first(tmp_path):
+    cache = FigureCache(tmp_path, max_disk_bytes=25)
+    for i, key in enumerate(["old", "mid", "new"]):
+        cache.put(key, b"0123456789")
+        os.utime(tmp_path / f"{key}.png", (1000 + i, 1000 + i))
+    cache.put("newest", b"0123456789")
+    assert sorted(p.stem for p in tmp_path.glob("*.png")) == ["new", "newest"]
+
+
+def test_decorator_renders_once_per_normalized_call(cache_on):
+    calls = []
+
+    @cached_figure
+    def create_thing(min_val=0, points=None):
+        calls.append(min_val)
+        return "data:image/png;base64,iVBORw0KGgo="
+
+    first = create_thing(1, points=[1, 2])
+    assert create_thing(min_val=1, points=(1, 2)) == first
+    create_thing(2, points=[1, 2])
+    assert calls == [1, 2]
+
+
+def test_int_and_float_values_key_different_figures(cache_on):
+    assert figure_key("k", {"b": 6}) != figure_key("k", {"b": 6.0})
+    calls = []
+
+    @cached_figure
+    def create_thing(b):
+        calls.append(b)
+        return "data:image/png;base64,iVBORw0KGgo="
+
+    create_thing(6)
+    create_thing(6.0)
+    create_thing(6)
+    assert calls == [6, 6.0]
+    assert cache_on.stats()["memory_entries"] == 2
+
+
+def test_flag_off_always_renders(monkeypatch):
+    monkeypatch.delenv("FLAG_FIGURE_CACHE", raising=False)
+    calls = []
+
+    @cached_figure
+    def create_thing():
+        calls.append(1)
+        return "data:image/png;base64,iVBORw0KGgo="
+
+    create_thing()
+    create_thing()
+    assert len(calls) == 2
+
+
+def test_visualization_helper_reuses_cached_png(cache_on):
+    from backend.services import visualization as viz
+    first = viz.create_number_line(points=[1, 2], labels=["A", "B"])
+    with patch.object(viz, "figure_to_base64", side_effect=AssertionError("re-rendered")):
+        assert viz.create_number_line(points=[1, 2], labels=["A", "B"]) == first
+
+
+def test_planner_question_visual_reuses_png_and_aspect(cache_on):
+    pytest.importorskip("reportlab")
+    from backend.services import planner_export
+    question = {"question_type": "number_line", "min_val": -5, "max_val": 5}
+    first = planner_export._create_visual_for_question(question, show_answer=False)
+    with patch.object(planner_export, "_build_question_figure_part1",
+                      side_effect=AssertionError("re-rendered")):
+        second = planner_export._create_visual_for_question(question, show_answer=False)
+    assert (second.drawWidth, second.drawHeight) == (first.drawWidth, first.drawHeight)
+    assert cache_on.stats()["hits"] == 1
@@ -0,0 +1,38 @@
+"""District-scale gradebook benchmark (backend/scripts/bench_gradebook.py).
+
+Seeds the fake Supabase with a 180-student × 40-assessment class and checks
+that the RPC-grid assembly reproduces the multi-query Python payload for
+every attempt mode, while the Python path's round trips are what the RPC
+collapses to one. Marked `stress` (deselect with -m "not stress").
+"""
+import time
+
+import pytest
+
+from backend.scripts.bench_gradebook import MeteredDB, grid_from_payload, seed_class
+from backend.services.student_gradebook import _build_class_gradebook_python, build_gradebook_from_grid
+from backend.testing.fake_supabase import FakeSupabaseClient
+
+pytestmark = pytest.mark.stress
+
+
+@pytest.fixture(scope="module")
+def district_class():
+    db = FakeSupabaseClient()
+    return db, seed_class(db, n_students=180, n_assessments=40, max_attempts=3)
+
+
+@pytest.mark.parametrize("mode", ["latest", "best", "average"])
+def test_grid_assembly_matches_python_path_at_district_scale(district_class, mode):
+    db, class_id = district_class
+    metered = MeteredDB(db)
+    payload = _build_class_gradebook_python(metered, class_id, 'P1', mode)
+    assert len(payload['students']) == 180 and len(payload['assessments']) == 40
+    # Enrollments + students + content + ≥10 submission pages (PostgREST cap).
+    assert metered.round_trips >= 13
+
+    grid = grid_from_payload(payload, db, class_id)
+    t0 = time.perf_counter()
+    assert build_gradebook_from_grid(grid, class_id, 'P1', mode) == payload
+    # Assembly from a grid is pure Python over ~7k cells; keep it cheap.
+    assert time.perf_counter() - t0 < 2.0
@@ -0,0 +1,161 @@
+"""0005 class_gradebook_grid() RPC — applies after `alembic upgrade head`
+and returns, for every attempt mode, a grid that assembles into exactly the
+payload the Python gradebook path builds from the same rows.
+Docker-gated (skips cleanly without Docker)."""
+from __future__ import annotations
+
+import os
+import pathlib
+import subprocess
+import uuid
+
+import pytest
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+SCHEMA_APPLY_ORDER = [
+    "supabase_student_portal_schema.sql",
+    "backend/database/supabase_schema.sql",
+    "backend/database/supabase_teacher_schema.sql",
+    "supabase_submission_confirmations.sql",
+    "supabase_roster_rls.sql",
+]
+
+AUTH_SCHEMA_STUB = """
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE AS $$ SELECT NULL::uuid; $$;
+CREATE OR REPLACE FUNCTION auth.jwt() RETURNS jsonb LANGUAGE sql STABLE AS $$ SELECT '{}'::jsonb; $$;
+CREATE OR REPLACE FUNCTION auth.role() RETURNS text LANGUAGE sql STABLE AS $$ SELECT NULL::text; $$;
+"""
+
+TEACHER = str(uuid.uuid4())
+CLASS = str(uuid.uuid4())
+
+
+def _docker_available() -> bool:
+    try:
+        subprocess.run(["docker", "ps"], capture_output=True, timeout=5, check=True)
+        return True
+    except (FileNotFoundError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return False
+
+
+def _ts(day, hour=10):
+    return f"2026-04-{day:02d}T{hour:02d}:00:00+00:00"
+
+
+def _rows():
+    """Roster with an orphan-free mix of attempt shapes, tied timestamps,
+    NULL percentages, a draft, and one remediation row."""
+    s1, s2, s3 = (str(uuid.uuid4()) for _ in range(3))
+    c1, c2, rem = (str(uuid.uuid4()) for _ in range(3))
+    students = [
+        {'id': s1, 'first_name': 'amy', 'last_name': 'Lee'},
+        {'id': s2, 'first_name': 'Ben', 'last_name': 'Ortiz'},
+        {'id': s3, 'first_name': 'Cy', 'last_name': 'Park'},
+    ]
+    content = [
+        {'id': c1, 'title': 'Quiz 1', 'content_type': 'assessment', 'created_at': _ts(1),
+         'due_date': None, 'is_active': True, 'target_student_ids': None,
+         'content': {'sections': []}},
+        {'id': c2, 'title': 'HW 1', 'content_type': 'assignment', 'created_at': _ts(2),
+         'due_date': _ts(9), 'is_active': False, 'target_student_ids': None,
+         'content': {'sections': []}},
+        {'id': rem, 'title': 'Reteach', 'content_type': 'assessment', 'created_at': _ts(3),
+         'due_date': None, 'is_active': True, 'target_student_ids': [s2],
+         'content': {'sections': [{'questions': [{'dok': 2}, {'dok': 2}]}]}},
+    ]
+    subs = [
+        (s1, c1, 1, _ts(4), 50, 'graded'),
+        (s1, c1, 2, _ts(5), 90, 'graded'),
+        (s1, c1, 3, _ts(6), 70, 'graded'),
+        (s1, c2, 1, _ts(4), None, 'submitted'),
+        (s2, c1, 1, _ts(4), 80, 'graded'),
+        (s2, c1, 2, _ts(4), 80, 'graded'),      # same pct + timestamp → attempt breaks tie
+        (s2, rem, 1, _ts(7), 33.3, 'graded'),
+        (s3, c2, 1, _ts(8), 100, 'draft'),      # drafts never count
+    ]
+    submissions = [
+        {'id': str(uuid.uuid4()), 'student_id': sid, 'content_id': cid, 'attempt_number': n,
+         'submitted_at': ts, 'percentage': pct, 'status': status}
+        for sid, cid, n, ts, pct, status in subs
+    ]
+    return students, content, submissions
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    if not _docker_available():
+        pytest.skip("Docker not available")
+    try:
+        from testcontainers.postgres import PostgresContainer
+        import psycopg2  # noqa: F401
+    except ImportError:
+        pytest.skip("testcontainers[postgres]/psycopg2 not installed")
+
+    import psycopg2
+    from psycopg2.extras import Json
+    students, content, submissions = _rows()
+    with PostgresContainer("postgres:15-alpine") as pg:
+        url = pg.get_connection_url().replace("postgresql+psycopg2", "postgresql")
+        conn = psycopg2.connect(url)
+        conn.autocommit = True
+        cur = conn.cursor()
+        cur.execute(AUTH_SCHEMA_STUB)
+        for rel in SCHEMA_APPLY_ORDER:
+            cur.execute((REPO_ROOT / rel).read_text(encoding="utf-8"))
+        env = {**os.environ, "ALEMBIC_DATABASE_URL": url}
+        subprocess.run(["alembic", "stamp", "0001_baseline"], cwd=REPO_ROOT,
+                       env=env, check=True, capture_output=True)
+        r = subprocess.run(["alembic", "upgrade", "head"], cwd=REPO_ROOT,
+                           env=env, capture_output=True, text=True)
+        assert r.returncode == 0, f"alembic upgrade head failed: {r.stderr}"
+
+        cur.execute("SET TIME ZONE 'UTC'")
+        cur.execute("INSERT INTO classes (id, teacher_id, name, join_code) VALUES (%s, %s, 'P1', 'GRID01')",
+                    (CLASS, TEACHER))
+        for i, s in enumerate(students):
+            cur.execute("INSERT INTO students (id, teacher_id, student_id_number, first_name, last_name) "
+                        "VALUES (%s, %s, %s, %s, %s)",
+                        (s['id'], TEACHER, f"n{i}", s['first_name'], s['last_name']))
+            cur.execute("INSERT INTO class_students (class_id, student_id) VALUES (%s, %s)", (CLASS, s['id']))
+        for c in content:
+            cur.execute("INSERT INTO published_content (id, teacher_id, class_id, content_type, title, content, "
+                        "is_active, due_date, created_at, target_student_ids) "
+                        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                        (c['id'], TEACHER, CLASS, c['content_type'], c['title'], Json(c['content']),
+                         c['is_active'], c['due_date'], c['created_at'],
+                         Json(c['target_student_ids']) if c['target_student_ids'] is not None else None))
+        for s in submissions:
+            cur.execute("INSERT INTO student_submissions (id, student_id, content_id, student_name, "
+                        "attempt_number, submitted_at, percentage, status) "
+                        "VALUES (%s, %s, %s, 'x', %s, %s, %s, %s)",
+                        (s['id'], s['student_id'], s['content_id'], s['attempt_number'],
+                         s['submitted_at'], s['percentage'], s['status']))
+        yield cur, students, content, submissions
+
+
+def _fake_db(students, content, submissions):
+    from backend.testing.fake_supabase import FakeSupabaseClient
+    db = FakeSupabaseClient()
+    db.table('class_students').insert([{'class_id': CLASS, 'student_id': s['id']} for s in students]).execute()
+    db.table('students').insert(students).execute()
+    db.table('published_content').insert([{**c, 'class_id': CLASS} for c in content]).execute()
+    db.table('student_submissions').insert(submissions).execute()
+    return db
+
+
+@pytest.mark.parametrize("mode", ["latest", "best", "average"])
+def test_rpc_grid_matches_python_gradebook(seeded, mode):
+    from backend.services.student_gradebook import (
+        _build_class_gradebook_python,
+        build_gradebook_from_grid,
+    )
+    cur, students, content, submissions = seeded
+    cur.execute("SELECT public.class_gradebook_grid(%s, %s)", (CLASS, mode))
+    grid = cur.fetchone()[0]
+
+    from_rpc = build_gradebook_from_grid(grid, CLASS, 'P1', mode)
+    from_python = _build_class_gradebook_python(_fake_db(students, content, submissions), CLASS, 'P1', mode)
+    assert from_rpc == from_python
+    assert from_rpc['assessments'][-1]['assessment_dok'] == 2
@@ -0,0 +1,114 @@
+"""Tests for grading-state memory bounds in backend/grading/state.py:
+the capped `BoundedLog`, idle/LRU eviction, and persist-before-evict."""
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+import backend.grading.state as gs
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Empty state registry, eviction flag on, storage replaced by a dict."""
+    monkeypatch.setattr(gs, "_grading_states", {})
+    monkeypatch.setattr(gs, "_grading_locks", {})
+    monkeypatch.setattr(gs, "_last_access", {})
+    monkeypatch.setattr(gs, "_persisted_digests", {})
+    monkeypatch.setattr(gs, "_last_sweep", float("inf"))  # no implicit sweeps
+    monkeypatch.setattr(gs, "evictions_total", 0)
+    monkeypatch.setenv("FLAG_GRADING_STATE_EVICTION", "1")
+    monkeypatch.setenv("GRADING_STATE_IDLE_TTL", "1800")
+    monkeypatch.setenv("GRADING_STATE_MAX", "200")
+    store = {}
+    monkeypatch.setattr(gs, "storage_load", lambda kind, tid: json.loads(json.dumps(store.get(tid, []))))
+
+    def _save(kind, results, tid):
+        store[tid] = json.loads(json.dumps(results))
+    monkeypatch.setattr(gs, "storage_save", _save)
+    return store
+
+
+def _touch(teacher_id, at):
+    with patch.object(gs.time, "monotonic", return_value=at):
+        return gs._get_state(teacher_id)
+
+
+class TestBoundedLog:
+    def test_append_keeps_newest_lines(self):
+        log = gs.BoundedLog(maxlen=3)
+        for i in range(5):
+            log.append(i)
+        assert log == [2, 3, 4]
+        log.extend([5, 6])
+        assert log == [4, 5, 6]
+        assert json.dumps(log) == "[4, 5, 6]"
+
+    def test_default_cap_from_env(self, monkeypatch):
+        monkeypatch.setenv("GRADING_LOG_MAX_LINES", "2")
+        assert gs.BoundedLog(["a", "b", "c"]) == ["b", "c"]
+
+    def test_plain_list_reassigned_by_routes_is_rewrapped(self, registry):
+        state = _touch("t1", 0.0)
+        state["log"] = []
+        assert isinstance(_touch("t1", 1.0)["log"], gs.BoundedLog)
+
+
+class TestEviction:
+    def test_idle_state_evicted_and_rehydrated(self, registry):
+        registry["t1"] = [{"student_name": "A", "score": 90}]
+        _touch("t1", 0.0)
+        assert gs.evict_idle_states(now=2000.0) == ["t1"]
+        assert "t1" not in gs._grading_states
+        assert gs.evictions_total == 1
+        assert _touch("t1", 2001.0)["results"] == [{"student_name": "A", "score": 90, "graded_at": None}]
+
+    def test_running_and_recent_states_are_kept(self, registry):
+        _touch("running", 0.0)["is_running"] = True
+        _touch("recent", 1900.0)
+        assert gs.evict_idle_states(now=2000.0) == []
+
+    def test_unsaved_results_are_persisted_before_eviction(self, registry):
+        state = _touch("t1", 0.0)
+        state["results"].append({"student_name": "B", "score": 70})
+        gs.evict_idle_states(now=2000.0)
+        assert registry["t1"] == [{"student_name": "B", "score": 70}]
+
+    def test_unchanged_results_are_not_rewritten(self, registry):
+        registry["t1"] = [{"student_name": "A", "graded_at": None}]
+        _touch("t1", 0.0)
+        with patch.object(gs, "save_results") as save:
+            gs.evict_idle_states(now=2000.0)
+        save.assert_not_called()
+
+    def test_failed_save_keeps_state(self, registry, monkeypatch):
+        _touch("t1", 0.0)["results"].append({"student_name": "C"})
+        monkeypatch.setattr(gs, "storage_save", lambda *a: (_ for _ in ()).throw(OSError("down")))
+        assert gs.evict_idle_states(now=2000.0) == []
+        assert "t1" in gs._grading_states
+
+    def test_lru_eviction_over_max(self, registry, monkeypatch):
+        monkeypatch.setenv("GRADING_STATE_MAX", "2")
+        for i, tid in enumerate(["a", "b", "c", "d"]):
+            _touch(tid, float(i))
+        assert gs.evict_idle_states(now=100.0) == ["a", "b"]
+        assert sorted(gs._grading_states) == ["c", "d"]
+
+    def test_locked_state_is_skipped(self, registry):
+        _touch("t1", 0.0)
+        with gs._grading_locks["t1"]:
+            assert gs.evict_idle_states(now=2000.0) == []
+
+    def test_get_state_sweeps_when_flag_on(self, registry, monkeypatch):
+        _touch("old", 0.0)
+        monkeypatch.setattr(gs, "_last_sweep", 0.0)
+        _touch("new", 2000.0)
+        assert list(gs._grading_states) == ["new"]
+
+
+def test_state_bytes_grows_with_results():
+    small = {"log": ["x"], "results": [{"feedback": "ok"}]}
+    big = {"log": ["x"], "results": [{"feedback": "ok" * 500}] * 200}
+    assert 0 < gs.state_bytes(small) < gs.state_bytes(big)
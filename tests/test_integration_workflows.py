@@ -194,6 +194,31 @@ class TestStudentJoinCode:
         assert questions[0]['question'] == 'What is 2+2?'
         assert questions[0]['options'] is not None
 
+    @patch('backend.routes.student_portal_routes.get_supabase')
+    def test_join_serves_stored_projection_with_etag(self, mock_get_sb, client):
+        """A row with a stored projection is served verbatim in one query."""
+        from backend.services.student_assessment_projection import serialize_projection
+        body, etag = serialize_projection({'title': 'Stored Quiz', 'sections': []})
+        mock_sb, chain = _simple_sb([{
+            'id': 'pub-003',
+            'join_code': 'ABC123',
+            'is_active': True,
+            'student_projection': body,
+            'student_projection_etag': etag,
+        }])
+        mock_get_sb.return_value = mock_sb
+
+        response = client.get('/api/student/join/ABC123')
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'title': 'Stored Quiz', 'sections': []}
+        assert response.headers['ETag'] == f'"{etag}"'
+        assert chain.execute.call_count == 1
+
+        again = client.get('/api/student/join/ABC123', headers={'If-None-Match': f'"{etag}"'})
+        assert again.status_code == 304
+        assert again.data == b''
+
     @patch('backend.routes.student_portal_routes.get_supabase')
     def test_join_inactive_assessment_returns_403(self, mock_get_sb, client):
         mock_sb, _ = _simple_sb([{
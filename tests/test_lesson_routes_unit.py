@@ -248,11 +248,10 @@ class TestListLessons:
             "lesson:OnlyTwoParts": {"title": "Two-Part Lesson"},
             "lessononeparttotal": {"title": "One-Part Lesson"},
         }
-        with patch("backend.routes.lesson_routes.storage_list_keys",
-                   return_value=keys), \
-             patch("backend.routes.lesson_routes.storage_load",
-                   side_effect=lambda k, t: loads.get(k, {})):
+        with patch("backend.routes.lesson_routes.storage_load_prefix",
+                   return_value={k: loads[k] for k in keys}) as load_prefix:
             resp = client.get("/api/list-lessons", headers=auth_headers)
+        load_prefix.assert_called_once()
         body = resp.get_json()
         assert "Biology" in body["units"]
         assert len(body["units"]["Biology"]) == 2
@@ -284,8 +283,8 @@ class TestListLessons:
             "_saved_at": "f1",
         }))
 
-        with patch("backend.routes.lesson_routes.storage_list_keys",
-                   return_value=[]):
+        with patch("backend.routes.lesson_routes.storage_load_prefix",
+                   return_value={}):
             resp = client.get("/api/list-lessons", headers=auth_headers)
         body = resp.get_json()
         assert "FromFile" in body["units"]
@@ -294,12 +293,10 @@ class TestListLessons:
     def test_no_lessons_dir_returns_empty(
         self, client, auth_headers, tmp_lesson_dirs,
     ):
-        # Module-level storage_list_keys exists but returns empty AND
+        # Module-level storage_load_prefix exists but returns empty AND
         # LESSONS_DIR doesn't exist → empty response
-        with patch("backend.routes.lesson_routes.storage_list_keys",
-                   return_value=[]), \
-             patch("backend.routes.lesson_routes.storage_load",
-                   return_value=None):
+        with patch("backend.routes.lesson_routes.storage_load_prefix",
+                   return_value={}):
             resp = client.get("/api/list-lessons", headers=auth_headers)
         body = resp.get_json()
         assert body["units"] == {}
@@ -308,14 +305,14 @@ class TestListLessons:
     def test_storage_unavailable_uses_file_fallback(
         self, client, auth_headers, tmp_lesson_dirs,
     ):
-        # storage_list_keys/load = None → goes straight to filesystem.
+        # storage_load_prefix/load = None → goes straight to filesystem.
         unit = tmp_lesson_dirs["lessons"] / "U"
         unit.mkdir(parents=True)
         (unit / "Lesson.json").write_text(json.dumps({"title": "L"}))
         # Create a non-directory entry to exercise the isdir filter
         (tmp_lesson_dirs["lessons"] / "stray.txt").write_text("ignored")
 
-        with patch("backend.routes.lesson_routes.storage_list_keys", None), \
+        with patch("backend.routes.lesson_routes.storage_load_prefix", None), \
              patch("backend.routes.lesson_routes.storage_load", None):
             resp = client.get("/api/list-lessons", headers=auth_headers)
         body = resp.get_json()
@@ -332,7 +329,7 @@ class TestListLessons:
         (unit / "broken.json").write_text("{ not valid")
         (unit / "ok.json").write_text(json.dumps({"title": "OK"}))
 
-        with patch("backend.routes.lesson_routes.storage_list_keys", None):
+        with patch("backend.routes.lesson_routes.storage_load_prefix", None):
             resp = client.get("/api/list-lessons", headers=auth_headers)
         body = resp.get_json()
         assert "U" in body["units"]
@@ -1226,16 +1223,13 @@ class TestSaveResource:
 class TestListResources:
     def test_filter_by_content_type(self, client, auth_headers):
         with patch(
-            "backend.routes.lesson_routes.storage_list_keys",
-            return_value=["resource:1", "resource:2"],
-        ), patch(
-            "backend.routes.lesson_routes.storage_load",
-            side_effect=lambda k, t: {
+            "backend.routes.lesson_routes.storage_load_prefix",
+            return_value={
                 "resource:1": {"id": "1", "content_type": "assessment",
                                "title": "A1", "updated_at": "2026-05-09"},
                 "resource:2": {"id": "2", "content_type": "lesson",
                                "title": "L1", "updated_at": "2026-05-08"},
-            }.get(k),
+            },
         ):
             resp = client.get(
                 "/api/list-resources?type=assessment",
@@ -1247,11 +1241,8 @@ class TestListResources:
 
     def test_sorted_by_updated_at_desc(self, client, auth_headers):
         with patch(
-            "backend.routes.lesson_routes.storage_list_keys",
-            return_value=["resource:old", "resource:new"],
-        ), patch(
-            "backend.routes.lesson_routes.storage_load",
-            side_effect=lambda k, t: {
+            "backend.routes.lesson_routes.storage_load_prefix",
+            return_value={
                 "resource:old": {"id": "old",
                                  "content_type": "assessment",
                                  "title": "Old",
@@ -1260,7 +1251,7 @@ class TestListResources:
                                  "content_type": "assessment",
                                  "title": "New",
                                  "updated_at": "2026-12-31"},
-            }.get(k),
+            },
         ):
             resp = client.get(
                 "/api/list-resources",
@@ -1270,13 +1261,12 @@ class TestListResources:
         assert body["resources"][0]["title"] == "New"
         assert body["resources"][1]["title"] == "Old"
 
-    def test_skips_loads_returning_none(self, client, auth_headers):
+    def test_no_stored_resources_returns_empty(self, client, auth_headers):
+        # load_prefix omits keys with no data, so an empty dict is the
+        # "nothing stored" case.
         with patch(
-            "backend.routes.lesson_routes.storage_list_keys",
-            return_value=["resource:gone"],
-        ), patch(
-            "backend.routes.lesson_routes.storage_load",
-            return_value=None,
+            "backend.routes.lesson_routes.storage_load_prefix",
+            return_value={},
         ):
             resp = client.get(
                 "/api/list-resources",
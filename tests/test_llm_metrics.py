@@ -0,0 +1,143 @@
+"""Tests for backend/observability/llm_metrics.py and the adapter telemetry hooks."""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from backend.observability import events, llm_metrics
+from backend.retry import with_retry
+from backend.services.llm_adapter.streaming import FinishEvent, TextDelta
+from backend.services.llm_adapter.telemetry import (
+    cached_prompt_tokens,
+    retry_observer,
+    time_first_token,
+)
+from backend.services.llm_adapter.types import LLMRequest, Message, TextPart
+
+
+@pytest.fixture(autouse=True)
+def installed(monkeypatch, tmp_path):
+    monkeypatch.delenv("METRICS_MULTIPROC_DIR", raising=False)
+    llm_metrics.reset()
+    llm_metrics.install()
+    yield
+    events.remove_listener(llm_metrics.on_event)
+    llm_metrics.reset()
+
+
+def _request(feature=None):
+    return LLMRequest(
+        model="claude-haiku-4-5",
+        messages=[Message(role="user", content=[TextPart(text="hi")])],
+        metadata={"feature_label": feature} if feature else {},
+    )
+
+
+def _value(body, sample):
+    for line in body.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_complete_and_error_events_feed_latency_tokens_and_cost():
+    events.emit("llm.call.complete", provider="anthropic", model="m", feature_label="grading",
+                duration_ms=1500, prompt_tokens=100, completion_tokens=20, cached_tokens=80,
+                cost_usd=0.25)
+    events.emit("llm.call.error", provider="anthropic", model="m", feature_label=None,
+                duration_ms=200, error_kind="APIError")
+
+    body = llm_metrics.render()
+    labels = 'provider="anthropic",model="m",feature="grading"'
+    assert _value(body, f"graider_llm_request_duration_seconds_sum{{{labels},status=\"ok\"}}") == 1.5
+    assert _value(body, f"graider_llm_tokens_total{{{labels},kind=\"prompt\"}}") == 100
+    assert _value(body, f"graider_llm_tokens_total{{{labels},kind=\"completion\"}}") == 20
+    assert _value(body, f"graider_llm_tokens_total{{{labels},kind=\"cached\"}}") == 80
+    assert _value(body, f"graider_llm_cost_usd_total{{{labels}}}") == 0.25
+    assert 'provider="anthropic",model="m",feature="unlabeled",status="error"' in body
+
+
+def test_unrelated_events_are_ignored():
+    events.emit("grading.run.start", provider="anthropic")
+    assert "graider_llm_request_duration_seconds_count" not in llm_metrics.render()
+
+
+def test_retry_hook_records_rate_limit_waits():
+    exc = Exception("HTTP 429")
+    exc.status_code = 429
+    calls = iter([exc, "ok"])
+
+    def fn():
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    with patch("backend.retry.time.sleep"), patch("backend.retry.get_retry_delay", return_value=2.0):
+        assert with_retry(fn, on_retry=retry_observer("openai", _request("assistant"))) == "ok"
+
+    body = llm_metrics.render()
+    labels = 'provider="openai",model="claude-haiku-4-5",feature="assistant"'
+    assert _value(body, f"graider_llm_retries_total{{{labels},reason=\"rate_limit\"}}") == 1
+    assert _value(body, f"graider_llm_rate_limit_wait_seconds_total{{{labels}}}") == 2.0
+
+
+def test_on_retry_errors_do_not_break_retry():
+    calls = iter([ConnectionError("reset"), "ok"])
+
+    def fn():
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def boom(*_):
+        raise RuntimeError("metrics down")
+
+    with patch("backend.retry.time.sleep"):
+        assert with_retry(fn, on_retry=boom) == "ok"
+
+
+def test_time_first_token_emits_once_and_closes_inner_stream():
+    closed = []
+
+    def stream():
+        try:
+            yield TextDelta(text="a")
+            yield TextDelta(text="b")
+            yield FinishEvent(finish_reason="stop")
+        finally:
+            closed.append(True)
+
+    wrapped = time_first_token(stream(), "gemini", _request())
+    assert next(wrapped) == TextDelta(text="a")
+    wrapped.close()
+    assert closed == [True]
+
+    list(time_first_token(stream(), "gemini", _request()))
+    body = llm_metrics.render()
+    assert _value(body, 'graider_llm_time_to_first_token_seconds_count'
+                        '{provider="gemini",model="claude-haiku-4-5",feature="unlabeled"}') == 2
+
+
+def test_breaker_transitions_and_live_state_gauge():
+    from backend.services.llm_adapter import breakers
+
+    fake = SimpleNamespace(current_state="open")
+    with patch.dict(breakers._BREAKERS, {("openai", "gpt-x"): fake}, clear=True):
+        events.emit("llm.breaker.state_change", provider="openai", model="gpt-x",
+                    from_state="closed", to_state="open")
+        body = llm_metrics.render()
+    assert _value(body, 'graider_llm_breaker_transitions_total{provider="openai",model="gpt-x",to_state="open"}') == 1
+    assert _value(body, 'graider_llm_breaker_state{provider="openai",model="gpt-x"}') == 2
+
+
+@pytest.mark.parametrize("usage, expected", [
+    (SimpleNamespace(cache_read_input_tokens=40), 40),
+    (SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=12)), 12),
+    (SimpleNamespace(cached_content_token_count=7), 7),
+    (SimpleNamespace(prompt_tokens=5), 0),
+    (None, 0),
+])
+def test_cached_prompt_tokens_across_providers(usage, expected):
+    assert cached_prompt_tokens(usage) == expected
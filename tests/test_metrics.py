@@ -14,6 +14,8 @@ Covers:
 - Wiring: backend.app exposes /metrics and exempts it from the limiter.
 """
 import importlib
+import json
+import os
 import re
 import sys
 
@@ -187,6 +189,58 @@ class TestHistogram:
         assert s is not None and s >= 0.0
 
 
+# ──────────────────────────────────────────────────────────────────
+# Multiprocess shards (METRICS_MULTIPROC_DIR)
+# ──────────────────────────────────────────────────────────────────
+
+_DEAD_PID = 2 ** 22 + 12345  # above Linux pid_max defaults
+
+
+def _requests_shard(count):
+    return {
+        "counters": [["graider_http_requests_total",
+                      [["method", "GET"], ["endpoint", "/api/things/<thing_id>"], ["status", "2xx"]], count]],
+        "histograms": [["graider_http_request_duration_seconds",
+                        [["method", "GET"], ["endpoint", "/api/things/<thing_id>"]],
+                        [count] * 9, 0.001 * count, count]],
+    }
+
+
+class TestMultiprocessShards:
+    @pytest.fixture
+    def mp_client(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("METRICS_TOKEN", raising=False)
+        monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+        app = Flask(__name__)
+        register_metrics(app)
+        app.add_url_rule("/api/things/<thing_id>", "get_thing", lambda thing_id: {"id": thing_id})
+        return app.test_client()
+
+    def test_scrape_sums_live_and_exited_workers(self, mp_client, tmp_path):
+        (tmp_path / f"web_{os.getppid()}.json").write_text(json.dumps(_requests_shard(3)))
+        (tmp_path / f"web_{_DEAD_PID}.json").write_text(json.dumps(_requests_shard(4)))
+        mp_client.get("/api/things/1")
+        mp_client.get("/api/things/2")
+
+        body = _scrape(mp_client).get_data(as_text=True)
+        labels = dict(method="GET", endpoint="/api/things/<thing_id>")
+        assert _counter_value(body, "graider_http_requests_total", status="2xx", **labels) == 9.0
+        assert _counter_value(body, "graider_http_request_duration_seconds_count", **labels) == 9.0
+        assert "fleet-wide" in body
+
+        # The exited worker's shard is folded into the archive exactly once.
+        assert not (tmp_path / f"web_{_DEAD_PID}.json").exists()
+        assert (tmp_path / "web_archive.json").exists()
+        body = _scrape(mp_client).get_data(as_text=True)
+        assert _counter_value(body, "graider_http_requests_total", status="2xx", **labels) == 9.0
+
+    def test_own_shard_written_for_other_workers(self, mp_client, tmp_path):
+        mp_client.get("/api/things/1")
+        _scrape(mp_client)
+        shard = json.loads((tmp_path / f"web_{os.getpid()}.json").read_text())
+        assert shard["counters"][0][2] == 1
+
+
 # ──────────────────────────────────────────────────────────────────
 # PII safety
 # ──────────────────────────────────────────────────────────────────
@@ -225,6 +279,42 @@ class TestGradingGauges:
         assert "graider_grading_files_pending 10" in body
         assert "graider_grading_states_tracked 3" in body
 
+    def test_state_bytes_gauges(self, client, monkeypatch):
+        from backend.grading import state as gstate
+        monkeypatch.setattr(gstate, "_grading_states", {
+            "t1": {"results": [{"feedback": "x" * 10_000}], "log": []},
+            "t2": {"results": [], "log": []},
+        })
+        body = _scrape(client).get_data(as_text=True)
+        total = int(re.search(r"^graider_grading_state_bytes (\d+)", body, re.M).group(1))
+        largest = int(re.search(r"^graider_grading_state_bytes_max (\d+)", body, re.M).group(1))
+        assert total > largest > 10_000
+        assert re.search(r"^graider_grading_state_evictions_total \d+", body, re.M)
+
+    def test_gauges_copy_each_state_under_its_teacher_lock(self, client, monkeypatch):
+        from backend.grading import state as gstate
+        held = []
+
+        class _Lock:
+            locked = False
+
+            def __enter__(self):
+                _Lock.locked = True
+
+            def __exit__(self, *exc):
+                _Lock.locked = False
+
+        class _State(dict):
+            def items(self):
+                held.append(_Lock.locked)
+                return super().items()
+
+        monkeypatch.setattr(gstate, "_grading_states", {"t1": _State(is_running=True, total=4)})
+        monkeypatch.setattr(gstate, "_grading_locks", {"t1": _Lock()})
+        body = _scrape(client).get_data(as_text=True)
+        assert "graider_grading_files_pending 4" in body
+        assert held and held[0] is True
+
     def test_process_threads_gauge_positive(self, client):
         body = _scrape(client).get_data(as_text=True)
         m = re.search(r"^graider_process_threads (\d+)", body, re.M)
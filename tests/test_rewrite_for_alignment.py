@@ -108,3 +108,22 @@ def test_service_non_json_returns_error_dict():
         out = rewrite_for_alignment_content(enriched_questions=ENRICHED, doc_text="",
                                             grade="7", subject="ELA", api_key="fake-key")
     assert out == {"error": "AI returned non-JSON response. Possibly rate limited."}
+
+
+def test_rewrite_blank_target_is_suggested_not_assigned(client, headers):
+    grade = {'standards': [{"code": "ELA.7.1", "benchmark": "Identify nouns and verbs",
+                            "topics": ["noun"], "vocabulary": ["noun"]}]}
+    fake_adapter = MagicMock()
+    fake_adapter.chat.return_value = _completion(json.dumps({"rewrites": []}))
+    with patch('backend.routes.planner_routes.load_standards', return_value=grade), \
+         patch('backend.api_keys.get_api_key', return_value='fake-key'), \
+         patch('backend.services.llm_adapter.OpenAIAdapter', return_value=fake_adapter):
+        resp = client.post('/api/rewrite-for-alignment',
+                          json={"questions": [{"original_text": "What is a noun?"}],
+                                "grade": "7", "subject": "ELA", "state": "FL"},
+                          headers=headers)
+    body = resp.get_json()
+    assert body["suggested_standards"] == [
+        {"question_index": 0, "code": "ELA.7.1", "benchmark": "Identify nouns and verbs"}]
+    prompt = json.loads(fake_adapter.chat.call_args.args[0].messages[0].content[0].text)
+    assert json.dumps(prompt).count("ELA.7.1") == 0
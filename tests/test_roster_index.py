@@ -0,0 +1,112 @@
+"""Tests for backend/services/roster_index.py.
+
+The reference scans below are the pre-index implementations (grading
+pipeline `_resolve_student` fallback, email `_find_in_roster` strategies 4/5,
+assistant `_fuzzy_name_match` loop); the index must agree with them.
+"""
+import random
+
+import pytest
+
+from backend.services.roster_index import (
+    NameMatcher,
+    RosterIndex,
+    edit_distance,
+    fuzzy_name_match,
+)
+
+FIRSTS = ["Ana", "Anabel", "Da'Jaun", "Dajuan", "Luke", "Lucas", "Troy", "Serenity", "Mary Ann", "Jo"]
+LASTS = ["Kolas-Nowicki", "Maloney Fox", "Salvador-Guzman", "Petite", "Smith", "Smyth", "O'Neil", "Lundell", "Wilkins Reels"]
+
+
+def _roster(seed=7, size=60):
+    rng = random.Random(seed)
+    roster = {}
+    for i in range(size):
+        first, last = rng.choice(FIRSTS), rng.choice(LASTS)
+        entry = {"student_id": str(i), "student_name": f"{first} {last}",
+                 "first_name": first, "last_name": last, "email": ""}
+        roster[f"{first.split()[0]} {last}".lower() + f" #{i}"] = entry
+        roster[f"{last} {first.split()[0]}".lower() + f" #{i}"] = entry  # duplicate key, same entry
+    return roster
+
+
+def _pipeline_scan(roster, first, last):
+    first_norm = first.lower().replace("'", "").replace("’", "")
+    last_norm = last.lower().replace("'", "").replace("’", "")
+    last_collapsed = last_norm.replace(" ", "").replace("-", "")
+    for data in roster.values():
+        r_first = data.get('first_name', '').lower().replace("'", "").replace("’", "")
+        r_last = data.get('last_name', '').lower().replace("'", "").replace("’", "")
+        if r_first != first_norm and not r_first.startswith(first_norm):
+            continue
+        hy, sp = r_last.split('-'), r_last.split(' ')
+        if (r_last.startswith(last_norm) or hy[0] == last_norm or last_norm in hy or sp[0] == last_norm
+                or last_norm in sp or r_last.replace(" ", "").replace("-", "") == last_collapsed):
+            return data
+    return None
+
+
+def _email_fuzzy_scan(roster, first, last):
+    best, best_dist, seen = None, 3, set()
+    for val in roster.values():
+        if id(val) in seen:
+            continue
+        seen.add(id(val))
+        r_first = val['first_name'].split()[0].lower()
+        r_last = val['last_name'].lower()
+        if r_last == last:
+            d = edit_distance(first, r_first)
+        elif r_first == first:
+            d = edit_distance(last, r_last)
+        else:
+            continue
+        if d < best_dist:
+            best, best_dist = val, d
+    return best
+
+
+QUERIES = [("ana", "k"), ("an", "nowicki"), ("dajaun", "oneil"), ("da'jaun", "o'neil"), ("luke", "lundel"),
+           ("lucas", "smith"), ("luk", "smyth"), ("troy", "fox"), ("serenity", "p"), ("mary", "maloney"),
+           ("jo", "salvador guzman"), ("lukas", "smith"), ("seren1ty", "petite"), ("x", "y"), ("", "smith")]
+
+
+@pytest.mark.parametrize("first,last", QUERIES)
+def test_filename_match_agrees_with_scan(first, last):
+    roster = _roster()
+    assert RosterIndex(roster).match_filename_name(first, last) is _pipeline_scan(roster, first, last)
+
+
+@pytest.mark.parametrize("first,last", QUERIES)
+def test_fuzzy_match_agrees_with_scan(first, last):
+    roster = _roster()
+    assert RosterIndex(roster).match_fuzzy(first, last) is _email_fuzzy_scan(roster, first, last)
+
+
+def test_last_initial_returns_first_entry_in_roster_order():
+    roster = {
+        "serenity petite": {"first_name": "Serenity", "last_name": "Petite"},
+        "serenity park": {"first_name": "Serenity", "last_name": "Park"},
+    }
+    index = RosterIndex(roster)
+    assert index.match_last_initial("serenity", "p") is roster["serenity petite"]
+    assert index.match_last_initial("serenity", "q") is None
+
+
+def test_bounded_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("kitten", "sitting", bound=2) == 3
+    assert edit_distance("abc", "abcdefgh", bound=2) == 3
+    assert edit_distance("smith", "smyth", bound=2) == 1
+
+
+def test_name_matcher_agrees_with_linear_fuzzy_scan():
+    names = {str(i): e["student_name"] for i, e in enumerate(_roster(seed=3).values())}
+    names.update({"x1": "Wilkins Reels, Dicen Macheil", "x2": "Troy Mikell", "x3": "Luke J Lundell"})
+    matcher = NameMatcher(names)
+    searches = ["Dicen Wilkins", "Troy Jaxson Mikell", "Luke Lundell", "An Smi", "Da'Jaun O'Neil",
+                "Mary Fox", "J", "Nobody Here", "", "Lu"]
+    for search in searches:
+        expected = [(k, n) for k, n in names.items() if fuzzy_name_match(search, n)]
+        assert matcher.matches(search) == expected
+        assert matcher.first_match(search) == (expected[0][0] if expected else None)
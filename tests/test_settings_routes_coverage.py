@@ -204,20 +204,22 @@ class TestListPeriods:
         assert resp.status_code == 200
         assert resp.get_json() == {"periods": []}
 
-    @patch('backend.routes.settings_routes.storage_list_keys')
-    @patch('backend.routes.settings_routes.storage_load')
-    def test_loads_from_cloud_storage(self, mock_load, mock_list,
+    @patch('backend.routes.settings_routes.storage_load_prefix')
+    @patch('backend.routes.settings_routes.storage_load_many')
+    def test_loads_from_cloud_storage(self, mock_load_many, mock_load_prefix,
                                        client, teacher_headers):
-        mock_list.return_value = ['period_meta:p1.csv']
-        # First call: metadata. Second call: period data with rows.
-        mock_load.side_effect = [
-            {"filename": "p1.csv", "period_name": "P1", "class_level": "standard"},
-            {"headers": ["First Name", "Last Name", "Student ID"],
-             "rows": [{"First Name": "Ada", "Last Name": "Lovelace",
-                       "Student ID": "S1"}]},
-        ]
+        # One query for every metadata blob, one for the periods they name.
+        mock_load_prefix.return_value = {
+            'period_meta:p1.csv': {"filename": "p1.csv", "period_name": "P1", "class_level": "standard"},
+        }
+        mock_load_many.return_value = {
+            'period:p1.csv': {"headers": ["First Name", "Last Name", "Student ID"],
+                              "rows": [{"First Name": "Ada", "Last Name": "Lovelace",
+                                        "Student ID": "S1"}]},
+        }
         resp = client.get('/api/list-periods', headers=teacher_headers)
         assert resp.status_code == 200
+        assert mock_load_many.call_args[0][0] == ['period:p1.csv']
         data = resp.get_json()
         assert len(data['periods']) == 1
         assert data['periods'][0]['students'][0]['first'] == 'Ada'
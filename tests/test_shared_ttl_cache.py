@@ -0,0 +1,82 @@
+"""Tests for backend.utils.ttl_cache.SharedTTLCache (Redis tier via fakeredis)."""
+import threading
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from backend.utils.ttl_cache import SharedTTLCache, invalidate_scope  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _cache(server, namespace="t", **kw):
+    client = fakeredis.FakeStrictRedis(server=server)
+    return SharedTTLCache(namespace, ttl_seconds=5, scope_of=lambda k: k[1],
+                          redis_client=client, **kw)
+
+
+def test_value_written_by_one_process_is_served_to_another(server):
+    pod_a, pod_b = _cache(server), _cache(server)
+    pod_a.set(("teacher", "cls-1", "latest"), {"students": [1]})
+    assert pod_b.get(("teacher", "cls-1", "latest")) == {"students": [1]}
+    assert pod_b.stats()["redis_hits"] == 1
+    # Second read is served from pod_b's local tier.
+    pod_b.get(("teacher", "cls-1", "latest"))
+    assert pod_b.stats()["hits"] == 1
+
+
+def test_scope_invalidation_crosses_processes(server):
+    pod_a, pod_b = _cache(server), _cache(server)
+    key = ("teacher", "cls-1", "latest")
+    pod_a.set(key, "old")
+    assert pod_b.get(key) == "old"
+    invalidate_scope("t", "cls-1", redis_client=fakeredis.FakeStrictRedis(server=server))
+    assert pod_a.get(key) is None
+    assert pod_b.get(key) is None
+
+
+def test_scope_invalidation_leaves_other_scopes(server):
+    cache = _cache(server)
+    cache.set(("t", "cls-1", "latest"), 1)
+    cache.set(("t", "cls-2", "latest"), 2)
+    cache.invalidate_scope("cls-1")
+    assert cache.get(("t", "cls-1", "latest")) is None
+    assert cache.get(("t", "cls-2", "latest")) == 2
+
+
+def test_get_or_compute_single_flight_across_processes(server):
+    pods = [_cache(server) for _ in range(4)]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"v": 1}, True
+
+    results = []
+    threads = [threading.Thread(target=lambda p=p: results.append(
+        p.get_or_compute(("t", "cls-1", "best"), compute))) for p in pods]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"v": 1}] * 4
+
+
+def test_redis_failure_degrades_to_local_tier():
+    class Down:
+        def __getattr__(self, name):
+            def fail(*a, **kw):
+                raise ConnectionError("redis down")
+            return fail
+
+    cache = SharedTTLCache("t", ttl_seconds=5, redis_client=Down())
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    assert cache.stats()["redis_errors"] == 1  # backoff: one failure, then local-only
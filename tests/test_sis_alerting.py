@@ -97,7 +97,10 @@ SIS_CAPTURES = [
     # 2026-06-08: shifted 325 -> 332 by VB8 #18 (establish_sso_session import
     # at module top, +1 line) pushing the capture from 333 to 334 — 1 past the
     # window=8 edge. Pin tracks the except (332); capture at 334 unchanged.
-    ("backend/routes/clever_routes.py", 332),
+    # 2026-10-19: shifted 332 -> 337 by the storage-flush review fix (module
+    # `storage` import plus storage.flush() before the roster-sync thread).
+    # Pin tracks the except (337).
+    ("backend/routes/clever_routes.py", 337),
     # 2026-05-14: shifted 265 -> 286 by the security-quintet PR (Task 4b
     # added the Clever-ID resolver + filter_roster_to_teacher block to
     # _background_roster_sync — ~21 lines). Capture site at 288 unchanged.
@@ -113,7 +116,14 @@ SIS_CAPTURES = [
     # (db_counts + zero-student-rows warning block added inside
     # _background_roster_sync, +14 lines). Pin tracks the except (389);
     # capture at 391 unchanged.
-    ("backend/routes/clever_routes.py", 389),
+    # 2026-10-18: shifted 389 -> 403 by the background-jobs PR (roster sync
+    # body extracted to _run_clever_roster_sync, and the FLAG_BACKGROUND_JOBS
+    # branch added in clever_callback). Pin tracks the except (403); capture
+    # at 405 unchanged.
+    # 2026-10-19: shifted 403 -> 405 by the storage-flush review fix (module
+    # `storage` import plus storage.flush() before the roster-sync thread).
+    # Pin tracks the except (405).
+    ("backend/routes/clever_routes.py", 405),
     # 2026-05-06: shifted 672 -> 692 by PR 3 of SIS compliance hardening sprint
     # (PII redaction in Clever logs added ~20 lines of helper code earlier in
     # the file). 2026-05-07: shifted 692 -> 699 by PR #227 same-as-above net
@@ -160,7 +170,12 @@ SIS_CAPTURES = [
     # (FLAG_CLEVER_ROSTER_SYNC gate in clever_callback: flag_enabled import +
     # KILL SWITCH comment + flag check + skip warning, +8 lines above this
     # capture). Pin tracks the except sb_err (933); capture at 935 unchanged.
-    ("backend/routes/clever_routes.py", 933),
+    # 2026-10-18: shifted 933 -> 957 by the background-jobs PR (same lines
+    # above; see the 403 pin). Capture at 959 unchanged.
+    # 2026-10-19: shifted 957 -> 962 by the storage-flush review fix (module
+    # `storage` import plus storage.flush() before the roster-sync thread).
+    # Pin tracks the except (962).
+    ("backend/routes/clever_routes.py", 962),
     # 2026-06-01 (whole-branch review): NEW capture pinned — the legacy
     # clever:{id} cleanup `except e` in clever_delete_data captures to Sentry
     # (FERPA right-to-delete observability guardrail). Shifted 776 -> 787 by the
@@ -177,7 +192,12 @@ SIS_CAPTURES = [
     # 2026-06-10: shifted 883 -> 891 by the feature-flag kill-switch PR
     # (same +8 lines in clever_callback; see the 933 pin). Pin tracks the
     # legacy-cleanup except (891); capture at 893 unchanged.
-    ("backend/routes/clever_routes.py", 891),
+    # 2026-10-18: shifted 891 -> 915 by the background-jobs PR (see the 403
+    # pin). Capture at 917 unchanged.
+    # 2026-10-19: shifted 915 -> 919 by the storage-flush review fix (module
+    # `storage` import plus storage.flush() before the roster-sync thread).
+    # Pin tracks the except (919).
+    ("backend/routes/clever_routes.py", 919),
     # 2026-05-05: shifted 92 -> 102 and 150 -> 161 by PR 1 of SIS compliance
     # hardening sprint, which added 6 lines of imports + the OIDC validation
     # block. Captures themselves are unchanged — pins track the except block.
@@ -199,12 +219,19 @@ SIS_CAPTURES = [
     # _mint_classlink_student_session, and _create_classlink_student_session ABOVE
     # _trigger_roster_sync. The _bg_sync sentry_sdk.capture_exception (the original
     # meaning of this pin) is now at line 297.
-    ("backend/routes/classlink_routes.py", 295),
+    # 2026-10-18: shifted 295 -> 303 by the background-jobs PR
+    # (FLAG_BACKGROUND_JOBS enqueue branch at the top of _trigger_roster_sync).
+    # Capture at 305 unchanged.
+    # 2026-10-19: shifted 303 -> 304 by the storage-flush review fix (+1
+    # line: module `storage` import). Pin tracks the except (304).
+    ("backend/routes/classlink_routes.py", 304),
     # 2026-05-25: NEW pin added by the same branch. Task 5's
     # _create_classlink_student_session has its own try/except that captures via
     # sentry_sdk.capture_exception at line 225. Pinning it explicitly so any future
     # refactor that drops the capture is caught by this SIS regression test.
-    ("backend/routes/classlink_routes.py", 223),
+    # 2026-10-19: shifted 223 -> 224 by the storage-flush review fix (+1
+    # line: module `storage` import). Capture now at 228.
+    ("backend/routes/classlink_routes.py", 224),
     ("backend/routes/oneroster_routes.py", 157),
     ("backend/routes/oneroster_routes.py", 204),
     ("backend/routes/oneroster_routes.py", 218),
@@ -36,6 +36,7 @@ def test_html_to_pdf_awaits_fonts_ready(monkeypatch):
         def set_content(self, html, **kw): calls.append(("set_content", kw.get("wait_until")))
         def evaluate(self, expr): calls.append(("evaluate", expr))
         def pdf(self, **kw): calls.append(("pdf", None)); return b"%PDF-1.4 x"
+        def close(self): pass
     class _Browser:
         def new_page(self): return _Page()
         def close(self): pass
@@ -62,3 +63,125 @@ def test_html_to_pdf_returns_pdf_bytes():
     pdf = html_to_pdf("<!DOCTYPE html><html><body><h1>Hi</h1></body></html>")
     assert pdf[:5] == b"%PDF-"
     assert len(pdf) > 500
+
+
+class _FakePlaywright:
+    """Fake sync_playwright() for the pool: records launches per thread."""
+
+    def __init__(self):
+        self.launches = []
+        self.browsers = []
+        self.fail_next_render = False
+        outer = self
+
+        class _Page:
+            def set_content(self, html, **kw): self.html = html
+            def evaluate(self, expr): pass
+            def close(self): pass
+            def pdf(self, **kw):
+                if outer.fail_next_render:
+                    outer.fail_next_render = False
+                    raise RuntimeError("render crashed")
+                return b"%PDF-" + self.html.encode()
+
+        class _Browser:
+            def __init__(self):
+                self.connected = True
+                self.closed = False
+            def new_page(self): return _Page()
+            def is_connected(self): return self.connected
+            def close(self): self.closed = True
+
+        class _Chromium:
+            @staticmethod
+            def launch(args=None):
+                import threading
+                outer.launches.append(threading.current_thread().name)
+                b = _Browser()
+                outer.browsers.append(b)
+                return b
+
+        class _PW:
+            chromium = _Chromium
+            def start(self): return self
+            def stop(self): pass
+
+        self._pw = _PW()
+
+    def __call__(self):
+        return self._pw
+
+
+@pytest.fixture
+def fake_pw(monkeypatch):
+    from backend.services import slide_pdf
+    fake = _FakePlaywright()
+    monkeypatch.setattr(slide_pdf, "sync_playwright", fake)
+    return fake
+
+
+def test_pool_reuses_one_browser_and_batches_in_one_session(fake_pw):
+    from backend.services.slide_pdf import RendererPool
+    pool = RendererPool(size=1, recycle_after=10)
+    try:
+        assert pool.render("<a>") == b"%PDF-<a>"
+        assert pool.render_many(["<b>", "<c>"]) == [b"%PDF-<b>", b"%PDF-<c>"]
+    finally:
+        pool.close()
+    assert len(fake_pw.launches) == 1
+    stats = pool.stats()
+    assert stats["jobs"] == 2 and stats["renders"] == 3
+    assert fake_pw.browsers[0].closed  # closed on shutdown
+
+
+def test_pool_recycles_after_n_renders_and_relaunches_dead_browsers(fake_pw):
+    from backend.services.slide_pdf import RendererPool
+    pool = RendererPool(size=1, recycle_after=2)
+    try:
+        pool.render_many(["1", "2"])
+        pool.render("3")  # recycled: 2 renders reached
+        fake_pw.browsers[-1].connected = False
+        pool.render("4")  # health check fails -> relaunch
+    finally:
+        pool.close()
+    assert len(fake_pw.launches) == 3
+    assert pool.stats()["recycles"] == 1 and pool.stats()["relaunches"] == 1
+
+
+def test_pool_failure_surfaces_as_slide_pdf_error_and_restarts_browser(fake_pw, monkeypatch):
+    from backend.services import slide_pdf
+    monkeypatch.setenv("FLAG_SLIDE_PDF_POOL", "1")
+    pool = slide_pdf.RendererPool(size=1)
+    monkeypatch.setattr(slide_pdf, "_pool", pool)
+    try:
+        fake_pw.fail_next_render = True
+        with pytest.raises(slide_pdf.SlidePdfError):
+            slide_pdf.html_to_pdf("<x>")
+        assert slide_pdf.html_to_pdf("<y>") == b"%PDF-<y>"
+    finally:
+        pool.close()
+    assert len(fake_pw.launches) == 2
+
+
+def test_pool_browsers_are_created_on_worker_threads(fake_pw):
+    from backend.services.slide_pdf import RendererPool
+    pool = RendererPool(size=2)
+    try:
+        pool.render("a")
+    finally:
+        pool.close()
+    assert fake_pw.launches[0].startswith("slide-pdf-")
+
+
+def test_flag_off_keeps_one_shot_launch(fake_pw, monkeypatch):
+    from backend.services import slide_pdf
+    monkeypatch.delenv("FLAG_SLIDE_PDF_POOL", raising=False)
+
+    class _CM:
+        def __enter__(self): return fake_pw._pw
+        def __exit__(self, *a): return False
+
+    monkeypatch.setattr(slide_pdf, "sync_playwright", lambda: _CM())
+    assert slide_pdf.html_to_pdf_many(["a", "b"]) == [b"%PDF-a", b"%PDF-b"]
+    assert len(fake_pw.launches) == 1
+    assert slide_pdf._pool is None
@@ -0,0 +1,135 @@
+"""Tests for backend/observability/stage_timing.py (grading stage spans)."""
+import concurrent.futures
+from unittest.mock import patch
+
+from backend.observability import stage_timing
+from backend.observability.stage_timing import (
+    LLM,
+    POSTPROCESS,
+    STAGING,
+    file_trace,
+    propagate,
+    run_trace,
+    span,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_span_is_noop_outside_a_run():
+    with span(LLM):
+        pass
+    with file_trace("a.docx"):
+        assert stage_timing.current_trace() is None
+
+
+def test_summary_stage_percentiles_and_slowest_files():
+    clock = _Clock()
+    with patch.object(stage_timing.time, "monotonic", clock):
+        with run_trace() as trace:
+            with span(STAGING):
+                clock.now += 0.5
+            for name, llm_seconds in (("a.docx", 1.0), ("b.docx", 3.0), ("c.docx", 2.0)):
+                with file_trace(name):
+                    with span(LLM):
+                        clock.now += llm_seconds
+                    with span(POSTPROCESS):
+                        clock.now += 0.1
+            clock.now += 0.4
+
+    summary = trace.summary()
+    assert summary["running"] is False
+    assert summary["elapsed_ms"] == 7200
+    assert summary["files"] == 3
+    assert summary["stages"][STAGING] == {"count": 1, "total_ms": 500, "p50_ms": 500, "p95_ms": 500, "max_ms": 500}
+    assert summary["stages"][LLM]["count"] == 3
+    assert summary["stages"][LLM]["p50_ms"] == 2000
+    assert summary["stages"][LLM]["p95_ms"] == 3000
+    assert summary["file_p50_ms"] == 2100
+    slowest = summary["slowest_files"]
+    assert [f["file"] for f in slowest] == ["b.docx", "c.docx", "a.docx"]
+    assert slowest[0] == {"file": "b.docx", "total_ms": 3100, "critical_stage": LLM,
+                          "stages": {LLM: 3000, POSTPROCESS: 100}}
+
+
+def test_nested_spans_count_self_time_only():
+    clock = _Clock()
+    with patch.object(stage_timing.time, "monotonic", clock):
+        with run_trace() as trace, file_trace("a.docx"):
+            with span(POSTPROCESS):
+                clock.now += 0.2
+                with span(LLM):  # e.g. feedback translation inside post-processing
+                    clock.now += 1.0
+
+    stages = trace.summary()["slowest_files"][0]["stages"]
+    assert stages == {POSTPROCESS: 200, LLM: 1000}
+    assert [round(s.duration, 6) for s in trace.spans] == [1.0, 1.2]
+
+
+def test_propagate_records_worker_thread_spans_under_the_callers_file():
+    def work(n):
+        with span(LLM):
+            return n * 2
+
+    with run_trace() as trace, file_trace("a.docx"):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(propagate(work), [1, 2, 3]))
+        # Without propagate the worker threads see no active trace.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(work, 4).result()
+
+    assert results == [2, 4, 6]
+    assert [(s.stage, s.file) for s in trace.spans] == [(LLM, "a.docx")] * 3
+
+
+def test_propagate_is_identity_outside_a_run():
+    def fn():
+        return 1
+    assert propagate(fn) is fn
+
+
+def test_timed_decorator_preserves_function():
+    @stage_timing.timed(LLM)
+    def call(x):
+        """Doc."""
+        return x + 1
+
+    with run_trace() as trace:
+        assert call(1) == 2
+    assert call.__doc__ == "Doc."
+    assert [s.stage for s in trace.spans] == [LLM]
+
+
+def test_export_otel_requires_endpoint_and_sdk(monkeypatch):
+    with run_trace() as trace:
+        pass
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_ENDPOINT", raising=False)
+    assert stage_timing.export_otel(trace) is False
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://collector:4318")
+    with patch.object(stage_timing, "_get_tracer", side_effect=ImportError("no sdk")):
+        assert stage_timing.export_otel(trace) is False
+
+
+def test_run_grading_thread_binds_a_trace_and_exports_it():
+    from backend.grading import thread
+
+    seen = {}
+
+    def fake_inner(*args):
+        with span(STAGING):
+            seen["trace"] = stage_timing.current_trace()
+
+    with patch.object(thread, "_run_grading_thread_inner", fake_inner), \
+            patch.object(thread, "export_otel") as export:
+        thread.run_grading_thread("in", "out", "roster.csv", teacher_id="t-timing")
+
+    trace = seen["trace"]
+    assert trace is not None and stage_timing.current_trace() is None
+    export.assert_called_once_with(trace, {"graider.ai_model": "gpt-4o-mini"})
+    assert trace.summary()["stages"][STAGING]["count"] == 1
@@ -0,0 +1,136 @@
+"""Tests for backend/services/standards_catalog.py and its use in planner_standards."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from backend.services import standards_catalog
+from backend.services.standards_catalog import StandardsCatalog, catalog, select_candidates, tokenize
+
+STANDARDS_DIR = os.path.join(os.path.dirname(__file__), '..', 'backend', 'data', 'standards')
+RECALL_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'standards_alignment_recall.json')
+
+STANDARDS = [
+    {"code": "SS.7.CG.1.1", "benchmark": "Analyze the influences of Enlightenment ideas on the founding documents.",
+     "topics": ["Enlightenment", "Locke"], "vocabulary": ["natural rights", "social contract"]},
+    {"code": "SS.7.CG.3.4", "benchmark": "Explain the separation of powers and checks and balances.",
+     "topics": ["Branches of government"], "vocabulary": ["checks and balances", "veto"]},
+    {"code": "SS.8.A.1.1", "benchmark": "Use primary sources to study the colonial economy.",
+     "topics": ["Colonial trade"], "vocabulary": ["mercantilism"]},
+    {"code": "SS.912.CG.2.1", "benchmark": "Explain the constitutional amendment process.",
+     "topics": ["Amendments"], "vocabulary": ["ratify"]},
+]
+
+
+@pytest.fixture
+def standards_file(tmp_path):
+    path = tmp_path / "civics.json"
+    path.write_text(json.dumps({"standards": STANDARDS}))
+    return path
+
+
+def test_file_is_parsed_once_and_reparsed_when_changed(standards_file):
+    catalog = StandardsCatalog()
+    with patch("backend.services.standards_catalog._parse_standards_file",
+               wraps=standards_catalog._parse_standards_file) as parse:
+        first = catalog.get(standards_file)
+        assert catalog.get(standards_file) is first
+        assert parse.call_count == 1
+
+        standards_file.write_text(json.dumps(STANDARDS[:1]))
+        st = standards_file.stat()
+        os.utime(standards_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert len(catalog.get(standards_file).standards) == 1
+        assert parse.call_count == 2
+
+
+def test_missing_or_empty_file_returns_none(tmp_path):
+    catalog = StandardsCatalog()
+    assert catalog.get(tmp_path / "nope.json") is None
+    (tmp_path / "empty.json").write_text("[]")
+    assert catalog.get(tmp_path / "empty.json") is None
+
+
+def test_grade_partition_matches_grade_rules_and_is_copied(standards_file):
+    entry = StandardsCatalog().get(standards_file)
+    grade7 = entry.grade("7")
+    assert [s["code"] for s in grade7] == ["SS.7.CG.1.1", "SS.7.CG.3.4"]
+    grade7.clear()
+    assert len(entry.grade("7")) == 2
+    assert [s["code"] for s in entry.grade("10")] == ["SS.912.CG.2.1"]
+    assert entry.grade("3") == []
+
+
+def test_code_index(standards_file):
+    entry = StandardsCatalog().get(standards_file)
+    assert entry.by_code["SS.8.A.1.1"]["topics"] == ["Colonial trade"]
+    assert "SS.9.X" not in entry.by_code
+
+
+def test_search_ranks_by_relevance_and_respects_subset(standards_file):
+    entry = StandardsCatalog().get(standards_file)
+    ranked = entry.search("How does a presidential veto check Congress?")
+    assert ranked[0][0]["code"] == "SS.7.CG.3.4"
+    assert all(score > 0 for _, score in ranked)
+
+    assert entry.search("mercantilism colonial trade", within=entry.grade("7")) == []
+    assert entry.search("the and of") == []
+
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("Explain the Bill of Rights, a U.S. document") == ["bill", "rights", "document"]
+
+
+def test_load_standards_reads_each_file_once(tmp_path, monkeypatch):
+    import backend.services.planner_standards as ps
+    (tmp_path / "standards" / "florida").mkdir(parents=True)
+    (tmp_path / "standards" / "florida" / "civics.json").write_text(json.dumps({"standards": STANDARDS}))
+    (tmp_path / "standards" / "standards_map.json").write_text(json.dumps({
+        "states": {"FL": {"framework": "florida"}},
+        "subject_to_filename": {"Civics": "civics"},
+    }))
+    monkeypatch.setattr(ps, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ps, "_standards_map_cache", None)
+    monkeypatch.setattr(ps, "standards_catalog", StandardsCatalog())
+
+    with patch("backend.services.standards_catalog._parse_standards_file",
+               wraps=standards_catalog._parse_standards_file) as parse:
+        first = ps.load_standards("FL", "Civics", "7")
+        second = ps.load_standards("FL", "Civics", "8")
+        assert parse.call_count == 1
+
+    assert [s["code"] for s in first["standards"]] == ["SS.7.CG.1.1", "SS.7.CG.3.4"]
+    assert [s["code"] for s in second["standards"]] == ["SS.8.A.1.1"]
+    assert ps.get_standards_by_code("FL", "Civics", ["SS.8.A.1.1", "nope"]) == {"SS.8.A.1.1": STANDARDS[2]}
+
+
+def test_select_candidates_keeps_short_lists_and_pads_when_few_match():
+    assert select_candidates(STANDARDS, "veto", 10) == STANDARDS
+    assert select_candidates(STANDARDS, "veto", 0) == STANDARDS
+    picked = select_candidates(STANDARDS, "veto", 2)
+    assert [s["code"] for s in picked] == ["SS.7.CG.3.4", "SS.7.CG.1.1"]
+
+
+@pytest.mark.parametrize("k", [10, 25])
+def test_preselection_recall_on_labeled_documents(k):
+    """Every labeled standard must survive pre-selection at the given K."""
+    with open(RECALL_FIXTURE) as f:
+        cases = json.load(f)["cases"]
+    missed = []
+    for case in cases:
+        pool = catalog.get(os.path.join(STANDARDS_DIR, case["file"])).grade(case["grade"])
+        assert len(pool) > k  # otherwise the check proves nothing
+        selected = {s["code"] for s in select_candidates(pool, case["text"], k)}
+        missed += [code for code in case["expected"] if code not in selected]
+    assert missed == []
+
+
+def test_preselect_standards_uses_configured_k(monkeypatch):
+    import backend.services.planner_standards as ps
+    monkeypatch.setenv("ALIGNMENT_STANDARDS_TOP_K", "1")
+    assert [s["code"] for s in ps.preselect_standards(STANDARDS, "amendment ratify")] == ["SS.912.CG.2.1"]
+    monkeypatch.setenv("ALIGNMENT_STANDARDS_TOP_K", "0")
+    assert ps.preselect_standards(STANDARDS, "amendment ratify") == STANDARDS
+    assert ps.suggest_standard_for_question(STANDARDS, "colonial mercantilism")["code"] == "SS.8.A.1.1"
+    assert ps.suggest_standard_for_question(STANDARDS, "photosynthesis") is None
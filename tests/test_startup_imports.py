@@ -0,0 +1,72 @@
+"""Startup import targets for the web app and the Celery worker.
+
+Each check imports the target in a fresh interpreter via
+backend/scripts/import_time_report.py (``-X importtime``): heavy packages
+and the grading pipeline must stay deferred to first use. That is the hard
+gate. The wall-clock budget check depends on the host (a loaded 1-CPU box
+runs well over it), so it only runs with STARTUP_IMPORT_BUDGET_CHECK=1 or
+via ``python backend/scripts/import_time_report.py``.
+"""
+import os
+import sys
+
+import pytest
+
+from backend.scripts import import_time_report as itr
+
+
+@pytest.fixture(scope="module", params=sorted(itr.TARGETS))
+def profile(request):
+    try:
+        # Best of two: the first run may pay for .pyc compilation.
+        runs = [itr.measure(request.param) for _ in range(2)]
+    except RuntimeError as e:
+        pytest.fail(str(e))
+    return min(runs, key=lambda p: p.total_us)
+
+
+def test_startup_does_not_import_deferred_modules(profile):
+    offenders = {m: " -> ".join(profile.chain(m)) for m in profile.deferred_loaded()}
+    assert offenders == {}, f"{profile.target} startup imports deferred modules: {offenders}"
+
+
+@pytest.mark.skipif(os.getenv("STARTUP_IMPORT_BUDGET_CHECK") != "1",
+                    reason="wall-clock budget is opt-in: set STARTUP_IMPORT_BUDGET_CHECK=1")
+def test_startup_import_time_within_budget(profile):
+    seconds = profile.total_us / 1e6
+    budget = itr.budget_s(profile.target)
+    assert seconds <= budget, (
+        f"{profile.target} startup imports took {seconds:.2f}s (budget {budget:.1f}s); "
+        f"run python backend/scripts/import_time_report.py {profile.target}"
+    )
+
+
+def test_parse_importtime_links_children_to_parents():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:        10 |         10 |     leaf",
+        "import time:        20 |         30 |   mid",
+        "import time:         5 |          5 |   sibling",
+        "import time:       100 |        135 | root",
+        "import time:         7 |          7 | other",
+    ])
+    profile = itr.ImportProfile("web", itr.parse_importtime(stderr))
+    assert profile.chain("leaf") == ["root", "mid", "leaf"]
+    assert profile.chain("sibling") == ["root", "sibling"]
+    assert profile.chain("missing") == []
+    assert profile.total_us == 142
+
+
+def test_llm_adapter_types_do_not_load_provider_sdks():
+    import subprocess
+
+    code = (
+        "import sys\n"
+        "from backend.services.llm_adapter import LLMRequest, TextDelta\n"
+        "assert not {'anthropic', 'openai', 'google.genai'} & set(sys.modules), 'sdk loaded'\n"
+        "from backend.services.llm_adapter import OpenAIAdapter\n"
+        "assert 'openai' in sys.modules\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=itr.REPO_ROOT,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
@@ -637,6 +637,102 @@ class TestPublicAPI:
         assert keys == []
 
 
+# ──────────────────────────────────────────────────────────────────
+# Bulk reads: load_many / load_prefix
+# ──────────────────────────────────────────────────────────────────
+
+
+def _mock_sb_rows(rows):
+    sb = MagicMock()
+    chain = MagicMock()
+    for m in ('select', 'eq', 'in_', 'like'):
+        getattr(chain, m).return_value = chain
+    chain.execute.return_value = MagicMock(data=rows)
+    sb.table.return_value = chain
+    return sb, chain
+
+
+class TestBulkLoad:
+    def test_sb_load_many_is_one_in_query(self):
+        from backend.storage import _sb_load_many
+        sb, chain = _mock_sb_rows([
+            {'data_key': 'period:a.csv', 'data': {'rows': [1]}},
+            {'data_key': 'period:b.csv', 'data': {'rows': [2]}},
+        ])
+        with patch('backend.storage._get_supabase', return_value=sb):
+            result = _sb_load_many(['period:a.csv', 'period:b.csv'], 't-1')
+        assert result == {'period:a.csv': {'rows': [1]}, 'period:b.csv': {'rows': [2]}}
+        assert chain.execute.call_count == 1
+        chain.in_.assert_called_once_with('data_key', ['period:a.csv', 'period:b.csv'])
+
+    def test_sb_load_many_batches_long_key_lists(self, monkeypatch):
+        import backend.storage as storage_mod
+        monkeypatch.setattr(storage_mod, '_SB_IN_BATCH', 2)
+        sb, chain = _mock_sb_rows([])
+        with patch('backend.storage._get_supabase', return_value=sb):
+            storage_mod._sb_load_many(['k1', 'k2', 'k3'], 't-1')
+        assert chain.execute.call_count == 2
+
+    def test_sb_load_many_failure_returns_none(self):
+        from backend.storage import _sb_load_many
+        sb = MagicMock()
+        sb.table.side_effect = Exception("query failed")
+        with patch('backend.storage._get_supabase', return_value=sb):
+            assert _sb_load_many(['settings'], 't-1') is None
+
+    def test_sb_load_prefix_filters_like_wildcard_matches(self):
+        from backend.storage import _sb_load_prefix
+        sb, chain = _mock_sb_rows([
+            {'data_key': 'period_meta:a.csv', 'data': {'period_name': 'A'}},
+            {'data_key': 'periodXmeta:b.csv', 'data': {'period_name': 'B'}},
+            {'data_key': 'period_meta:empty.csv', 'data': None},
+        ])
+        with patch('backend.storage._get_supabase', return_value=sb):
+            result = _sb_load_prefix('period_meta:', 't-1')
+        assert result == {'period_meta:a.csv': {'period_name': 'A'}}
+        chain.like.assert_called_once_with('data_key', 'period_meta:%')
+
+    def test_file_load_prefix_matches_list_keys_plus_load(self, tmp_home):
+        from backend.storage import save, load, list_keys, load_prefix
+        save('assignment:B', {'title': 'B'})
+        save('assignment:A', {'title': 'A'})
+        expected = {k: load(k) for k in list_keys('assignment:')}
+        result = load_prefix('assignment:')
+        assert result == expected
+        assert list(result) == ['assignment:A', 'assignment:B']
+
+    def test_load_many_local_dev_maps_every_key(self, tmp_home):
+        from backend.storage import save, load_many
+        save('settings', {'k': 'v'})
+        assert load_many(['settings', 'rubric', 'settings']) == {
+            'settings': {'k': 'v'}, 'rubric': None,
+        }
+        assert load_many([]) == {}
+
+    def test_load_many_supabase_falls_back_per_key(self, tmp_home, monkeypatch):
+        monkeypatch.setenv('SUPABASE_URL', 'https://x.supabase.co')
+        monkeypatch.setenv('SUPABASE_SERVICE_KEY', 'sk-test')
+        from backend.storage import _file_save, load_many
+        _file_save('rubric', {'from': 'file'}, 'teacher-uuid-1')
+        _file_save('api_keys', {'openai': 'sk-secret'}, 'teacher-uuid-1')
+        with patch('backend.storage._sb_load_many',
+                   return_value={'settings': {'from': 'sb'}}) as sb_many:
+            result = load_many(['settings', 'rubric', 'api_keys'], 'teacher-uuid-1')
+        sb_many.assert_called_once_with(['settings', 'rubric', 'api_keys'], 'teacher-uuid-1')
+        # Sensitive keys never fall back to files (same rule as load)
+        assert result == {'settings': {'from': 'sb'}, 'rubric': {'from': 'file'}, 'api_keys': None}
+
+    def test_load_prefix_supabase_failure_falls_back_to_files(self, tmp_home, monkeypatch):
+        monkeypatch.setenv('SUPABASE_URL', 'https://x.supabase.co')
+        monkeypatch.setenv('SUPABASE_SERVICE_KEY', 'sk-test')
+        from backend.storage import _file_save, load_prefix
+        _file_save('resource:r1', {'id': 'r1'}, 'teacher-uuid-1')
+        with patch('backend.storage._sb_load_prefix', return_value=None):
+            assert load_prefix('resource:', 'teacher-uuid-1') == {'resource:r1': {'id': 'r1'}}
+        with patch('backend.storage._sb_load_prefix', return_value={}):
+            assert load_prefix('resource:', 'teacher-uuid-1') == {}
+
+
 # ──────────────────────────────────────────────────────────────────
 # Public student-history API
 # ──────────────────────────────────────────────────────────────────
@@ -0,0 +1,175 @@
+"""Tests for backend/storage_uow.py and its hooks in backend/storage.py."""
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+import backend.storage as storage
+from backend import storage_uow
+
+
+@pytest.fixture
+def uow_on(monkeypatch):
+    monkeypatch.setenv("FLAG_STORAGE_UNIT_OF_WORK", "1")
+
+
+@pytest.fixture
+def backend_calls():
+    """Patch the direct (uncached) load/save paths and record their calls."""
+    calls = {"load": [], "save": []}
+    data = {"settings": {"theme": "dark", "tags": ["a"]}}
+
+    def load_direct(key, tid):
+        calls["load"].append(key)
+        return data.get(key)
+
+    def save_direct(key, value, tid, *, mirror_in_background=False):
+        calls["save"].append((key, value, mirror_in_background))
+        return True
+
+    with patch("backend.storage._load_direct", side_effect=load_direct), \
+         patch("backend.storage._save_direct", side_effect=save_direct):
+        yield calls
+
+
+def test_flag_off_starts_no_unit(monkeypatch, backend_calls):
+    monkeypatch.delenv("FLAG_STORAGE_UNIT_OF_WORK", raising=False)
+    with storage_uow.unit_of_work() as uow:
+        assert uow is None
+        storage.load("settings", "t1")
+        storage.load("settings", "t1")
+    assert backend_calls["load"] == ["settings", "settings"]
+
+
+def test_loads_are_deduplicated_and_copied(uow_on, backend_calls):
+    with storage_uow.unit_of_work() as uow:
+        first = storage.load("settings", "t1")
+        first["tags"].append("mutated")
+        second = storage.load("settings", "t1")
+        storage.load("settings", "t2")  # other teacher: separate entry
+    assert second == {"theme": "dark", "tags": ["a"]}
+    assert backend_calls["load"] == ["settings", "settings"]
+    assert uow.stats()["round_trips_saved"] == 1
+
+
+def test_saves_are_buffered_last_writer_wins(uow_on, backend_calls):
+    with storage_uow.unit_of_work():
+        settings = {"theme": "light"}
+        storage.save("settings", settings, "t1")
+        settings["theme"] = "changed-after-save"  # snapshot taken at save()
+        assert storage.load("settings", "t1") == {"theme": "light"}
+        storage.save("rubric", {"v": 1}, "t1")
+        storage.save("settings", {"theme": "final"}, "t1")
+        assert backend_calls["save"] == []
+        assert backend_calls["load"] == []  # served from the pending write
+    assert backend_calls["save"] == [
+        ("rubric", {"v": 1}, True),
+        ("settings", {"theme": "final"}, True),
+    ]
+
+
+def test_listing_flushes_pending_saves_first(uow_on, backend_calls):
+    with patch("backend.storage._file_list_keys", return_value=[]):
+        with storage_uow.unit_of_work():
+            storage.save("assignment:A", {"title": "A"}, "local-dev")
+            storage.list_keys("assignment:", "local-dev")
+            assert [c[0] for c in backend_calls["save"]] == ["assignment:A"]
+    assert len(backend_calls["save"]) == 1
+
+
+def test_delete_drops_cached_and_pending_values(uow_on, backend_calls):
+    with patch("backend.storage._file_delete", return_value=True):
+        with storage_uow.unit_of_work():
+            storage.save("rubric", {"v": 1}, "local-dev")
+            storage.delete("rubric", "local-dev")
+            assert storage.load("rubric", "local-dev") is None
+    assert backend_calls["save"] == []
+
+
+def test_failed_flush_is_counted_and_not_served(uow_on):
+    uow = storage_uow.StorageUnitOfWork()
+    uow.save("settings", {"v": 1}, "t1")
+    assert uow.flush(lambda key, data, tid: False) == 1
+    assert uow.load("settings", "t1", lambda: {"v": "from-backend"}) == {"v": "from-backend"}
+    assert uow.stats()["save_failures"] == 1
+
+
+def test_completed_event_reports_savings(uow_on, backend_calls, monkeypatch):
+    events = []
+    monkeypatch.setattr("backend.observability.events.emit",
+                        lambda event, **fields: events.append((event, fields)))
+    with storage_uow.unit_of_work("task"):
+        for _ in range(3):
+            storage.load("settings", "t1")
+        storage.save("settings", {"v": 1}, "t1")
+        storage.save("settings", {"v": 2}, "t1")
+    event, fields = events[0]
+    assert event == "storage.uow.completed"
+    assert fields["scope"] == "task"
+    assert fields["loads_requested"] == 3 and fields["loads_performed"] == 1
+    assert fields["saves_requested"] == 2 and fields["saves_performed"] == 1
+    assert fields["round_trips_saved"] == 3
+
+
+def test_supabase_file_mirror_runs_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "HOME", str(tmp_path))
+    monkeypatch.setattr(storage, "_use_supabase", lambda tid: True)
+    with patch("backend.storage._sb_save", return_value=True) as sb_save:
+        assert storage._save_direct("settings", {"v": 1}, "t1", mirror_in_background=True)
+    storage_uow.wait_for_file_writes()
+    sb_save.assert_called_once()
+    assert storage._file_load("settings", "t1") == {"v": 1}
+
+
+def test_flask_request_gets_one_unit_flushed_at_teardown(uow_on, backend_calls):
+    app = Flask(__name__)
+    storage_uow.register(app)
+
+    @app.route("/work")
+    def work():
+        storage.load("settings", "t1")
+        storage.load("settings", "t1")
+        storage.save("settings", {"v": 1}, "t1")
+        storage.save("settings", {"v": 2}, "t1")
+        assert backend_calls["save"] == []
+        return "ok"
+
+    assert app.test_client().get("/work").status_code == 200
+    assert backend_calls["load"] == ["settings"]
+    assert backend_calls["save"] == [("settings", {"v": 2}, True)]
+    assert storage_uow.current_unit_of_work() is None
+
+
+def test_saves_are_flushed_before_work_leaves_the_request(uow_on, backend_calls, monkeypatch):
+    """Threads and Celery tasks don't share the unit: every dispatch point
+    flushes first, so the handler sees the request's writes."""
+    from backend.routes import student_portal_routes
+    from backend.services import background_jobs
+
+    seen = []
+    monkeypatch.setitem(sys.modules, "backend.services.portal_grading",
+                        MagicMock(run_portal_grading_thread=lambda *a: None))
+    monkeypatch.delenv("CELERY_BROKER_URL", raising=False)
+    monkeypatch.setattr(background_jobs, "_run_in_thread",
+                        lambda job_id: seen.append(list(backend_calls["save"])))
+
+    class _Thread:
+        def __init__(self, *a, **k):
+            seen.append(list(backend_calls["save"]))
+
+        def start(self):
+            pass
+
+    with storage_uow.unit_of_work():
+        storage.save("results", {"v": 1}, "t1")
+        background_jobs.dispatch({"id": "job-1", "kind": "district_report"})
+        storage.save("results", {"v": 2}, "t1")
+        with patch("threading.Thread", _Thread):
+            student_portal_routes._spawn_thread_grading(
+                "sub-1", {}, {}, {}, {}, "t1", "join_code", {})
+
+    assert seen == [
+        [("results", {"v": 1}, True)],
+        [("results", {"v": 1}, True), ("results", {"v": 2}, True)],
+    ]
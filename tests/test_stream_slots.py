@@ -0,0 +1,162 @@
+"""Tests for backend/stream_slots.py (per-worker SSE stream admission)."""
+from __future__ import annotations
+
+import runpy
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask, Response, stream_with_context
+
+from backend import stream_slots
+from backend.stream_slots import StreamSlots
+
+
+@pytest.fixture(autouse=True)
+def _fresh_slots(monkeypatch):
+    monkeypatch.delenv("SSE_STREAM_SLOTS", raising=False)
+    monkeypatch.delenv("GUNICORN_THREADS", raising=False)
+    stream_slots.reset()
+    yield
+    stream_slots.reset()
+
+
+def test_default_capacity_leaves_threads_for_sync_routes(monkeypatch):
+    assert stream_slots.default_capacity() == 12
+    monkeypatch.setenv("GUNICORN_THREADS", "8")
+    assert stream_slots.default_capacity() == 4
+    monkeypatch.setenv("GUNICORN_THREADS", "1")
+    assert stream_slots.default_capacity() == 1
+    monkeypatch.setenv("SSE_STREAM_SLOTS", "3")
+    assert stream_slots.default_capacity() == 3
+
+
+def test_acquire_rejects_at_capacity_and_release_is_idempotent():
+    slots = StreamSlots(2)
+    first, second = slots.try_acquire(), slots.try_acquire()
+    assert first is not None and second is not None
+    assert slots.try_acquire() is None
+    assert slots.rejected_total == 1
+
+    first.release()
+    first.release()
+    assert slots.active == 1
+    assert slots.try_acquire() is not None
+
+
+def test_wrapped_iterator_releases_on_exhaustion_and_error():
+    slots = StreamSlots(1)
+    assert list(slots.try_acquire().wrap(iter(["a", "b"]))) == ["a", "b"]
+    assert slots.active == 0
+
+    def boom():
+        yield "a"
+        raise RuntimeError("provider down")
+
+    wrapped = slots.try_acquire().wrap(boom())
+    assert next(wrapped) == "a"
+    with pytest.raises(RuntimeError):
+        next(wrapped)
+    assert slots.active == 0
+
+
+def test_close_before_first_chunk_releases_the_slot():
+    """A response closed before iteration (client gone, after_request error).
+
+    stream_with_context's primed wrapper never reaches the inner generator's
+    cleanup in that case, so the lease must wrap the outside.
+    """
+    app = Flask(__name__)
+    slots = StreamSlots(1)
+
+    def generate():
+        yield "data: 1\n\n"
+
+    with app.test_request_context("/"):
+        response = Response(slots.try_acquire().wrap(stream_with_context(generate())))
+    assert slots.active == 1
+    response.close()
+    assert slots.active == 0
+
+
+def _chat_app():
+    from backend.routes.assistant_routes import assistant_bp
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.secret_key = "test-secret"
+
+    @app.before_request
+    def _set_user_id():
+        from flask import g
+        g.user_id = "test-teacher"
+
+    app.register_blueprint(assistant_bp)
+    return app
+
+
+def test_assistant_chat_returns_503_when_stream_slots_are_full(monkeypatch):
+    from backend.services.llm_adapter import breakers
+
+    monkeypatch.setenv("SSE_STREAM_SLOTS", "1")
+    held = stream_slots.try_acquire()
+    assert held is not None
+    breakers._BREAKERS.clear()
+
+    with patch("backend.routes.assistant_routes._get_assistant_model",
+               return_value={"provider": "openai", "model": "gpt-4o"}), \
+            patch("backend.api_keys.get_api_key", return_value="sk-test"), \
+            patch("backend.routes.assistant_routes.openai_pkg", MagicMock()), \
+            patch("backend.routes.assistant_routes._run_assistant_stream") as run_stream:
+        resp = _chat_app().test_client().post(
+            "/api/assistant/chat",
+            json={"messages": [{"role": "user", "content": "hi"}], "session_id": "slots-full"},
+        )
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(stream_slots.RETRY_AFTER_SECONDS)
+    run_stream.assert_not_called()
+    assert stream_slots.get_slots().rejected_total == 1
+    breakers._BREAKERS.clear()
+
+
+def test_assistant_chat_frees_its_slot_when_the_stream_ends(monkeypatch):
+    from backend.services.llm_adapter import breakers
+
+    monkeypatch.setenv("SSE_STREAM_SLOTS", "1")
+    breakers._BREAKERS.clear()
+
+    def fake_stream(**kwargs):
+        assert stream_slots.get_slots().active == 1
+        yield 'data: {"type": "done"}\n\n'
+
+    with patch("backend.routes.assistant_routes._get_assistant_model",
+               return_value={"provider": "openai", "model": "gpt-4o"}), \
+            patch("backend.api_keys.get_api_key", return_value="sk-test"), \
+            patch("backend.routes.assistant_routes.openai_pkg", MagicMock()), \
+            patch("backend.routes.assistant_routes._run_assistant_stream", fake_stream):
+        resp = _chat_app().test_client().post(
+            "/api/assistant/chat",
+            json={"messages": [{"role": "user", "content": "hi"}], "session_id": "slots-free"},
+        )
+        assert resp.get_data(as_text=True) == 'data: {"type": "done"}\n\n'
+
+    assert stream_slots.get_slots().active == 0
+    breakers._BREAKERS.clear()
+
+
+def test_gunicorn_config_defaults_to_threaded_workers(monkeypatch):
+    for name in ("GUNICORN_WORKER_CLASS", "WEB_CONCURRENCY", "GUNICORN_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+    config = runpy.run_path(str(Path(__file__).resolve().parents[1] / "backend" / "gunicorn.conf.py"))
+    assert (config["worker_class"], config["workers"], config["threads"]) == ("gthread", 2, 16)
+    assert config["threads"] - stream_slots.default_capacity() == 4
+
+
+def test_gunicorn_sync_rollback_runs_one_thread_per_worker(monkeypatch):
+    monkeypatch.delenv("GUNICORN_THREADS", raising=False)
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "sync")
+    path = str(Path(__file__).resolve().parents[1] / "backend" / "gunicorn.conf.py")
+    assert runpy.run_path(path)["threads"] == 1
+    monkeypatch.setenv("GUNICORN_THREADS", "4")
+    assert runpy.run_path(path)["threads"] == 4
@@ -0,0 +1,100 @@
+"""Tests for backend/services/student_assessment_projection.py.
+
+The projection is what /api/student/join/<code> serves verbatim, so the
+contract pinned here is: no answer-key fields ever leak, the shape matches
+the legacy per-request sanitizer, and serialization is deterministic (same
+payload -> same bytes -> same ETag).
+"""
+import json
+
+from backend.services.student_assessment_projection import (
+    build_student_projection,
+    projection_columns_for,
+    serialize_projection,
+)
+
+
+def _row(**overrides):
+    row = {
+        'join_code': 'ABC123',
+        'teacher_name': 'Ms. Rivera',
+        'assessment': {
+            'title': 'Unit 3 Quiz',
+            'instructions': 'Answer all questions.',
+            'total_points': 10,
+            'sections': [{
+                'name': 'Part A',
+                'instructions': 'Pick one.',
+                'questions': [{
+                    'number': 1,
+                    'question': 'What is 2+2?',
+                    'question_type': 'multiple_choice',
+                    'options': ['3', '4'],
+                    'answer': '4',
+                    'rubric': 'exact',
+                    'model_answer': 'Four',
+                    'points': 5,
+                }],
+            }],
+        },
+        'settings': {
+            'time_limit_minutes': 20,
+            'restricted_students': ['Ana Lopez'],
+            'is_makeup': True,
+            'student_accommodations': {'Ana Lopez': {'extended_time': 1.5}},
+            'period': 'P2',
+        },
+    }
+    row.update(overrides)
+    return row
+
+
+def test_projection_strips_answer_key_fields():
+    out = build_student_projection(_row())
+    q = out['sections'][0]['questions'][0]
+    assert set(q) == {'number', 'question', 'type', 'points', 'options', 'terms', 'definitions'}
+    assert q['type'] == 'multiple_choice'
+    assert 'answer' not in json.dumps(out).lower().replace('answer all', '')
+
+
+def test_projection_carries_settings_and_accommodations():
+    out = build_student_projection(_row())
+    assert out['settings'] == {
+        'content_type': 'assessment',
+        'time_limit_minutes': 20,
+        'require_name': True,
+        'is_makeup': True,
+        'restricted_students': ['Ana Lopez'],
+        'period': 'P2',
+    }
+    assert out['student_accommodations'] == {'Ana Lopez': {'extended_time': 1.5}}
+    assert out['teacher'] == 'Ms. Rivera'
+
+
+def test_material_projection_uses_join_code_for_media_url():
+    row = _row(
+        assessment={'title': 'Audio', 'shared_file': 'x.mp3'},
+        settings={'content_type': 'audio_overview'},
+        join_code='abc123',
+    )
+    out = build_student_projection(row)
+    assert out == {
+        'content_type': 'audio_overview',
+        'title': 'Audio',
+        'teacher': 'Ms. Rivera',
+        'media_url': '/api/student/shared-media/ABC123',
+    }
+
+
+def test_serialization_is_deterministic_and_etag_tracks_content():
+    body_a, etag_a = serialize_projection({'b': 1, 'a': [1, 2]})
+    body_b, etag_b = serialize_projection({'a': [1, 2], 'b': 1})
+    assert body_a == body_b and etag_a == etag_b
+    _, etag_c = serialize_projection({'a': [1, 2], 'b': 2})
+    assert etag_c != etag_a
+
+
+def test_projection_columns_round_trip():
+    cols = projection_columns_for(_row())
+    assert json.loads(cols['student_projection']) == build_student_projection(_row())
+    assert serialize_projection(build_student_projection(_row()))[1] == cols['student_projection_etag']
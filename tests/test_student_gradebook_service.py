@@ -60,6 +60,66 @@ def test_full_grid_canonical_grade_latest():
     assert out['grades']['s1']['ct1']['total_attempts'] == 1
 
 
+def _grid(**over):
+    grid = {
+        'roster': [{'id': 's1', 'first_name': 'A', 'last_name': 'B'}],
+        'content': [{'id': 'ct1', 'title': 'Q1', 'content_type': 'assessment',
+                     'created_at': '2026-04-01', 'due_date': None, 'is_active': True,
+                     'target_student_ids': None, 'remediation_content': None}],
+        'grades': [{'student_id': 's1', 'content_id': 'ct1', 'submission_id': 'sub2',
+                    'percentage': 90, 'attempt_number': 2, 'submitted_at': '2026-04-03T10:00:00Z',
+                    'total_attempts': 2, 'percentage_sum': 145}],
+    }
+    grid.update(over)
+    return grid
+
+
+def test_rpc_grid_is_used_when_flag_on(monkeypatch):
+    from backend.services.student_gradebook import build_class_gradebook
+    monkeypatch.setenv('FLAG_GRADEBOOK_RPC', 'true')
+    db = MagicMock()
+    db.rpc.return_value.execute.return_value = MagicMock(data=_grid())
+    out = build_class_gradebook(db, 'c1', 'P1', 'average')
+    db.table.assert_not_called()
+    db.rpc.assert_called_once_with('class_gradebook_grid', {'p_class_id': 'c1', 'p_attempt_mode': 'average'})
+    assert out['grades']['s1']['ct1'] == {'submission_id': 'sub2', 'percentage': 72.5, 'attempt_number': 2,
+                                          'submitted_at': '2026-04-03T10:00:00Z', 'total_attempts': 2}
+    assert 'remediation_content' not in out['assessments'][0]
+
+
+def test_rpc_error_falls_back_to_python_path(monkeypatch):
+    from backend.services.student_gradebook import build_class_gradebook
+    monkeypatch.setenv('FLAG_GRADEBOOK_RPC', 'true')
+    db = _db({'class_students': [{'student_id': 's1'}],
+              'students': [{'id': 's1', 'first_name': 'A', 'last_name': 'B'}],
+              'published_content': []})
+    db.rpc.side_effect = RuntimeError("function class_gradebook_grid does not exist")
+    out = build_class_gradebook(db, 'c1', 'P1', 'latest')
+    assert out['students'] == [{'student_id': 's1', 'student_name': 'A B'}]
+
+
+def test_rpc_grid_matches_python_path_payload(monkeypatch):
+    from backend.services.student_gradebook import build_class_gradebook
+    tables = {
+        'class_students': [{'student_id': 's1'}],
+        'students': [{'id': 's1', 'first_name': 'A', 'last_name': 'B'}],
+        'published_content': [{'id': 'ct1', 'title': 'Q1', 'content_type': 'assessment',
+                               'created_at': '2026-04-01', 'due_date': None,
+                               'is_active': True, 'target_student_ids': None}],
+        'student_submissions': [
+            {'id': 'sub1', 'student_id': 's1', 'content_id': 'ct1', 'attempt_number': 1,
+             'submitted_at': '2026-04-02T10:00:00Z', 'percentage': 55, 'status': 'graded'},
+            {'id': 'sub2', 'student_id': 's1', 'content_id': 'ct1', 'attempt_number': 2,
+             'submitted_at': '2026-04-03T10:00:00Z', 'percentage': 90, 'status': 'graded'},
+        ],
+    }
+    python_out = build_class_gradebook(_db(tables), 'c1', 'P1', 'latest')
+    monkeypatch.setenv('FLAG_GRADEBOOK_RPC', 'true')
+    db = MagicMock()
+    db.rpc.return_value.execute.return_value = MagicMock(data=_grid())
+    assert build_class_gradebook(db, 'c1', 'P1', 'latest') == python_out
+
+
 # ── build_submission_detail (Wave 5 Slice 4b): the (payload, err) contract ──
 
 def _detail_db(tables):
@@ -0,0 +1,135 @@
+"""Tests for backend/services/student_mastery_rollup.py.
+
+The rollup must serve exactly what the pre-rollup progress-rank and report-card
+aggregation computes, for every attempt mode. These tests drive both paths
+against the in-memory fake Supabase and compare payloads.
+"""
+import pytest
+
+from backend.testing.fake_supabase import FakeSupabaseClient
+from backend.services import student_mastery_rollup as rollup
+from backend.services.student_progress_reports import (
+    build_class_progress_rank,
+    build_student_report_card,
+)
+
+
+def _mastery(earned, possible, dok=None):
+    entry = {'points_earned': earned, 'points_possible': possible, 'question_count': 1}
+    if dok is None:
+        return entry
+    return {'overall': entry, 'by_dok': {str(dok): entry}}
+
+
+@pytest.fixture
+def db():
+    db = FakeSupabaseClient()
+    db.table('class_students').insert([
+        {'class_id': 'c1', 'student_id': 's1'},
+        {'class_id': 'c1', 'student_id': 's2'},
+    ]).execute()
+    db.table('students').insert([
+        {'id': 's1', 'first_name': 'Amy', 'last_name': 'Lee'},
+        {'id': 's2', 'first_name': 'Ben', 'last_name': 'Ortiz'},
+    ]).execute()
+    db.table('published_content').insert([
+        {'id': 'ct1', 'class_id': 'c1', 'title': 'Quiz 1', 'content_type': 'assessment'},
+        {'id': 'ct2', 'class_id': 'c1', 'title': 'HW 1', 'content_type': 'assignment'},
+    ]).execute()
+    db.table('student_submissions').insert([
+        {'id': 'a1', 'student_id': 's1', 'content_id': 'ct1', 'attempt_number': 1,
+         'submitted_at': '2026-04-01T10:00:00Z', 'percentage': 50, 'status': 'graded',
+         'results': {'standards_mastery': {'STD.1': _mastery(5, 10, dok=2), 'STD.2': _mastery(1, 2)}}},
+        {'id': 'a2', 'student_id': 's1', 'content_id': 'ct1', 'attempt_number': 2,
+         'submitted_at': '2026-04-02T10:00:00Z', 'percentage': 90, 'status': 'graded',
+         'results': {'standards_mastery': {'STD.1': _mastery(9, 10, dok=2)}}},
+        {'id': 'b1', 'student_id': 's2', 'content_id': 'ct2', 'attempt_number': 1,
+         'submitted_at': '2026-04-03T10:00:00Z', 'percentage': 0, 'status': 'graded',
+         'results': {'standards_mastery': {'STD.3': _mastery(0, 0)}}},
+        {'id': 'd1', 'student_id': 's2', 'content_id': 'ct1', 'attempt_number': 1,
+         'status': 'draft', 'results': {'standards_mastery': {'STD.9': _mastery(1, 1)}}},
+    ]).execute()
+    return db
+
+
+def _reads(monkeypatch, enabled):
+    monkeypatch.setenv('FLAG_MASTERY_ROLLUP_READS', 'true' if enabled else 'false')
+
+
+@pytest.mark.parametrize('mode', ['latest', 'best', 'average'])
+def test_progress_rank_from_rollup_matches_live_aggregation(db, monkeypatch, mode):
+    _reads(monkeypatch, False)
+    live, _ = build_class_progress_rank(db, 'c1', 'P1', mode)
+
+    assert rollup.backfill_class_rollup(db, 'c1') == 3
+    _reads(monkeypatch, True)
+    rolled, _ = build_class_progress_rank(db, 'c1', 'P1', mode)
+
+    assert rolled == live
+    # A zero-point standard still appears as a column (exact union).
+    assert rolled['standards'] == ['STD.1', 'STD.2', 'STD.3']
+
+
+@pytest.mark.parametrize('mode', ['latest', 'best', 'average'])
+def test_report_card_breakdown_from_rollup_matches_live(db, monkeypatch, mode):
+    _reads(monkeypatch, False)
+    live = build_student_report_card(db, 'c1', 'P1', 's1', 'Amy Lee', mode)
+    rollup.backfill_class_rollup(db, 'c1')
+    _reads(monkeypatch, True)
+    rolled = build_student_report_card(db, 'c1', 'P1', 's1', 'Amy Lee', mode)
+    assert rolled == live
+    assert rolled['standards_breakdown'][-1]['by_dok'][0]['dok'] == 2
+
+
+def test_refresh_for_submission_picks_up_new_grade_and_drops_stale_codes(db, monkeypatch):
+    rollup.backfill_class_rollup(db, 'c1')
+    db.table('student_submissions').insert({
+        'id': 'a3', 'student_id': 's1', 'content_id': 'ct2', 'attempt_number': 1,
+        'submitted_at': '2026-04-05T10:00:00Z', 'percentage': 100, 'status': 'graded',
+        'results': {'standards_mastery': {'STD.4': _mastery(4, 4)}},
+    }).execute()
+    db.table('student_submissions').delete().eq('id', 'a1').execute()
+
+    rollup.refresh_rollup_for_submission(db, 'a3')
+
+    codes = sorted(r['standard_code'] for r in db.table(rollup.ROLLUP_TABLE).select('*').eq(
+        'student_id', 's1').execute().data)
+    assert codes == ['STD.1', 'STD.4']
+
+
+def test_refresh_for_classes_drops_standards_of_deleted_content(db, monkeypatch):
+    rollup.backfill_class_rollup(db, 'c1')
+    db.table('published_content').delete().eq('id', 'ct2').execute()
+
+    rollup.refresh_rollup_for_classes(db, ['c1'])
+
+    rows = db.table(rollup.ROLLUP_TABLE).select('*').execute().data
+    assert sorted((r['student_id'], r['standard_code']) for r in rows) == [
+        ('s1', 'STD.1'), ('s1', 'STD.2'),
+    ]
+
+
+def test_rollup_reads_retitle_renamed_content(db, monkeypatch):
+    rollup.backfill_class_rollup(db, 'c1')
+    db.table('published_content').update({'title': 'Quiz 1 (renamed)'}).eq('id', 'ct1').execute()
+    _, titles = rollup.fetch_class_content(db, 'c1')
+    mastery, _ = rollup.load_class_mastery(db, 'c1', 'latest', titles)
+    contrib = mastery['s1']['STD.1']['contributing_submissions'][0]
+    assert contrib['title'] == 'Quiz 1 (renamed)'
+    assert 'content_id' not in contrib
+
+
+def test_write_hooks_respect_kill_switch(db, monkeypatch):
+    monkeypatch.setenv('FLAG_MASTERY_ROLLUP_WRITES', 'false')
+    rollup.refresh_rollup_for_submission(db, 'a2')
+    rollup.refresh_rollup_for_students(db, 'c1', ['s1'])
+    assert db.table(rollup.ROLLUP_TABLE).select('*').execute().data == []
+
+
+def test_refresh_never_raises_on_backend_error(monkeypatch):
+    class Broken:
+        def table(self, name):
+            raise RuntimeError("supabase down")
+    rollup.refresh_rollup_for_submission(Broken(), 'a1')
+    rollup.refresh_rollup_for_students(Broken(), 'c1', ['s1'])
+    rollup.refresh_rollup_for_classes(Broken(), ['c1'])
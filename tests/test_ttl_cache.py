@@ -97,3 +97,58 @@ def test_tuple_keys_supported():
     cache.set(("teacher-1", "class-1", "latest"), {"foo": "bar"})
     assert cache.get(("teacher-1", "class-1", "latest")) == {"foo": "bar"}
     assert cache.get(("teacher-1", "class-1", "best")) is None
+
+
+def test_lru_eviction_bounds_size_and_keeps_recently_used():
+    cache = TTLCache(ttl_seconds=5, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")          # "a" is now most recently used
+    cache.set("c", 3)       # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 2
+
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(ttl_seconds=5)
+    cache.get("k")
+    cache.set("k", "v")
+    cache.get("k")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_zero_max_entries_rejected():
+    with pytest.raises(ValueError):
+        TTLCache(ttl_seconds=5, max_entries=0)
+
+
+def test_get_or_compute_coalesces_concurrent_callers():
+    cache = TTLCache(ttl_seconds=5)
+    calls = []
+    gate = threading.Event()
+
+    def compute():
+        calls.append(1)
+        gate.wait(1)
+        return {"v": 1}, True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"v": 1}] * 8
+
+
+def test_get_or_compute_does_not_store_uncacheable_result():
+    cache = TTLCache(ttl_seconds=5)
+    assert cache.get_or_compute("k", lambda: ("empty", False)) == "empty"
+    assert cache.get("k") is None